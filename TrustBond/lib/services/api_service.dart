@@ -5,6 +5,7 @@ import 'dart:convert';
 import 'package:http/http.dart' as http;
 import 'package:shared_preferences/shared_preferences.dart';
 import '../config/api_config.dart';
+import 'device_service.dart';
 
 class ApiService {
   static final ApiService _instance = ApiService._internal();
@@ -15,6 +16,7 @@ class ApiService {
   static const Duration _timeout = Duration(seconds: 60);
   static const Duration _catalogTimeout = Duration(seconds: 12);
   static const Duration _reportsTimeout = Duration(seconds: 15);
+  static const int _myReportsPageSize = 100;
   static const String _incidentTypesCacheKey = 'tb_cache_incident_types_v1';
   static const String _myReportsCachePrefix = 'tb_cache_my_reports_v1_';
   static const String _reportDetailCachePrefix = 'tb_cache_report_detail_v1_';
@@ -24,6 +26,16 @@ class ApiService {
     'Content-Type': 'application/json',
   };
   static const Map<String, String> _getHeaders = {};
+  static const String _deviceHashHeader = 'X-Device-Hash';
+
+  /// [headers] plus X-Device-Hash, for the rate-limited writes (report submit,
+  /// evidence upload, community vote): the backend throttles them per device
+  /// as well as per IP, and only reads the device from this header.
+  Future<Map<String, String>> _withDeviceHash(Map<String, String> headers) async {
+    final deviceHash = await DeviceService().getDeviceHash();
+    if (deviceHash.isEmpty) return headers;
+    return {...headers, _deviceHashHeader: deviceHash};
+  }
 
   Future<Map<String, dynamic>> registerDevice(String deviceHash) async {
     final response = await _client.post(
@@ -82,28 +94,41 @@ class ApiService {
     }
   }
 
-  /// List reports for the given device (my reports).
+  /// List reports for the given device (my reports), following next_cursor
+  /// until every page has been fetched.
   Future<List<dynamic>> getMyReports(String deviceId) async {
-    final uri = Uri.parse('${ApiConfig.reportsUrl}/').replace(
-      queryParameters: {'device_id': deviceId},
-    );
     final cacheKey = '$_myReportsCachePrefix$deviceId';
     try {
-      final response = await _client
-          .get(uri, headers: _getHeaders)
-          .timeout(_reportsTimeout);
-      if (response.statusCode == 200) {
+      final data = <dynamic>[];
+      String? cursor;
+      do {
+        final uri = Uri.parse('${ApiConfig.reportsUrl}/').replace(
+          queryParameters: {
+            'device_id': deviceId,
+            'limit': '$_myReportsPageSize',
+            if (cursor != null) 'cursor': cursor,
+          },
+        );
+        final response = await _client
+            .get(uri, headers: _getHeaders)
+            .timeout(_reportsTimeout);
+        if (response.statusCode != 200) {
+          throw Exception('Failed to get my reports: ${response.statusCode}');
+        }
         final decoded = jsonDecode(response.body);
-        final data = decoded is List
-            ? decoded
-            : decoded is Map<String, dynamic>
-                ? (decoded['items'] as List<dynamic>? ?? const <dynamic>[])
-                : const <dynamic>[];
-        await _saveCache(cacheKey, data);
-        await _cacheReportDetailStubs(deviceId, data);
-        return data;
-      }
-      throw Exception('Failed to get my reports: ${response.statusCode}');
+        if (decoded is List) {
+          data.addAll(decoded);
+          cursor = null;
+        } else if (decoded is Map<String, dynamic>) {
+          data.addAll(decoded['items'] as List<dynamic>? ?? const <dynamic>[]);
+          cursor = decoded['next_cursor'] as String?;
+        } else {
+          cursor = null;
+        }
+      } while (cursor != null);
+      await _saveCache(cacheKey, data);
+      await _cacheReportDetailStubs(deviceId, data);
+      return data;
     } catch (_) {
       final cached = await _readCache(cacheKey);
       if (cached is List) {
@@ -193,7 +218,7 @@ class ApiService {
   Future<Map<String, dynamic>> submitReport(Map<String, dynamic> reportData) async {
     final response = await _client.post(
       Uri.parse('${ApiConfig.reportsUrl}/'),
-      headers: _jsonHeaders,
+      headers: await _withDeviceHash(_jsonHeaders),
       body: jsonEncode(reportData),
     ).timeout(_timeout);
     
@@ -313,7 +338,7 @@ class ApiService {
       'POST',
       Uri.parse('${ApiConfig.reportsUrl}/$reportId/evidence'),
     );
-    request.headers.addAll(_getHeaders);
+    request.headers.addAll(await _withDeviceHash(_getHeaders));
     request.fields['device_id'] = deviceId.trim();
     request.files.add(await http.MultipartFile.fromPath('file', filePath));
 
@@ -351,7 +376,7 @@ class ApiService {
   Future<Map<String, dynamic>> submitCommunityVote(String reportId, String deviceId, String vote) async {
     final response = await _client.post(
       Uri.parse('${ApiConfig.reportsUrl}/$reportId/confirm'),
-      headers: _jsonHeaders,
+      headers: await _withDeviceHash(_jsonHeaders),
       body: jsonEncode({
         'device_id': deviceId,
         'vote': vote,
@@ -0,0 +1,65 @@
+"""Add number_counters table for O(1) report/case number allocation
+
+Revision ID: 013
+Revises: 012_merge_heads
+Create Date: 2026-10-19
+
+Replaces the per-insert MAX(SUBSTRING(...)) scan over reports/cases with a
+(scope, year) counter row bumped via INSERT ... ON CONFLICT ... RETURNING.
+Counters are seeded from the highest number already issued in each year.
+"""
+import re
+from typing import Dict, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "013"
+down_revision: Union[str, None] = "012_merge_heads"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# scope -> (table, column, number prefix)
+_SEED_SOURCES = {
+    "report": ("reports", "report_number", "RPT"),
+    "case": ("cases", "case_number", "CASE"),
+}
+
+
+def seed_counters(bind) -> None:
+    """Start each (scope, year) counter at the highest number already issued."""
+    for scope, (table, column, prefix) in _SEED_SOURCES.items():
+        pattern = re.compile(rf"^{prefix}-([0-9]{{4}})-([0-9]+)$")
+        highest: Dict[int, int] = {}
+        rows = bind.execute(
+            sa.text(f"SELECT {column} FROM {table} WHERE {column} LIKE :prefix"),
+            {"prefix": f"{prefix}-%"},
+        )
+        for (number,) in rows:
+            match = pattern.match(number or "")
+            if match:
+                year, value = int(match.group(1)), int(match.group(2))
+                highest[year] = max(value, highest.get(year, 0))
+        if highest:
+            bind.execute(
+                sa.text("INSERT INTO number_counters (scope, year, last_value) VALUES (:scope, :year, :last_value)"),
+                [{"scope": scope, "year": year, "last_value": value} for year, value in highest.items()],
+            )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "number_counters",
+        sa.Column("scope", sa.String(30), nullable=False),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("last_value", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("scope", "year"),
+    )
+
+    # Seed from existing data so new numbers continue after the current maximum.
+    seed_counters(op.get_bind())
+
+
+def downgrade() -> None:
+    op.drop_table("number_counters")
@@ -0,0 +1,36 @@
+"""Add composite indexes for keyset pagination of reports
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-19
+
+list_reports pages by (reported_at DESC, report_id DESC); the mobile
+"my reports" list does the same within one device_id.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "014"
+down_revision: Union[str, None] = "013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_reports_reported_at_report_id",
+        "reports",
+        [sa.text("reported_at DESC"), sa.text("report_id DESC")],
+    )
+    op.create_index(
+        "ix_reports_device_id_reported_at",
+        "reports",
+        ["device_id", sa.text("reported_at DESC"), sa.text("report_id DESC")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reports_device_id_reported_at", table_name="reports")
+    op.drop_index("ix_reports_reported_at_report_id", table_name="reports")
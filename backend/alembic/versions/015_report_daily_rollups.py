@@ -0,0 +1,70 @@
+"""Add report_daily_rollups for pre-aggregated dashboard statistics
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-19
+
+Dashboard and station statistics read per-day report counts from this table
+instead of scanning reports. It is kept current by ORM hooks and rebuilt by a
+periodic reconcile job; the initial contents are built here.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "015"
+down_revision: Union[str, None] = "014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "report_daily_rollups",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("station_id", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("village_location_id", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("incident_type_id", sa.SmallInteger(), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default=""),
+        sa.Column("verification_status", sa.String(20), nullable=False, server_default=""),
+        sa.Column("is_flagged", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("is_reviewed", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("report_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint(
+            "day",
+            "station_id",
+            "village_location_id",
+            "incident_type_id",
+            "status",
+            "verification_status",
+            "is_flagged",
+            "is_reviewed",
+        ),
+    )
+    op.create_index("ix_report_daily_rollups_station_day", "report_daily_rollups", ["station_id", "day"])
+    op.create_index("ix_report_daily_rollups_village", "report_daily_rollups", ["village_location_id"])
+
+    op.execute("""
+        INSERT INTO report_daily_rollups (
+            day, station_id, village_location_id, incident_type_id,
+            status, verification_status, is_flagged, is_reviewed, report_count
+        )
+        SELECT (COALESCE(reported_at, now()) AT TIME ZONE 'UTC')::date,
+               COALESCE(handling_station_id, 0),
+               COALESCE(village_location_id, 0),
+               incident_type_id,
+               COALESCE(status, ''),
+               COALESCE(verification_status::text, ''),
+               COALESCE(is_flagged, false),
+               verified_by IS NOT NULL,
+               COUNT(*)
+        FROM reports
+        GROUP BY 1, 2, 3, 4, 5, 6, 7, 8
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_report_daily_rollups_village", table_name="report_daily_rollups")
+    op.drop_index("ix_report_daily_rollups_station_day", table_name="report_daily_rollups")
+    op.drop_table("report_daily_rollups")
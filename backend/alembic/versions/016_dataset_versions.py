@@ -0,0 +1,51 @@
+"""Add dataset_versions, bumped by triggers when map source tables change
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-19
+
+Pre-rendered map artifacts (public locations GeoJSON) are keyed by the version
+of the table they were built from. A statement-level trigger bumps the version
+on any write, including writes from scripts that bypass the application.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "016"
+down_revision: Union[str, None] = "015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dataset_versions",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="1"),
+        sa.Column("changed_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.execute("INSERT INTO dataset_versions (name) VALUES ('locations')")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_dataset_version() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO dataset_versions (name, version, changed_at)
+            VALUES (TG_ARGV[0], 1, now())
+            ON CONFLICT (name) DO UPDATE
+                SET version = dataset_versions.version + 1, changed_at = now();
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER locations_dataset_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON locations
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_dataset_version('locations')
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS locations_dataset_version ON locations")
+    op.execute("DROP FUNCTION IF EXISTS bump_dataset_version()")
+    op.drop_table("dataset_versions")
@@ -0,0 +1,31 @@
+"""Bump dataset_versions on hotspot writes
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-19
+
+Vector tiles for the hotspots layer are cached on disk per layer version; the
+same statement-level trigger used for locations keeps that version current.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "017"
+down_revision: Union[str, None] = "016"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("INSERT INTO dataset_versions (name) VALUES ('hotspots') ON CONFLICT (name) DO NOTHING")
+    op.execute("""
+        CREATE TRIGGER hotspots_dataset_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON hotspots
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_dataset_version('hotspots')
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS hotspots_dataset_version ON hotspots")
+    op.execute("DELETE FROM dataset_versions WHERE name = 'hotspots'")
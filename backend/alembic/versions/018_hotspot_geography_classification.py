@@ -0,0 +1,48 @@
+"""Add indexed hotspot geography and stored cluster classification
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-19
+
+Public alerts look up hotspots near the user with a KNN / ST_DWithin query on
+an indexed geography point derived from center_lat / center_long, restricted to
+the current generation by detected_at. Cluster classification is stored when a
+hotspot is created or refreshed instead of being recomputed per request.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "018"
+down_revision: Union[str, None] = "017"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        ALTER TABLE hotspots ADD COLUMN geog geography(Point, 4326)
+        GENERATED ALWAYS AS (
+            ST_SetSRID(ST_MakePoint(center_long::float8, center_lat::float8), 4326)::geography
+        ) STORED
+    """)
+    op.create_index("idx_hotspots_geog", "hotspots", ["geog"], postgresql_using="gist")
+    op.create_index("ix_hotspots_detected_at", "hotspots", ["detected_at"])
+
+    op.add_column("hotspots", sa.Column("classification", sa.String(20), nullable=True))
+    op.add_column("hotspots", sa.Column("classification_confidence", sa.Float(), nullable=True))
+    op.add_column("hotspots", sa.Column("hotspot_score", sa.Float(), nullable=True))
+    op.add_column("hotspots", sa.Column("classification_source", sa.String(20), nullable=True))
+    op.add_column("hotspots", sa.Column("avg_trust_score", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("hotspots", "avg_trust_score")
+    op.drop_column("hotspots", "classification_source")
+    op.drop_column("hotspots", "hotspot_score")
+    op.drop_column("hotspots", "classification_confidence")
+    op.drop_column("hotspots", "classification")
+    op.drop_index("ix_hotspots_detected_at", table_name="hotspots")
+    op.drop_index("idx_hotspots_geog", table_name="hotspots")
+    op.drop_column("hotspots", "geog")
@@ -0,0 +1,106 @@
+"""Add notification_counters, kept in step with notifications by triggers
+
+Revision ID: 019
+Revises: 018
+Create Date: 2026-10-19
+
+Unread badge counts were a per-process dict (wrong across workers, reset on
+restart) next to a COUNT(*) endpoint. notification_counters holds the unread
+count per user; statement-level triggers with transition tables adjust it in
+the same transaction as every insert, is_read update or delete, so bulk
+inserts update each user's counter once.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "019"
+down_revision: Union[str, None] = "018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "notification_counters",
+        sa.Column(
+            "police_user_id",
+            sa.Integer(),
+            sa.ForeignKey("police_users.police_user_id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("unread_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.execute("""
+        INSERT INTO notification_counters (police_user_id, unread_count)
+        SELECT police_user_id, count(*) FILTER (WHERE NOT COALESCE(is_read, false))
+        FROM notifications
+        GROUP BY police_user_id
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION apply_notification_counter_deltas() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO notification_counters AS c (police_user_id, unread_count, updated_at)
+                SELECT police_user_id, count(*), now()
+                FROM new_rows
+                WHERE NOT COALESCE(is_read, false)
+                GROUP BY police_user_id
+                ON CONFLICT (police_user_id) DO UPDATE
+                    SET unread_count = c.unread_count + EXCLUDED.unread_count, updated_at = now();
+            ELSIF TG_OP = 'UPDATE' THEN
+                INSERT INTO notification_counters AS c (police_user_id, unread_count, updated_at)
+                SELECT police_user_id, sum(delta), now()
+                FROM (
+                    SELECT police_user_id, 1 AS delta FROM new_rows WHERE NOT COALESCE(is_read, false)
+                    UNION ALL
+                    SELECT police_user_id, -1 FROM old_rows WHERE NOT COALESCE(is_read, false)
+                ) d
+                GROUP BY police_user_id
+                HAVING sum(delta) <> 0
+                ON CONFLICT (police_user_id) DO UPDATE
+                    SET unread_count = GREATEST(0, c.unread_count + EXCLUDED.unread_count), updated_at = now();
+            ELSE
+                UPDATE notification_counters c
+                SET unread_count = GREATEST(0, c.unread_count - d.n), updated_at = now()
+                FROM (
+                    SELECT police_user_id, count(*) AS n
+                    FROM old_rows
+                    WHERE NOT COALESCE(is_read, false)
+                    GROUP BY police_user_id
+                ) d
+                WHERE c.police_user_id = d.police_user_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    # Transition tables allow only one event per trigger.
+    op.execute("""
+        CREATE TRIGGER notifications_counter_insert
+        AFTER INSERT ON notifications
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION apply_notification_counter_deltas()
+    """)
+    op.execute("""
+        CREATE TRIGGER notifications_counter_update
+        AFTER UPDATE ON notifications
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION apply_notification_counter_deltas()
+    """)
+    op.execute("""
+        CREATE TRIGGER notifications_counter_delete
+        AFTER DELETE ON notifications
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION apply_notification_counter_deltas()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS notifications_counter_delete ON notifications")
+    op.execute("DROP TRIGGER IF EXISTS notifications_counter_update ON notifications")
+    op.execute("DROP TRIGGER IF EXISTS notifications_counter_insert ON notifications")
+    op.execute("DROP FUNCTION IF EXISTS apply_notification_counter_deltas()")
+    op.drop_table("notification_counters")
@@ -0,0 +1,60 @@
+"""Add email_outbox for queued notification emails
+
+Revision ID: 020
+Revises: 019
+Create Date: 2026-10-19
+
+Notification emails were sent inline, one SMTP connect + login per message.
+They are now inserted here and drained in batches by the delivery worker over
+pooled SMTP connections, with retries (next_attempt_at) and a dead-letter
+status. The partial index covers the worker's claim query only.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "020"
+down_revision: Union[str, None] = "019"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "email_outbox",
+        sa.Column("email_id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("to_address", sa.String(255), nullable=False),
+        sa.Column("subject", sa.String(255)),
+        sa.Column("body_plain", sa.Text()),
+        sa.Column("body_html", sa.Text()),
+        sa.Column("template", sa.String(50)),
+        sa.Column("context", postgresql.JSONB()),
+        sa.Column("status", sa.String(10), nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("locked_at", sa.DateTime(timezone=True)),
+        sa.Column("last_error", sa.Text()),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("sent_at", sa.DateTime(timezone=True)),
+        sa.CheckConstraint(
+            "status IN ('pending', 'sending', 'sent', 'dead')", name="chk_email_outbox_status"
+        ),
+        sa.CheckConstraint(
+            "template IS NOT NULL OR body_plain IS NOT NULL", name="chk_email_outbox_body"
+        ),
+    )
+    op.create_index(
+        "idx_email_outbox_due",
+        "email_outbox",
+        ["next_attempt_at", "email_id"],
+        postgresql_where=sa.text("status IN ('pending', 'sending')"),
+    )
+    op.create_index("idx_email_outbox_status_created", "email_outbox", ["status", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_email_outbox_status_created", table_name="email_outbox")
+    op.drop_index("idx_email_outbox_due", table_name="email_outbox")
+    op.drop_table("email_outbox")
@@ -5,11 +5,12 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
 from app.core.websocket import manager
 import asyncio
 
 from app.config import settings
+from app.core.auth_cache import principal_cache
 from app.core.email import is_smtp_configured, send_password_reset_code
 from app.core.security import (
     ALGORITHM,
@@ -53,38 +54,51 @@ def _get_user_from_token(db: Session, token: str) -> PoliceUser:
         sub: str | None = payload.get("sub")
         if sub is None:
             raise credentials_exception
-    except JWTError:
+        user_id = int(sub)
+    except (JWTError, ValueError):
         raise credentials_exception
 
-    user = db.query(PoliceUser).filter(PoliceUser.police_user_id == int(sub)).first()
+    # Recently verified token: rebuild the user from the cache and attach it to
+    # this request's session without querying (see app.core.auth_cache).
+    cached = principal_cache.get(token)
+    if cached is not None and cached["police_user_id"] == user_id:
+        user = PoliceUser(**cached)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    user = db.query(PoliceUser).filter(PoliceUser.police_user_id == user_id).first()
     if not user or not user.is_active:
         raise credentials_exception
 
-    # Optional: if sessions table exists, ensure this token corresponds
-    # to a non-revoked session. If not found, fall back to accepting
-    # the token so legacy tokens still work.
+    # Tokens issued at login have a session row; reject them once every row
+    # for the token is revoked or expired. Tokens without a row (legacy, or no
+    # sessions table) are still accepted.
     try:
-        session = (
-            db.query(UserSession)
+        sessions = (
+            db.query(UserSession.expires_at, UserSession.revoked_at)
             .filter(
                 UserSession.police_user_id == user.police_user_id,
                 UserSession.refresh_token == token,
-                UserSession.expires_at > datetime.now(timezone.utc),
-                UserSession.revoked_at.is_(None),
             )
-            .first()
+            .all()
         )
     except Exception:
-        session = None
+        sessions = []
 
-    if session is None:
-        # Do not immediately revoke access; simply allow login,
-        # but admin revoke endpoints will act on sessions when present.
-        return user
+    now = datetime.now(timezone.utc)
+    if sessions and not any(
+        s.revoked_at is None and (s.expires_at is None or _as_utc(s.expires_at) > now) for s in sessions
+    ):
+        raise credentials_exception
 
+    principal_cache.put(token, user, token_expires_at=payload.get("exp"))
     return user
 
 
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
 def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
     db: Session = Depends(get_db),
@@ -164,11 +178,7 @@ def login(data: LoginRequest, background_tasks: BackgroundTasks, request: Reques
     db.commit()
 
     def notify():
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(manager.broadcast({"type": "refresh_data", "entity": "session"}))
-        except RuntimeError:
-            asyncio.run(manager.broadcast({"type": "refresh_data", "entity": "session"}))
+        manager.publish({"type": "refresh_data", "entity": "session"})
     background_tasks.add_task(notify)
 
     return Token(access_token=access_token)
@@ -192,13 +202,10 @@ def change_password(
     current_user.password_hash = get_password_hash(payload.new_password)
     db.add(current_user)
     db.commit()
+    principal_cache.invalidate_user(current_user.police_user_id)
 
     def notify():
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(manager.broadcast({"type": "refresh_data", "entity": "user"}))
-        except RuntimeError:
-            asyncio.run(manager.broadcast({"type": "refresh_data", "entity": "user"}))
+        manager.publish({"type": "refresh_data", "entity": "user"})
     background_tasks.add_task(notify)
 
     return {"message": "Password updated"}
@@ -226,13 +233,10 @@ def revoke_other_sessions(
         .update({UserSession.revoked_at: now}, synchronize_session=False)
     )
     db.commit()
+    principal_cache.invalidate_user(current_user.police_user_id)
 
     def notify():
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(manager.broadcast({"type": "refresh_data", "entity": "session"}))
-        except RuntimeError:
-            asyncio.run(manager.broadcast({"type": "refresh_data", "entity": "session"}))
+        manager.publish({"type": "refresh_data", "entity": "session"})
     background_tasks.add_task(notify)
 
     return {"message": "Other sessions revoked"}
@@ -308,6 +312,7 @@ def reset_password(payload: ResetPasswordRequest, db: Session = Depends(get_db))
     db.add(user)
     db.delete(row)
     db.commit()
+    principal_cache.invalidate_user(user.police_user_id)
 
     return {"message": "Password has been reset. You can now log in with your new password."}
 
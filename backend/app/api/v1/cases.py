@@ -7,7 +7,9 @@ from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy import or_, func
 
 from app.database import get_db
-from app.core.websocket import manager
+from app.core.websocket import manager, refresh_event
+from app.core.number_allocator import allocate_case_number
+from app.core.location_hierarchy import location_hierarchy
 from app.models.case import Case, CaseReport, CaseHistory
 from app.models.report import Report
 from app.models.report_assignment import ReportAssignment
@@ -33,24 +35,7 @@ def _require_supervisor_station_id(current_user: PoliceUser) -> int:
 
 
 def _all_location_ids_for_scope(db: Session, location_id: Optional[int]) -> set[int]:
-    if location_id is None:
-        return set()
-    query = db.query(Location.location_id).filter(
-        or_(
-            Location.location_id == location_id,
-            Location.parent_location_id == location_id,
-            Location.location_id.in_(
-                db.query(Location.location_id).filter(
-                    Location.parent_location_id.in_(
-                        db.query(Location.location_id).filter(
-                            Location.parent_location_id == location_id
-                        )
-                    )
-                )
-            )
-        )
-    )
-    return {r[0] for r in query.all()}
+    return set(location_hierarchy.descendants(db, location_id))
 
 
 def _supervisor_scope(current_user: PoliceUser, db: Session) -> tuple[int, set[int]]:
@@ -59,37 +44,7 @@ def _supervisor_scope(current_user: PoliceUser, db: Session) -> tuple[int, set[i
     
     sector_location_ids = set()
     if supervisor_station_id is not None:
-        # Get station to find its sector location(s)
-        from app.models.station import Station
-        station = db.query(Station).filter(Station.station_id == supervisor_station_id).first()
-        
-        if station:
-            # Handle both primary and secondary sectors
-            sector_location_ids_list = []
-            
-            # Primary sector
-            if station.location_id:
-                sector_location_ids_list.append(station.location_id)
-            
-            # Secondary sector (if exists)
-            if station.sector2_id:
-                sector_location_ids_list.append(station.sector2_id)
-            
-            # Find all villages/cells in all sectors
-            for sector_location_id in sector_location_ids_list:
-                sector_locations_query = db.query(Location.location_id).filter(
-                    or_(
-                        Location.location_id == sector_location_id,  # The sector itself
-                        Location.parent_location_id == sector_location_id,  # Direct children (cells)
-                        # Also get villages under cells in this sector
-                        Location.parent_location_id.in_(
-                            db.query(Location.location_id).filter(
-                                Location.parent_location_id == sector_location_id
-                            ).subquery()
-                        )
-                    )
-                )
-                sector_location_ids.update({loc[0] for loc in sector_locations_query.all()})
+        sector_location_ids = set(location_hierarchy.station_scope(db, supervisor_station_id) or ())
     else:
         # Fallback to assigned_location_id if station_id is None
         assigned_location_id = getattr(current_user, "assigned_location_id", None)
@@ -194,23 +149,6 @@ def _log_case_history_entry(db: Session, case: Case, payload: CaseUpdate, perfor
     ))
 
 
-def _generate_case_number(db: Session) -> str:
-    from datetime import datetime, timezone
-    from sqlalchemy import text
-    year = datetime.now(timezone.utc).strftime("%Y")
-    row = db.execute(
-        text("""
-            SELECT COALESCE(MAX(
-                NULLIF(SUBSTRING(case_number FROM 'CASE-[0-9]{4}-([0-9]+)'), '')::INT
-            ), 0) + 1 AS next_num
-            FROM cases WHERE case_number LIKE :prefix
-        """),
-        {"prefix": f"CASE-{year}-%"},
-    ).fetchone()
-    next_num = row[0] if row else 1
-    return f"CASE-{year}-{next_num:04d}"
-
-
 def _case_to_response(c: Case) -> CaseResponse:
     # Compute average ML trust score across reports linked to this case, if predictions exist.
     avg_trust = None
@@ -431,28 +369,8 @@ def list_available_reports_for_case(
 
     # Optionally restrict to a sector by resolving all villages under that sector
     if sector_location_id is not None:
-        # Cells directly under sector
-        cell_ids_subq = (
-            db.query(Location.location_id)
-            .filter(
-                Location.location_type == "cell",
-                Location.parent_location_id == sector_location_id,
-            )
-            .subquery()
-        )
-        # Villages whose parent is the sector OR whose parent is a cell under the sector
-        village_ids_subq = (
-            db.query(Location.location_id)
-            .filter(
-                Location.location_type == "village",
-                (
-                    (Location.parent_location_id == sector_location_id)
-                    | (Location.parent_location_id.in_(cell_ids_subq))
-                ),
-            )
-            .subquery()
-        )
-        q = q.filter(Report.village_location_id.in_(village_ids_subq))
+        village_ids = location_hierarchy.villages_under(db, sector_location_id)
+        q = q.filter(Report.village_location_id.in_(village_ids))
 
     # Add station-based filtering as alternative to sector
     # IMPORTANT: Don't override supervisor geographic filtering - work with it
@@ -527,7 +445,7 @@ def create_case(
     case_station_id = supervisor_station_id or getattr(current_user, "station_id", None)
 
     case_id = uuid4()
-    case_number = _generate_case_number(db)
+    case_number = allocate_case_number(db)
     case = Case(
         case_id=case_id,
         case_number=case_number,
@@ -593,7 +511,11 @@ def create_case(
     db.commit()
     db.refresh(case)
     
-    background_tasks.add_task(manager.broadcast, {"type": "refresh_data", "entity": "case", "action": "created"})
+    background_tasks.add_task(
+        manager.broadcast,
+        refresh_event("case", "created", ids=[case.case_id]),
+        location_ids=[case.location_id],
+    )
     
     case = db.query(Case).options(
         joinedload(Case.location),
@@ -960,7 +882,24 @@ def update_case(
     db.commit()
     db.refresh(case)
 
-    background_tasks.add_task(manager.broadcast, {"type": "refresh_data", "entity": "case", "action": "updated"})
+    # Dashboards patch list rows from `changes`; a reassignment also changes the
+    # derived officer name/station, so it is sent without changes (clients refetch).
+    changes = None
+    if payload.assigned_to_id is None:
+        changes = {
+            "status": case.status,
+            "priority": case.priority,
+            "title": case.title,
+            "description": case.description,
+            "outcome": case.outcome,
+            "closed_at": case.closed_at.isoformat() if case.closed_at else None,
+            "report_count": case.report_count,
+        }
+    background_tasks.add_task(
+        manager.broadcast,
+        refresh_event("case", "updated", ids=[case.case_id], changes=changes),
+        location_ids=[case.location_id],
+    )
 
     case = db.query(Case).options(
         joinedload(Case.location),
@@ -1006,7 +945,7 @@ def delete_case(
 
     background_tasks.add_task(
         manager.broadcast,
-        {"type": "refresh_data", "entity": "case", "action": "deleted"},
+        refresh_event("case", "deleted", ids=[cid]),
     )
     return {}
 
@@ -1085,11 +1024,12 @@ def remove_report_from_case(
     # Broadcast updates
     background_tasks.add_task(
         manager.broadcast,
-        {"type": "refresh_data", "entity": "case", "action": "updated"},
+        refresh_event("case", "updated", ids=[case.case_id], changes={"report_count": case.report_count}),
+        location_ids=[case.location_id],
     )
     background_tasks.add_task(
         manager.broadcast,
-        {"type": "refresh_data", "entity": "report", "action": "updated"},
+        refresh_event("report", "updated", ids=[rid]),
     )
 
     return _case_to_response(case)
@@ -1206,11 +1146,15 @@ def move_report_to_case(
     # Broadcast updates
     background_tasks.add_task(
         manager.broadcast,
-        {"type": "refresh_data", "entity": "case", "action": "updated"},
+        refresh_event(
+            "case", "updated", ids=[target_case.case_id], changes={"report_count": target_case.report_count}
+        ),
+        location_ids=[target_case.location_id],
     )
     background_tasks.add_task(
         manager.broadcast,
-        {"type": "refresh_data", "entity": "report", "action": "updated"},
+        refresh_event("report", "updated", ids=[rid], changes={"case_id": str(target_case.case_id)}),
+        location_ids=[report.village_location_id],
     )
 
     return _case_to_response(target_case)
@@ -1308,7 +1252,11 @@ def add_reports_to_case(
     db.commit()
     db.refresh(case)
     
-    background_tasks.add_task(manager.broadcast, {"type": "refresh_data", "entity": "case", "action": "updated"})
+    background_tasks.add_task(
+        manager.broadcast,
+        refresh_event("case", "updated", ids=[case.case_id], changes={"report_count": case.report_count}),
+        location_ids=[case.location_id],
+    )
     
     case = db.query(Case).options(
         joinedload(Case.location),
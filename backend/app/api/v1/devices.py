@@ -2,7 +2,7 @@ from typing import Annotated, Optional, List
 import math
 
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
-from sqlalchemy import func
+from sqlalchemy import bindparam, func, text
 from sqlalchemy.orm import Session, joinedload
 from uuid import uuid4, UUID
 from datetime import datetime, timezone, timedelta
@@ -13,7 +13,6 @@ from app.database import get_db
 from app.models.device import Device
 from app.models.report import Report
 from app.models.ml_prediction import MLPrediction
-from app.models.location import Location
 from app.schemas.device import DeviceCreate, DeviceResponse
 from app.api.v1.auth import get_current_admin_or_supervisor, get_current_admin_supervisor_or_officer
 from app.models.police_user import PoliceUser
@@ -23,7 +22,7 @@ from app.core.credibility_model import (
     get_home_insights,
     get_device_ml_stats
 )
-from app.core.village_lookup import get_village_location_info
+from app.core.location_hierarchy import location_hierarchy
 
 router = APIRouter(prefix="/devices", tags=["devices"])
 
@@ -45,30 +44,6 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     return R * c
 
 
-def _report_is_trusted(report: Report) -> bool:
-    """Normalize report trust semantics across legacy/new status fields."""
-    rule_status = str(getattr(report, "rule_status", "") or "").strip().lower()
-    status = str(getattr(report, "status", "") or "").strip().lower()
-    verification_status = str(getattr(report, "verification_status", "") or "").strip().lower()
-    return (
-        rule_status in {"confirmed", "verified", "trusted", "passed"}
-        or status in {"verified"}
-        or verification_status in {"verified"}
-    )
-
-
-def _report_is_rejected_or_flagged(report: Report) -> bool:
-    """Normalize rejected/flagged semantics used by the device registry table."""
-    rule_status = str(getattr(report, "rule_status", "") or "").strip().lower()
-    status = str(getattr(report, "status", "") or "").strip().lower()
-    verification_status = str(getattr(report, "verification_status", "") or "").strip().lower()
-    return (
-        rule_status in {"flagged", "rejected", "false_report", "failed"}
-        or status in {"flagged", "rejected"}
-        or verification_status in {"rejected"}
-    )
-
-
 def _safe_float(value):
     if value is None:
         return None
@@ -78,6 +53,113 @@ def _safe_float(value):
         return None
 
 
+_TRUSTED_RULE_STATUSES = ("confirmed", "verified", "trusted", "passed")
+_FLAGGED_RULE_STATUSES = ("flagged", "rejected", "false_report", "failed")
+
+
+def _device_registry_aggregates(db: Session, device_ids: List[UUID]) -> dict:
+    """
+    Per-device report totals, trusted/flagged counts and latest report for a page.
+
+    One grouped query and one DISTINCT ON query replace loading every report of
+    every device. A report counts as trusted when any of its rule/lifecycle/
+    verification statuses says so (likewise for flagged/rejected), matching the
+    legacy status fields. A latest report without village_location_id falls back
+    to the point-in-polygon village lookup inside the same statement.
+    """
+    if not device_ids:
+        return {}
+    rows = db.execute(
+        text(
+            """
+            SELECT device_id,
+                   COUNT(*) AS total,
+                   COUNT(*) FILTER (
+                       WHERE lower(coalesce(rule_status, '')) IN :trusted_rule
+                          OR lower(coalesce(status, '')) = 'verified'
+                          OR lower(coalesce(verification_status::text, '')) = 'verified'
+                   ) AS trusted,
+                   COUNT(*) FILTER (
+                       WHERE lower(coalesce(rule_status, '')) IN :flagged_rule
+                          OR lower(coalesce(status, '')) IN ('flagged', 'rejected')
+                          OR lower(coalesce(verification_status::text, '')) = 'rejected'
+                   ) AS flagged
+            FROM reports
+            WHERE device_id IN :device_ids
+            GROUP BY device_id
+            """
+        ).bindparams(
+            bindparam("device_ids", expanding=True),
+            bindparam("trusted_rule", expanding=True),
+            bindparam("flagged_rule", expanding=True),
+        ),
+        {
+            "device_ids": list(device_ids),
+            "trusted_rule": list(_TRUSTED_RULE_STATUSES),
+            "flagged_rule": list(_FLAGGED_RULE_STATUSES),
+        },
+    ).fetchall()
+    out = {
+        row.device_id: {
+            "total": int(row.total or 0),
+            "trusted": int(row.trusted or 0),
+            "flagged": int(row.flagged or 0),
+            "last_report": None,
+        }
+        for row in rows
+    }
+
+    last_rows = db.execute(
+        text(
+            """
+            SELECT DISTINCT ON (r.device_id)
+                   r.device_id,
+                   r.reported_at,
+                   r.latitude,
+                   r.longitude,
+                   COALESCE(
+                       r.village_location_id,
+                       (
+                           SELECT l.location_id
+                           FROM locations l
+                           WHERE l.location_type = 'village'
+                             AND l.is_active = true
+                             AND l.geometry IS NOT NULL
+                             AND ST_Covers(
+                                 ST_MakeValid(l.geometry),
+                                 ST_SetSRID(ST_MakePoint(r.longitude, r.latitude), 4326)
+                             )
+                           LIMIT 1
+                       )
+                   ) AS village_location_id
+            FROM reports r
+            WHERE r.device_id IN :device_ids
+            ORDER BY r.device_id, r.reported_at DESC NULLS LAST
+            """
+        ).bindparams(bindparam("device_ids", expanding=True)),
+        {"device_ids": list(device_ids)},
+    ).fetchall()
+    for row in last_rows:
+        if row.device_id in out:
+            out[row.device_id]["last_report"] = row
+    return out
+
+
+def _latest_ml_predictions_by_device(db: Session, device_ids: List[UUID]) -> dict:
+    """Latest MLPrediction per device (single DISTINCT ON query)."""
+    if not device_ids:
+        return {}
+    rows = (
+        db.query(Report.device_id, MLPrediction)
+        .join(Report, MLPrediction.report_id == Report.report_id)
+        .filter(Report.device_id.in_(device_ids))
+        .order_by(Report.device_id, MLPrediction.evaluated_at.desc())
+        .distinct(Report.device_id)
+        .all()
+    )
+    return {device_id: prediction for device_id, prediction in rows}
+
+
 @router.post("/register", response_model=DeviceResponse)
 def register_device(device_data: DeviceCreate, db: Session = Depends(get_db)):
     """Register or get existing device by hash (anonymous)"""
@@ -252,16 +334,25 @@ def list_devices(
     )
 
     # Build per-device last activity and sector information from most recent report.
+    page_device_ids = [d.device_id for d in devices]
+    aggregates = _device_registry_aggregates(db, page_device_ids)
+    latest_ml_by_device = _latest_ml_predictions_by_device(
+        db,
+        [
+            d.device_id
+            for d in devices
+            if not (isinstance(d.metadata_json, dict) and isinstance(d.metadata_json.get("ml"), dict))
+        ],
+    )
     items = []
     for d in devices:
-        # Get actual report statistics for this device
-        device_reports = db.query(Report).filter(Report.device_id == d.device_id).all()
-        actual_total = len(device_reports)
-        actual_trusted = sum(1 for r in device_reports if _report_is_trusted(r))
-        actual_flagged = sum(1 for r in device_reports if _report_is_rejected_or_flagged(r))
+        agg = aggregates.get(d.device_id) or {"total": 0, "trusted": 0, "flagged": 0, "last_report": None}
+        actual_total = agg["total"]
+        actual_trusted = agg["trusted"]
+        actual_flagged = agg["flagged"]
         
-        # Get most recent report for location and activity data
-        last_report = None
+        # Most recent report for location and activity data
+        last_report = agg["last_report"]
         last_active = getattr(d, "last_seen_at", None)
         sector_location_id = None
         sector_name = None
@@ -273,46 +364,26 @@ def list_devices(
         last_latitude = None
         last_longitude = None
         
-        if device_reports:
-            last_report = max(device_reports, key=lambda r: r.reported_at or r.created_at)
+        if last_report is not None:
             if not last_active:
-                last_active = last_report.reported_at or last_report.created_at
+                last_active = last_report.reported_at
             
-            # Resolve coordinates + admin hierarchy from latest report location.
-            lat_f = _safe_float(getattr(last_report, "latitude", None))
-            lon_f = _safe_float(getattr(last_report, "longitude", None))
+            lat_f = _safe_float(last_report.latitude)
+            lon_f = _safe_float(last_report.longitude)
             if lat_f is not None and lon_f is not None:
                 last_latitude = lat_f
                 last_longitude = lon_f
                 last_location = f"{lat_f:.4f}, {lon_f:.4f}"
-                location_info = get_village_location_info(db, lat_f, lon_f)
-                if isinstance(location_info, dict):
-                    sector_location_id = location_info.get("sector_location_id")
-                    sector_name = location_info.get("sector_name")
-                    cell_location_id = location_info.get("cell_location_id")
-                    cell_name = location_info.get("cell_name")
-                    village_location_id = location_info.get("village_location_id")
-                    village_name = location_info.get("village_name")
-
-            # Fallback to report location relation if polygon lookup did not resolve.
-            if village_name is None and getattr(last_report, "village_location", None):
-                village = last_report.village_location
-                village_location_id = getattr(village, "location_id", None)
-                village_name = getattr(village, "location_name", None)
-                parent_id = getattr(village, "parent_location_id", None)
-                if parent_id:
-                    parent = db.query(Location).filter(Location.location_id == parent_id).first()
-                    if parent and parent.location_type == "cell":
-                        cell_location_id = parent.location_id
-                        cell_name = parent.location_name
-                        if parent.parent_location_id:
-                            sector = db.query(Location).filter(Location.location_id == parent.parent_location_id).first()
-                            if sector:
-                                sector_location_id = sector.location_id
-                                sector_name = sector.location_name
-                    elif parent and parent.location_type == "sector":
-                        sector_location_id = parent.location_id
-                        sector_name = parent.location_name
+
+            # Admin hierarchy from the cached location tree.
+            location_info = location_hierarchy.lineage(db, last_report.village_location_id)
+            if location_info:
+                sector_location_id = location_info.get("sector_location_id")
+                sector_name = location_info.get("sector_name")
+                cell_location_id = location_info.get("cell_location_id")
+                cell_name = location_info.get("cell_name")
+                village_location_id = location_info.get("village_location_id")
+                village_name = location_info.get("village_name")
 
         # Metadata fallback for admin names/ids if report-derived values are unavailable.
         meta = getattr(d, "metadata_json", None)
@@ -347,15 +418,9 @@ def list_devices(
         except Exception:
             pass
         
-        # If no ML data in metadata, check latest ML prediction
-        if ml_avg_trust is None and device_reports:
-            latest_ml = (
-                db.query(MLPrediction)
-                .join(Report, MLPrediction.report_id == Report.report_id)
-                .filter(Report.device_id == d.device_id)
-                .order_by(MLPrediction.evaluated_at.desc())
-                .first()
-            )
+        # If no ML data in metadata, use the latest ML prediction
+        if ml_avg_trust is None and actual_total:
+            latest_ml = latest_ml_by_device.get(d.device_id)
             if latest_ml:
                 ml_avg_trust = _safe_float(latest_ml.trust_score)
                 # MLPrediction does not store aggregate fake_rate; derive a single-point proxy.
@@ -406,59 +471,19 @@ def list_devices(
             }
         )
     since_30d = datetime.now(timezone.utc) - timedelta(days=30)
-    high = (
-        db.query(func.count(Device.device_id))
-        .filter(Device.device_trust_score >= 70)
-        .scalar()
-        or 0
-    )
-    medium = (
-        db.query(func.count(Device.device_id))
-        .filter(
+    activity_col = Device.last_seen_at if hasattr(Device, "last_seen_at") else Device.first_seen_at
+    summary = db.query(
+        func.count(Device.device_id).filter(Device.device_trust_score >= 70),
+        func.count(Device.device_id).filter(
             Device.device_trust_score >= 40, Device.device_trust_score < 70
-        )
-        .scalar()
-        or 0
-    )
-    low = (
-        db.query(func.count(Device.device_id))
-        .filter(Device.device_trust_score < 40)
-        .scalar()
-        or 0
-    )
-    if hasattr(Device, "is_banned"):
-        banned = (
-            db.query(func.count(Device.device_id))
-            .filter(Device.is_banned == True)
-            .scalar()
-            or 0
-        )
-    else:
-        banned = 0
-    # Active devices in last 30 days based on last_seen_at when available
-    if hasattr(Device, "last_seen_at"):
-        active_base = db.query(func.count(Device.device_id)).filter(
-            Device.last_seen_at >= since_30d
-        )
-        if hasattr(Device, "is_banned"):
-            active_base = active_base.filter(Device.is_banned == False)
-        active_30d = active_base.scalar() or 0
-    else:
-        active_30d = (
-            db.query(func.count(Device.device_id))
-            .filter(Device.first_seen_at >= since_30d)
-            .scalar()
-            or 0
-        )
-        if hasattr(Device, "is_banned"):
-            active_30d = (
-                db.query(func.count(Device.device_id))
-                .filter(
-                    Device.first_seen_at >= since_30d, Device.is_banned == False
-                )
-                .scalar()
-                or 0
-            )
+        ),
+        func.count(Device.device_id).filter(Device.device_trust_score < 40),
+        func.count(Device.device_id).filter(Device.is_banned == True),
+        func.count(Device.device_id).filter(
+            activity_col >= since_30d, Device.is_banned == False
+        ),
+    ).one()
+    high, medium, low, banned, active_30d = (int(v or 0) for v in summary)
     return {
         "items": items,
         "total": total,
@@ -501,11 +526,7 @@ def ban_device(
     db.refresh(device)
 
     def notify():
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(manager.broadcast({"type": "refresh_data", "entity": "device"}))
-        except RuntimeError:
-            asyncio.run(manager.broadcast({"type": "refresh_data", "entity": "device"}))
+        manager.publish({"type": "refresh_data", "entity": "device"})
     background_tasks.add_task(notify)
 
     return {
@@ -538,11 +559,7 @@ def unban_device(
     db.refresh(device)
 
     def notify():
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(manager.broadcast({"type": "refresh_data", "entity": "device"}))
-        except RuntimeError:
-            asyncio.run(manager.broadcast({"type": "refresh_data", "entity": "device"}))
+        manager.publish({"type": "refresh_data", "entity": "device"})
     background_tasks.add_task(notify)
 
     return {
@@ -1,14 +1,15 @@
-from typing import Annotated, List, Optional, Dict, Any
+from typing import Annotated, List, Optional, Dict, Any, Tuple
 import logging
 
 from fastapi import APIRouter, BackgroundTasks, Depends, Query, HTTPException, status
+from sqlalchemy import select, text
 from sqlalchemy.orm import Session, joinedload, selectinload
 from datetime import datetime, timedelta, timezone
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
-from app.core.cluster_classifier import predict_cluster_classification
+from app.core.cluster_classifier import classify_from_score
 from app.database import get_db
 from app.models.hotspot import Hotspot, hotspot_reports_table
 from app.models.report import Report
@@ -25,11 +26,38 @@ from app.core.hotspot_auto import (
     get_hotspot_params_from_db,
     get_hotspot_trust_min_from_db,
 )
-from app.core.village_lookup import get_village_location_info
-from app.core.websocket import manager
+from app.core.location_hierarchy import location_hierarchy
+from app.core.response_cache import cached_response
+from app.core.websocket import manager, refresh_event
 
 router = APIRouter(prefix="/hotspots", tags=["hotspots"])
 
+
+def _apply_station_scope(query, db: Session, station_id: int):
+    """Restrict a Hotspot query to hotspots with reports under the station's sectors."""
+    sector_location_ids = location_hierarchy.station_scope(db, station_id)
+    if sector_location_ids is None:
+        return query
+    # Semi-join instead of join + DISTINCT, so LIMIT and ORDER BY apply to hotspot rows.
+    in_scope = (
+        select(hotspot_reports_table.c.hotspot_id)
+        .join(Report, Report.report_id == hotspot_reports_table.c.report_id)
+        .where(Report.village_location_id.in_(sector_location_ids))
+    )
+    return query.filter(Hotspot.hotspot_id.in_(in_scope))
+
+def _ensure_in_scope(db: Session, current_user: PoliceUser, hotspot_id: int) -> None:
+    """404 when an officer/supervisor asks for a hotspot outside their station's sectors."""
+    if getattr(current_user, "role", None) not in ("officer", "supervisor"):
+        return
+    station_id = getattr(current_user, "station_id", None)
+    if station_id is None:
+        raise HTTPException(status_code=403, detail="Station is not configured")
+    query = _apply_station_scope(db.query(Hotspot.hotspot_id), db, station_id)
+    if query.filter(Hotspot.hotspot_id == hotspot_id).first() is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hotspot not found")
+
+
 def _classify_hotspot(hotspot_score: float) -> str:
     """Classify hotspot based on trust-weighted DBSCAN score (0-100).
 
@@ -194,6 +222,335 @@ def _expand_hull(hull: List[List[float]], factor: float = 0.12) -> List[List[flo
     return out
 
 
+def _hotspot_classification(
+    h: Hotspot, incident_count: int, avg_pre_trust: float
+) -> Tuple[float, str, Optional[float], str]:
+    """(score, classification, confidence, source) for a hotspot.
+
+    Classification is stored when the hotspot is detected; rows from before
+    that fall back to the deterministic score, never the model.
+    """
+    if h.classification:
+        return (
+            float(h.hotspot_score or 0.0),
+            h.classification,
+            float(h.classification_confidence) if h.classification_confidence is not None else None,
+            h.classification_source or "dbscan_fallback",
+        )
+    # Cluster density proxy: incident_count / (pi*r^2) in points per sq-km.
+    radius_m = float(getattr(h, "radius_meters", 500) or 500)
+    area_sqkm = max(0.001, 3.14159 * (radius_m / 1000.0) ** 2)
+    hotspot_score = _dbscan_hotspot_score(
+        incident_count=incident_count,
+        avg_trust=avg_pre_trust,
+        cluster_density=incident_count / area_sqkm,
+        time_window_hours=int(getattr(h, "time_window_hours", 24) or 24),
+    )
+    return hotspot_score, classify_from_score(hotspot_score), None, "dbscan_fallback"
+
+
+# Per-hotspot aggregates over the contributing reports that are mapped to a
+# village. Latest prediction per report prefers final ones, newest first.
+_HOTSPOT_SUMMARY_SQL = text("""
+WITH members AS (
+    SELECT hr.hotspot_id,
+           r.latitude::float8 AS lat,
+           r.longitude::float8 AS lon,
+           COALESCE(it.type_name, 'Unknown') AS type_name,
+           loc.location_name AS village_name,
+           latest.trust_score AS latest_trust,
+           finals.trust_sum,
+           finals.trust_count,
+           (SELECT count(*) FROM evidence_files e WHERE e.report_id = r.report_id) AS evidence_count
+    FROM hotspot_reports hr
+    JOIN reports r ON r.report_id = hr.report_id
+    JOIN locations loc ON loc.location_id = r.village_location_id
+    LEFT JOIN incident_types it ON it.incident_type_id = r.incident_type_id
+    LEFT JOIN LATERAL (
+        SELECT mp.trust_score
+        FROM ml_predictions mp
+        WHERE mp.report_id = r.report_id
+        ORDER BY COALESCE(mp.is_final, false) DESC, mp.evaluated_at DESC NULLS LAST
+        LIMIT 1
+    ) latest ON true
+    LEFT JOIN LATERAL (
+        SELECT sum(mp.trust_score) AS trust_sum, count(mp.trust_score) AS trust_count
+        FROM ml_predictions mp
+        WHERE mp.report_id = r.report_id AND mp.is_final
+    ) finals ON true
+    WHERE hr.hotspot_id = ANY(CAST(:hotspot_ids AS integer[]))
+),
+types AS (
+    SELECT hotspot_id, jsonb_object_agg(type_name, c) AS incident_mix
+    FROM (SELECT hotspot_id, type_name, count(*) AS c FROM members GROUP BY 1, 2) t
+    GROUP BY hotspot_id
+),
+villages AS (
+    SELECT hotspot_id, jsonb_object_agg(village_name, c) AS village_counts
+    FROM (
+        SELECT hotspot_id, village_name, count(*) AS c
+        FROM members
+        WHERE village_name IS NOT NULL
+        GROUP BY 1, 2
+    ) v
+    GROUP BY hotspot_id
+)
+SELECT m.hotspot_id,
+       count(*) AS incident_count,
+       avg(COALESCE(m.latest_trust, 50))::float8 AS avg_pre_trust,
+       (sum(m.trust_sum) / NULLIF(sum(m.trust_count), 0))::float8 AS avg_final_trust,
+       sum(m.evidence_count) AS evidence_count,
+       array_agg(m.lat) AS lats,
+       array_agg(m.lon) AS lons,
+       types.incident_mix,
+       villages.village_counts
+FROM members m
+LEFT JOIN types ON types.hotspot_id = m.hotspot_id
+LEFT JOIN villages ON villages.hotspot_id = m.hotspot_id
+GROUP BY m.hotspot_id, types.incident_mix, villages.village_counts
+""")
+
+
+def _hotspot_summaries(db: Session, hotspot_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    if not hotspot_ids:
+        return {}
+    return {
+        row["hotspot_id"]: dict(row)
+        for row in db.execute(_HOTSPOT_SUMMARY_SQL, {"hotspot_ids": hotspot_ids}).mappings()
+    }
+
+
+def _summary_hotspot_response(h: Hotspot, summary: Dict[str, Any]) -> HotspotResponse:
+    """List-view hotspot payload built from _hotspot_summaries() aggregates.
+
+    Report-level lists (incident_points, evidence_files) are left empty; the
+    detail and /incidents endpoints return them.
+    """
+    incident_count = int(summary["incident_count"])
+    avg_pre_trust = float(summary["avg_pre_trust"] or 50.0)
+    hotspot_score, classification, classification_confidence, classification_source = (
+        _hotspot_classification(h, incident_count, avg_pre_trust)
+    )
+    avg_final = summary["avg_final_trust"]
+    avg_trust_score = round(float(avg_final), 2) if avg_final is not None else round(avg_pre_trust, 2)
+
+    cluster_points = [
+        (lat, lon)
+        for lat, lon in zip(summary["lats"] or [], summary["lons"] or [])
+        if lat is not None and lon is not None
+    ]
+    boundary_points = _expand_hull(_convex_hull(cluster_points)) if cluster_points else []
+
+    incident_mix = {name: int(count) for name, count in (summary["incident_mix"] or {}).items()}
+    village_counts = {name: int(count) for name, count in (summary["village_counts"] or {}).items()}
+    area_label = None
+    if village_counts:
+        area_label = sorted(village_counts.items(), key=lambda x: x[1], reverse=True)[0][0]
+
+    dominant_crime = h.incident_type.type_name if h.incident_type else None
+    cluster_kind = "trend_cluster" if len(incident_mix) <= 1 else "mixed_hotspot"
+    return HotspotResponse(
+        hotspot_id=h.hotspot_id,
+        center_lat=h.center_lat,
+        center_long=h.center_long,
+        radius_meters=h.radius_meters,
+        incident_count=incident_count,
+        risk_level=h.risk_level,
+        time_window_hours=h.time_window_hours,
+        detected_at=h.detected_at,
+        incident_type_id=h.incident_type_id,
+        incident_type_name=dominant_crime,
+        evidence_files=[],
+        evidence_count=int(summary["evidence_count"] or 0),
+        village_names=sorted(village_counts),
+        lifecycle_state=classification,
+        hotspot_score=hotspot_score,
+        classification=classification,
+        classification_confidence=classification_confidence,
+        classification_source=classification_source,
+        avg_trust_score=avg_trust_score,
+        dominant_crime_type=dominant_crime,
+        cluster_kind=cluster_kind,
+        area_label=area_label,
+        incident_mix=incident_mix,
+        prediction=_prediction_for_hotspot(
+            classification,
+            incident_count,
+            dominant_crime,
+            cluster_kind,
+            area_label,
+            incident_mix,
+        ),
+        boundary_points=boundary_points,
+        incident_points=[],
+    )
+
+
+def _full_hotspot_response(db: Session, h: Hotspot) -> Optional[HotspotResponse]:
+    """Full hotspot payload with every contributing report, evidence and boundary.
+
+    Requires h.reports (with ml_predictions, village_location, incident_type and
+    evidence_files) to be loaded. Returns None when no report is mapped to a village.
+    """
+    # Defensive filter: only consider reports mapped to covered village locations.
+    reports_in_cluster = [
+        r
+        for r in (getattr(h, "reports", None) or [])
+        if getattr(r, "village_location_id", None) is not None
+        and getattr(r, "village_location", None) is not None
+    ]
+    if not reports_in_cluster:
+        return None
+
+    incident_count = len(reports_in_cluster)
+
+    # Collect per-report trust scores from ML predictions first;
+    # fall back to 50 (neutral) for reports without a prediction.
+    pre_trust_scores: List[float] = []
+    for r in reports_in_cluster:
+        preds = list(getattr(r, "ml_predictions", None) or [])
+        final_p = [p for p in preds if getattr(p, "is_final", False)]
+        src_p = final_p if final_p else preds
+        src_p.sort(
+            key=lambda p: p.evaluated_at or datetime.min.replace(tzinfo=timezone.utc),
+            reverse=True,
+        )
+        if src_p and getattr(src_p[0], "trust_score", None) is not None:
+            pre_trust_scores.append(float(src_p[0].trust_score))
+        else:
+            pre_trust_scores.append(50.0)
+
+    avg_pre_trust = (
+        sum(pre_trust_scores) / len(pre_trust_scores) if pre_trust_scores else 50.0
+    )
+
+    hotspot_score, classification, classification_confidence, classification_source = (
+        _hotspot_classification(h, incident_count, avg_pre_trust)
+    )
+    lifecycle_state = classification
+
+    ml_scores: List[float] = []
+    cluster_points: List[tuple[float, float]] = []
+    incident_points: List[Dict[str, Any]] = []
+    incident_mix: Dict[str, int] = {}
+    area_counts: Dict[str, int] = {}
+    for r in reports_in_cluster:
+        try:
+            cluster_points.append((float(r.latitude), float(r.longitude)))
+        except Exception:
+            pass
+
+        incident_name = r.incident_type.type_name if r.incident_type else "Unknown"
+        incident_mix[incident_name] = incident_mix.get(incident_name, 0) + 1
+
+        if getattr(r, "village_location", None) and r.village_location.location_name:
+            area_name = str(r.village_location.location_name)
+            area_counts[area_name] = area_counts.get(area_name, 0) + 1
+
+        report_preds = list(getattr(r, "ml_predictions", None) or [])
+        final_preds = [p for p in report_preds if getattr(p, "is_final", False)]
+        src_preds = final_preds if final_preds else report_preds
+        src_preds.sort(
+            key=lambda p: p.evaluated_at or datetime.min.replace(tzinfo=timezone.utc),
+            reverse=True,
+        )
+        report_trust = None
+        if src_preds and getattr(src_preds[0], "trust_score", None) is not None:
+            report_trust = float(src_preds[0].trust_score)
+
+        location_info = location_hierarchy.lineage(db, r.village_location_id)
+
+        incident_points.append(
+            {
+                "report_id": str(r.report_id),
+                "incident_type_name": incident_name,
+                "description": r.description,
+                "latitude": float(r.latitude),
+                "longitude": float(r.longitude),
+                "reported_at": r.reported_at.isoformat() if r.reported_at else None,
+                "trust_score": report_trust,
+                "village_name": location_info.get("village_name") if location_info else None,
+                "cell_name": location_info.get("cell_name") if location_info else None,
+                "sector_name": location_info.get("sector_name") if location_info else None,
+                "evidence_files": [
+                    {
+                        "evidence_id": str(e.evidence_id),
+                        "file_type": e.file_type,
+                        "file_url": e.file_url,
+                        "uploaded_at": e.uploaded_at.isoformat() if e.uploaded_at else None,
+                    }
+                    for e in (r.evidence_files or [])
+                ],
+            }
+        )
+
+        for p in (getattr(r, "ml_predictions", None) or []):
+            if getattr(p, "is_final", False) and getattr(p, "trust_score", None) is not None:
+                ml_scores.append(float(p.trust_score))
+    avg_trust_score = (
+        round(sum(ml_scores) / len(ml_scores), 2)
+        if ml_scores
+        else round(avg_pre_trust, 2)
+    )
+    boundary_points = _expand_hull(_convex_hull(cluster_points)) if cluster_points else []
+
+    dominant_crime = h.incident_type.type_name if h.incident_type else None
+    area_label = None
+    if area_counts:
+        area_label = sorted(area_counts.items(), key=lambda x: x[1], reverse=True)[0][0]
+
+    cluster_kind = "trend_cluster" if len(incident_mix) <= 1 else "mixed_hotspot"
+
+    prediction = _prediction_for_hotspot(
+        classification,
+        incident_count,
+        dominant_crime,
+        cluster_kind,
+        area_label,
+        incident_mix,
+    )
+
+    return HotspotResponse(
+        hotspot_id=h.hotspot_id,
+        center_lat=h.center_lat,
+        center_long=h.center_long,
+        radius_meters=h.radius_meters,
+        incident_count=incident_count,
+        risk_level=h.risk_level,
+        time_window_hours=h.time_window_hours,
+        detected_at=h.detected_at,
+        incident_type_id=h.incident_type_id,
+        incident_type_name=h.incident_type.type_name if h.incident_type else None,
+        evidence_files=[
+            {
+                "evidence_id": str(e.evidence_id),
+                "file_type": e.file_type,
+                "file_url": e.file_url,
+                "uploaded_at": e.uploaded_at.isoformat() if e.uploaded_at else None,
+            }
+            for r in h.reports
+            for e in (r.evidence_files or [])
+        ],
+        lifecycle_state=lifecycle_state,
+        hotspot_score=hotspot_score,
+        classification=classification,
+        classification_confidence=(
+            float(classification_confidence)
+            if classification_confidence is not None
+            else None
+        ),
+        classification_source=classification_source,
+        avg_trust_score=avg_trust_score,
+        dominant_crime_type=dominant_crime,
+        cluster_kind=cluster_kind,
+        area_label=area_label,
+        incident_mix=incident_mix,
+        prediction=prediction,
+        boundary_points=boundary_points,
+        incident_points=incident_points,
+    )
+
+
 @router.get("/", response_model=List[HotspotResponse])
 def list_hotspots(
     current_user: Annotated[PoliceUser, Depends(get_current_user)],
@@ -215,22 +572,18 @@ def list_hotspots(
     ),
     limit: int = Query(50, ge=1, le=200),
 ):
-    """List hotspots.
+    """List hotspots as a summary projection (aggregates computed in SQL).
+
+    Use GET /hotspots/{hotspot_id} or /hotspots/{hotspot_id}/incidents for the
+    contributing reports.
 
     - Admin: sees all hotspots.
     - Supervisor: hotspots that include at least one report in their assigned_location_id (if set).
     - Officer: same sector scoping as supervisor when assigned_location_id is set, otherwise all.
     """
-    query = db.query(Hotspot).options(
-        joinedload(Hotspot.incident_type),
-        selectinload(Hotspot.reports).selectinload(Report.ml_predictions),
-        selectinload(Hotspot.reports).joinedload(Report.village_location),
-        selectinload(Hotspot.reports).joinedload(Report.incident_type),
-        selectinload(Hotspot.reports).selectinload(Report.evidence_files),
-    )
+    query = db.query(Hotspot).options(joinedload(Hotspot.incident_type))
 
     role = getattr(current_user, "role", None)
-    assigned_loc = getattr(current_user, "assigned_location_id", None)
 
     # Apply time-based filtering
     if time_period or hours_back:
@@ -262,137 +615,13 @@ def list_hotspots(
         if officer_station_id is None:
             raise HTTPException(status_code=403, detail="Officer station is not configured")
         
-        # Get station to find its sector location(s)
-        from app.models.station import Station
-        from app.models.location import Location
-        from sqlalchemy import or_
-        
-        station = db.query(Station).filter(Station.station_id == officer_station_id).first()
-        if station:
-            # Handle both primary and secondary sectors
-            sector_location_ids = []
-            
-            # Primary sector
-            if station.location_id:
-                sector_location_id = station.location_id
-                # Find all villages/cells in this sector
-                sector_locations_query = db.query(Location.location_id).filter(
-                    or_(
-                        Location.location_id == sector_location_id,  # The sector itself
-                        Location.parent_location_id == sector_location_id,  # Direct children (cells)
-                        # Also get villages under cells in this sector
-                        Location.location_id.in_(
-                            db.query(Location.location_id).filter(
-                                Location.parent_location_id.in_(
-                                    db.query(Location.location_id).filter(
-                                        Location.parent_location_id == sector_location_id
-                                    )
-                                )
-                            )
-                        )
-                    )
-                )
-                sector_location_ids.extend([loc[0] for loc in sector_locations_query.all()])
-            
-            # Secondary sector (if exists)
-            if station.sector2_id:
-                sector2_location_id = station.sector2_id
-                # Find all villages/cells in secondary sector
-                sector2_locations_query = db.query(Location.location_id).filter(
-                    or_(
-                        Location.location_id == sector2_location_id,  # The sector itself
-                        Location.parent_location_id == sector2_location_id,  # Direct children (cells)
-                        # Also get villages under cells in this sector
-                        Location.location_id.in_(
-                            db.query(Location.location_id).filter(
-                                Location.parent_location_id.in_(
-                                    db.query(Location.location_id).filter(
-                                        Location.parent_location_id == sector2_location_id
-                                    )
-                                )
-                            )
-                        )
-                    )
-                )
-                sector_location_ids.extend([loc[0] for loc in sector2_locations_query.all()])
-            
-            # Remove duplicates
-            sector_location_ids = list(set(sector_location_ids))
-            
-            # Filter hotspots to include reports from officer's station sector
-            query = (
-                query.join(Hotspot.reports)
-                .filter(Report.village_location_id.in_(sector_location_ids))
-                .distinct()
-            )
+        query = _apply_station_scope(query, db, officer_station_id)
     elif role == "supervisor":
         supervisor_station_id = getattr(current_user, "station_id", None)
         if supervisor_station_id is None:
             raise HTTPException(status_code=403, detail="Supervisor station is not configured")
         
-        # Get station to find its sector location(s)
-        from app.models.station import Station
-        from app.models.location import Location
-        from sqlalchemy import or_
-        
-        station = db.query(Station).filter(Station.station_id == supervisor_station_id).first()
-        if station:
-            # Handle both primary and secondary sectors
-            sector_location_ids = []
-            
-            # Primary sector
-            if station.location_id:
-                sector_location_id = station.location_id
-                # Find all villages/cells in this sector
-                sector_locations_query = db.query(Location.location_id).filter(
-                    or_(
-                        Location.location_id == sector_location_id,  # The sector itself
-                        Location.parent_location_id == sector_location_id,  # Direct children (cells)
-                        # Also get villages under cells in this sector
-                        Location.location_id.in_(
-                            db.query(Location.location_id).filter(
-                                Location.parent_location_id.in_(
-                                    db.query(Location.location_id).filter(
-                                        Location.parent_location_id == sector_location_id
-                                    )
-                                )
-                            )
-                        )
-                    )
-                )
-                sector_location_ids.extend([loc[0] for loc in sector_locations_query.all()])
-            
-            # Secondary sector (if exists)
-            if station.sector2_id:
-                sector2_location_id = station.sector2_id
-                # Find all villages/cells in secondary sector
-                sector2_locations_query = db.query(Location.location_id).filter(
-                    or_(
-                        Location.location_id == sector2_location_id,  # The sector itself
-                        Location.parent_location_id == sector2_location_id,  # Direct children (cells)
-                        # Also get villages under cells in this sector
-                        Location.location_id.in_(
-                            db.query(Location.location_id).filter(
-                                Location.parent_location_id.in_(
-                                    db.query(Location.location_id).filter(
-                                        Location.parent_location_id == sector2_location_id
-                                    )
-                                )
-                            )
-                        )
-                    )
-                )
-                sector_location_ids.extend([loc[0] for loc in sector2_locations_query.all()])
-            
-            # Remove duplicates
-            sector_location_ids = list(set(sector_location_ids))
-            
-            # Filter hotspots to include reports from supervisor's sector
-            query = (
-                query.join(Hotspot.reports)
-                .filter(Report.village_location_id.in_(sector_location_ids))
-                .distinct()
-            )
+        query = _apply_station_scope(query, db, supervisor_station_id)
 
     query = query.order_by(Hotspot.detected_at.desc())
     if risk_level:
@@ -401,189 +630,13 @@ def list_hotspots(
         query = query.filter(Hotspot.time_window_hours == int(time_window_hours))
     hotspots = query.limit(limit).all()
     
-    responses = []
-    
-    for h in hotspots:
-        # Defensive filter: only consider reports mapped to covered village locations.
-        reports_in_cluster = [
-            r
-            for r in (getattr(h, "reports", None) or [])
-            if getattr(r, "village_location_id", None) is not None
-            and getattr(r, "village_location", None) is not None
-        ]
-        if not reports_in_cluster:
-            continue
-
-        incident_count = len(reports_in_cluster)
-
-        # Collect per-report trust scores from ML predictions first;
-        # fall back to 50 (neutral) for reports without a prediction.
-        pre_trust_scores: List[float] = []
-        for r in reports_in_cluster:
-            preds = list(getattr(r, "ml_predictions", None) or [])
-            final_p = [p for p in preds if getattr(p, "is_final", False)]
-            src_p = final_p if final_p else preds
-            src_p.sort(
-                key=lambda p: p.evaluated_at or datetime.min.replace(tzinfo=timezone.utc),
-                reverse=True,
-            )
-            if src_p and getattr(src_p[0], "trust_score", None) is not None:
-                pre_trust_scores.append(float(src_p[0].trust_score))
-            else:
-                pre_trust_scores.append(50.0)
-
-        avg_pre_trust = (
-            sum(pre_trust_scores) / len(pre_trust_scores) if pre_trust_scores else 50.0
-        )
-
-        # Cluster density proxy: incident_count / (pi*r^2) in points per sq-km.
-        radius_m = float(getattr(h, "radius_meters", 500) or 500)
-        area_sqkm = max(0.001, 3.14159 * (radius_m / 1000.0) ** 2)
-        cluster_density = incident_count / area_sqkm
-
-        time_window_hours = int(getattr(h, "time_window_hours", 24) or 24)
-
-        hotspot_score = _dbscan_hotspot_score(
-            incident_count=incident_count,
-            avg_trust=avg_pre_trust,
-            cluster_density=cluster_density,
-            time_window_hours=time_window_hours,
-        )
-        classification_result = predict_cluster_classification(
-            incident_count=incident_count,
-            avg_trust=avg_pre_trust,
-            cluster_density=cluster_density,
-            time_window_hours=time_window_hours,
-        )
-        hotspot_score = float(classification_result["hotspot_score"])
-        classification = str(classification_result["classification"])
-        classification_confidence = classification_result.get("confidence")
-        classification_source = str(classification_result.get("source") or "dbscan_fallback")
-        lifecycle_state = classification
-
-        ml_scores: List[float] = []
-        cluster_points: List[tuple[float, float]] = []
-        incident_points: List[Dict[str, Any]] = []
-        incident_mix: Dict[str, int] = {}
-        area_counts: Dict[str, int] = {}
-        for r in reports_in_cluster:
-            try:
-                cluster_points.append((float(r.latitude), float(r.longitude)))
-            except Exception:
-                pass
-
-            incident_name = r.incident_type.type_name if r.incident_type else "Unknown"
-            incident_mix[incident_name] = incident_mix.get(incident_name, 0) + 1
-
-            if getattr(r, "village_location", None) and r.village_location.location_name:
-                area_name = str(r.village_location.location_name)
-                area_counts[area_name] = area_counts.get(area_name, 0) + 1
-
-            report_preds = list(getattr(r, "ml_predictions", None) or [])
-            final_preds = [p for p in report_preds if getattr(p, "is_final", False)]
-            src_preds = final_preds if final_preds else report_preds
-            src_preds.sort(
-                key=lambda p: p.evaluated_at or datetime.min.replace(tzinfo=timezone.utc),
-                reverse=True,
-            )
-            report_trust = None
-            if src_preds and getattr(src_preds[0], "trust_score", None) is not None:
-                report_trust = float(src_preds[0].trust_score)
-
-            # Get location hierarchy using the village lookup utility
-            location_info = get_village_location_info(db, float(r.latitude), float(r.longitude))
-            
-            incident_points.append(
-                {
-                    "report_id": str(r.report_id),
-                    "incident_type_name": incident_name,
-                    "description": r.description,
-                    "latitude": float(r.latitude),
-                    "longitude": float(r.longitude),
-                    "reported_at": r.reported_at.isoformat() if r.reported_at else None,
-                    "trust_score": report_trust,
-                    "village_name": location_info.get("village_name") if location_info else None,
-                    "cell_name": location_info.get("cell_name") if location_info else None,
-                    "sector_name": location_info.get("sector_name") if location_info else None,
-                    "evidence_files": [
-                        {
-                            "evidence_id": str(e.evidence_id),
-                            "file_type": e.file_type,
-                            "file_url": e.file_url,
-                            "uploaded_at": e.uploaded_at.isoformat() if e.uploaded_at else None,
-                        }
-                        for e in (r.evidence_files or [])
-                    ],
-                }
-            )
-
-            for p in (getattr(r, "ml_predictions", None) or []):
-                if getattr(p, "is_final", False) and getattr(p, "trust_score", None) is not None:
-                    ml_scores.append(float(p.trust_score))
-        avg_trust_score = (
-            round(sum(ml_scores) / len(ml_scores), 2)
-            if ml_scores
-            else round(avg_pre_trust, 2)
-        )
-        boundary_points = _expand_hull(_convex_hull(cluster_points)) if cluster_points else []
-
-        dominant_crime = h.incident_type.type_name if h.incident_type else None
-        area_label = None
-        if area_counts:
-            area_label = sorted(area_counts.items(), key=lambda x: x[1], reverse=True)[0][0]
-
-        cluster_kind = "trend_cluster" if len(incident_mix) <= 1 else "mixed_hotspot"
-
-        prediction = _prediction_for_hotspot(
-            classification,
-            incident_count,
-            dominant_crime,
-            cluster_kind,
-            area_label,
-            incident_mix,
-        )
-            
-        responses.append(HotspotResponse(
-            hotspot_id=h.hotspot_id,
-            center_lat=h.center_lat,
-            center_long=h.center_long,
-            radius_meters=h.radius_meters,
-            incident_count=incident_count,
-            risk_level=h.risk_level,
-            time_window_hours=h.time_window_hours,
-            detected_at=h.detected_at,
-            incident_type_id=h.incident_type_id,
-            incident_type_name=h.incident_type.type_name if h.incident_type else None,
-            evidence_files=[
-                {
-                    "evidence_id": str(e.evidence_id),
-                    "file_type": e.file_type,
-                    "file_url": e.file_url,
-                    "uploaded_at": e.uploaded_at.isoformat() if e.uploaded_at else None,
-                }
-                for r in h.reports
-                for e in (r.evidence_files or [])
-            ],
-            lifecycle_state=lifecycle_state,
-            hotspot_score=hotspot_score,
-            classification=classification,
-            classification_confidence=(
-                float(classification_confidence)
-                if classification_confidence is not None
-                else None
-            ),
-            classification_source=classification_source,
-            avg_trust_score=avg_trust_score,
-            dominant_crime_type=dominant_crime,
-            cluster_kind=cluster_kind,
-            area_label=area_label,
-            incident_mix=incident_mix,
-            prediction=prediction,
-            boundary_points=boundary_points,
-            incident_points=incident_points,
-        ))
-        
-    return responses
+    summaries = _hotspot_summaries(db, [h.hotspot_id for h in hotspots])
+    # Hotspots without any report mapped to a village are left out, as before.
+    return [
+        _summary_hotspot_response(h, summaries[h.hotspot_id])
+        for h in hotspots
+        if h.hotspot_id in summaries
+    ]
 
 
 @router.get("/emergencies", response_model=List[HotspotResponse])
@@ -622,117 +675,13 @@ def get_daily_emergencies(
         if officer_station_id is None:
             raise HTTPException(status_code=403, detail="Officer station is not configured")
         
-        from app.models.station import Station
-        from app.models.location import Location
-        from sqlalchemy import or_
-        
-        station = db.query(Station).filter(Station.station_id == officer_station_id).first()
-        if station:
-            sector_location_ids = []
-            
-            # Primary sector
-            if station.location_id:
-                sector_location_id = station.location_id
-                sector_locations_query = db.query(Location.location_id).filter(
-                    or_(
-                        Location.location_id == sector_location_id,
-                        Location.parent_location_id == sector_location_id,
-                        Location.location_id.in_(
-                            db.query(Location.location_id).filter(
-                                Location.parent_location_id.in_(
-                                    db.query(Location.location_id).filter(
-                                        Location.parent_location_id == sector_location_id
-                                    )
-                                )
-                            )
-                        )
-                    )
-                )
-                sector_location_ids.extend([loc[0] for loc in sector_locations_query.all()])
-            
-            # Secondary sector
-            if station.sector2_id:
-                sector2_location_id = station.sector2_id
-                sector2_locations_query = db.query(Location.location_id).filter(
-                    or_(
-                        Location.location_id == sector2_location_id,
-                        Location.parent_location_id == sector2_location_id,
-                        Location.location_id.in_(
-                            db.query(Location.location_id).filter(
-                                Location.parent_location_id.in_(
-                                    db.query(Location.location_id).filter(
-                                        Location.parent_location_id == sector2_location_id
-                                    )
-                                )
-                            )
-                        )
-                    )
-                )
-                sector_location_ids.extend([loc[0] for loc in sector2_locations_query.all()])
-            
-            sector_location_ids = list(set(sector_location_ids))
-            query = (
-                query.join(Hotspot.reports)
-                .filter(Report.village_location_id.in_(sector_location_ids))
-                .distinct()
-            )
+        query = _apply_station_scope(query, db, officer_station_id)
     elif role == "supervisor":
         supervisor_station_id = getattr(current_user, "station_id", None)
         if supervisor_station_id is None:
             raise HTTPException(status_code=403, detail="Supervisor station is not configured")
         
-        from app.models.station import Station
-        from app.models.location import Location
-        from sqlalchemy import or_
-        
-        station = db.query(Station).filter(Station.station_id == supervisor_station_id).first()
-        if station:
-            sector_location_ids = []
-            
-            if station.location_id:
-                sector_location_id = station.location_id
-                sector_locations_query = db.query(Location.location_id).filter(
-                    or_(
-                        Location.location_id == sector_location_id,
-                        Location.parent_location_id == sector_location_id,
-                        Location.location_id.in_(
-                            db.query(Location.location_id).filter(
-                                Location.parent_location_id.in_(
-                                    db.query(Location.location_id).filter(
-                                        Location.parent_location_id == sector_location_id
-                                    )
-                                )
-                            )
-                        )
-                    )
-                )
-                sector_location_ids.extend([loc[0] for loc in sector_locations_query.all()])
-            
-            if station.sector2_id:
-                sector2_location_id = station.sector2_id
-                sector2_locations_query = db.query(Location.location_id).filter(
-                    or_(
-                        Location.location_id == sector2_location_id,
-                        Location.parent_location_id == sector2_location_id,
-                        Location.location_id.in_(
-                            db.query(Location.location_id).filter(
-                                Location.parent_location_id.in_(
-                                    db.query(Location.location_id).filter(
-                                        Location.parent_location_id == sector2_location_id
-                                    )
-                                )
-                            )
-                        )
-                    )
-                )
-                sector_location_ids.extend([loc[0] for loc in sector2_locations_query.all()])
-            
-            sector_location_ids = list(set(sector_location_ids))
-            query = (
-                query.join(Hotspot.reports)
-                .filter(Report.village_location_id.in_(sector_location_ids))
-                .distinct()
-            )
+        query = _apply_station_scope(query, db, supervisor_station_id)
     
     # Filter by minimum incident count for emergencies
     emergency_hotspots = []
@@ -923,7 +872,7 @@ def recompute_hotspots(
     db.commit()
     
     # Broadcast hotspot update to all connected clients for real-time Safety Map updates
-    background_tasks.add_task(manager.broadcast, {"type": "refresh_data", "entity": "hotspot", "action": "recomputed"})
+    background_tasks.add_task(manager.broadcast, refresh_event("hotspot", "recomputed", changes={"created": created}))
     
     return {
         "created": created,
@@ -992,7 +941,45 @@ def get_hotspot_incidents(
     )
     if not hotspot:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hotspot not found")
+    _ensure_in_scope(db, current_user, hotspot_id)
+
+    incidents: List[HotspotIncidentResponse] = []
+    for r in hotspot.reports or []:
+        preds = list(r.ml_predictions or [])
+        final_p = [p for p in preds if getattr(p, "is_final", False)]
+        src_p = final_p if final_p else preds
+        src_p.sort(
+            key=lambda p: p.evaluated_at or datetime.min.replace(tzinfo=timezone.utc),
+            reverse=True,
+        )
+        trust = None
+        if src_p and src_p[0].trust_score is not None:
+            trust = float(src_p[0].trust_score)
+        location_info = (
+            location_hierarchy.lineage(db, r.village_location_id) if r.village_location_id else None
+        ) or {}
+        incidents.append(
+            HotspotIncidentResponse(
+                report_id=str(r.report_id),
+                incident_type_name=r.incident_type.type_name if r.incident_type else None,
+                description=r.description,
+                latitude=r.latitude,
+                longitude=r.longitude,
+                reported_at=r.reported_at,
+                rule_status=r.rule_status,
+                verification_status=r.verification_status,
+                trust_score=trust,
+                village_name=location_info.get("village_name"),
+                cell_name=location_info.get("cell_name"),
+                sector_name=location_info.get("sector_name"),
+            )
+        )
+    incidents.sort(key=lambda i: (i.reported_at is None, i.reported_at), reverse=True)
+    return incidents
+
+
 @router.get("/stats")
+@cached_response("hotspots.stats", 30.0, ("hotspot",))
 async def get_hotspot_stats(
     time_period: Optional[str] = None,
     hours_back: Optional[int] = None,
@@ -1107,36 +1094,30 @@ async def get_hotspot_stats(
         raise HTTPException(status_code=500, detail="Failed to get hotspot statistics")
 
 
-
-    incidents: List[HotspotIncidentResponse] = []
-    for r in hotspot.reports or []:
-        preds = list(getattr(r, "ml_predictions", None) or [])
-        final_preds = [p for p in preds if getattr(p, "is_final", False)]
-        source_preds = final_preds if final_preds else preds
-        source_preds.sort(
-            key=lambda p: p.evaluated_at or datetime.min.replace(tzinfo=timezone.utc),
-            reverse=True,
-        )
-        trust_score = None
-        if source_preds and getattr(source_preds[0], "trust_score", None) is not None:
-            trust_score = float(source_preds[0].trust_score)
-
-        incidents.append(
-            HotspotIncidentResponse(
-                report_id=str(r.report_id),
-                incident_type_name=r.incident_type.type_name if r.incident_type else None,
-                description=r.description,
-                latitude=r.latitude,
-                longitude=r.longitude,
-                reported_at=r.reported_at,
-                rule_status=r.rule_status,
-                verification_status=r.verification_status,
-                trust_score=trust_score,
-            )
+@router.get("/{hotspot_id}", response_model=HotspotResponse)
+def get_hotspot(
+    hotspot_id: int,
+    current_user: Annotated[PoliceUser, Depends(get_current_user)],
+    db: Session = Depends(get_db),
+):
+    """Full hotspot detail, including incident points and evidence files."""
+    hotspot = (
+        db.query(Hotspot)
+        .options(
+            joinedload(Hotspot.incident_type),
+            selectinload(Hotspot.reports).selectinload(Report.ml_predictions),
+            selectinload(Hotspot.reports).joinedload(Report.village_location),
+            selectinload(Hotspot.reports).joinedload(Report.incident_type),
+            selectinload(Hotspot.reports).selectinload(Report.evidence_files),
         )
-
-    incidents.sort(
-        key=lambda i: i.reported_at or datetime.min.replace(tzinfo=timezone.utc),
-        reverse=True,
+        .filter(Hotspot.hotspot_id == hotspot_id)
+        .first()
     )
-    return incidents
+    if not hotspot:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hotspot not found")
+    _ensure_in_scope(db, current_user, hotspot_id)
+
+    response = _full_hotspot_response(db, hotspot)
+    if response is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hotspot not found")
+    return response
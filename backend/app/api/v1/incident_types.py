@@ -3,6 +3,7 @@ from typing import Annotated, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status, BackgroundTasks
 from sqlalchemy.orm import Session
+from app.core.response_cache import cached_response
 from app.core.websocket import manager
 import asyncio
 
@@ -20,6 +21,13 @@ router = APIRouter(prefix="/incident-types", tags=["incident-types"])
 
 
 @router.get("/", response_model=List[IncidentTypeResponse])
+@cached_response(
+    "incident_types.list",
+    300.0,
+    ("incident_type",),
+    scope=lambda user: "admin" if getattr(user, "role", None) == "admin" else "public",
+    response_model=List[IncidentTypeResponse],
+)
 def get_incident_types(
     include_inactive: bool = Query(False, description="Include inactive types (admin only)."),
     db: Session = Depends(get_db),
@@ -60,11 +68,7 @@ def create_incident_type(
     db.refresh(obj)
 
     def notify():
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(manager.broadcast({"type": "refresh_data", "entity": "incident_type"}))
-        except RuntimeError:
-            asyncio.run(manager.broadcast({"type": "refresh_data", "entity": "incident_type"}))
+        manager.publish({"type": "refresh_data", "entity": "incident_type"})
     background_tasks.add_task(notify)
 
     return obj
@@ -111,11 +115,7 @@ def update_incident_type(
     db.refresh(obj)
 
     def notify():
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(manager.broadcast({"type": "refresh_data", "entity": "incident_type"}))
-        except RuntimeError:
-            asyncio.run(manager.broadcast({"type": "refresh_data", "entity": "incident_type"}))
+        manager.publish({"type": "refresh_data", "entity": "incident_type"})
     background_tasks.add_task(notify)
 
     return obj
@@ -143,11 +143,7 @@ def delete_incident_type(
     db.commit()
 
     def notify():
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(manager.broadcast({"type": "refresh_data", "entity": "incident_type"}))
-        except RuntimeError:
-            asyncio.run(manager.broadcast({"type": "refresh_data", "entity": "incident_type"}))
+        manager.publish({"type": "refresh_data", "entity": "incident_type"})
     background_tasks.add_task(notify)
 
     return {}
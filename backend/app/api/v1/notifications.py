@@ -1,11 +1,11 @@
-from uuid import uuid4
+from uuid import UUID, uuid4
 from typing import Annotated, List
 
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from sqlalchemy import insert
 from sqlalchemy.orm import Session, joinedload
 from app.core.websocket import manager
-from app.api.v1.ws import notification_manager
-import asyncio
+from app.core.notification_delivery import notification_manager
 
 from app.database import get_db
 from app.models.notification import Notification
@@ -16,19 +16,6 @@ from app.schemas.notification import NotificationResponse
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
 
-def _run_async_now_or_schedule(coro) -> None:
-    """
-    Run a coroutine from either sync or async context.
-    - If an event loop exists, schedule it.
-    - Otherwise, run it to completion synchronously.
-    """
-    try:
-        loop = asyncio.get_running_loop()
-        loop.create_task(coro)
-    except RuntimeError:
-        asyncio.run(coro)
-
-
 def create_notification(
     db: Session,
     police_user_id: int,
@@ -49,17 +36,14 @@ def create_notification(
         related_entity_id=related_entity_id,
     )
     db.add(n)
+    # The email goes into email_outbox in the same transaction, so it is sent iff the notification exists.
+    if send_email:
+        _send_email_notification(db, police_user_id, title, message, notif_type, related_entity_type, related_entity_id)
     db.commit()
     db.refresh(n)
     
-    # Send real-time notification update for the target user.
-    _run_async_now_or_schedule(
-        notification_manager.increment_notification_count(str(police_user_id))
-    )
-    
-    # Send email notification if requested
-    if send_email:
-        _send_email_notification(db, police_user_id, title, message, notif_type, related_entity_type, related_entity_id)
+    # The counter was updated in the same transaction (trigger); push it to the user's tabs.
+    notification_manager.push_counts(db, [police_user_id])
     
     return n
 
@@ -76,7 +60,7 @@ def create_role_notifications(
     target_station_id: int | None = None,
     exclude_user_id: int | None = None,
     send_email: bool = False,
-) -> List[Notification]:
+) -> List[UUID]:
     """
     Create notifications for users based on roles, location, or station.
     
@@ -93,11 +77,9 @@ def create_role_notifications(
         exclude_user_id: User ID to exclude from notifications
     
     Returns:
-        List of created notifications
+        Ids of the created notifications
     """
-    from app.models.police_user import PoliceUser
-    
-    query = db.query(PoliceUser).filter(PoliceUser.is_active == True)
+    query = db.query(PoliceUser.police_user_id).filter(PoliceUser.is_active == True)
     
     if exclude_user_id:
         query = query.filter(PoliceUser.police_user_id != exclude_user_id)
@@ -111,35 +93,36 @@ def create_role_notifications(
     if target_station_id:
         query = query.filter(PoliceUser.station_id == target_station_id)
     
-    users = query.all()
-    notifications = []
-    
-    for user in users:
-        notif = Notification(
-            notification_id=uuid4(),
-            police_user_id=user.police_user_id,
-            title=title,
-            message=message,
-            type=notif_type,
-            related_entity_type=related_entity_type,
-            related_entity_id=related_entity_id,
+    user_ids = [user_id for (user_id,) in query.all()]
+    if not user_ids:
+        return []
+
+    # One multi-row INSERT; the unread counters follow via the statement trigger.
+    rows = [
+        {
+            "notification_id": uuid4(),
+            "police_user_id": user_id,
+            "title": title,
+            "message": message,
+            "type": notif_type,
+            "related_entity_type": related_entity_type,
+            "related_entity_id": related_entity_id,
+        }
+        for user_id in user_ids
+    ]
+    db.execute(insert(Notification).values(rows))
+    # Emails are queued in email_outbox within this transaction; its worker sends them after commit.
+    if send_email:
+        users = db.query(PoliceUser).filter(PoliceUser.police_user_id.in_(user_ids)).all()
+        _send_role_email_notifications(
+            db, users, title, message, notif_type, related_entity_type, related_entity_id
         )
-        db.add(notif)
-        notifications.append(notif)
-    
     db.commit()
     
     # Send real-time notification updates for affected users.
-    for user in users:
-        _run_async_now_or_schedule(
-            notification_manager.increment_notification_count(str(user.police_user_id))
-        )
-    
-    # Send email notifications if requested
-    if send_email and users:
-        _send_role_email_notifications(db, users, title, message, notif_type, related_entity_type, related_entity_id)
+    notification_manager.push_counts(db, user_ids)
     
-    return notifications
+    return [row["notification_id"] for row in rows]
 
 
 @router.get("/", response_model=List[NotificationResponse])
@@ -162,17 +145,7 @@ def unread_count(
     db: Session = Depends(get_db),
 ):
     """Return count of unread notifications (for badge)."""
-    from sqlalchemy import func
-    count = (
-        db.query(func.count(Notification.notification_id))
-        .filter(
-            Notification.police_user_id == current_user.police_user_id,
-            Notification.is_read == False,
-        )
-        .scalar()
-        or 0
-    )
-    return {"unread_count": count}
+    return {"unread_count": notification_manager.unread_count(db, current_user.police_user_id)}
 
 
 @router.patch("/{notification_id}/read", response_model=NotificationResponse)
@@ -206,25 +179,13 @@ def mark_read(
     db.commit()
     db.refresh(notif)
 
+    # If this was unread, send the updated count to every tab of the user
+    if was_unread:
+        notification_manager.push_counts(db, [current_user.police_user_id])
+
     def notify():
-        try:
-            loop = asyncio.get_running_loop()
-            # Send general refresh for any connected clients
-            loop.create_task(manager.broadcast({"type": "refresh_data", "entity": "notification"}))
-            
-            # If this was unread, send updated count to user
-            if was_unread:
-                loop.create_task(notification_manager.send_to_user(
-                    str(current_user.police_user_id),
-                    {"type": "notification_count_updated"}
-                ))
-        except RuntimeError:
-            asyncio.run(manager.broadcast({"type": "refresh_data", "entity": "notification"}))
-            if was_unread:
-                asyncio.run(notification_manager.send_to_user(
-                    str(current_user.police_user_id),
-                    {"type": "notification_count_updated"}
-                ))
+        # Send general refresh for any connected clients
+        manager.publish({"type": "refresh_data", "entity": "notification"})
     background_tasks.add_task(notify)
 
     return notif
@@ -315,6 +276,19 @@ def register_mobile_token(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _float_or_none(value) -> float | None:
+    return float(value) if value is not None else None
+
+
+def _report_location_text(db: Session, report) -> str:
+    """Location line for report emails, resolved once per report (stored village first)."""
+    from app.services.email_notification_service import resolve_location_text
+    return resolve_location_text(
+        db, report.latitude, report.longitude,
+        village_location_id=report.village_location_id, entity=("report", str(report.report_id)),
+    )
+
+
 def _send_email_notification(
     db: Session,
     police_user_id: int,
@@ -324,84 +298,60 @@ def _send_email_notification(
     related_entity_type: str | None,
     related_entity_id: str | None,
 ):
-    """Send email notification to a single police user."""
+    """Queue the email for a single police user's notification in the caller's transaction."""
     try:
-        from app.services.email_notification_service import email_service
-        from app.models.police_user import PoliceUser
-        
-        police_user = db.query(PoliceUser).filter(PoliceUser.police_user_id == police_user_id).first()
-        if not police_user or not police_user.email:
-            return
-        
-        # Send appropriate email based on notification type
-        if notif_type == "assignment" and related_entity_type == "case":
-            # Case assignment notification
-            from app.models.case import Case
-            case = db.query(Case).options(
-                joinedload(Case.location),
-                joinedload(Case.incident_type)
-            ).filter(Case.case_id == related_entity_id).first()
-            if case:
-                # Build location description with hierarchy
-                location_desc = ""
-                if case.location:
-                    location_parts = []
-                    if case.location.location_name:
-                        location_parts.append(case.location.location_name)
-                    
-                    # Get parent location hierarchy (village -> cell -> sector -> district)
-                    current_location = case.location
-                    hierarchy_parts = []
-                    while current_location and current_location.parent:
-                        current_location = current_location.parent
-                        if current_location and current_location.location_name:
-                            hierarchy_parts.append(current_location.location_name)
-                    
-                    # Add hierarchy in reverse order (sector -> cell -> village)
-                    if hierarchy_parts:
-                        location_parts.extend(reversed(hierarchy_parts))
-                    
-                    location_desc = ", ".join(location_parts)
-                elif case.latitude and case.longitude:
-                    location_desc = f"{float(case.latitude):.4f}, {float(case.longitude):.4f}"
-                else:
-                    location_desc = "Location not specified"
-                
-                email_service.send_case_assignment_notification(
-                    police_user,
-                    case.case_number,
-                    case.title,
-                    case.incident_type.type_name if case.incident_type else "Unknown",
-                    location_desc,
-                    case.report_count or 0,
-                    latitude=float(case.latitude) if case.latitude is not None else None,
-                    longitude=float(case.longitude) if case.longitude is not None else None,
-                )
-        elif notif_type == "assignment" and related_entity_type == "report":
-            # Report assignment notification
-            from app.models.report import Report
-            from app.services.email_notification_service import get_location_hierarchy_from_coordinates
-            report = db.query(Report).filter(Report.report_id == related_entity_id).first()
-            if report:
-                assignment_type = "boundary" if "out of boundary" in message.lower() else "flagged"
-                
-                # Convert coordinates to location hierarchy
-                location_display = f"{report.latitude}, {report.longitude}"
-                if report.latitude and report.longitude:
-                    try:
-                        location_display = get_location_hierarchy_from_coordinates(db, float(report.latitude), float(report.longitude))
-                    except Exception:
-                        pass  # Keep coordinates if conversion fails
-                
-                email_service.send_report_assignment_notification(
-                    police_user,
-                    str(report.report_id),
-                    report.incident_type.type_name if report.incident_type else "Unknown",
-                    location_display,
-                    report.flag_reason or "Requires review",
-                    assignment_type
-                )
-        
+        # Savepoint: a failed lookup or insert rolls back only the email rows, not the notification.
+        with db.begin_nested():
+            from app.services.email_notification_service import email_service, resolve_location_text
+
+            police_user = db.query(PoliceUser).filter(PoliceUser.police_user_id == police_user_id).first()
+            if not police_user or not police_user.email:
+                return
+
+            # Send appropriate email based on notification type
+            if notif_type == "assignment" and related_entity_type == "case":
+                # Case assignment notification
+                from app.models.case import Case
+                case = db.query(Case).options(
+                    joinedload(Case.incident_type)
+                ).filter(Case.case_id == related_entity_id).first()
+                if case:
+                    # Shared with every other email about this case (one lookup per case).
+                    location_desc = resolve_location_text(
+                        db, case.latitude, case.longitude,
+                        village_location_id=case.location_id, entity=("case", str(case.case_id)),
+                    )
+
+                    email_service.send_case_assignment_notification(
+                        police_user,
+                        case.case_number,
+                        case.title,
+                        case.incident_type.type_name if case.incident_type else "Unknown",
+                        location_desc,
+                        case.report_count or 0,
+                        latitude=float(case.latitude) if case.latitude is not None else None,
+                        longitude=float(case.longitude) if case.longitude is not None else None,
+                        db=db,
+                    )
+            elif notif_type == "assignment" and related_entity_type == "report":
+                # Report assignment notification
+                from app.models.report import Report
+                report = db.query(Report).filter(Report.report_id == related_entity_id).first()
+                if report:
+                    assignment_type = "boundary" if "out of boundary" in (message or "").lower() else "flagged"
+
+                    email_service.send_report_assignment_notification(
+                        police_user,
+                        str(report.report_id),
+                        report.incident_type.type_name if report.incident_type else "Unknown",
+                        _report_location_text(db, report),
+                        report.flag_reason or "Requires review",
+                        assignment_type,
+                        latitude=_float_or_none(report.latitude),
+                        longitude=_float_or_none(report.longitude),
+                        db=db,
+                    )
+
     except Exception as e:
         # Log error but don't fail the notification creation
         import logging
@@ -418,77 +368,71 @@ def _send_role_email_notifications(
     related_entity_type: str | None,
     related_entity_id: str | None,
 ):
-    """Send email notifications to multiple police users by role."""
+    """Queue the emails for a role notification in the caller's transaction."""
     try:
-        from app.services.email_notification_service import email_service
-        from app.models.case import Case
-        from app.models.report import Report
-        from app.models.hotspot import Hotspot
-        
-        # Send appropriate email based on notification type
-        if notif_type == "system" and related_entity_type == "case":
-            # Auto-generated case notification
-            from app.services.email_notification_service import get_location_hierarchy_from_coordinates
-            case = db.query(Case).filter(Case.case_id == related_entity_id).first()
-            if case:
-                # Convert coordinates to location hierarchy
-                location_display = f"{case.latitude}, {case.longitude}"
-                if case.latitude and case.longitude:
-                    try:
-                        location_display = get_location_hierarchy_from_coordinates(db, float(case.latitude), float(case.longitude))
-                    except Exception:
-                        pass  # Keep coordinates if conversion fails
-                
-                email_service.send_auto_case_notification(
-                    users,
-                    case.case_number,
-                    case.title,
-                    case.incident_type.type_name if case.incident_type else "Unknown",
-                    location_display,
-                    case.report_count or 0,
-                    latitude=float(case.latitude) if case.latitude is not None else None,
-                    longitude=float(case.longitude) if case.longitude is not None else None,
-                )
-        elif notif_type == "system" and related_entity_type == "hotspot":
-            # Hotspot detection notification
-            if related_entity_id:
-                hotspot = db.query(Hotspot).filter(Hotspot.hotspot_id == related_entity_id).first()
-                if hotspot:
-                    hotspot_count = 1  # Single hotspot notification
-                    hotspot_location = f"Radius {hotspot.radius_meters}m"
-                    hotspot_coordinates = f"{hotspot.center_lat},{hotspot.center_long}"
-                    email_service.send_hotspot_notification(
+        # Savepoint: a failed lookup or insert rolls back only the email rows, not the notification.
+        with db.begin_nested():
+            from app.services.email_notification_service import email_service, resolve_location_text
+            from app.models.case import Case
+            from app.models.report import Report
+            from app.models.hotspot import Hotspot
+
+            # Send appropriate email based on notification type
+            if notif_type == "system" and related_entity_type == "case":
+                # Auto-generated case notification
+                case = db.query(Case).filter(Case.case_id == related_entity_id).first()
+                if case:
+                    location_display = resolve_location_text(
+                        db, case.latitude, case.longitude,
+                        village_location_id=case.location_id, entity=("case", str(case.case_id)),
+                    )
+
+                    email_service.send_auto_case_notification(
                         users,
-                        hotspot_count,
-                        hotspot_location,
-                        hotspot_coordinates
+                        case.case_number,
+                        case.title,
+                        case.incident_type.type_name if case.incident_type else "Unknown",
+                        location_display,
+                        case.report_count or 0,
+                        latitude=float(case.latitude) if case.latitude is not None else None,
+                        longitude=float(case.longitude) if case.longitude is not None else None,
+                        db=db,
                     )
-            else:
-                # Multiple hotspots notification
-                hotspot_count = int(message.split()[0]) if message and message.split()[0].isdigit() else 1
-                email_service.send_hotspot_notification(users, hotspot_count)
-        elif notif_type == "report" and related_entity_type == "report":
-            # Report verification notification
-            from app.services.email_notification_service import get_location_hierarchy_from_coordinates
-            report = db.query(Report).filter(Report.report_id == related_entity_id).first()
-            if report:
-                # Convert coordinates to location hierarchy
-                location_display = f"{report.latitude}, {report.longitude}"
-                if report.latitude and report.longitude:
-                    try:
-                        location_display = get_location_hierarchy_from_coordinates(db, float(report.latitude), float(report.longitude))
-                    except Exception:
-                        pass  # Keep coordinates if conversion fails
-                
-                email_service.send_report_verification_notification(
-                    users,
-                    str(report.report_id),
-                    report.incident_type.type_name if report.incident_type else "Unknown",
-                    location_display,
-                    report.verification_status or "pending",
-                    report.flag_reason
-                )
-        
+            elif notif_type == "system" and related_entity_type == "hotspot":
+                # Hotspot detection notification
+                if related_entity_id:
+                    hotspot = db.query(Hotspot).filter(Hotspot.hotspot_id == related_entity_id).first()
+                    if hotspot:
+                        hotspot_count = 1  # Single hotspot notification
+                        hotspot_location = f"Radius {hotspot.radius_meters}m"
+                        hotspot_coordinates = f"{hotspot.center_lat},{hotspot.center_long}"
+                        email_service.send_hotspot_notification(
+                            users,
+                            hotspot_count,
+                            hotspot_location,
+                            hotspot_coordinates,
+                            db=db,
+                        )
+                else:
+                    # Multiple hotspots notification
+                    hotspot_count = int(message.split()[0]) if message and message.split()[0].isdigit() else 1
+                    email_service.send_hotspot_notification(users, hotspot_count, db=db)
+            elif notif_type == "report" and related_entity_type == "report":
+                # Report verification notification
+                report = db.query(Report).filter(Report.report_id == related_entity_id).first()
+                if report:
+                    email_service.send_report_verification_notification(
+                        users,
+                        str(report.report_id),
+                        report.incident_type.type_name if report.incident_type else "Unknown",
+                        _report_location_text(db, report),
+                        report.verification_status or "pending",
+                        report.flag_reason,
+                        latitude=_float_or_none(report.latitude),
+                        longitude=_float_or_none(report.longitude),
+                        db=db,
+                    )
+
     except Exception as e:
         # Log error but don't fail the notification creation
         import logging
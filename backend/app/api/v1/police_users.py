@@ -13,6 +13,7 @@ from app.core.websocket import manager
 import asyncio
 
 from app.api.v1.auth import get_current_admin, get_current_admin_or_supervisor, get_current_user
+from app.core.auth_cache import principal_cache
 from app.core.security import get_password_hash
 from app.core.email import is_smtp_configured, send_new_user_credentials
 from app.database import get_db
@@ -331,11 +332,7 @@ def create_police_user(
     db.refresh(user)
 
     def notify():
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(manager.broadcast({"type": "refresh_data", "entity": "user"}))
-        except RuntimeError:
-            asyncio.run(manager.broadcast({"type": "refresh_data", "entity": "user"}))
+        manager.publish({"type": "refresh_data", "entity": "user"})
     background_tasks.add_task(notify)
 
     return user
@@ -375,14 +372,11 @@ def update_police_user(
 
         db.add(user)
         db.commit()
+        principal_cache.invalidate_user(user.police_user_id)
         db.refresh(user)
 
         def notify():
-            try:
-                loop = asyncio.get_running_loop()
-                loop.create_task(manager.broadcast({"type": "refresh_data", "entity": "user"}))
-            except RuntimeError:
-                asyncio.run(manager.broadcast({"type": "refresh_data", "entity": "user"}))
+            manager.publish({"type": "refresh_data", "entity": "user"})
         background_tasks.add_task(notify)
 
         return user
@@ -440,14 +434,11 @@ def update_police_user(
 
     db.add(user)
     db.commit()
+    principal_cache.invalidate_user(user.police_user_id)
     db.refresh(user)
 
     def notify():
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(manager.broadcast({"type": "refresh_data", "entity": "user"}))
-        except RuntimeError:
-            asyncio.run(manager.broadcast({"type": "refresh_data", "entity": "user"}))
+        manager.publish({"type": "refresh_data", "entity": "user"})
     background_tasks.add_task(notify)
 
     return user
@@ -498,6 +489,7 @@ def delete_police_user(
         # Proceed with deleting the user itself
         db.delete(user)
         db.commit()
+        principal_cache.invalidate_user(user_id)
     except IntegrityError as e:
         db.rollback()
         raise HTTPException(
@@ -506,11 +498,7 @@ def delete_police_user(
         )
 
     def notify():
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(manager.broadcast({"type": "refresh_data", "entity": "user"}))
-        except RuntimeError:
-            asyncio.run(manager.broadcast({"type": "refresh_data", "entity": "user"}))
+        manager.publish({"type": "refresh_data", "entity": "user"})
     background_tasks.add_task(notify)
 
 
@@ -554,6 +542,7 @@ def admin_reset_password(
         raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=detail)
 
     db.commit()
+    principal_cache.invalidate_user(user_id)
     return {"message": "Temporary password sent to user's email."}
 
 
@@ -584,13 +573,10 @@ def admin_revoke_user_sessions(
         .update({UserSession.revoked_at: now}, synchronize_session=False)
     )
     db.commit()
+    principal_cache.invalidate_user(user_id)
 
     def notify():
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(manager.broadcast({"type": "refresh_data", "entity": "session"}))
-        except RuntimeError:
-            asyncio.run(manager.broadcast({"type": "refresh_data", "entity": "session"}))
+        manager.publish({"type": "refresh_data", "entity": "session"})
     background_tasks.add_task(notify)
 
     return {"message": "All active sessions for this user have been revoked."}
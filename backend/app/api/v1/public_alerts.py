@@ -1,14 +1,15 @@
-from datetime import datetime, timezone
-from math import atan2, cos, radians, sin, sqrt
-from typing import List, Dict, Any, Optional
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session, joinedload, selectinload
+from geoalchemy2 import Geography
+from sqlalchemy import cast, func
+from sqlalchemy.orm import Session, joinedload
 
-from app.core.cluster_classifier import predict_cluster_classification
+from app.core.cluster_classifier import risk_level_to_classification
+from app.core.hotspot_auto import CURRENT_HOTSPOT_HOURS
 from app.database import get_db
 from app.models.hotspot import Hotspot
-from app.models.report import Report
 
 
 router = APIRouter(prefix="/public/alerts", tags=["public"])
@@ -25,46 +26,6 @@ def _severity_from_risk(risk_level: str) -> str:
     return "info"
 
 
-def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    r = 6371.0
-    dlat = radians(lat2 - lat1)
-    dlon = radians(lon2 - lon1)
-    a = (
-        sin(dlat / 2) ** 2
-        + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
-    )
-    return r * 2 * atan2(sqrt(a), sqrt(1 - a))
-
-
-def _latest_ml_trust(report: Report) -> Optional[float]:
-    preds = list(getattr(report, "ml_predictions", None) or [])
-    if not preds:
-        return None
-    finals = [p for p in preds if getattr(p, "is_final", False)]
-    src = finals if finals else preds
-    src.sort(
-        key=lambda p: p.evaluated_at or datetime.min.replace(tzinfo=timezone.utc),
-        reverse=True,
-    )
-    top = src[0]
-    try:
-        if top.trust_score is None:
-            return None
-        return float(top.trust_score)
-    except Exception:
-        return None
-
-
-def _avg_cluster_trust(reports: List[Report]) -> float:
-    if not reports:
-        return 50.0
-    vals: List[float] = []
-    for r in reports:
-        t = _latest_ml_trust(r)
-        vals.append(t if t is not None else 50.0)
-    return sum(vals) / len(vals)
-
-
 def _prediction_narrative(classification: str, incident_name: str, distance_km: float) -> str:
     crime = incident_name.lower()
     if classification == "critical":
@@ -90,59 +51,47 @@ def _prediction_narrative(classification: str, incident_name: str, distance_km:
 
 @router.get("/", response_model=List[Dict[str, Any]])
 def list_public_alerts(
-    latitude: float = Query(..., description="User latitude for proximity filtering."),
-    longitude: float = Query(..., description="User longitude for proximity filtering."),
+    latitude: float = Query(..., ge=-90, le=90, description="User latitude for proximity filtering."),
+    longitude: float = Query(..., ge=-180, le=180, description="User longitude for proximity filtering."),
     radius_km: float = Query(10.0, ge=0.5, le=50.0, description="Max alert distance from user."),
     db: Session = Depends(get_db),
     limit: int = Query(20, ge=1, le=100),
 ):
-    """AI-derived public alerts within radius of user location (default 10km)."""
-    hotspots = (
-        db.query(Hotspot)
-        .options(
-            joinedload(Hotspot.incident_type),
-            selectinload(Hotspot.reports).selectinload(Report.ml_predictions),
+    """
+    AI-derived public alerts within radius of user location (default 10km).
+
+    Only the current hotspot generation is considered; hotspots are returned
+    nearest first from the geography index, with the classification stored
+    when the hotspot was detected.
+    """
+    user_point = cast(
+        func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326), Geography("POINT", srid=4326)
+    )
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=CURRENT_HOTSPOT_HOURS)
+    rows = (
+        db.query(Hotspot, func.ST_Distance(Hotspot.geog, user_point).label("distance_m"))
+        .options(joinedload(Hotspot.incident_type))
+        .filter(
+            Hotspot.detected_at >= cutoff,
+            func.ST_DWithin(Hotspot.geog, user_point, float(radius_km) * 1000.0),
         )
-        .order_by(Hotspot.detected_at.desc())
+        .order_by(Hotspot.geog.op("<->")(user_point))
+        .limit(limit)
         .all()
     )
 
     alerts: List[Dict[str, Any]] = []
-    for h in hotspots:
-        try:
-            h_lat = float(h.center_lat)
-            h_lon = float(h.center_long)
-        except Exception:
-            continue
-
-        distance_km = _haversine_km(latitude, longitude, h_lat, h_lon)
-        if distance_km > float(radius_km):
-            continue
-
-        incident_count = int(h.incident_count or 0)
-        time_window_hours = int(h.time_window_hours or 24)
+    for h, distance_m in rows:
+        distance_km = float(distance_m or 0.0) / 1000.0
         radius_meters = float(h.radius_meters or 500.0)
-        area_sqkm = max(0.001, 3.14159 * (radius_meters / 1000.0) ** 2)
-        cluster_density = incident_count / area_sqkm
-        avg_trust = _avg_cluster_trust(list(getattr(h, "reports", None) or []))
-        ai = predict_cluster_classification(
-            incident_count=incident_count,
-            avg_trust=avg_trust,
-            cluster_density=cluster_density,
-            time_window_hours=time_window_hours,
-        )
-
+        classification = h.classification or risk_level_to_classification(h.risk_level)
         incident_name = h.incident_type.type_name if h.incident_type else "Incident"
         risk = (h.risk_level or "unknown").lower()
         alerts.append(
             {
                 "alert_id": f"hotspot-{h.hotspot_id}",
                 "title": f"{incident_name} safety alert",
-                "message": _prediction_narrative(
-                    str(ai.get("classification") or "low_activity"),
-                    incident_name,
-                    distance_km,
-                ),
+                "message": _prediction_narrative(classification, incident_name, distance_km),
                 "severity": _severity_from_risk(risk),
                 "risk_level": risk,
                 "location_name": "Nearby Musanze area",
@@ -153,14 +102,11 @@ def list_public_alerts(
                 "incident_count": h.incident_count,
                 "radius_meters": radius_meters,
                 "distance_km": round(distance_km, 2),
-                "classification": ai.get("classification"),
-                "classification_confidence": ai.get("confidence"),
-                "classification_source": ai.get("source"),
-                "hotspot_score": ai.get("hotspot_score"),
+                "classification": classification,
+                "classification_confidence": h.classification_confidence,
+                "classification_source": h.classification_source or "risk_level",
+                "hotspot_score": h.hotspot_score,
             }
         )
 
-        if len(alerts) >= limit:
-            break
-
     return alerts
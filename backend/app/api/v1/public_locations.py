@@ -1,11 +1,9 @@
-from typing import Any, Dict, List, Optional
-import time
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session, aliased
-from sqlalchemy import func
-import json
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.orm import Session
 
+from app.core.geojson_artifacts import LOCATION_TYPES, location_geojson_artifacts
 from app.database import get_db
 from app.models.location import Location
 from app.schemas.location import LocationResponse
@@ -35,6 +33,7 @@ def list_public_locations(
 
 @router.get("/geojson")
 def locations_geojson(
+    request: Request,
     db: Session = Depends(get_db),
     location_type: Optional[str] = Query(
         "village", description="sector | cell | village"
@@ -43,153 +42,36 @@ def locations_geojson(
         None, description="Return children of this parent_location_id"
     ),
     limit: int = Query(3000, ge=1, le=10000),
-) -> Dict[str, Any]:
+    detail: str = Query(
+        "full",
+        pattern="^(full|medium|low)$",
+        description="Geometry detail: full (~0.1 m), medium (~5 m simplified) or low (~20 m, smallest)",
+    ),
+) -> Response:
     """
     Return a GeoJSON FeatureCollection from PostGIS geometry in `locations`.
 
     - For villages: includes `sector`, `cell`, `village` properties for coloring and labeling.
     - For cells: includes `sector`, `cell`.
     - For sectors: includes `sector`.
+
+    The body is pre-rendered per locations version and served compressed with an
+    ETag; clients sending a matching If-None-Match get 304 Not Modified.
     """
     lt = (location_type or "village").strip().lower()
-    if lt not in ("sector", "cell", "village"):
+    if lt not in LOCATION_TYPES:
         lt = "village"
 
-    # Build joins so each feature includes its full hierarchy names, and also
-    # select ST_AsGeoJSON in the same query to avoid N+1 calls.
-    cell = aliased(Location)
-    sector = aliased(Location)
-
-    base_filter = [
-        Location.is_active == True,
-        Location.location_type == lt,
-        Location.geometry.isnot(None),
-    ]
-    if parent_id is not None:
-        base_filter.append(Location.parent_location_id == parent_id)
-
-    geojson_col = func.ST_AsGeoJSON(Location.geometry).label("geojson")
-
-    if lt == "village":
-        query = (
-            db.query(
-                Location,
-                cell.location_name.label("cell_name"),
-                sector.location_name.label("sector_name"),
-                geojson_col,
-            )
-            .filter(*base_filter)
-            .join(cell, Location.parent_location_id == cell.location_id)
-            .join(sector, cell.parent_location_id == sector.location_id)
-            .order_by(Location.location_name)
-            .limit(limit)
-        )
-        
-        # Add retry logic for database connection issues
-        max_retries = 3
-        rows = None
-        for attempt in range(max_retries):
-            try:
-                rows = query.all()
-                break
-            except Exception as e:
-                if attempt == max_retries - 1:
-                    print(f"Failed to fetch locations after {max_retries} attempts: {e}")
-                    raise HTTPException(status_code=500, detail="Database connection error")
-                print(f"Database error in locations query attempt {attempt + 1}, retrying...")
-                db.rollback()
-                time.sleep(0.5)
-        
-        if rows is None:
-            raise HTTPException(status_code=500, detail="Failed to fetch locations")
-        
-        features: List[Dict[str, Any]] = []
-        for loc, cell_name, sector_name, geojson_text in rows:
-            if not geojson_text:
-                continue
-            try:
-                geometry = json.loads(geojson_text)
-            except Exception:
-                continue
-            features.append(
-                {
-                    "type": "Feature",
-                    "geometry": geometry,
-                    "properties": {
-                        "location_id": loc.location_id,
-                        "location_type": lt,
-                        "sector": sector_name,
-                        "cell": cell_name,
-                        "village": loc.location_name,
-                    },
-                }
-            )
-        return {"type": "FeatureCollection", "features": features}
-
-    if lt == "cell":
-        query = (
-            db.query(
-                Location,
-                sector.location_name.label("sector_name"),
-                geojson_col,
-            )
-            .filter(*base_filter)
-            .join(sector, Location.parent_location_id == sector.location_id)
-            .order_by(Location.location_name)
-            .limit(limit)
-        )
-        rows = query.all()
-        features = []
-        for loc, sector_name, geojson_text in rows:
-            if not geojson_text:
-                continue
-            try:
-                geometry = json.loads(geojson_text)
-            except Exception:
-                continue
-            features.append(
-                {
-                    "type": "Feature",
-                    "geometry": geometry,
-                    "properties": {
-                        "location_id": loc.location_id,
-                        "location_type": lt,
-                        "sector": sector_name,
-                        "cell": loc.location_name,
-                    },
-                }
-            )
-        return {"type": "FeatureCollection", "features": features}
-
-    # sector
-    query = (
-        db.query(
-            Location,
-            geojson_col,
-        )
-        .filter(*base_filter)
-        .order_by(Location.location_name)
-        .limit(limit)
-    )
-    rows = query.all()
-    features = []
-    for loc, geojson_text in rows:
-        if not geojson_text:
-            continue
-        try:
-            geometry = json.loads(geojson_text)
-        except Exception:
-            continue
-        features.append(
-            {
-                "type": "Feature",
-                "geometry": geometry,
-                "properties": {
-                    "location_id": loc.location_id,
-                    "location_type": lt,
-                    "sector": loc.location_name,
-                },
-            }
-        )
-    return {"type": "FeatureCollection", "features": features}
+    artifact = location_geojson_artifacts.get(db, lt, parent_id, detail, limit)
+    headers = {
+        "ETag": artifact.etag,
+        "Cache-Control": "public, max-age=300, must-revalidate",
+        "Vary": "Accept-Encoding",
+    }
+    if artifact.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
 
+    body, encoding = artifact.encoded(request.headers.get("accept-encoding", ""))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -5,7 +5,9 @@ from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFi
 from sqlalchemy.orm import Session, joinedload, selectinload
 from uuid import uuid4, UUID
 from datetime import datetime, timedelta, timezone
+import base64
 import io
+import json
 import os
 import math
 import hashlib
@@ -40,7 +42,7 @@ from app.models.police_user import PoliceUser
 from app.models.report_assignment import ReportAssignment
 from app.models.police_review import PoliceReview
 from app.core.security import verify_password
-from app.core.websocket import manager
+from app.core.websocket import manager, refresh_event
 from app.api.v1.auth import get_optional_user, get_current_user, get_current_admin_or_supervisor
 from app.api.v1.notifications import create_notification
 from app.core.report_rules import (
@@ -64,8 +66,10 @@ from app.core.hotspot_auto import (
     get_hotspot_trust_min_from_db,
 )
 from app.core.village_lookup import get_village_location_id, get_village_location_info
+from app.core.number_allocator import allocate_case_number, allocate_report_number
+from app.core.location_hierarchy import location_hierarchy
 from app.schemas.report import CommunityVoteRequest
-from sqlalchemy import text, or_, func, cast, String
+from sqlalchemy import text, or_, func, cast, String, tuple_
 from sqlalchemy.exc import IntegrityError
 
 router = APIRouter(prefix="/reports", tags=["reports"])
@@ -285,7 +289,19 @@ def _process_report_background(
         
         # Broadcast update to dashboard
         try:
-            manager.broadcast({"type": "refresh_data", "entity": "report", "action": "processed"})
+            manager.publish(
+                refresh_event(
+                    "report",
+                    "processed",
+                    ids=[report.report_id],
+                    changes={
+                        "status": report.status,
+                        "rule_status": report.rule_status,
+                        "verification_status": report.verification_status,
+                    },
+                ),
+                location_ids=[report.village_location_id],
+            )
         except Exception as e:
             logger.warning(f"Failed to broadcast update for report {report_id}: {e}")
             
@@ -792,13 +808,8 @@ def run_hotspot_auto():
             try:
                 import asyncio
                 from app.core.websocket import manager
-                try:
-                    loop = asyncio.get_running_loop()
-                    loop.create_task(manager.broadcast({"type": "refresh_data", "entity": "hotspot", "action": "auto_created"}))
-                    loop.create_task(manager.broadcast({"type": "refresh_data", "entity": "geographic_intelligence", "action": "updated"}))
-                except RuntimeError:
-                    asyncio.run(manager.broadcast({"type": "refresh_data", "entity": "hotspot", "action": "auto_created"}))
-                    asyncio.run(manager.broadcast({"type": "refresh_data", "entity": "geographic_intelligence", "action": "updated"}))
+                manager.publish(refresh_event("hotspot", "auto_created", changes={"created": created}))
+                manager.publish(refresh_event("geographic_intelligence", "updated"))
             except Exception as e:
                 print(f"Failed to broadcast hotspot update: {e}")
             
@@ -976,22 +987,6 @@ def _purge_outside_musanze_reports(db: Session, recompute_hotspots: bool = True)
     return deleted_reports, recomputed
 
 
-def _generate_report_number(db: Session) -> str:
-    """Generate next report number RPT-YYYY-NNNN."""
-    year = datetime.now(timezone.utc).strftime("%Y")
-    prefix = f"RPT-{year}-"
-    row = db.execute(
-        text("""
-            SELECT COALESCE(MAX(
-                NULLIF(SUBSTRING(report_number FROM 'RPT-[0-9]{4}-([0-9]+)'), '')::INT
-            ), 0) + 1 AS next_num
-            FROM reports WHERE report_number LIKE :prefix
-        """),
-        {"prefix": f"{prefix}%"},
-    ).fetchone()
-    next_num = row[0] if row else 1
-    return f"{prefix}{next_num:04d}"
-
 UPLOAD_DIR = "uploads/evidence"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
@@ -1189,7 +1184,7 @@ def create_report(
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Location validation failed: {e}")
     
-    report_num = _generate_report_number(db) if hasattr(Report, "report_number") else None
+    report_num = allocate_report_number(db) if hasattr(Report, "report_number") else None
     report = Report(
         report_id=incoming_report_id,
         report_number=report_num,
@@ -1481,13 +1476,98 @@ def create_report(
     )
 
 
+_MOBILE_REPORTS_PAGE_LIMIT = 100
+
+
+def _report_response_load_options():
+    """Eager loads covering everything _build_report_response touches."""
+    return (
+        joinedload(Report.device),
+        joinedload(Report.incident_type),
+        joinedload(Report.village_location),
+        selectinload(Report.evidence_files),
+        selectinload(Report.ml_predictions),
+    )
+
+
+def _encode_report_cursor(report: Report) -> str:
+    raw = f"{report.reported_at.isoformat()}|{report.report_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_report_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        reported_at_raw, report_id_raw = raw.split("|", 1)
+        return datetime.fromisoformat(reported_at_raw), UUID(report_id_raw)
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _fetch_report_page(query, db: Session, limit: Optional[int], offset: int, cursor: Optional[str]):
+    """
+    Return (reports, next_cursor) for one page of a filtered Report query
+    (limit=None returns every remaining row).
+
+    Two phases keep the cost independent of page depth: a keyset scan over
+    (reported_at, report_id) picks the page ids, then one hydrating query plus
+    two selectin loads fetch every relationship _build_report_response needs.
+    """
+    id_query = query.with_entities(Report.report_id, Report.reported_at)
+    if cursor:
+        cursor_reported_at, cursor_report_id = _decode_report_cursor(cursor)
+        id_query = id_query.filter(
+            tuple_(Report.reported_at, Report.report_id) < tuple_(cursor_reported_at, cursor_report_id)
+        )
+    id_query = id_query.order_by(Report.reported_at.desc(), Report.report_id.desc()).offset(offset)
+    if limit is not None:
+        id_query = id_query.limit(limit + 1)
+    id_rows = id_query.all()
+    has_more = limit is not None and len(id_rows) > limit
+    page_ids = [row[0] for row in id_rows[:limit]]
+    if not page_ids:
+        return [], None
+
+    by_id = {
+        r.report_id: r
+        for r in db.query(Report)
+        .options(*_report_response_load_options())
+        .filter(Report.report_id.in_(page_ids))
+        .all()
+    }
+    reports = [by_id[rid] for rid in page_ids if rid in by_id]
+    next_cursor = _encode_report_cursor(reports[-1]) if has_more and reports else None
+    return reports, next_cursor
+
+
+def _estimate_query_count(db: Session, query) -> Optional[int]:
+    """Planner row estimate for a query (EXPLAIN), avoiding a full COUNT(*)."""
+    try:
+        compiled = query.order_by(None).statement.compile(
+            dialect=db.get_bind().dialect,
+            compile_kwargs={"render_postcompile": True},
+        )
+        plan = db.connection().exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+        ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        logger.warning("Report count estimate failed: %s", e)
+        return None
+
+
 @router.get("/", response_model=Union[ReportListResponse, List[ReportResponse]])
 def list_reports(
     device_id: Optional[UUID] = Query(None, description="Device ID (mobile owner). If omitted, auth required."),
     current_user: Annotated[Optional[PoliceUser], Depends(get_optional_user)] = None,
     db: Session = Depends(get_db),
-    limit: int = Query(20, le=100),
-    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Page size (default 20 for police; mobile returns every report unless limit or cursor is set)"),
+    offset: int = Query(0, ge=0, description="Legacy offset paging; ignored when cursor is set"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor"),
+    total_mode: str = Query("exact", pattern="^(exact|estimate|none)$", description="How to compute total"),
     report_status: Optional[str] = Query(None, description="Filter by report status"),
     rule_status: Optional[str] = Query(None, description="Filter by rule status"),
     boundary_status: Optional[str] = Query(None, description="Filter by boundary status"),
@@ -1504,19 +1584,12 @@ def list_reports(
       * Officers: only reports assigned to them.
       * Supervisors: reports in their assigned location (if set).
       * Admins: all reports.
+
+    Pages are ordered by (reported_at, report_id) descending. Pass the returned
+    next_cursor back as ?cursor= for constant-cost paging at any depth.
     """
     if device_id is not None:
-        mobile_query = (
-            db.query(Report)
-            .options(
-                joinedload(Report.device),
-                joinedload(Report.incident_type),
-                joinedload(Report.village_location),
-                selectinload(Report.evidence_files),
-                selectinload(Report.ml_predictions),
-            )
-            .filter(Report.device_id == device_id)
-        )
+        mobile_query = db.query(Report).filter(Report.device_id == device_id)
         if boundary_status == "out_of_boundary":
             mobile_query = mobile_query.filter(Report.flag_reason.like("out_of_musanze_boundary%"))
         elif boundary_status == "in_boundary":
@@ -1524,38 +1597,34 @@ def list_reports(
                 or_(Report.flag_reason.is_(None), ~Report.flag_reason.like("out_of_musanze_boundary%"))
             )
 
-        reports = mobile_query.order_by(Report.reported_at.desc()).all()
+        # App builds that read `items` once without following next_cursor send
+        # neither limit nor cursor; they still get every report for the device.
+        page_limit = limit or (_MOBILE_REPORTS_PAGE_LIMIT if cursor else None)
+        reports, next_cursor = _fetch_report_page(mobile_query, db, page_limit, 0 if cursor else offset, cursor)
         items = [_build_report_response(r, db, request_device_id=device_id) for r in reports]
         return ReportListResponse(
             items=items,
-            total=len(items),
-            limit=len(items),
-            offset=0,
+            total=len(items) if next_cursor is None and cursor is None and not offset else None,
+            limit=page_limit or len(items),
+            offset=0 if cursor else offset,
+            next_cursor=next_cursor,
         )
     
     if current_user is None:
         raise HTTPException(status_code=401, detail="Authentication required")
     
-    query = db.query(Report).options(
-        joinedload(Report.device),
-        joinedload(Report.incident_type),
-        joinedload(Report.village_location)
-        .joinedload(Location.parent),  # Load parent location (cell -> sector hierarchy)
-        selectinload(Report.evidence_files),
-        selectinload(Report.assignments)
-        .joinedload(ReportAssignment.police_user)
-        .joinedload(PoliceUser.station),  # Load station through police user assignments
-        selectinload(Report.ml_predictions),
-        selectinload(Report.case_reports),
-    )
+    page_limit = limit or 20
+    # Relationship loading is deferred to _fetch_report_page so the count and
+    # keyset scans stay narrow.
+    query = db.query(Report)
     
     role = getattr(current_user, "role", None)
     
     # Officers see only reports assigned to them
     if role == "officer":
-        query = query.join(Report.assignments).filter(
-            ReportAssignment.police_user_id == current_user.police_user_id
-        ).distinct()
+        query = query.filter(
+            Report.assignments.any(ReportAssignment.police_user_id == current_user.police_user_id)
+        )
     
     # Supervisors are restricted to their own station's sector.
     elif role == "supervisor":
@@ -1566,59 +1635,8 @@ def list_reports(
                 detail="Supervisor station is not configured",
             )
         
-        # Get station to find its sector location(s)
-        station = db.query(Station).filter(Station.station_id == supervisor_station_id).first()
-        if station:
-            # Handle both primary and secondary sectors
-            sector_location_ids = []
-            
-            # Primary sector
-            if station.location_id:
-                sector_location_id = station.location_id
-                # Find all villages/cells in this sector
-                sector_locations_query = db.query(Location.location_id).filter(
-                    or_(
-                        Location.location_id == sector_location_id,  # The sector itself
-                        Location.parent_location_id == sector_location_id,  # Direct children (cells)
-                        # Also get villages under cells in this sector
-                        Location.location_id.in_(
-                            db.query(Location.location_id).filter(
-                                Location.parent_location_id.in_(
-                                    db.query(Location.location_id).filter(
-                                        Location.parent_location_id == sector_location_id
-                                    )
-                                )
-                            )
-                        )
-                    )
-                )
-                sector_location_ids.extend([loc[0] for loc in sector_locations_query.all()])
-            
-            # Secondary sector (if exists)
-            if station.sector2_id:
-                sector2_location_id = station.sector2_id
-                # Find all villages/cells in secondary sector
-                sector2_locations_query = db.query(Location.location_id).filter(
-                    or_(
-                        Location.location_id == sector2_location_id,  # The sector itself
-                        Location.parent_location_id == sector2_location_id,  # Direct children (cells)
-                        # Also get villages under cells in this sector
-                        Location.location_id.in_(
-                            db.query(Location.location_id).filter(
-                                Location.parent_location_id.in_(
-                                    db.query(Location.location_id).filter(
-                                        Location.parent_location_id == sector2_location_id
-                                    )
-                                )
-                            )
-                        )
-                    )
-                )
-                sector_location_ids.extend([loc[0] for loc in sector2_locations_query.all()])
-            
-            # Remove duplicates
-            sector_location_ids = list(set(sector_location_ids))
-            
+        sector_location_ids = location_hierarchy.station_scope(db, supervisor_station_id)
+        if sector_location_ids is not None:
             # Filter reports by location hierarchy (village_location_id in sector) + station assignments
             query = query.filter(
                 or_(
@@ -1664,32 +1682,9 @@ def list_reports(
     
     if sector_location_id is not None:
         # Villages can be direct children of sector or nested under cells in that sector.
-        cell_ids = [
-            row[0]
-            for row in db.query(Location.location_id)
-            .filter(
-                Location.location_type == "cell",
-                Location.parent_location_id == sector_location_id,
-            )
-            .all()
-        ]
-        village_q = db.query(Location.location_id).filter(
-            Location.location_type == "village"
-        )
-        if cell_ids:
-            village_q = village_q.filter(
-                or_(
-                    Location.parent_location_id == sector_location_id,
-                    Location.parent_location_id.in_(cell_ids),
-                )
-            )
-        else:
-            village_q = village_q.filter(
-                Location.parent_location_id == sector_location_id
-            )
-        sector_village_ids = [row[0] for row in village_q.all()]
+        sector_village_ids = location_hierarchy.villages_under(db, sector_location_id)
         if not sector_village_ids:
-            return ReportListResponse(items=[], total=0, limit=limit, offset=offset)
+            return ReportListResponse(items=[], total=0, limit=page_limit, offset=offset)
         query = query.filter(Report.village_location_id.in_(sector_village_ids))
     
     if from_date is not None:
@@ -1698,19 +1693,21 @@ def list_reports(
     if to_date is not None:
         query = query.filter(Report.reported_at <= to_date)
     
-    total = query.count()
-    reports = (
-        query.order_by(Report.reported_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
+    total = None
+    if total_mode == "exact":
+        total = query.order_by(None).count()
+    elif total_mode == "estimate":
+        total = _estimate_query_count(db, query)
+
+    reports, next_cursor = _fetch_report_page(query, db, page_limit, 0 if cursor else offset, cursor)
     
     return ReportListResponse(
         items=[_build_report_response(r, db, request_device_id=device_id) for r in reports],
         total=total,
-        limit=limit,
-        offset=offset,
+        limit=page_limit,
+        offset=0 if cursor else offset,
+        next_cursor=next_cursor,
+        total_is_estimate=total_mode == "estimate" and total is not None,
     )
 
 
@@ -2012,7 +2009,16 @@ def add_review(
         background_tasks.add_task(run_auto_case_for_report, str(report.report_id))
     background_tasks.add_task(run_hotspot_auto)
     
-    background_tasks.add_task(manager.broadcast, {"type": "refresh_data", "entity": "report", "action": "reviewed"})
+    background_tasks.add_task(
+        manager.broadcast,
+        refresh_event(
+            "report",
+            "reviewed",
+            ids=[report.report_id],
+            changes={"status": report.status, "verification_status": report.verification_status},
+        ),
+        location_ids=[report.village_location_id],
+    )
 
     return ReviewResponse(
         review_id=review.review_id,
@@ -2356,7 +2362,16 @@ def assign_report(
     db.refresh(assignment)
     officer_name = f"{officer.first_name or ''} {officer.last_name or ''}".strip() or officer.email
     
-    background_tasks.add_task(manager.broadcast, {"type": "refresh_data", "entity": "report", "action": "assigned"})
+    background_tasks.add_task(
+        manager.broadcast,
+        refresh_event(
+            "report",
+            "assigned",
+            ids=[report_id],
+            changes={"assigned_to": body.police_user_id, "priority": body.priority},
+        ),
+        location_ids=[report.village_location_id],
+    )
 
     return AssignmentResponse(
         assignment_id=assignment.assignment_id,
@@ -2818,7 +2833,10 @@ async def upload_evidence(
             print(f" HUMAN REVIEW NEEDED: Report flagged after evidence upload - {flag_reason}")
         db.commit()
     
-    await manager.broadcast({"type": "refresh_data", "entity": "report", "action": "evidence_added"})
+    await manager.broadcast(
+        refresh_event("report", "evidence_added", ids=[report.report_id]),
+        location_ids=[report.village_location_id],
+    )
     
     return {"evidence_id": str(evidence.evidence_id), "file_url": file_url}
 @router.post("/{report_id}/confirm")
@@ -3151,13 +3169,14 @@ def _attach_report_to_case(db: Session, case, report: Report, match_reason: str)
     # Broadcast real-time update
     try:
         import asyncio
-        payload = {"type": "refresh_data", "entity": "case", "action": "updated",
-                   "case_id": str(case.case_id)}
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(manager.broadcast(payload))
-        except RuntimeError:
-            asyncio.run(manager.broadcast(payload))
+        payload = refresh_event(
+            "case",
+            "updated",
+            ids=[case.case_id],
+            changes={"report_count": case.report_count},
+            case_id=str(case.case_id),
+        )
+        manager.publish(payload, location_ids=[case.location_id])
     except Exception as e:
         print(f"Warning: broadcast failed: {e}")
 
@@ -3442,7 +3461,7 @@ def _auto_remove_rejected_report(report_id: str):
             try:
                 background_tasks.add_task(
                     manager.broadcast,
-                    {"type": "refresh_data", "entity": "report", "action": "deleted", "report_id": report_id}
+                    refresh_event("report", "deleted", ids=[report_id], report_id=report_id),
                 )
             except Exception as broadcast_error:
                 print(f"Warning: Could not broadcast report removal: {broadcast_error}")
@@ -3525,9 +3544,8 @@ def _balance_report_workload_and_reassign(db: Session):
             
             # Broadcast changes to keep clients synchronized
             try:
-                from app.api.v1.ws import manager
                 from app.core.websocket import manager as ws_manager
-                ws_manager.broadcast({"type": "refresh_data", "entity": "report", "action": "reassigned"})
+                ws_manager.publish(refresh_event("report", "reassigned"))
             except Exception as broadcast_error:
                 print(f"Warning: Could not broadcast report reassignments: {broadcast_error}")
     
@@ -3622,7 +3640,7 @@ def _balance_workload_and_reassign(db: Session):
                 from app.api.v1.ws import manager
                 background_tasks.add_task(
                     manager.broadcast,
-                    {"type": "refresh_data", "entity": "case", "action": "reassigned"}
+                    refresh_event("case", "reassigned"),
                 )
             except Exception as broadcast_error:
                 print(f"Warning: Could not broadcast case reassignments: {broadcast_error}")
@@ -3919,19 +3937,7 @@ def _create_case_from_reports(db: Session, reports: List[Report], station_id: in
         else:
             officer_id = _assign_officer_to_case_based_on_location(db, case_lat, case_lon)
 
-        # Robust case number generation (race-condition safe)
-        from sqlalchemy import text as sa_text
-        year = datetime.now(timezone.utc).year
-        row = db.execute(
-            sa_text("""
-                SELECT COALESCE(MAX(
-                    NULLIF(SUBSTRING(case_number FROM 'CASE-[0-9]{4}-([0-9]+)'), '')::INT
-                ), 0) + 1 AS next_num
-                FROM cases WHERE case_number LIKE :prefix
-            """),
-            {"prefix": f"CASE-{year}-%"},
-        ).fetchone()
-        case_number = f"CASE-{year}-{(row[0] if row else 1):04d}"
+        case_number = allocate_case_number(db)
 
         case = Case(
             case_id=uuid4(),
@@ -3988,13 +3994,8 @@ def _create_case_from_reports(db: Session, reports: List[Report], station_id: in
         # Broadcast
         try:
             import asyncio
-            payload = {"type": "refresh_data", "entity": "case", "action": "created",
-                       "case_id": str(case.case_id)}
-            try:
-                loop = asyncio.get_running_loop()
-                loop.create_task(manager.broadcast(payload))
-            except RuntimeError:
-                asyncio.run(manager.broadcast(payload))
+            payload = refresh_event("case", "created", ids=[case.case_id], case_id=str(case.case_id))
+            manager.publish(payload, location_ids=[case.location_id])
         except Exception as e:
             print(f"Warning: broadcast failed: {e}")
 
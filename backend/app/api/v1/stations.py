@@ -3,6 +3,7 @@ from typing import Annotated, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status, BackgroundTasks
 from sqlalchemy.orm import Session, joinedload
 from app.core.websocket import manager
+from app.core.location_hierarchy import location_hierarchy
 import asyncio
 from sqlalchemy import func
 
@@ -111,14 +112,11 @@ def create_station(
         db.add(st)
 
     db.commit()
+    location_hierarchy.invalidate()
     db.refresh(st)
     
     def notify():
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(manager.broadcast({"type": "refresh_data", "entity": "station"}))
-        except RuntimeError:
-            asyncio.run(manager.broadcast({"type": "refresh_data", "entity": "station"}))
+        manager.publish({"type": "refresh_data", "entity": "station"})
     background_tasks.add_task(notify)
 
     st = db.query(Station).options(joinedload(Station.location), joinedload(Station.sector2)).get(st.station_id)
@@ -191,14 +189,11 @@ def update_station(
 
     db.add(st)
     db.commit()
+    location_hierarchy.invalidate()
     db.refresh(st)
 
     def notify():
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(manager.broadcast({"type": "refresh_data", "entity": "station"}))
-        except RuntimeError:
-            asyncio.run(manager.broadcast({"type": "refresh_data", "entity": "station"}))
+        manager.publish({"type": "refresh_data", "entity": "station"})
     background_tasks.add_task(notify)
 
     st = db.query(Station).options(joinedload(Station.location), joinedload(Station.sector2)).get(st.station_id)
@@ -218,13 +213,10 @@ def delete_station(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Station not found")
     db.delete(st)
     db.commit()
+    location_hierarchy.invalidate()
 
     def notify():
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(manager.broadcast({"type": "refresh_data", "entity": "station"}))
-        except RuntimeError:
-            asyncio.run(manager.broadcast({"type": "refresh_data", "entity": "station"}))
+        manager.publish({"type": "refresh_data", "entity": "station"})
     background_tasks.add_task(notify)
 
     return {}
@@ -4,17 +4,21 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session, joinedload, selectinload
-from sqlalchemy import func, or_
+from sqlalchemy import and_, func, or_
 
 from app.database import get_db
 from app.core.report_review import needs_police_review_clause, resolve_display_trust_score
 from app.core.village_lookup import get_village_location_info
+from app.core.location_hierarchy import location_hierarchy
+from app.core.response_cache import cached_response, response_cache
+from app.core.email_delivery import email_delivery
+from app.core.auth_cache import principal_cache
 from app.models.report import Report
+from app.models.report_rollup import ReportDailyRollup
 from app.models.report_assignment import ReportAssignment
 from app.models.device import Device
 from app.models.audit_log import AuditLog
 from app.models.station import Station
-from app.models.location import Location
 from app.models.police_user import PoliceUser
 from app.api.v1.auth import get_current_user
 from app.models.hotspot import Hotspot
@@ -24,7 +28,133 @@ from app.models.case import Case
 router = APIRouter(prefix="/stats", tags=["stats"])
 
 
+def _rollup_sum(*conditions):
+    """SUM(report_count), optionally restricted with FILTER (WHERE ...)."""
+    total = func.sum(ReportDailyRollup.report_count)
+    if conditions:
+        total = total.filter(and_(*conditions))
+    return func.coalesce(total, 0)
+
+
+def _dashboard_report_counters(db: Session, rollup_filter) -> dict:
+    """
+    Dashboard report counters for a report_daily_rollups scope in one grouped query.
+
+    Windows are UTC-day aligned: "last 7 days" is today plus the six previous days,
+    weekly_volume W4 is that same window and W1 the oldest of four.
+    """
+    R = ReportDailyRollup
+    today = datetime.now(timezone.utc).date()
+    week_starts = [today - timedelta(days=7 * i - 1) for i in range(4, 0, -1)]
+    week_sums = [
+        _rollup_sum(R.day >= start, R.day < start + timedelta(days=7))
+        for start in week_starts
+    ]
+    rows = (
+        db.query(
+            R.status,
+            _rollup_sum(),
+            _rollup_sum(R.verification_status.in_(["pending", "under_review"])),
+            _rollup_sum(R.is_flagged.is_(True)),
+            _rollup_sum(R.day >= week_starts[-1]),
+            *week_sums,
+        )
+        .filter(rollup_filter)
+        .group_by(R.status)
+        .all()
+    )
+    by_status: dict = {}
+    total = pending_review = flagged = recent_7d = 0
+    weekly = [0, 0, 0, 0]
+    for status, count, pending, flagged_count, recent, *weeks in rows:
+        count = int(count or 0)
+        if count:
+            by_status[status or None] = count
+        total += count
+        pending_review += int(pending or 0)
+        flagged += int(flagged_count or 0)
+        recent_7d += int(recent or 0)
+        for i, week_count in enumerate(weeks):
+            weekly[i] += int(week_count or 0)
+    return {
+        "total": total,
+        "by_status": by_status,
+        "pending_review": pending_review,
+        "flagged": flagged,
+        "recent_7d": recent_7d,
+        "weekly": weekly,
+    }
+
+
+def _officer_report_counters(db: Session, report_filter) -> dict:
+    """Same counters as _dashboard_report_counters, computed from the officer's assigned reports."""
+    today = datetime.now(timezone.utc).date()
+    week_starts = [today - timedelta(days=7 * i - 1) for i in range(4, 0, -1)]
+    by_status: dict = {}
+    total = pending_review = flagged = recent_7d = 0
+    weekly = [0, 0, 0, 0]
+    rows = (
+        db.query(Report.status, Report.verification_status, Report.is_flagged, Report.reported_at)
+        .filter(report_filter)
+        .all()
+    )
+    for status, verification_status, is_flagged, reported_at in rows:
+        total += 1
+        by_status[status] = by_status.get(status, 0) + 1
+        if verification_status in ("pending", "under_review"):
+            pending_review += 1
+        if is_flagged:
+            flagged += 1
+        if reported_at is None:
+            continue
+        day = (reported_at.astimezone(timezone.utc) if reported_at.tzinfo else reported_at).date()
+        if day >= week_starts[-1]:
+            recent_7d += 1
+        for i, start in enumerate(week_starts):
+            if start <= day < start + timedelta(days=7):
+                weekly[i] += 1
+    return {
+        "total": total,
+        "by_status": by_status,
+        "pending_review": pending_review,
+        "flagged": flagged,
+        "recent_7d": recent_7d,
+        "weekly": weekly,
+    }
+
+
+@router.get("/cache")
+def get_response_cache_stats(
+    current_user: Annotated[PoliceUser, Depends(get_current_user)],
+):
+    """Hit/miss/coalesced counters for the dashboard response cache (admin only)."""
+    if getattr(current_user, "role", None) != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can view cache statistics")
+    return response_cache.stats()
+
+
+@router.get("/email")
+def get_email_delivery_stats(
+    current_user: Annotated[PoliceUser, Depends(get_current_user)],
+):
+    """Outbox backlog by status plus delivery worker and SMTP pool counters (admin only)."""
+    if getattr(current_user, "role", None) != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can view email statistics")
+    return {"outbox": email_delivery.store.counts(), "worker": email_delivery.stats()}
+
+
+@router.get("/auth-cache")
+def get_auth_cache_stats(
+    current_user: Annotated[PoliceUser, Depends(get_current_user)],
+):
+    """Hit/miss counters for the authenticated-user cache on this worker (admin only)."""
+    if getattr(current_user, "role", None) != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can view cache statistics")
+    return principal_cache.stats()
+
+
 @router.get("/station/{station_id}")
+@cached_response("stats.station", 30.0, ("report", "case", "user", "station"))
 def get_station_stats(
     station_id: int,
     current_user: Annotated[PoliceUser, Depends(get_current_user)],
@@ -36,87 +166,50 @@ def get_station_stats(
     if current_role not in ["admin", "supervisor"]:
         raise HTTPException(status_code=403, detail="Only admins and supervisors can view station statistics")
     
-    since_7d = datetime.now(timezone.utc) - timedelta(days=7)
-    since_30d = datetime.now(timezone.utc) - timedelta(days=30)
-    
     # Get station information
     station = db.query(Station).filter(Station.station_id == station_id).first()
     if not station:
         raise HTTPException(status_code=404, detail="Station not found")
     
-    # Build location filter for dual sectors
-    sector_location_ids = []
-    if station.location_id:
-        sector_location_id = station.location_id
-        sector_locations_query = db.query(Location.location_id).filter(
-            or_(
-                Location.location_id == sector_location_id,
-                Location.parent_location_id == sector_location_id,
-                Location.location_id.in_(
-                    db.query(Location.location_id).filter(
-                        Location.parent_location_id.in_(
-                            db.query(Location.location_id).filter(
-                                Location.parent_location_id == sector_location_id
-                            )
-                        )
-                    )
-                )
-            )
-        )
-        sector_location_ids.extend([loc[0] for loc in sector_locations_query.all()])
-    
-    if station.sector2_id:
-        sector2_location_id = station.sector2_id
-        sector2_locations_query = db.query(Location.location_id).filter(
-            or_(
-                Location.location_id == sector2_location_id,
-                Location.parent_location_id == sector2_location_id,
-                Location.location_id.in_(
-                    db.query(Location.location_id).filter(
-                        Location.parent_location_id.in_(
-                            db.query(Location.location_id).filter(
-                                Location.parent_location_id == sector2_location_id
-                            )
-                        )
-                    )
-                )
-            )
+    # Counts come from report_daily_rollups. Reports routed via an officer
+    # assignment carry the officer's station in handling_station_id.
+    sector_location_ids = location_hierarchy.station_scope(db, station_id) or frozenset()
+    R = ReportDailyRollup
+    station_rollup_filter = or_(
+        R.station_id == station_id,
+        R.village_location_id.in_(sector_location_ids) if sector_location_ids else False,
+    )
+    is_verified = R.verification_status == "verified"
+    is_rejected = R.status == "rejected"
+    counts = (
+        db.query(
+            _rollup_sum(),
+            _rollup_sum(R.day > (datetime.now(timezone.utc) - timedelta(days=7)).date()),
+            _rollup_sum(is_verified),
+            _rollup_sum(~is_verified, ~is_rejected),
+            _rollup_sum(R.is_flagged.is_(True)),
+            _rollup_sum(is_verified, R.is_reviewed.is_(False)),
+            _rollup_sum(is_verified, R.is_reviewed.is_(True)),
+            _rollup_sum(is_rejected),
+            _rollup_sum(is_rejected, R.is_reviewed.is_(False)),
+            _rollup_sum(is_rejected, R.is_reviewed.is_(True)),
         )
-        sector_location_ids.extend([loc[0] for loc in sector2_locations_query.all()])
-    
-    sector_location_ids = list(set(sector_location_ids))
-    
-    # Reports for this station
-    station_report_filter = or_(
-        Report.handling_station_id == station_id,
-        Report.assignments.any(
-            ReportAssignment.police_user.has(PoliceUser.station_id == station_id)
-        ),
-        Report.village_location_id.in_(sector_location_ids) if sector_location_ids else False
+        .filter(station_rollup_filter)
+        .one()
     )
-    
-    # Total reports
-    total_reports = db.query(func.count(Report.report_id)).filter(station_report_filter).scalar() or 0
-    
-    # Reports in last 7 days
-    reports_7d = db.query(func.count(Report.report_id)).filter(
-        station_report_filter,
-        Report.reported_at >= since_7d
-    ).scalar() or 0
-    
-    # Verified reports
-    verified_reports = db.query(func.count(Report.report_id)).filter(
-        station_report_filter,
-        Report.verified == True
-    ).scalar() or 0
-    
-    # Pending reports (not verified, not rejected)
-    pending_reports = db.query(func.count(Report.report_id)).filter(
-        station_report_filter,
-        Report.verified == False,
-        or_(Report.status.is_(None), Report.status != 'rejected')
-    ).scalar() or 0
-    
+    (
+        total_reports,
+        reports_7d,
+        verified_reports,
+        pending_reports,
+        flagged_reports,
+        auto_confirmed_reports,
+        officer_confirmed_reports,
+        rejected_reports,
+        auto_rejected_reports,
+        manually_rejected_reports,
+    ) = (int(c or 0) for c in counts)
+
     # Active cases for this station
     active_cases = db.query(func.count(Case.case_id)).filter(
         Case.assigned_to.has(PoliceUser.station_id == station_id),
@@ -129,48 +222,6 @@ def get_station_stats(
         PoliceUser.is_active == True
     ).scalar() or 0
     
-    # Detailed report statistics
-    # Flagged reports (high trust score threshold)
-    flagged_reports = db.query(func.count(Report.report_id)).filter(
-        station_report_filter,
-        Report.verification_status == 'verified',
-        Report.trust_score >= 80
-    ).scalar() or 0
-    
-    # Auto-confirmed reports (verified without police review)
-    auto_confirmed_reports = db.query(func.count(Report.report_id)).filter(
-        station_report_filter,
-        Report.verification_status == 'verified',
-        Report.police_review_id.is_(None)
-    ).scalar() or 0
-    
-    # Confirmed by officer (verified with police review)
-    officer_confirmed_reports = db.query(func.count(Report.report_id)).filter(
-        station_report_filter,
-        Report.verification_status == 'verified',
-        Report.police_review_id.isnot(None)
-    ).scalar() or 0
-    
-    # Rejected reports
-    rejected_reports = db.query(func.count(Report.report_id)).filter(
-        station_report_filter,
-        Report.status == 'rejected'
-    ).scalar() or 0
-    
-    # Auto-rejected reports (rejected without police review)
-    auto_rejected_reports = db.query(func.count(Report.report_id)).filter(
-        station_report_filter,
-        Report.status == 'rejected',
-        Report.police_review_id.is_(None)
-    ).scalar() or 0
-    
-    # Manually rejected reports (rejected with police review)
-    manually_rejected_reports = db.query(func.count(Report.report_id)).filter(
-        station_report_filter,
-        Report.status == 'rejected',
-        Report.police_review_id.isnot(None)
-    ).scalar() or 0
-    
     return {
         'total_reports': total_reports,
         'reports_7d': reports_7d,
@@ -192,6 +243,7 @@ def get_station_stats(
 
 
 @router.get("/dashboard")
+@cached_response("stats.dashboard", 15.0, ("report", "case", "hotspot", "device", "user"))
 def get_dashboard_stats(
     current_user: Annotated[PoliceUser, Depends(get_current_user)],
     db: Session = Depends(get_db),
@@ -199,7 +251,6 @@ def get_dashboard_stats(
     """Return counts and widgets for dashboard. Officers see only assigned reports."""
     current_role = getattr(current_user, "role", None)
     is_officer = current_role == "officer"
-    since_7d = datetime.now(timezone.utc) - timedelta(days=7)
     since_30d = datetime.now(timezone.utc) - timedelta(days=30)
 
     # 1) Build report_filter based on role
@@ -212,59 +263,8 @@ def get_dashboard_stats(
         station_id = getattr(current_user, "station_id", None)
         
         if station_id is not None:
-            # Get station to find its sector location(s)
-            station = db.query(Station).filter(Station.station_id == station_id).first()
-            if station:
-                # Handle both primary and secondary sectors
-                sector_location_ids = []
-                
-                # Primary sector
-                if station.location_id:
-                    sector_location_id = station.location_id
-                    # Find all villages/cells in this sector
-                    sector_locations_query = db.query(Location.location_id).filter(
-                        or_(
-                            Location.location_id == sector_location_id,  # The sector itself
-                            Location.parent_location_id == sector_location_id,  # Direct children (cells)
-                            # Also get villages under cells in this sector
-                            Location.location_id.in_(
-                                db.query(Location.location_id).filter(
-                                    Location.parent_location_id.in_(
-                                        db.query(Location.location_id).filter(
-                                            Location.parent_location_id == sector_location_id
-                                        )
-                                    )
-                                )
-                            )
-                        )
-                    )
-                    sector_location_ids.extend([loc[0] for loc in sector_locations_query.all()])
-                
-                # Secondary sector (if exists)
-                if station.sector2_id:
-                    sector2_location_id = station.sector2_id
-                    # Find all villages/cells in secondary sector
-                    sector2_locations_query = db.query(Location.location_id).filter(
-                        or_(
-                            Location.location_id == sector2_location_id,  # The sector itself
-                            Location.parent_location_id == sector2_location_id,  # Direct children (cells)
-                            # Also get villages under cells in this sector
-                            Location.location_id.in_(
-                                db.query(Location.location_id).filter(
-                                    Location.parent_location_id.in_(
-                                        db.query(Location.location_id).filter(
-                                            Location.parent_location_id == sector2_location_id
-                                        )
-                                    )
-                                )
-                            )
-                        )
-                    )
-                    sector_location_ids.extend([loc[0] for loc in sector2_locations_query.all()])
-                
-                # Remove duplicates
-                sector_location_ids = list(set(sector_location_ids))
-                
+            sector_location_ids = location_hierarchy.station_scope(db, station_id)
+            if sector_location_ids is not None:
                 # Filter reports by location hierarchy (village_location_id in sector)
                 assigned_qs = (
                     db.query(Report.report_id)
@@ -298,65 +298,33 @@ def get_dashboard_stats(
         # Admin
         report_filter = True
 
-    total = db.query(Report).filter(report_filter).count()
-    
-    # Use DB status/verification_status for counters (rule_status may be null on older rows).
-    by_status_rows = (
-        db.query(Report.status, func.count(Report.report_id))
-        .filter(report_filter)
-        .group_by(Report.status)
-        .all()
-    )
-    by_status = {str(r[0]) if r[0] is not None else None: int(r[1]) for r in by_status_rows}
+    # Admin/supervisor counters come from report_daily_rollups; officers only see
+    # their assigned reports, which are few enough to count directly.
+    if current_role == "officer":
+        counters = _officer_report_counters(db, report_filter)
+    else:
+        R = ReportDailyRollup
+        if current_role == "supervisor":
+            station_id = getattr(current_user, "station_id", None)
+            if station_id is None:
+                rollup_filter = False
+            else:
+                scope = location_hierarchy.station_scope(db, station_id)
+                rollup_filter = or_(
+                    R.station_id == station_id,
+                    R.village_location_id.in_(scope) if scope else False,
+                )
+        else:
+            rollup_filter = True
+        counters = _dashboard_report_counters(db, rollup_filter)
 
-    # Debug: Let's see what reports are being filtered
-    print(f"DEBUG: Dashboard user role: {current_role}")
-    print(f"DEBUG: Dashboard user station_id: {getattr(current_user, 'station_id', None)}")
-    
-    # Count total reports for admin
-    total_reports_debug = db.query(func.count(Report.report_id)).scalar() or 0
-    print(f"DEBUG: Total reports in database: {total_reports_debug}")
-    
-    # Show report status breakdown
-    status_breakdown = (
-        db.query(Report.status, func.count(Report.report_id))
-        .group_by(Report.status)
-        .all()
-    )
-    print(f"DEBUG: Report status breakdown: {dict(status_breakdown)}")
-    
-    # Show verification status breakdown
-    verification_breakdown = (
-        db.query(Report.verification_status, func.count(Report.report_id))
-        .group_by(Report.verification_status)
-        .all()
-    )
-    print(f"DEBUG: Verification status breakdown: {dict(verification_breakdown)}")
-    
-    # Count reports that need police review (pending + under_review)
-    pending_review = (
-        db.query(func.count(Report.report_id))
-        .filter(report_filter, Report.verification_status.in_(['pending', 'under_review']))
-        .scalar()
-        or 0
-    )
-    
-    # Count flagged reports using is_flagged field
-    flagged_reports = (
-        db.query(func.count(Report.report_id))
-        .filter(report_filter, Report.is_flagged == True)
-        .scalar()
-        or 0
-    )
-    
-    print(f"DEBUG: Dashboard pending_review (pending + under_review): {pending_review}")
-    print(f"DEBUG: Dashboard flagged_reports (is_flagged=True): {flagged_reports}")
+    total = counters["total"]
+    by_status = counters["by_status"]
+    pending_review = counters["pending_review"]
     pending = int(pending_review)
     verified = int(by_status.get("verified", 0))
-    flagged = int(flagged_reports)
-    recent_7d_count = db.query(func.count(Report.report_id)).filter(
-        report_filter, Report.reported_at >= since_7d
-    ).scalar() or 0
+    flagged = int(counters["flagged"])
+    recent_7d_count = counters["recent_7d"]
 
     open_cases = 0
     try:
@@ -591,23 +559,10 @@ def get_dashboard_stats(
     activity_list = [_activity_row(a) for a in recent_activity]
 
     # Weekly volume over the last 4 weeks (oldest W1 to newest W4)
-    weekly_volume = []
-    now = datetime.now(timezone.utc)
-    for i in range(4, 0, -1):
-        start = now - timedelta(days=7 * i)
-        end = now - timedelta(days=7 * (i - 1))
-        count = (
-            db.query(func.count(Report.report_id))
-            .filter(report_filter, Report.reported_at >= start, Report.reported_at < end)
-            .scalar()
-            or 0
-        )
-        weekly_volume.append(
-            {
-                "label": f"W{5 - i}",  # W1, W2, W3, W4
-                "count": int(count),
-            }
-        )
+    weekly_volume = [
+        {"label": f"W{i + 1}", "count": int(count)}
+        for i, count in enumerate(counters["weekly"])
+    ]
 
     # Average trust score from recent reports (device/ML trust)
     trust_values = [
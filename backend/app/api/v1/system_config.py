@@ -11,6 +11,7 @@ from app.models.police_user import PoliceUser
 from app.models.system_config import SystemConfig
 from app.schemas.system_config import SystemConfigItem, SystemConfigList
 from app.core.credibility_model import get_effective_trust_formula
+from app.middleware.rate_limit import RATE_LIMIT_CONFIG_KEY, invalidate_rate_limit_config
 
 
 router = APIRouter(prefix="/system-config", tags=["system-config"])
@@ -55,13 +56,11 @@ def update_system_config(
     db.add(row)
     db.commit()
     db.refresh(row)
+    if config_key == RATE_LIMIT_CONFIG_KEY:
+        invalidate_rate_limit_config()
 
     def notify():
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(manager.broadcast({"type": "refresh_data", "entity": "system"}))
-        except RuntimeError:
-            asyncio.run(manager.broadcast({"type": "refresh_data", "entity": "system"}))
+        manager.publish({"type": "refresh_data", "entity": "system"})
     background_tasks.add_task(notify)
 
     return row
@@ -0,0 +1,50 @@
+import gzip
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
+
+from app.core.geojson_artifacts import etag_matches
+from app.core.vector_tiles import LAYERS, tile_in_range, vector_tiles
+from app.database import get_db
+
+router = APIRouter(prefix="/tiles", tags=["public"])
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+
+
+@router.get("/{layer}/{z}/{x}/{y}.mvt")
+def get_vector_tile(
+    layer: str,
+    z: int,
+    x: int,
+    y: int,
+    request: Request,
+    db: Session = Depends(get_db),
+) -> Response:
+    """
+    Public (no-auth) Mapbox vector tile for the `locations` or `hotspots` layer.
+
+    Tiles are cached on disk per layer version and served gzip-encoded when the
+    client accepts it; a matching If-None-Match returns 304.
+    """
+    if layer not in LAYERS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown tile layer")
+    if not tile_in_range(z, x, y):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tile out of range")
+
+    # The ETag only depends on the layer version, so revalidations never render the tile.
+    version = vector_tiles.layer_version(db, layer)
+    headers = {
+        "ETag": f'"{layer}-{version}-{z}-{x}-{y}"',
+        "Cache-Control": "public, max-age=300, must-revalidate",
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(headers["ETag"], request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+
+    _, data = vector_tiles.get(db, layer, z, x, y, version=version)
+
+    if "gzip" in request.headers.get("accept-encoding", "").lower():
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=data, media_type=MVT_MEDIA_TYPE, headers=headers)
+    return Response(content=gzip.decompress(data), media_type=MVT_MEDIA_TYPE, headers=headers)
@@ -1,84 +1,59 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from app.core.websocket import manager
+from app.core.notification_delivery import notification_manager
 from app.core.security import decode_access_token
-from typing import Dict, Any
+from app.core.location_hierarchy import location_hierarchy
+from app.database import SessionLocal
+from app.models.police_user import PoliceUser
+from typing import FrozenSet, Optional
+import asyncio
 import json
 
 router = APIRouter(tags=["websockets"])
 
-class NotificationManager:
-    def __init__(self):
-        # Store user-specific connections with their user_id
-        self.user_connections: Dict[str, WebSocket] = {}
-        # Store notification counts per user
-        self.notification_counts: Dict[str, int] = {}
-
-    async def connect_user(self, websocket: WebSocket, user_id: str):
-        await websocket.accept()
-        self.user_connections[user_id] = websocket
-        # Send current notification count to user
-        count = self.notification_counts.get(user_id, 0)
-        await websocket.send_text(json.dumps({
-            "type": "notification_count",
-            "count": count
-        }))
-
-    def disconnect_user(self, user_id: str):
-        if user_id in self.user_connections:
-            del self.user_connections[user_id]
-
-    async def send_to_user(self, user_id: str, message: Dict[str, Any]):
-        if user_id in self.user_connections:
-            try:
-                await self.user_connections[user_id].send_text(json.dumps(message))
-            except Exception:
-                # Connection might be dead, remove it
-                self.disconnect_user(user_id)
+def _unread_count(police_user_id: int) -> int:
+    db = SessionLocal()
+    try:
+        return notification_manager.unread_count(db, police_user_id)
+    finally:
+        db.close()
 
-    async def increment_notification_count(self, user_id: str):
-        current = self.notification_counts.get(user_id, 0)
-        new_count = current + 1
-        self.notification_counts[user_id] = new_count
-        await self.send_to_user(user_id, {
-            "type": "notification_count",
-            "count": new_count
-        })
 
-    async def clear_notifications(self, user_id: str):
-        self.notification_counts[user_id] = 0
-        await self.send_to_user(user_id, {
-            "type": "notification_count",
-            "count": 0
-        })
+def _clear_notifications(police_user_id: int) -> None:
+    db = SessionLocal()
+    try:
+        notification_manager.mark_all_read(db, police_user_id)
+        notification_manager.push_counts(db, [police_user_id])
+    finally:
+        db.close()
 
-# Global notification manager
-notification_manager = NotificationManager()
 
 @router.websocket("/ws/notifications")
 async def websocket_notifications_endpoint(websocket: WebSocket):
-    user_id = None
+    """Unread-count updates for one user; every open tab of the user gets them."""
+    registered = False
+    # The auth message arrives over the socket, so it has to be accepted first.
+    await websocket.accept()
     try:
         # Wait for authentication message
         data = await websocket.receive_text()
         message = json.loads(data)
         
-        if message.get("type") == "auth":
-            token = message.get("token")
-            if token:
-                # Decode token to get user_id
-                payload = decode_access_token(token)
-                if payload:
-                    user_id = str(payload.get("sub"))
-                    await notification_manager.connect_user(websocket, user_id)
-                else:
-                    await websocket.close(code=4001, reason="Invalid token")
-                    return
-            else:
-                await websocket.close(code=4001, reason="Token required")
-                return
-        else:
+        if message.get("type") != "auth":
             await websocket.close(code=4001, reason="Authentication required")
             return
+        token = message.get("token")
+        if not token:
+            await websocket.close(code=4001, reason="Token required")
+            return
+        payload = decode_access_token(token)
+        if not payload or payload.get("sub") is None:
+            await websocket.close(code=4001, reason="Invalid token")
+            return
+        user_id = int(payload["sub"])
+        unread = await asyncio.to_thread(_unread_count, user_id)
+        await notification_manager.connect_user(websocket, user_id, unread)
+        registered = True
 
         # Keep connection alive and handle messages
         while True:
@@ -86,32 +61,68 @@ async def websocket_notifications_endpoint(websocket: WebSocket):
             message = json.loads(data)
             
             if message.get("type") == "get_notification_count":
-                count = notification_manager.notification_counts.get(user_id, 0)
-                await websocket.send_text(json.dumps({
-                    "type": "notification_count",
-                    "count": count
-                }))
+                count = await asyncio.to_thread(_unread_count, user_id)
+                notification_manager.send(websocket, {"type": "notification_count", "count": count})
             elif message.get("type") == "clear_notifications":
-                await notification_manager.clear_notifications(user_id)
+                # Persisted: marks the user's notifications read; the new count is pushed to all tabs.
+                await asyncio.to_thread(_clear_notifications, user_id)
             else:
-                await websocket.send_text(json.dumps({"type": "pong"}))
+                notification_manager.send(websocket, {"type": "pong"})
                 
     except WebSocketDisconnect:
-        if user_id:
-            notification_manager.disconnect_user(user_id)
+        pass
     except Exception as e:
         print(f"WebSocket error: {e}")
-        if user_id:
-            notification_manager.disconnect_user(user_id)
+    finally:
+        if registered:
+            notification_manager.disconnect(websocket)
+
+
+def _subscription_scope(token: Optional[str]) -> Optional[FrozenSet[int]]:
+    """Location scope for the token's user: the station's sectors for officers/supervisors, else None."""
+    payload = decode_access_token(token) if token else None
+    if not payload or payload.get("sub") is None:
+        return None
+    db = SessionLocal()
+    try:
+        user = db.query(PoliceUser).filter(PoliceUser.police_user_id == int(payload["sub"])).first()
+        if not user or not user.is_active or user.role not in ("officer", "supervisor"):
+            return None
+        return location_hierarchy.station_scope(db, user.station_id)
+    finally:
+        db.close()
+
 
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
+    """
+    Dashboard refresh events.
+
+    Clients may send {"type": "subscribe", "topics": ["report", "case"], "token": "<jwt>"}
+    to receive only those entities, limited to their station's area when the
+    token belongs to an officer or supervisor. Without it every event is sent.
+    """
     await manager.connect(websocket)
     try:
         while True:
             # Client might ping us, we keep the connection alive
             data = await websocket.receive_text()
-            await websocket.send_text('{"type": "pong"}')
+            try:
+                message = json.loads(data)
+            except ValueError:
+                message = None
+            if isinstance(message, dict) and message.get("type") == "subscribe":
+                topics = [t for t in (message.get("topics") or []) if isinstance(t, str)]
+                scope = await asyncio.to_thread(_subscription_scope, message.get("token"))
+                manager.subscribe(websocket, topics, scope)
+                manager.send(websocket, {
+                    "type": "subscribed",
+                    "topics": sorted(topics),
+                    "scoped": scope is not None,
+                })
+                continue
+            # Queued behind pending broadcasts; the writer task owns sends.
+            manager.send(websocket, {"type": "pong"})
     except WebSocketDisconnect:
         manager.disconnect(websocket)
 
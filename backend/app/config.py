@@ -44,6 +44,19 @@ class Settings(BaseSettings):
     smtp_pass: Optional[str] = None
     smtp_from: Optional[str] = None
     smtp_timeout_seconds: int = 12
+    # Set both to false to point at a local debugging server (python -m aiosmtpd -n -l localhost:8025).
+    smtp_starttls: bool = True
+    smtp_auth: bool = True
+    # Persistent SMTP connections shared by request paths and the outbox worker.
+    smtp_pool_size: int = 2
+    smtp_idle_check_seconds: int = 60
+    # email_outbox worker: batch size, poll interval, retries with exponential backoff, then dead-letter.
+    email_outbox_enabled: bool = True
+    email_outbox_batch_size: int = 50
+    email_outbox_poll_seconds: float = 2.0
+    email_outbox_max_attempts: int = 6
+    email_outbox_retry_base_seconds: int = 30
+    email_outbox_retention_days: int = 14
     # Base URL of the police dashboard (for login link in email)
     frontend_url: str = "https://trustbond-dashboard.vercel.app"
 
@@ -61,6 +74,43 @@ class Settings(BaseSettings):
     impossible_travel_min_distance_km: float = 20.0
     max_plausible_speed_kmh: float = 250.0
 
+    # Optional Redis (e.g. redis://localhost:6379/0) shared by the response cache across workers.
+    redis_url: Optional[str] = None
+    response_cache_max_entries: int = 512
+
+    # Websocket hub: per-connection send queue, slow-consumer limits, Redis fan-out channel.
+    ws_shards: int = 8
+    ws_send_queue_size: int = 64
+    ws_send_timeout_seconds: float = 5.0
+    ws_max_dropped_messages: int = 32
+    ws_redis_channel: str = "trustbond:ws"
+
+    # Token-bucket limits on report/evidence/confirm writes (per client IP and per X-Device-Hash).
+    # Shared through redis_url when set. system_config "rate_limit.rules" overrides per rule.
+    rate_limit_enabled: bool = True
+    rate_limit_report_create_per_minute: int = 20
+    rate_limit_evidence_upload_per_minute: int = 30
+    rate_limit_report_confirm_per_minute: int = 40
+    rate_limit_config_ttl_seconds: float = 60.0
+    # Peers trusted to set X-Forwarded-For/-Proto (comma-separated IPs/CIDRs, "*" = any) and how
+    # many proxies append to it. The client IP is the trusted_proxy_hops-th entry from the right,
+    # so client-supplied entries on the left never pick the rate-limit bucket. Render: "*" and 1
+    # (its proxy addresses aren't fixed). Not uvicorn's FORWARDED_ALLOW_IPS, which trusts the
+    # leftmost entry.
+    trusted_proxy_ips: str = "127.0.0.1"
+    trusted_proxy_hops: int = 1
+
+    # Per-worker cache of authenticated users keyed by token hash (0 disables). Changes made on
+    # another worker reach this one within the TTL.
+    auth_cache_ttl_seconds: float = 30.0
+    auth_cache_max_entries: int = 4096
+
+    # On-disk cache for /tiles vector tiles, one subdirectory per layer version.
+    tile_cache_dir: str = str(BACKEND_ROOT / "tile_cache")
+
+    # Full rebuild interval for report_daily_rollups (dashboard counters). 0 disables the job.
+    report_rollup_reconcile_minutes: int = 30
+
     @field_validator("debug", mode="before")
     @classmethod
     def normalize_debug_flag(cls, value):
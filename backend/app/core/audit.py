@@ -1,11 +1,17 @@
 """
 Audit logging: write actions to audit_logs table.
+structured_log() emits one JSON log line (logger "app.structured") for operational events.
 """
-from typing import Any, Optional
+import json
+import logging
+from typing import Any, Dict, Optional
 from sqlalchemy.orm import Session
 
+from app.core.request_context import get_request_id
 from app.models.audit_log import AuditLog
 
+structured_logger = logging.getLogger("app.structured")
+
 
 def log_action(
     db: Session,
@@ -33,3 +39,16 @@ def log_action(
         success=success,
     )
     db.add(entry)
+
+
+def structured_log(action: str, entity: str, outcome: str, **fields: Any) -> Dict[str, Any]:
+    """Log one event as JSON with the current request id; returns the payload."""
+    payload: Dict[str, Any] = {
+        "action": action,
+        "entity": entity,
+        "outcome": outcome,
+        "request_id": get_request_id(),
+        **fields,
+    }
+    structured_logger.info(json.dumps(payload, default=str))
+    return payload
@@ -0,0 +1,120 @@
+"""
+Short-TTL cache of authenticated principals for get_current_user.
+
+Every dashboard page load fans out into many authenticated calls, and each one
+used to load the PoliceUser row and its UserSession. After a token has been
+checked once, its principal (the user's column values: role, station,
+assigned location, is_active, ...) is kept here, keyed by a SHA-256 of the
+token, for settings.auth_cache_ttl_seconds:
+
+- A hit costs no query: auth rebuilds the PoliceUser and attaches it to the
+  request's session with merge(load=False), so endpoints still get a normal
+  persistent instance (lazy relationships, db.add(current_user), ...).
+- Only tokens that passed the user and session checks are cached. Revoked,
+  expired or unknown tokens go to the database every time.
+- invalidate_user() drops every cached token of a user. The endpoints that
+  revoke sessions, update, delete or change a user's password call it, so the
+  change applies to that user's next request on this worker. Other workers
+  pick it up when their entry expires (at most one TTL later).
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlalchemy import inspect
+
+from app.config import settings
+
+DEFAULT_MAX_ENTRIES = 4096
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def principal_snapshot(user: Any) -> Dict[str, Any]:
+    """Column values of a loaded PoliceUser (no relationships)."""
+    return {attr.key: getattr(user, attr.key) for attr in inspect(user).mapper.column_attrs}
+
+
+class PrincipalCache:
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        # token key -> (expires_at, police_user_id, column values)
+        self._entries: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._by_user: Dict[int, Set[str]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            keys = self._by_user.get(entry[1])
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_user[entry[1]]
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        if self.ttl_seconds <= 0:
+            return None
+        key = token_key(token)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    self._drop(key)
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[2]
+
+    def put(self, token: str, user: Any, token_expires_at: Optional[float] = None) -> None:
+        """Cache a verified user for this token; never past the token's own exp (unix time)."""
+        if self.ttl_seconds <= 0:
+            return
+        ttl = self.ttl_seconds
+        if token_expires_at is not None:
+            ttl = min(ttl, token_expires_at - time.time())
+            if ttl <= 0:
+                return
+        snapshot = principal_snapshot(user)
+        user_id = snapshot["police_user_id"]
+        key = token_key(token)
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (time.monotonic() + ttl, user_id, snapshot)
+            self._by_user[user_id].add(key)
+            while len(self._entries) > self._max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate_user(self, police_user_id: int) -> None:
+        with self._lock:
+            for key in list(self._by_user.get(police_user_id, ())):
+                self._drop(key)
+            self._stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "ttl_seconds": self.ttl_seconds}
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.auth_cache_ttl_seconds,
+    max_entries=settings.auth_cache_max_entries,
+)
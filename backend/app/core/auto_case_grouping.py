@@ -6,9 +6,9 @@ from math import atan2, cos, radians, sin, sqrt
 from typing import Iterable, Optional
 from uuid import uuid4
 
-from sqlalchemy import text
 from sqlalchemy.orm import Session, joinedload, selectinload
 
+from app.core.number_allocator import allocate_case_number
 from app.models.case import Case, CaseReport
 from app.models.incident_group import IncidentGroup
 from app.models.location import Location
@@ -80,23 +80,6 @@ def _latest_trust_score(report: Report) -> float:
     return 50.0
 
 
-def _generate_case_number(db: Session) -> str:
-    year = datetime.now(timezone.utc).strftime("%Y")
-    row = db.execute(
-        text(
-            """
-            SELECT COALESCE(MAX(
-                NULLIF(SUBSTRING(case_number FROM 'CASE-[0-9]{4}-([0-9]+)'), '')::INT
-            ), 0) + 1 AS next_num
-            FROM cases WHERE case_number LIKE :prefix
-            """
-        ),
-        {"prefix": f"CASE-{year}-%"},
-    ).fetchone()
-    next_num = row[0] if row else 1
-    return f"CASE-{year}-{next_num:04d}"
-
-
 def _sector_location_id(db: Session, location_id: Optional[int]) -> Optional[int]:
     if location_id is None:
         return None
@@ -334,7 +317,7 @@ def _upsert_case_for_group(db: Session, group: IncidentGroup, reports: list[Repo
     if case is None:
         case = Case(
             case_id=uuid4(),
-            case_number=_generate_case_number(db),
+            case_number=allocate_case_number(db),
             status="open",
             priority="high" if confidence >= 80 else "medium",
             title=f"Auto-grouped {getattr(first_report.incident_type, 'type_name', 'incident')} incident",
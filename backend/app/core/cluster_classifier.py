@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 
 def compute_dbscan_score(
@@ -44,6 +45,18 @@ def classification_to_risk_level(classification: str) -> str:
     return "low"
 
 
+def risk_level_to_classification(risk_level: Optional[str]) -> str:
+    """Inverse of classification_to_risk_level, for hotspots without a stored class."""
+    risk = (risk_level or "").strip().lower()
+    if risk == "critical":
+        return "critical"
+    if risk == "high":
+        return "active"
+    if risk == "medium":
+        return "emerging"
+    return "low_activity"
+
+
 def _project_root() -> Path:
     return Path(__file__).resolve().parents[2]
 
@@ -76,6 +89,104 @@ def _normalize_label(label: Any) -> Optional[str]:
     return None
 
 
+FEATURE_NAMES = (
+    "incident_count",
+    "avg_trust",
+    "cluster_density",
+    "time_window_hours",
+)
+
+
+@dataclass(frozen=True)
+class ClusterFeatures:
+    incident_count: int
+    avg_trust: float
+    cluster_density: float
+    time_window_hours: int
+
+
+def _model_labels(model: Any, rows: List[List[float]]) -> List[Tuple[Optional[str], Optional[float]]]:
+    """(label, confidence) per row from one predict / predict_proba call each."""
+    try:
+        import pandas as pd  # type: ignore
+
+        model_input = pd.DataFrame(rows, columns=list(FEATURE_NAMES))
+    except Exception:
+        model_input = rows
+
+    labels: List[Optional[str]] = [None] * len(rows)
+    confidences: List[Optional[float]] = [None] * len(rows)
+    if hasattr(model, "predict"):
+        pred = model.predict(model_input)
+        for i in range(min(len(rows), len(pred))):
+            labels[i] = _normalize_label(pred[i])
+
+    if hasattr(model, "predict_proba"):
+        probs = model.predict_proba(model_input)
+        classes = list(getattr(model, "classes_", []))
+        for i in range(min(len(rows), len(probs))):
+            p = list(probs[i])
+            if not p:
+                continue
+            top_idx = int(max(range(len(p)), key=lambda k: p[k]))
+            confidences[i] = float(p[top_idx])
+            if 0 <= top_idx < len(classes):
+                labels[i] = _normalize_label(classes[top_idx]) or labels[i]
+    return list(zip(labels, confidences))
+
+
+def predict_cluster_classification_many(clusters: Sequence[ClusterFeatures]) -> List[Dict[str, Any]]:
+    """Classify every cluster of a DBSCAN run with a single model call.
+
+    Results match predict_cluster_classification() for each cluster. If the
+    model is missing or fails, all clusters use the score-threshold fallback.
+    """
+    scores = [
+        compute_dbscan_score(
+            incident_count=c.incident_count,
+            avg_trust=c.avg_trust,
+            cluster_density=c.cluster_density,
+            time_window_hours=c.time_window_hours,
+        )
+        for c in clusters
+    ]
+
+    predicted: List[Tuple[Optional[str], Optional[float]]] = [(None, None)] * len(clusters)
+    model = _load_cluster_model()
+    if model is not None and clusters:
+        rows = [
+            [
+                float(c.incident_count),
+                float(c.avg_trust),
+                float(c.cluster_density),
+                float(c.time_window_hours),
+            ]
+            for c in clusters
+        ]
+        try:
+            predicted = _model_labels(model, rows)
+        except Exception:
+            pass
+
+    results: List[Dict[str, Any]] = []
+    for score, (label, confidence) in zip(scores, predicted):
+        if label is not None:
+            results.append({
+                "classification": label,
+                "confidence": round(float(confidence), 4) if confidence is not None else None,
+                "hotspot_score": score,
+                "source": "model",
+            })
+        else:
+            results.append({
+                "classification": classify_from_score(score),
+                "confidence": None,
+                "hotspot_score": score,
+                "source": "dbscan_fallback",
+            })
+    return results
+
+
 def predict_cluster_classification(
     incident_count: int,
     avg_trust: float,
@@ -88,66 +199,11 @@ def predict_cluster_classification(
     - model: optional trained model loaded and used successfully
     - dbscan_fallback: deterministic trust-weighted DBSCAN score thresholds
     """
-    score = compute_dbscan_score(
-        incident_count=incident_count,
-        avg_trust=avg_trust,
-        cluster_density=cluster_density,
-        time_window_hours=time_window_hours,
-    )
-
-    model = _load_cluster_model()
-    if model is not None:
-        try:
-            row = [[
-                float(incident_count),
-                float(avg_trust),
-                float(cluster_density),
-                float(time_window_hours),
-            ]]
-            feature_names = [
-                "incident_count",
-                "avg_trust",
-                "cluster_density",
-                "time_window_hours",
-            ]
-            try:
-                import pandas as pd  # type: ignore
-
-                model_input = pd.DataFrame(row, columns=feature_names)
-            except Exception:
-                model_input = row
-            label = None
-            confidence = None
-
-            if hasattr(model, "predict"):
-                pred = model.predict(model_input)
-                if len(pred):
-                    label = _normalize_label(pred[0])
-
-            if hasattr(model, "predict_proba"):
-                probs = model.predict_proba(model_input)
-                if len(probs):
-                    p = probs[0]
-                    confidence = float(max(p)) if len(p) else None
-                    if hasattr(model, "classes_") and confidence is not None:
-                        classes = list(getattr(model, "classes_"))
-                        top_idx = int(max(range(len(p)), key=lambda i: p[i]))
-                        if 0 <= top_idx < len(classes):
-                            label = _normalize_label(classes[top_idx]) or label
-
-            if label is not None:
-                return {
-                    "classification": label,
-                    "confidence": round(float(confidence), 4) if confidence is not None else None,
-                    "hotspot_score": score,
-                    "source": "model",
-                }
-        except Exception:
-            pass
-
-    return {
-        "classification": classify_from_score(score),
-        "confidence": None,
-        "hotspot_score": score,
-        "source": "dbscan_fallback",
-    }
+    return predict_cluster_classification_many([
+        ClusterFeatures(
+            incident_count=incident_count,
+            avg_trust=avg_trust,
+            cluster_density=cluster_density,
+            time_window_hours=time_window_hours,
+        )
+    ])[0]
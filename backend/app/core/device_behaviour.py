@@ -0,0 +1,249 @@
+"""
+Per-device reporting behaviour summaries for geographic intelligence.
+
+/behavior-patterns and /frequency-analysis used to load every device seen in the
+window and then query that device's reports one by one. Here a single windowed
+query (lag() over reported_at partitioned by device_id) computes, for every
+device at once:
+
+- report count, first/last report time
+- inter-report interval mean / population std-dev / min / max and how many
+  intervals sit within 10% of the device's mean (periodicity)
+- consecutive-report distance and speed aggregates
+- hour-of-day and weekday histograms (UTC)
+
+Summaries are kept per (window, sector) and refreshed incrementally: between full
+rebuilds only devices with reports newer than the last refresh are recomputed.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+# Full rebuild interval; in between, refreshes only touch devices with new reports.
+FULL_REFRESH_SECONDS = 600.0
+# Minimum age before an incremental refresh is attempted.
+INCREMENTAL_REFRESH_SECONDS = 30.0
+IMPOSSIBLE_SPEED_KMH = 200.0
+
+
+@dataclass
+class DeviceBehaviour:
+    device_id: Any
+    device_hash: str
+    trust_score: float
+    report_count: int
+    first_reported_at: datetime
+    last_reported_at: datetime
+    interval_count: int = 0
+    interval_mean: Optional[float] = None
+    interval_std: Optional[float] = None
+    interval_min: Optional[float] = None
+    interval_max: Optional[float] = None
+    similar_intervals: int = 0
+    avg_distance_km: float = 0.0
+    max_distance_km: float = 0.0
+    avg_speed_kmh: float = 0.0
+    impossible_movements: int = 0
+    hour_counts: Dict[int, int] = field(default_factory=dict)
+    weekday_counts: Dict[int, int] = field(default_factory=dict)
+
+    @property
+    def time_span_hours(self) -> float:
+        return (self.last_reported_at - self.first_reported_at).total_seconds() / 3600
+
+    @property
+    def interval_cv(self) -> float:
+        if not self.interval_mean or self.interval_std is None:
+            return 0.0
+        return self.interval_std / self.interval_mean
+
+
+_SUMMARY_SQL = """
+WITH scoped AS (
+    SELECT d.device_id, d.device_hash, d.device_trust_score
+    FROM devices d
+    WHERE d.last_seen_at >= :since {device_filters}
+),
+r AS (
+    SELECT rep.device_id,
+           rep.reported_at,
+           rep.latitude::float8 AS lat,
+           rep.longitude::float8 AS lon,
+           EXTRACT(EPOCH FROM rep.reported_at - lag(rep.reported_at) OVER w)::float8 AS interval_s,
+           lag(rep.latitude::float8) OVER w AS prev_lat,
+           lag(rep.longitude::float8) OVER w AS prev_lon,
+           EXTRACT(HOUR FROM rep.reported_at AT TIME ZONE 'UTC')::int AS hour,
+           (EXTRACT(ISODOW FROM rep.reported_at AT TIME ZONE 'UTC')::int - 1) AS weekday
+    FROM reports rep
+    JOIN scoped s ON s.device_id = rep.device_id
+    WHERE rep.reported_at >= :since
+    WINDOW w AS (PARTITION BY rep.device_id ORDER BY rep.reported_at)
+),
+seg AS (
+    SELECT r.*,
+           avg(interval_s) OVER (PARTITION BY device_id) AS device_mean_interval,
+           2 * 6371.0 * asin(sqrt(
+               power(sin(radians(lat - prev_lat) / 2), 2)
+               + cos(radians(prev_lat)) * cos(radians(lat)) * power(sin(radians(lon - prev_lon) / 2), 2)
+           )) AS distance_km
+    FROM r
+),
+stats AS (
+    SELECT device_id,
+           count(*) AS report_count,
+           min(reported_at) AS first_reported_at,
+           max(reported_at) AS last_reported_at,
+           count(interval_s) AS interval_count,
+           avg(interval_s) AS interval_mean,
+           stddev_pop(interval_s) AS interval_std,
+           min(interval_s) AS interval_min,
+           max(interval_s) AS interval_max,
+           count(*) FILTER (
+               WHERE device_mean_interval > 0
+                 AND abs(interval_s - device_mean_interval) < 0.1 * device_mean_interval
+           ) AS similar_intervals,
+           avg(distance_km) AS avg_distance_km,
+           max(distance_km) AS max_distance_km,
+           avg(distance_km / (interval_s / 3600.0)) FILTER (WHERE interval_s > 0) AS avg_speed_kmh,
+           count(*) FILTER (
+               WHERE interval_s > 0 AND distance_km / (interval_s / 3600.0) > :impossible_speed
+           ) AS impossible_movements
+    FROM seg
+    GROUP BY device_id
+),
+hours AS (
+    SELECT device_id, jsonb_object_agg(hour, c) AS hour_counts
+    FROM (SELECT device_id, hour, count(*) AS c FROM r GROUP BY 1, 2) h
+    GROUP BY device_id
+),
+weekdays AS (
+    SELECT device_id, jsonb_object_agg(weekday, c) AS weekday_counts
+    FROM (SELECT device_id, weekday, count(*) AS c FROM r GROUP BY 1, 2) wd
+    GROUP BY device_id
+)
+SELECT s.device_id, s.device_hash, s.device_trust_score,
+       st.report_count, st.first_reported_at, st.last_reported_at,
+       st.interval_count, st.interval_mean, st.interval_std, st.interval_min, st.interval_max,
+       st.similar_intervals, st.avg_distance_km, st.max_distance_km, st.avg_speed_kmh,
+       st.impossible_movements, h.hour_counts, wd.weekday_counts
+FROM stats st
+JOIN scoped s ON s.device_id = st.device_id
+LEFT JOIN hours h ON h.device_id = st.device_id
+LEFT JOIN weekdays wd ON wd.device_id = st.device_id
+"""
+
+
+def _float(value: Any, default: Optional[float] = 0.0) -> Optional[float]:
+    return float(value) if value is not None else default
+
+
+def _histogram(raw: Optional[Dict[str, Any]]) -> Dict[int, int]:
+    return {int(k): int(v) for k, v in (raw or {}).items()}
+
+
+def query_device_behaviour(
+    db: Session,
+    since: datetime,
+    sector_id: Optional[int] = None,
+    device_id: Optional[str] = None,
+    only_devices: Optional[Iterable[Any]] = None,
+) -> List[DeviceBehaviour]:
+    """Run the windowed summary query for devices seen since `since`."""
+    filters = []
+    params: Dict[str, Any] = {"since": since, "impossible_speed": IMPOSSIBLE_SPEED_KMH}
+    bind_expanding = []
+    if sector_id:
+        filters.append("AND (d.metadata_json->>'current_sector_location_id')::int = :sector_id")
+        params["sector_id"] = sector_id
+    if device_id:
+        filters.append("AND d.device_id::text = :device_id")
+        params["device_id"] = str(device_id)
+    if only_devices is not None:
+        filters.append("AND d.device_id IN :only_devices")
+        params["only_devices"] = list(only_devices)
+        bind_expanding.append(bindparam("only_devices", expanding=True))
+    stmt = text(_SUMMARY_SQL.format(device_filters=" ".join(filters)))
+    if bind_expanding:
+        stmt = stmt.bindparams(*bind_expanding)
+
+    out = []
+    for row in db.execute(stmt, params).mappings():
+        out.append(DeviceBehaviour(
+            device_id=row["device_id"],
+            device_hash=row["device_hash"] or "",
+            trust_score=row["device_trust_score"] or 0,
+            report_count=int(row["report_count"]),
+            first_reported_at=row["first_reported_at"],
+            last_reported_at=row["last_reported_at"],
+            interval_count=int(row["interval_count"] or 0),
+            interval_mean=_float(row["interval_mean"], None),
+            interval_std=_float(row["interval_std"], None),
+            interval_min=_float(row["interval_min"], None),
+            interval_max=_float(row["interval_max"], None),
+            similar_intervals=int(row["similar_intervals"] or 0),
+            avg_distance_km=_float(row["avg_distance_km"]),
+            max_distance_km=_float(row["max_distance_km"]),
+            avg_speed_kmh=_float(row["avg_speed_kmh"]),
+            impossible_movements=int(row["impossible_movements"] or 0),
+            hour_counts=_histogram(row["hour_counts"]),
+            weekday_counts=_histogram(row["weekday_counts"]),
+        ))
+    return out
+
+
+@dataclass
+class _Entry:
+    since: datetime
+    built_at: float
+    refreshed_at: datetime
+    devices: Dict[Any, DeviceBehaviour]
+
+
+class DeviceBehaviourSummaries:
+    """Per-(window, sector) device summaries with incremental refresh."""
+
+    def __init__(self) -> None:
+        self._entries: Dict[Tuple[int, Optional[int]], _Entry] = {}
+        self._lock = Lock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, db: Session, time_window_hours: int, sector_id: Optional[int] = None) -> List[DeviceBehaviour]:
+        key = (time_window_hours, sector_id)
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry.built_at >= FULL_REFRESH_SECONDS:
+                since = now - timedelta(hours=time_window_hours)
+                devices = query_device_behaviour(db, since, sector_id=sector_id)
+                entry = _Entry(since, time.monotonic(), now, {d.device_id: d for d in devices})
+                if len(self._entries) >= 32:
+                    self._entries.clear()
+                self._entries[key] = entry
+            elif (now - entry.refreshed_at).total_seconds() >= INCREMENTAL_REFRESH_SECONDS:
+                # Window start stays anchored until the next full rebuild.
+                changed = [
+                    device_id
+                    for (device_id,) in db.execute(
+                        text("SELECT DISTINCT device_id FROM reports WHERE reported_at >= :since"),
+                        {"since": entry.refreshed_at - timedelta(seconds=INCREMENTAL_REFRESH_SECONDS)},
+                    )
+                ]
+                if changed:
+                    for d in query_device_behaviour(db, entry.since, sector_id=sector_id, only_devices=changed):
+                        entry.devices[d.device_id] = d
+                entry.refreshed_at = now
+            return list(entry.devices.values())
+
+
+# Global singleton shared by the geographic intelligence endpoints.
+device_behaviour_summaries = DeviceBehaviourSummaries()
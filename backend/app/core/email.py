@@ -1,14 +1,25 @@
 """
 Send emails via SMTP (e.g. new user credentials).
 Uses settings from config; no-op if SMTP not configured.
+
+Messages go out over persistent connections from smtp_pool instead of a
+fresh connect + STARTTLS + login per message. A connection that has been idle
+for smtp_idle_check_seconds is checked with NOOP before reuse, and one that
+the server has dropped is reopened and the send retried once.
+Notification emails do not call send_email directly; they are queued in the
+email_outbox table (app.core.email_delivery).
 """
 import smtplib
 import socket
+import threading
+import time
+from contextlib import contextmanager
 from html import escape
 from pathlib import Path
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.image import MIMEImage
+from typing import Callable, Iterator, List, Optional
 
 from app.config import settings
 
@@ -16,50 +27,172 @@ from app.config import settings
 EMAIL_LOGO_CID = "trustbond-logo"
 EMAIL_LOGO_PATH = Path(__file__).resolve().parents[2] / "logo.jpeg"
 
+_logo_bytes: Optional[bytes] = None
+
 
 def is_smtp_configured() -> bool:
-    return bool(settings.smtp_host and settings.smtp_user and settings.smtp_pass)
+    if not settings.smtp_host:
+        return False
+    return not settings.smtp_auth or bool(settings.smtp_user and settings.smtp_pass)
 
 
 def get_email_logo_src() -> str:
     return f"cid:{EMAIL_LOGO_CID}"
 
 
-def send_email(to: str, subject: str, body_plain: str, body_html: str | None = None) -> tuple[bool, str | None]:
-    """
-    Send an email. Returns (True, None) if sent, (False, error_message) if not configured or send failed.
-    """
-    if not is_smtp_configured():
-        return False, "SMTP not configured (SMTP_HOST, SMTP_USER, SMTP_PASS required)"
-    from_addr = settings.smtp_from or settings.smtp_user
-    embed_logo = bool(body_html and EMAIL_LOGO_PATH.exists())
+def get_from_address() -> str:
+    return settings.smtp_from or settings.smtp_user or "noreply@trustbond.system"
+
+
+def _read_logo() -> bytes:
+    global _logo_bytes
+    if _logo_bytes is None:
+        _logo_bytes = EMAIL_LOGO_PATH.read_bytes()
+    return _logo_bytes
+
+
+def build_message(to: str, subject: str, body_plain: str, body_html: str | None = None) -> MIMEMultipart:
+    """MIME message with the logo embedded when the HTML body references it."""
+    embed_logo = bool(body_html and f"cid:{EMAIL_LOGO_CID}" in body_html and EMAIL_LOGO_PATH.exists())
     msg = MIMEMultipart("related") if embed_logo else MIMEMultipart("alternative")
     content = MIMEMultipart("alternative") if embed_logo else msg
     msg["Subject"] = subject
-    msg["From"] = from_addr
+    msg["From"] = get_from_address()
     msg["To"] = to
     content.attach(MIMEText(body_plain, "plain", "utf-8"))
     if body_html:
         content.attach(MIMEText(body_html, "html", "utf-8"))
     if embed_logo:
         msg.attach(content)
-        with EMAIL_LOGO_PATH.open("rb") as logo_file:
-            logo = MIMEImage(logo_file.read(), _subtype="jpeg")
+        logo = MIMEImage(_read_logo(), _subtype="jpeg")
         logo.add_header("Content-ID", f"<{EMAIL_LOGO_CID}>")
         logo.add_header("Content-Disposition", "inline", filename=EMAIL_LOGO_PATH.name)
         msg.attach(logo)
+    return msg
+
+
+def open_smtp_connection() -> smtplib.SMTP:
+    """Connect (and STARTTLS/login as configured) using settings."""
+    port = getattr(settings, "smtp_port", 587) or 587
+    timeout = max(3, int(getattr(settings, "smtp_timeout_seconds", 12) or 12))
+    if port == 465:
+        server: smtplib.SMTP = smtplib.SMTP_SSL(settings.smtp_host, port, timeout=timeout)
+    else:
+        server = smtplib.SMTP(settings.smtp_host, port, timeout=timeout)
+        if settings.smtp_starttls:
+            server.starttls()
+    if settings.smtp_auth:
+        server.login(settings.smtp_user, settings.smtp_pass)
+    return server
+
+
+def is_permanent_smtp_error(error: Exception) -> bool:
+    """5xx replies and refused recipients will not succeed on retry."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 500 <= error.smtp_code < 600
+    return False
+
+
+class PooledSmtpConnection:
+    """One SMTP connection checked out of SmtpPool; reconnects when dropped."""
+
+    def __init__(self, pool: "SmtpPool") -> None:
+        self._pool = pool
+        self._server: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+
+    def _ensure_open(self) -> smtplib.SMTP:
+        if self._server is not None and time.monotonic() - self._last_used > self._pool.idle_check_seconds:
+            try:
+                if self._server.noop()[0] != 250:
+                    self.close()
+            except (smtplib.SMTPException, OSError):
+                self.close()
+        if self._server is None:
+            self._server = self._pool.connect()
+            self._pool.stats["connects"] += 1
+        return self._server
+
+    def sendmail(self, from_addr: str, to_addrs: List[str], message: str | bytes) -> None:
+        for attempt in (1, 2):
+            server = self._ensure_open()
+            try:
+                server.sendmail(from_addr, to_addrs, message)
+                self._last_used = time.monotonic()
+                self._pool.stats["sent"] += 1
+                return
+            except (smtplib.SMTPServerDisconnected, ConnectionError, socket.timeout, TimeoutError):
+                self.close()
+                self._pool.stats["reconnects"] += 1
+                if attempt == 2:
+                    raise
+
+    def close(self) -> None:
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._server = None
+
+
+class SmtpPool:
+    """At most `size` open SMTP connections, reused across messages and threads."""
+
+    def __init__(
+        self,
+        size: int = 2,
+        connect: Callable[[], smtplib.SMTP] = open_smtp_connection,
+        idle_check_seconds: float = 60.0,
+    ) -> None:
+        self.connect = connect
+        self.idle_check_seconds = idle_check_seconds
+        self.stats = {"connects": 0, "reconnects": 0, "sent": 0}
+        self._slots = threading.BoundedSemaphore(max(1, size))
+        self._idle: List[PooledSmtpConnection] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[PooledSmtpConnection]:
+        self._slots.acquire()
+        with self._lock:
+            conn = self._idle.pop() if self._idle else PooledSmtpConnection(self)
+        try:
+            yield conn
+        except Exception:
+            # State after an error is unknown; start the next user on a fresh connection.
+            conn.close()
+            raise
+        finally:
+            with self._lock:
+                self._idle.append(conn)
+            self._slots.release()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+smtp_pool = SmtpPool(
+    size=settings.smtp_pool_size,
+    idle_check_seconds=settings.smtp_idle_check_seconds,
+)
+
+
+def send_email(to: str, subject: str, body_plain: str, body_html: str | None = None) -> tuple[bool, str | None]:
+    """
+    Send an email. Returns (True, None) if sent, (False, error_message) if not configured or send failed.
+    """
+    if not is_smtp_configured():
+        return False, "SMTP not configured (SMTP_HOST, SMTP_USER, SMTP_PASS required)"
+    msg = build_message(to, subject, body_plain, body_html)
     try:
-        port = getattr(settings, "smtp_port", 587) or 587
-        timeout = max(3, int(getattr(settings, "smtp_timeout_seconds", 12) or 12))
-        if port == 465:
-            with smtplib.SMTP_SSL(settings.smtp_host, port, timeout=timeout) as server:
-                server.login(settings.smtp_user, settings.smtp_pass)
-                server.sendmail(from_addr, [to], msg.as_string())
-        else:
-            with smtplib.SMTP(settings.smtp_host, port, timeout=timeout) as server:
-                server.starttls()
-                server.login(settings.smtp_user, settings.smtp_pass)
-                server.sendmail(from_addr, [to], msg.as_string())
+        with smtp_pool.connection() as server:
+            server.sendmail(get_from_address(), [to], msg.as_string())
         return True, None
     except (socket.timeout, TimeoutError):
         err = "SMTP connection timed out. Check SMTP settings/network or reduce SMTP_TIMEOUT_SECONDS."
@@ -0,0 +1,416 @@
+"""
+Queued delivery of notification emails through the email_outbox table.
+
+- enqueue_email() inserts one row per recipient, either with a rendered
+  subject/body or with a registered template name and its context. Passing
+  the caller's session keeps the rows in the caller's transaction.
+- EmailDeliveryWorker (one daemon thread per process) claims due rows in
+  batches with FOR UPDATE SKIP LOCKED, so several workers can drain the same
+  table, and sends the whole batch over one pooled SMTP connection.
+- Within a batch each distinct template + context (or rendered body) is
+  rendered and turned into a MIME message once; recipients only change the
+  To header.
+- Transient failures are retried with exponential backoff; 5xx replies and
+  the last allowed attempt move the row to status 'dead'. Rows stuck in
+  'sending' (worker died mid-batch) are claimed again after a while.
+- With settings.email_outbox_enabled off (no worker drains the table) or
+  until migration 020 is applied, enqueue_email sends inline over the SMTP
+  pool instead: after the caller's commit when given its session.
+- The worker is woken after the rows commit (session after_commit hook), not
+  when they are inserted, so it never polls before they are visible.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import smtplib
+import threading
+import time
+from functools import partial
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import bindparam, event, insert, inspect as sa_inspect, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.email import SmtpPool, build_message, get_from_address, is_permanent_smtp_error, smtp_pool
+from app.database import SessionLocal, engine
+from app.models.email_outbox import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_DELAY_SECONDS = 3600
+STALE_SENDING_SECONDS = 600
+
+
+class RenderedEmail(NamedTuple):
+    subject: str
+    body_plain: str
+    body_html: Optional[str]
+
+
+class OutboxMessage(NamedTuple):
+    email_id: int
+    to_address: str
+    subject: Optional[str]
+    body_plain: Optional[str]
+    body_html: Optional[str]
+    template: Optional[str]
+    context: Optional[Dict[str, Any]]
+    attempts: int
+
+
+EMAIL_TEMPLATES: Dict[str, Callable[[Dict[str, Any]], RenderedEmail]] = {}
+
+
+def register_email_template(name: str, render: Callable[[Dict[str, Any]], RenderedEmail]) -> None:
+    EMAIL_TEMPLATES[name] = render
+
+
+def render_outbox_message(message: OutboxMessage) -> RenderedEmail:
+    if message.template:
+        return EMAIL_TEMPLATES[message.template](message.context or {})
+    return RenderedEmail(message.subject or "", message.body_plain or "", message.body_html)
+
+
+def _render_key(message: OutboxMessage) -> Tuple:
+    if message.template:
+        return ("template", message.template, json.dumps(message.context or {}, sort_keys=True, default=str))
+    return ("body", message.subject, message.body_plain, message.body_html)
+
+
+# ----- storage -----
+
+
+class SqlOutboxStore:
+    """email_outbox rows, claimed and updated with plain SQL on the engine."""
+
+    _CLAIM_SQL = text("""
+        UPDATE email_outbox
+        SET status = 'sending', attempts = attempts + 1, locked_at = now()
+        WHERE email_id IN (
+            SELECT email_id FROM email_outbox
+            WHERE (status = 'pending' AND next_attempt_at <= now())
+               OR (status = 'sending' AND locked_at < now() - make_interval(secs => :stale))
+            ORDER BY next_attempt_at, email_id
+            LIMIT :limit
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING email_id, to_address, subject, body_plain, body_html, template, context, attempts
+    """)
+
+    def claim(self, limit: int) -> List[OutboxMessage]:
+        with engine.begin() as conn:
+            rows = conn.execute(self._CLAIM_SQL, {"limit": limit, "stale": STALE_SENDING_SECONDS}).all()
+        return sorted((OutboxMessage(*row) for row in rows), key=lambda m: m.email_id)
+
+    def mark_sent(self, email_ids: List[int]) -> None:
+        if not email_ids:
+            return
+        with engine.begin() as conn:
+            conn.execute(
+                text("""
+                    UPDATE email_outbox
+                    SET status = 'sent', sent_at = now(), locked_at = NULL, last_error = NULL
+                    WHERE email_id IN :ids
+                """).bindparams(bindparam("ids", expanding=True)),
+                {"ids": email_ids},
+            )
+
+    def mark_failed(self, email_id: int, error: str, retry_at: Optional[datetime]) -> None:
+        with engine.begin() as conn:
+            conn.execute(
+                text("""
+                    UPDATE email_outbox
+                    SET status = :status, next_attempt_at = COALESCE(:retry_at, next_attempt_at),
+                        locked_at = NULL, last_error = :error
+                    WHERE email_id = :email_id
+                """),
+                {
+                    "status": "pending" if retry_at else "dead",
+                    "retry_at": retry_at,
+                    "error": error[:2000],
+                    "email_id": email_id,
+                },
+            )
+
+    def purge_sent(self, older_than_days: int) -> int:
+        with engine.begin() as conn:
+            result = conn.execute(
+                text("DELETE FROM email_outbox WHERE status = 'sent' AND sent_at < now() - make_interval(days => :days)"),
+                {"days": older_than_days},
+            )
+        return result.rowcount or 0
+
+    def counts(self) -> Dict[str, int]:
+        with engine.connect() as conn:
+            rows = conn.execute(text("SELECT status, count(*) FROM email_outbox GROUP BY status")).all()
+        return {status: int(n) for status, n in rows}
+
+
+# ----- enqueue -----
+
+_has_outbox_table: Optional[bool] = None
+_AFTER_COMMIT_KEY = "email_delivery_after_commit"
+
+
+def _after_commit(db: Session, callback: Callable[[], Any]) -> None:
+    """Run callback once db's outermost transaction commits; dropped if it rolls back."""
+    db.info.setdefault(_AFTER_COMMIT_KEY, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session) -> None:
+    if session.in_nested_transaction():
+        # A savepoint was released; the rows aren't committed yet.
+        return
+    for callback in session.info.pop(_AFTER_COMMIT_KEY, ()):
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"Email after-commit callback failed: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_commit(session: Session) -> None:
+    if not session.in_nested_transaction():
+        session.info.pop(_AFTER_COMMIT_KEY, None)
+
+
+def _outbox_available(db: Session) -> bool:
+    global _has_outbox_table
+    if _has_outbox_table is None:
+        _has_outbox_table = sa_inspect(db.get_bind()).has_table("email_outbox")
+    return _has_outbox_table
+
+
+def enqueue_email(
+    to_addresses: Iterable[str],
+    subject: Optional[str] = None,
+    body_plain: Optional[str] = None,
+    body_html: Optional[str] = None,
+    template: Optional[str] = None,
+    context: Optional[Dict[str, Any]] = None,
+    db: Optional[Session] = None,
+) -> int:
+    """
+    Queue one email per recipient; returns how many were queued.
+
+    With `db` the rows are added to the caller's transaction and go out once
+    it commits; without it they are committed in a session of their own.
+    When the outbox is disabled or missing the emails are sent inline instead
+    (after the caller's commit with `db`) and the count is of emails sent or,
+    with `db`, to be sent.
+    """
+    recipients = list(dict.fromkeys(a for a in to_addresses if a))
+    if not recipients:
+        return 0
+    if template and template not in EMAIL_TEMPLATES:
+        raise ValueError(f"Unknown email template: {template}")
+
+    own_session = db is None
+    session = db or SessionLocal()
+    try:
+        if not settings.email_outbox_enabled or not _outbox_available(session):
+            # Nothing would drain the table: send over the SMTP pool instead.
+            send = partial(_send_inline, recipients, subject, body_plain, body_html, template, context)
+            if own_session:
+                return send()
+            _after_commit(session, send)
+            return len(recipients)
+        rows = [
+            {
+                "to_address": address,
+                "subject": None if template else subject,
+                "body_plain": None if template else (body_plain or ""),
+                "body_html": None if template else body_html,
+                "template": template,
+                "context": context if template else None,
+            }
+            for address in recipients
+        ]
+        session.execute(insert(OutboxEmail).values(rows))
+        if own_session:
+            session.commit()
+            email_delivery.wake()
+        else:
+            _after_commit(session, email_delivery.wake)
+    finally:
+        if own_session:
+            session.close()
+    return len(recipients)
+
+
+def _send_inline(
+    recipients: List[str],
+    subject: Optional[str],
+    body_plain: Optional[str],
+    body_html: Optional[str],
+    template: Optional[str],
+    context: Optional[Dict[str, Any]],
+) -> int:
+    from app.core.email import send_email
+
+    if template:
+        subject, body_plain, body_html = EMAIL_TEMPLATES[template](context or {})
+    return sum(1 for address in recipients if send_email(address, subject or "", body_plain or "", body_html)[0])
+
+
+# ----- worker -----
+
+
+class EmailDeliveryWorker:
+    def __init__(
+        self,
+        store: Any = None,
+        pool: Optional[SmtpPool] = None,
+        batch_size: int = 50,
+        poll_seconds: float = 2.0,
+        max_attempts: int = 6,
+        retry_base_seconds: float = 30.0,
+        retention_days: int = 14,
+    ) -> None:
+        self.store = store or SqlOutboxStore()
+        self.pool = pool or smtp_pool
+        self.batch_size = max(1, batch_size)
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base_seconds = retry_base_seconds
+        self.retention_days = retention_days
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_purge = 0.0
+        self._stats: Dict[str, int] = {
+            "batches": 0,
+            "claimed": 0,
+            "sent": 0,
+            "retried": 0,
+            "dead": 0,
+            "renders": 0,
+            "render_reuse": 0,
+        }
+
+    def retry_delay(self, attempts: int) -> float:
+        return min(MAX_RETRY_DELAY_SECONDS, self.retry_base_seconds * 2 ** max(0, attempts - 1))
+
+    def run_once(self) -> int:
+        """Claim and deliver one batch; returns the number of rows claimed."""
+        batch = self.store.claim(self.batch_size)
+        if not batch:
+            return 0
+        self._stats["batches"] += 1
+        self._stats["claimed"] += len(batch)
+        self._deliver(batch)
+        return len(batch)
+
+    def _deliver(self, batch: List[OutboxMessage]) -> None:
+        prepared: Dict[Tuple, Any] = {}
+        sent: List[int] = []
+        handled: set = set()
+        from_addr = get_from_address()
+        try:
+            with self.pool.connection() as smtp:
+                for message in batch:
+                    handled.add(message.email_id)
+                    key = _render_key(message)
+                    mime = prepared.get(key)
+                    try:
+                        if mime is None:
+                            rendered = render_outbox_message(message)
+                            mime = prepared[key] = build_message(
+                                message.to_address, rendered.subject, rendered.body_plain, rendered.body_html
+                            )
+                            self._stats["renders"] += 1
+                        else:
+                            mime.replace_header("To", message.to_address)
+                            self._stats["render_reuse"] += 1
+                    except Exception as e:
+                        # A template that cannot render will not render on retry either.
+                        self._fail(message, e, permanent=True)
+                        continue
+                    try:
+                        smtp.sendmail(from_addr, [message.to_address], mime.as_string())
+                        sent.append(message.email_id)
+                    except smtplib.SMTPServerDisconnected as e:
+                        # The pooled connection already reconnected once; stop hammering the server.
+                        self._fail(message, e)
+                        raise
+                    except smtplib.SMTPException as e:
+                        # A reply for this message only (4xx/5xx, refused recipient).
+                        self._fail(message, e)
+                    except OSError as e:
+                        self._fail(message, e)
+                        raise
+        except Exception as e:
+            # No usable connection: the rest of the batch is retried later.
+            for message in batch:
+                if message.email_id not in handled:
+                    self._fail(message, e)
+        finally:
+            self.store.mark_sent(sent)
+            self._stats["sent"] += len(sent)
+
+    def _fail(self, message: OutboxMessage, error: Exception, permanent: bool = False) -> None:
+        if permanent or is_permanent_smtp_error(error) or message.attempts >= self.max_attempts:
+            self._stats["dead"] += 1
+            logger.error(f"Email {message.email_id} to {message.to_address} dead-lettered: {error}")
+            self.store.mark_failed(message.email_id, str(error) or type(error).__name__, None)
+            return
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=self.retry_delay(message.attempts))
+        self._stats["retried"] += 1
+        logger.warning(f"Email {message.email_id} failed (attempt {message.attempts}), retrying: {error}")
+        self.store.mark_failed(message.email_id, str(error) or type(error).__name__, retry_at)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            claimed = 0
+            try:
+                claimed = self.run_once()
+                if self.retention_days > 0 and time.monotonic() - self._last_purge > 3600:
+                    self._last_purge = time.monotonic()
+                    self.store.purge_sent(self.retention_days)
+            except Exception as e:
+                logger.error(f"Email outbox drain failed: {e}")
+            if claimed < self.batch_size:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+
+    def wake(self) -> None:
+        """Poll now instead of at the next interval (new rows were queued)."""
+        self._wake.set()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        import app.services.email_templates  # noqa: F401  (rows may name these templates)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="email-delivery", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.pool.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "running": bool(self._thread and self._thread.is_alive()),
+            "smtp": dict(self.pool.stats),
+        }
+
+
+# Global worker; started from the app lifespan when SMTP is configured.
+email_delivery = EmailDeliveryWorker(
+    batch_size=settings.email_outbox_batch_size,
+    poll_seconds=settings.email_outbox_poll_seconds,
+    max_attempts=settings.email_outbox_max_attempts,
+    retry_base_seconds=settings.email_outbox_retry_base_seconds,
+    retention_days=settings.email_outbox_retention_days,
+)
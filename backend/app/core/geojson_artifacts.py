@@ -0,0 +1,235 @@
+"""
+Pre-rendered, compressed GeoJSON for the public locations map.
+
+/public/locations/geojson used to run ST_AsGeoJSON over every village polygon on
+each call and return full-precision geometry uncompressed. Instead, each
+(location_type, parent_id, detail, limit) FeatureCollection is rendered once per
+version of the `locations` table and kept as:
+
+- the JSON body, with geometry simplified (ST_SimplifyPreserveTopology) and
+  coordinates quantized (ST_AsGeoJSON max decimal digits) per detail level
+- gzip and, when the optional `brotli` package is installed, brotli encodings
+- a strong ETag derived from the body, so clients revalidate with If-None-Match
+
+The version comes from dataset_versions, bumped by a trigger on any write to
+locations (migration 016). Until that migration is applied, artifacts are
+rebuilt after FALLBACK_TTL_SECONDS instead.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, inspect as sa_inspect, text
+from sqlalchemy.orm import Session, aliased
+
+from app.models.location import Location
+
+try:  # optional dependency
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# detail level -> (simplify tolerance in degrees, coordinate decimal digits).
+# 1e-5 degrees is about 1.1 m at Musanze's latitude.
+DETAIL_LEVELS: Dict[str, Tuple[float, int]] = {
+    "full": (0.0, 6),
+    "medium": (0.00005, 5),
+    "low": (0.0002, 4),
+}
+LOCATION_TYPES = ("sector", "cell", "village")
+FALLBACK_TTL_SECONDS = 300.0
+MAX_ARTIFACTS = 128
+
+
+def dataset_version(db: Session, name: str) -> str:
+    """dataset_versions counter for a source table ("0" when it has no row yet)."""
+    version = db.execute(
+        text("SELECT version FROM dataset_versions WHERE name = :name"), {"name": name}
+    ).scalar()
+    return str(version or 0)
+
+
+@dataclass(frozen=True)
+class GeoJsonArtifact:
+    version: str
+    etag: str
+    body: bytes
+    gzip_body: bytes
+    brotli_body: Optional[bytes]
+    feature_count: int
+
+    def encoded(self, accept_encoding: str) -> Tuple[bytes, Optional[str]]:
+        """Best body for the client's Accept-Encoding and its Content-Encoding (None = identity)."""
+        accepted = {part.split(";")[0].strip().lower() for part in (accept_encoding or "").split(",")}
+        if self.brotli_body is not None and "br" in accepted:
+            return self.brotli_body, "br"
+        if "gzip" in accepted:
+            return self.gzip_body, "gzip"
+        return self.body, None
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """True when an If-None-Match header already names this artifact."""
+        return etag_matches(self.etag, if_none_match)
+
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """True when an If-None-Match header value names etag (weak or strong) or is "*"."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _feature_rows(
+    db: Session, location_type: str, parent_id: Optional[int], detail: str, limit: int
+) -> List[Tuple[Dict[str, object], str]]:
+    """(properties, geometry GeoJSON text) for each location, in name order."""
+    tolerance, digits = DETAIL_LEVELS[detail]
+    geometry = Location.geometry
+    if tolerance > 0:
+        geometry = func.ST_SimplifyPreserveTopology(geometry, tolerance)
+    geojson_col = func.ST_AsGeoJSON(geometry, digits).label("geojson")
+
+    cell = aliased(Location)
+    sector = aliased(Location)
+    filters = [
+        Location.is_active == True,
+        Location.location_type == location_type,
+        Location.geometry.isnot(None),
+    ]
+    if parent_id is not None:
+        filters.append(Location.parent_location_id == parent_id)
+
+    if location_type == "village":
+        query = (
+            db.query(Location.location_id, Location.location_name, cell.location_name, sector.location_name, geojson_col)
+            .join(cell, Location.parent_location_id == cell.location_id)
+            .join(sector, cell.parent_location_id == sector.location_id)
+        )
+    elif location_type == "cell":
+        query = db.query(Location.location_id, Location.location_name, sector.location_name, geojson_col).join(
+            sector, Location.parent_location_id == sector.location_id
+        )
+    else:
+        query = db.query(Location.location_id, Location.location_name, geojson_col)
+    rows = query.filter(*filters).order_by(Location.location_name).limit(limit).all()
+
+    out = []
+    for row in rows:
+        location_id, name, *parents, geojson_text = row
+        if not geojson_text:
+            continue
+        properties: Dict[str, object] = {"location_id": location_id, "location_type": location_type}
+        if location_type == "village":
+            properties.update({"sector": parents[1], "cell": parents[0], "village": name})
+        elif location_type == "cell":
+            properties.update({"sector": parents[0], "cell": name})
+        else:
+            properties["sector"] = name
+        out.append((properties, geojson_text))
+    return out
+
+
+def render_feature_collection(rows: List[Tuple[Dict[str, object], str]]) -> Tuple[bytes, int]:
+    """
+    Serialise a FeatureCollection, embedding PostGIS geometry text as-is.
+
+    Geometry that is not valid JSON is skipped, as before. Returns the body and
+    its feature count.
+    """
+    parts = []
+    for properties, geojson_text in rows:
+        try:
+            json.loads(geojson_text)
+        except ValueError:
+            continue
+        parts.append(
+            '{"type":"Feature","geometry":%s,"properties":%s}'
+            % (geojson_text, json.dumps(properties, separators=(",", ":"), ensure_ascii=False))
+        )
+    body = '{"type":"FeatureCollection","features":[%s]}' % ",".join(parts)
+    return body.encode("utf-8"), len(parts)
+
+
+def build_artifact(version: str, body: bytes, feature_count: int) -> GeoJsonArtifact:
+    digest = hashlib.sha256(body).hexdigest()[:24]
+    return GeoJsonArtifact(
+        version=version,
+        etag=f'"loc-{digest}"',
+        body=body,
+        gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+        brotli_body=brotli.compress(body) if brotli is not None else None,
+        feature_count=feature_count,
+    )
+
+
+class LocationGeoJsonArtifacts:
+    def __init__(self) -> None:
+        self._artifacts: Dict[Tuple[str, Optional[int], str, int], Tuple[float, GeoJsonArtifact]] = {}
+        self._lock = Lock()
+        self._versioned: Optional[bool] = None
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._artifacts.clear()
+
+    def _version(self, db: Session) -> Optional[str]:
+        """Current locations version, or None when dataset_versions does not exist yet."""
+        if self._versioned is None:
+            self._versioned = sa_inspect(db.get_bind()).has_table("dataset_versions")
+        if not self._versioned:
+            return None
+        return dataset_version(db, "locations")
+
+    def get(
+        self, db: Session, location_type: str, parent_id: Optional[int], detail: str, limit: int
+    ) -> GeoJsonArtifact:
+        key = (location_type, parent_id, detail, limit)
+        version = self._version(db)
+        cached = self._artifacts.get(key)
+        if cached is not None:
+            built_at, artifact = cached
+            if version is not None and artifact.version == version:
+                return artifact
+            if version is None and time.monotonic() - built_at < FALLBACK_TTL_SECONDS:
+                return artifact
+
+        # Rendering is serialised so a version bump regenerates each artifact once.
+        with self._lock:
+            cached = self._artifacts.get(key)
+            if cached is not None and version is not None and cached[1].version == version:
+                return cached[1]
+            started = time.monotonic()
+            body, feature_count = render_feature_collection(
+                _feature_rows(db, location_type, parent_id, detail, limit)
+            )
+            artifact = build_artifact(version or "ttl", body, feature_count)
+            if version is not None:
+                stale = [k for k, (_, a) in self._artifacts.items() if a.version != version]
+                for k in stale:
+                    del self._artifacts[k]
+            if len(self._artifacts) >= MAX_ARTIFACTS:
+                self._artifacts.clear()
+            self._artifacts[key] = (time.monotonic(), artifact)
+            logger.info(
+                f"Rendered {location_type} GeoJSON (parent={parent_id}, detail={detail}): "
+                f"{feature_count} features, {len(body)} bytes, {len(artifact.gzip_body)} gzip, "
+                f"{time.monotonic() - started:.2f}s"
+            )
+            return artifact
+
+
+# Global singleton used by the public locations router.
+location_geojson_artifacts = LocationGeoJsonArtifacts()
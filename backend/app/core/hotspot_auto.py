@@ -2,17 +2,18 @@
 
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
-from math import atan2, cos, radians, sin, sqrt
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
 from sqlalchemy import text
 from sqlalchemy.orm import Session, selectinload
 
 from app.core.cluster_classifier import (
+    ClusterFeatures,
     classification_to_risk_level,
-    predict_cluster_classification,
+    predict_cluster_classification_many,
 )
+from app.core.spatial_clustering import RadiusIndex, dbscan_labels
 from app.models.hotspot import Hotspot, hotspot_reports_table
 from app.models.location import Location
 from app.models.report import Report
@@ -23,6 +24,9 @@ DEFAULT_TIME_WINDOW_HOURS = 24
 DEFAULT_MIN_INCIDENTS = 2
 DEFAULT_RADIUS_METERS = 500
 DEFAULT_TRUST_MIN = 50.0
+# Hotspots detected (or refreshed) within this many hours form the current
+# generation shown on public maps and alerts; older rows are kept for history.
+CURRENT_HOTSPOT_HOURS = 24
 
 
 def get_hotspot_params_from_db(
@@ -126,17 +130,6 @@ def _is_report_eligible(report: Report) -> bool:
     return True
 
 
-def _haversine_meters(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    r = 6371000.0
-    dlat = radians(lat2 - lat1)
-    dlon = radians(lon2 - lon1)
-    a = (
-        sin(dlat / 2) ** 2
-        + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
-    )
-    return r * 2 * atan2(sqrt(a), sqrt(1 - a))
-
-
 def _trust_weight(point: Dict[str, Any]) -> float:
     """Return a normalized DBSCAN density weight from a report trust score."""
     try:
@@ -147,49 +140,23 @@ def _trust_weight(point: Dict[str, Any]) -> float:
 
 
 def _dbscan(points: List[Dict[str, Any]], eps_meters: float, min_pts: int) -> List[int]:
-    n = len(points)
-    labels = [-2] * n  # -2 unvisited, -1 noise, >=0 cluster id
-    cluster_id = 0
-    min_density_weight = max(1.0, float(min_pts) * 0.5)
-
-    def neighbors(i: int) -> Tuple[List[int], float]:
-        p = points[i]
-        out: List[int] = []
-        for j, q in enumerate(points):
-            if _haversine_meters(p["lat"], p["lon"], q["lat"], q["lon"]) <= eps_meters:
-                out.append(j)
-        density_weight = sum(_trust_weight(points[j]) for j in out)
-        return out, density_weight
-
-    for i in range(n):
-        if labels[i] != -2:
-            continue
-        nbs, density_weight = neighbors(i)
-        if len(nbs) < min_pts or density_weight < min_density_weight:
-            labels[i] = -1
-            continue
+    index = RadiusIndex([p["lat"] for p in points], [p["lon"] for p in points])
+    return dbscan_labels(
+        index,
+        eps_meters,
+        min_pts,
+        weights=[_trust_weight(p) for p in points],
+        min_weight=max(1.0, float(min_pts) * 0.5),
+    )
 
-        labels[i] = cluster_id
-        queue = list(nbs)
-        qi = 0
-        while qi < len(queue):
-            j = queue[qi]
-            if labels[j] == -1:
-                labels[j] = cluster_id
-            if labels[j] != -2:
-                qi += 1
-                continue
-            labels[j] = cluster_id
-            jn, j_density_weight = neighbors(j)
-            if len(jn) >= min_pts and j_density_weight >= min_density_weight:
-                for cand in jn:
-                    if cand not in queue:
-                        queue.append(cand)
-            qi += 1
-
-        cluster_id += 1
-
-    return labels
+
+def _store_classification(hotspot: Hotspot, result: Dict[str, Any], avg_trust: float) -> None:
+    """Persist a predict_cluster_classification() result so read paths never score."""
+    hotspot.classification = result["classification"]
+    hotspot.classification_confidence = result.get("confidence")
+    hotspot.hotspot_score = result.get("hotspot_score")
+    hotspot.classification_source = result.get("source")
+    hotspot.avg_trust_score = round(float(avg_trust), 2)
 
 
 def cleanup_expired_hotspots(db: Session):
@@ -303,6 +270,7 @@ def _create_village_based_hotspots(
         village_groups[village_key].append(report)
     
     # Create hotspots for village groups with enough incidents and within time window
+    candidates: List[Dict[str, Any]] = []
     for village_key, village_reports in village_groups.items():
         if len(village_reports) < min_incidents:
             continue
@@ -325,13 +293,32 @@ def _create_village_based_hotspots(
         
         # Risk classification
         area_sqkm = 0.01  # Village area approximation
-        cluster_density = incident_count / area_sqkm
-        classification_result = predict_cluster_classification(
-            incident_count=incident_count,
-            avg_trust=avg_trust,
-            cluster_density=cluster_density,
-            time_window_hours=time_window_hours,
-        )
+        candidates.append({
+            "village_id": village_id,
+            "incident_type_id": incident_type_id,
+            "reports": village_reports,
+            "center_lat": center_lat,
+            "center_long": center_long,
+            "avg_trust": avg_trust,
+            "features": ClusterFeatures(
+                incident_count=incident_count,
+                avg_trust=avg_trust,
+                cluster_density=incident_count / area_sqkm,
+                time_window_hours=time_window_hours,
+            ),
+        })
+
+    # Classify every village group in one model call.
+    results = predict_cluster_classification_many([c["features"] for c in candidates])
+
+    for candidate, classification_result in zip(candidates, results):
+        village_id = candidate["village_id"]
+        incident_type_id = candidate["incident_type_id"]
+        village_reports = candidate["reports"]
+        incident_count = len(village_reports)
+        center_lat = candidate["center_lat"]
+        center_long = candidate["center_long"]
+        avg_trust = candidate["avg_trust"]
         risk_level = classification_to_risk_level(classification_result["classification"])
         
         # Create or update hotspot
@@ -351,6 +338,7 @@ def _create_village_based_hotspots(
             existing_hotspot.risk_level = risk_level
             existing_hotspot.time_window_hours = time_window_hours
             existing_hotspot.detected_at = datetime.now(timezone.utc)
+            _store_classification(existing_hotspot, classification_result, avg_trust)
             
             # Refresh report associations
             db.execute(
@@ -377,6 +365,7 @@ def _create_village_based_hotspots(
                 incident_type_id=int(incident_type_id),
                 detected_at=datetime.now(timezone.utc),
             )
+            _store_classification(hotspot, classification_result, avg_trust)
             
             db.add(hotspot)
             db.flush()
@@ -413,7 +402,7 @@ def _create_geographic_hotspots(
             continue
         clusters.setdefault(label, []).append(points[idx])
 
-    created = 0
+    candidates: List[Dict[str, Any]] = []
     for _, cluster_points in clusters.items():
         incident_count = len(cluster_points)
         if incident_count < int(min_incidents):
@@ -445,13 +434,31 @@ def _create_geographic_hotspots(
         dominant_incident_type_id = list(type_counts.keys())[0]
 
         area_sqkm = max(0.001, 3.14159 * (float(radius_meters) / 1000.0) ** 2)
-        cluster_density = incident_count / area_sqkm
-        classification_result = predict_cluster_classification(
-            incident_count=incident_count,
-            avg_trust=avg_trust,
-            cluster_density=cluster_density,
-            time_window_hours=time_window_hours,
-        )
+        candidates.append({
+            "points": cluster_points,
+            "center_lat": center_lat,
+            "center_long": center_long,
+            "avg_trust": avg_trust,
+            "incident_type_id": dominant_incident_type_id,
+            "features": ClusterFeatures(
+                incident_count=incident_count,
+                avg_trust=avg_trust,
+                cluster_density=incident_count / area_sqkm,
+                time_window_hours=time_window_hours,
+            ),
+        })
+
+    # Classify every cluster of this run in one model call.
+    results = predict_cluster_classification_many([c["features"] for c in candidates])
+
+    created = 0
+    for candidate, classification_result in zip(candidates, results):
+        cluster_points = candidate["points"]
+        incident_count = len(cluster_points)
+        center_lat = candidate["center_lat"]
+        center_long = candidate["center_long"]
+        avg_trust = candidate["avg_trust"]
+        dominant_incident_type_id = candidate["incident_type_id"]
         risk_level = classification_to_risk_level(classification_result["classification"])
 
         existing_query = db.query(Hotspot).filter(
@@ -474,6 +481,7 @@ def _create_geographic_hotspots(
                 incident_type_id=dominant_incident_type_id,
                 detected_at=datetime.now(timezone.utc),
             )
+            _store_classification(hotspot, classification_result, avg_trust)
             db.add(hotspot)
             db.flush()
             created += 1
@@ -486,6 +494,7 @@ def _create_geographic_hotspots(
             hotspot.time_window_hours = time_window_hours
             hotspot.incident_type_id = dominant_incident_type_id
             hotspot.detected_at = datetime.now(timezone.utc)
+            _store_classification(hotspot, classification_result, avg_trust)
             db.execute(
                 text("DELETE FROM hotspot_reports WHERE hotspot_id = :hotspot_id"),
                 {"hotspot_id": hotspot.hotspot_id},
@@ -0,0 +1,205 @@
+"""
+In-process cache of the sector -> cell -> village tree and station sector scopes.
+
+Supervisor/officer scoping used to rebuild "every location under this station's
+primary and secondary sector" with nested IN (SELECT ...) subqueries on every
+request. The tree is small (a few hundred rows for Musanze) and changes rarely,
+so it is loaded once and reused:
+
+- descendants(db, location_id): the location itself plus every cell/village below it
+- villages_under(db, location_id): only the village ids below a sector/cell
+- station_scope(db, station_id): descendants of the station's primary + secondary sector
+- type_of(db, location_id) / children(db, location_id): single-node lookups
+- sector_of(db, location_id): nearest sector ancestor (or the location itself)
+- lineage(db, village_id): village/cell/sector ids and names for display
+
+Station create/update/delete call invalidate() on the worker that served them.
+The API has no location write endpoints; locations change only through offline
+scripts (e.g. scripts/populate_locations.py). Those edits, and station edits
+made on other workers, show up once the cached tree expires
+(DEFAULT_TTL_SECONDS, 5 minutes).
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+DEFAULT_TTL_SECONDS = 300.0
+
+
+@dataclass
+class _Snapshot:
+    parent: Dict[int, Optional[int]] = field(default_factory=dict)
+    children: Dict[int, List[int]] = field(default_factory=dict)
+    location_type: Dict[int, str] = field(default_factory=dict)
+    location_name: Dict[int, str] = field(default_factory=dict)
+    # station_id -> (primary sector location_id, secondary sector location_id)
+    stations: Dict[int, Tuple[Optional[int], Optional[int]]] = field(default_factory=dict)
+    descendants: Dict[int, FrozenSet[int]] = field(default_factory=dict)
+    villages: Dict[int, FrozenSet[int]] = field(default_factory=dict)
+    station_scopes: Dict[int, FrozenSet[int]] = field(default_factory=dict)
+    loaded_at: float = 0.0
+
+
+class LocationHierarchy:
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._snapshot: Optional[_Snapshot] = None
+        self._lock = Lock()
+
+    def invalidate(self) -> None:
+        """Drop the cached tree; the next lookup reloads it from the database."""
+        with self._lock:
+            self._snapshot = None
+
+    def _load(self, db: Session) -> _Snapshot:
+        snap = _Snapshot()
+        rows = db.execute(
+            text("SELECT location_id, parent_location_id, location_type, location_name FROM locations")
+        ).fetchall()
+        for location_id, parent_id, location_type, location_name in rows:
+            snap.parent[location_id] = parent_id
+            snap.location_type[location_id] = location_type
+            snap.location_name[location_id] = location_name
+            if parent_id is not None:
+                snap.children.setdefault(parent_id, []).append(location_id)
+        for station_id, location_id, sector2_id in db.execute(
+            text("SELECT station_id, location_id, sector2_id FROM stations")
+        ).fetchall():
+            snap.stations[station_id] = (location_id, sector2_id)
+        snap.loaded_at = time.monotonic()
+        return snap
+
+    def _get(self, db: Session) -> _Snapshot:
+        snap = self._snapshot
+        if snap is not None and time.monotonic() - snap.loaded_at < self._ttl_seconds:
+            return snap
+        with self._lock:
+            snap = self._snapshot
+            if snap is None or time.monotonic() - snap.loaded_at >= self._ttl_seconds:
+                snap = self._load(db)
+                self._snapshot = snap
+            return snap
+
+    def descendants(self, db: Session, location_id: Optional[int]) -> FrozenSet[int]:
+        """location_id plus all cells/villages beneath it (empty set for None)."""
+        if location_id is None:
+            return frozenset()
+        snap = self._get(db)
+        cached = snap.descendants.get(location_id)
+        if cached is not None:
+            return cached
+        found = {location_id}
+        stack = [location_id]
+        while stack:
+            for child in snap.children.get(stack.pop(), ()):
+                if child not in found:
+                    found.add(child)
+                    stack.append(child)
+        result = frozenset(found)
+        snap.descendants[location_id] = result
+        return result
+
+    def villages_under(self, db: Session, location_id: Optional[int]) -> FrozenSet[int]:
+        """Village ids beneath a sector or cell (direct children or via cells)."""
+        if location_id is None:
+            return frozenset()
+        snap = self._get(db)
+        cached = snap.villages.get(location_id)
+        if cached is not None:
+            return cached
+        result = frozenset(
+            loc_id
+            for loc_id in self.descendants(db, location_id)
+            if loc_id != location_id and snap.location_type.get(loc_id) == "village"
+        )
+        snap.villages[location_id] = result
+        return result
+
+    def station_scope(self, db: Session, station_id: Optional[int]) -> Optional[FrozenSet[int]]:
+        """
+        All location ids under the station's primary and secondary sectors.
+
+        Returns None when the station does not exist, so callers can keep their
+        "station missing -> fall back to station-only filtering" behaviour.
+        """
+        if station_id is None:
+            return None
+        snap = self._get(db)
+        cached = snap.station_scopes.get(station_id)
+        if cached is not None:
+            return cached
+        if station_id not in snap.stations:
+            return None
+        scope: set[int] = set()
+        for sector_id in snap.stations[station_id]:
+            if sector_id is not None:
+                scope.update(self.descendants(db, sector_id))
+        result = frozenset(scope)
+        snap.station_scopes[station_id] = result
+        return result
+
+    def type_of(self, db: Session, location_id: Optional[int]) -> Optional[str]:
+        """location_type of location_id (None for unknown ids)."""
+        if location_id is None:
+            return None
+        return self._get(db).location_type.get(location_id)
+
+    def children(self, db: Session, location_id: Optional[int]) -> List[int]:
+        """Direct children of location_id."""
+        if location_id is None:
+            return []
+        return list(self._get(db).children.get(location_id, ()))
+
+    def sector_of(self, db: Session, location_id: Optional[int]) -> Optional[int]:
+        """Nearest sector ancestor of location_id; the id itself if no sector is found."""
+        if location_id is None:
+            return None
+        snap = self._get(db)
+        current: Optional[int] = location_id
+        seen: set[int] = set()
+        while current is not None and current not in seen:
+            if snap.location_type.get(current) == "sector":
+                return current
+            seen.add(current)
+            current = snap.parent.get(current)
+        return location_id
+
+    def lineage(self, db: Session, village_location_id: Optional[int]) -> Optional[Dict[str, Any]]:
+        """
+        Village -> cell -> sector ids and names, shaped like get_village_location_info().
+
+        Villages may hang directly under a sector (no cell level). Returns None for
+        unknown ids.
+        """
+        if village_location_id is None:
+            return None
+        snap = self._get(db)
+        if village_location_id not in snap.location_type:
+            return None
+        out: Dict[str, Any] = {
+            "village_location_id": village_location_id,
+            "village_name": snap.location_name.get(village_location_id),
+            "cell_location_id": None,
+            "cell_name": None,
+            "sector_location_id": None,
+            "sector_name": None,
+        }
+        parent_id = snap.parent.get(village_location_id)
+        if parent_id is not None and snap.location_type.get(parent_id) == "cell":
+            out["cell_location_id"] = parent_id
+            out["cell_name"] = snap.location_name.get(parent_id)
+            parent_id = snap.parent.get(parent_id)
+        if parent_id is not None and snap.location_type.get(parent_id) == "sector":
+            out["sector_location_id"] = parent_id
+            out["sector_name"] = snap.location_name.get(parent_id)
+        return out
+
+
+# Global singleton shared by all API modules.
+location_hierarchy = LocationHierarchy()
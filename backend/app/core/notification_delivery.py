@@ -0,0 +1,126 @@
+"""
+Per-user notification delivery for /ws/notifications.
+
+- A user may have several sockets open (tabs, devices). Each one is registered
+  on notification_hub, a ConnectionManager of its own, under the topic
+  "user:<id>". A push reaches every socket of that user, on every worker when
+  settings.redis_url is set (same relay as the dashboard hub).
+- push_counts() publishes one {"type": "notification_count", "counts":
+  {user_id: n}} batch however many users it covers; each worker's hub splits
+  it into a {"type": "notification_count", "count": n} message per user socket.
+- Unread counts are read from notification_counters, which triggers keep in
+  step with notifications (migration 019), instead of COUNT(*) per request.
+  Until that migration is applied the count falls back to COUNT(*).
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import WebSocket
+from sqlalchemy import func, inspect as sa_inspect
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.websocket import ConnectionManager
+from app.models.notification import Notification
+from app.models.notification_counter import NotificationCounter
+
+
+def user_topic(police_user_id: int) -> str:
+    return f"user:{int(police_user_id)}"
+
+
+def expand_counts(message: Dict[str, Any]) -> Optional[List[Tuple[str, Dict[str, Any]]]]:
+    """Split a batched notification_count message into one message per user topic."""
+    if message.get("type") != "notification_count" or "counts" not in message:
+        return None
+    return [
+        (user_topic(user_id), {"type": "notification_count", "count": count})
+        for user_id, count in message["counts"].items()
+    ]
+
+
+class NotificationManager:
+    def __init__(self, hub: ConnectionManager) -> None:
+        self.hub = hub
+        self._counters: Optional[bool] = None
+
+    # ----- unread counts -----
+
+    def _has_counters(self, db: Session) -> bool:
+        if self._counters is None:
+            self._counters = sa_inspect(db.get_bind()).has_table("notification_counters")
+        return self._counters
+
+    def unread_counts(self, db: Session, police_user_ids: Iterable[int]) -> Dict[int, int]:
+        """Unread notification count per user (0 for users without a counter row)."""
+        ids = sorted({int(i) for i in police_user_ids})
+        if not ids:
+            return {}
+        if self._has_counters(db):
+            rows = db.query(NotificationCounter.police_user_id, NotificationCounter.unread_count).filter(
+                NotificationCounter.police_user_id.in_(ids)
+            )
+        else:
+            rows = (
+                db.query(Notification.police_user_id, func.count(Notification.notification_id))
+                .filter(Notification.police_user_id.in_(ids), Notification.is_read == False)
+                .group_by(Notification.police_user_id)
+            )
+        counts = {i: 0 for i in ids}
+        counts.update({user_id: int(count or 0) for user_id, count in rows})
+        return counts
+
+    def unread_count(self, db: Session, police_user_id: int) -> int:
+        return self.unread_counts(db, [police_user_id])[int(police_user_id)]
+
+    def mark_all_read(self, db: Session, police_user_id: int) -> int:
+        """Mark every unread notification of the user as read; returns how many changed."""
+        changed = (
+            db.query(Notification)
+            .filter(Notification.police_user_id == police_user_id, Notification.is_read == False)
+            .update({Notification.is_read: True}, synchronize_session=False)
+        )
+        db.commit()
+        return changed
+
+    # ----- delivery -----
+
+    async def connect_user(self, websocket: WebSocket, police_user_id: int, unread: int) -> None:
+        """Register one more (already accepted and authenticated) socket for the user and send it the current count."""
+        await self.hub.connect(websocket, accept=False)
+        self.hub.subscribe(websocket, topics=[user_topic(police_user_id)])
+        self.hub.send(websocket, {"type": "notification_count", "count": unread})
+
+    def disconnect(self, websocket: WebSocket) -> None:
+        self.hub.disconnect(websocket)
+
+    def send(self, websocket: WebSocket, message: Dict) -> None:
+        """Reply on one socket only (e.g. a requested count or a pong)."""
+        self.hub.send(websocket, message)
+
+    def send_to_user(self, police_user_id: int, message: Dict) -> None:
+        """Deliver to every socket of the user, on any worker. Safe from any thread."""
+        self.hub.publish(message, topic=user_topic(police_user_id))
+
+    def push_counts(self, db: Session, police_user_ids: Iterable[int]) -> Dict[int, int]:
+        """Send each user their current unread count, as one batched publish; returns the counts."""
+        counts = self.unread_counts(db, police_user_ids)
+        if counts:
+            self.hub.publish({"type": "notification_count", "counts": counts})
+        return counts
+
+
+# Separate hub so per-user topics never mix with dashboard subscriptions.
+notification_hub = ConnectionManager(
+    shards=settings.ws_shards,
+    queue_size=settings.ws_send_queue_size,
+    send_timeout=settings.ws_send_timeout_seconds,
+    max_dropped=settings.ws_max_dropped_messages,
+    redis_url=settings.redis_url,
+    channel=f"{settings.ws_redis_channel}:notifications",
+    expand=expand_counts,
+)
+
+# Global singleton used by the notifications API and /ws/notifications.
+notification_manager = NotificationManager(notification_hub)
@@ -0,0 +1,204 @@
+"""
+Grouped KPI queries for the geographic intelligence performance endpoints.
+
+Coverage, sector and station performance all need "per area unit" report
+statistics where a unit (usually a sector) covers every village beneath it.
+Rather than one nested-subquery report fetch per unit, the unit -> location
+mapping is taken from the cached location tree (app.core.location_hierarchy),
+passed to Postgres as two parallel arrays, and every unit's KPIs come back from
+one grouped query. Officer performance is likewise a single per-day GROUP BY.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.location_hierarchy import location_hierarchy
+
+
+@dataclass
+class AreaKpis:
+    report_count: int = 0
+    device_count: int = 0
+    min_lat: Optional[float] = None
+    max_lat: Optional[float] = None
+    min_lon: Optional[float] = None
+    max_lon: Optional[float] = None
+    confirmed_reports: int = 0
+    flagged_reports: int = 0
+    avg_response_hours: float = 0.0  # reported_at -> verified_at
+    median_response_hours: Optional[float] = None  # first assignment (or report) -> verified_at
+    avg_device_trust: float = 0.0
+    incident_type_distribution: Dict[int, int] = field(default_factory=dict)
+
+    @property
+    def geographic_area_km2(self) -> float:
+        """Rough bounding-box area of the unit's reports."""
+        if self.min_lat is None or self.min_lon is None:
+            return 0.0
+        return (self.max_lat - self.min_lat) * (self.max_lon - self.min_lon) * 111 * 111
+
+
+_AREA_KPIS_SQL = text("""
+WITH m AS (
+    SELECT *
+    FROM unnest(CAST(:location_ids AS integer[]), CAST(:unit_ids AS integer[])) AS m(location_id, unit_id)
+),
+r AS (
+    SELECT m.unit_id,
+           rep.device_id,
+           rep.incident_type_id,
+           rep.latitude::float8 AS lat,
+           rep.longitude::float8 AS lon,
+           rep.verification_status::text AS verification_status,
+           rep.reported_at,
+           rep.verified_at,
+           (
+               SELECT min(a.assigned_at)
+               FROM report_assignments a
+               WHERE a.report_id = rep.report_id
+           ) AS assigned_at
+    FROM reports rep
+    JOIN m ON m.location_id = rep.village_location_id
+    WHERE rep.reported_at >= :since
+),
+stats AS (
+    SELECT unit_id,
+           count(*) AS report_count,
+           count(DISTINCT device_id) AS device_count,
+           min(lat) AS min_lat, max(lat) AS max_lat,
+           min(lon) AS min_lon, max(lon) AS max_lon,
+           count(*) FILTER (WHERE verification_status = 'confirmed') AS confirmed_reports,
+           count(*) FILTER (WHERE verification_status IN ('flagged', 'rejected')) AS flagged_reports,
+           avg(EXTRACT(EPOCH FROM verified_at - reported_at) / 3600.0)
+               FILTER (WHERE verified_at IS NOT NULL) AS avg_response_hours,
+           percentile_cont(0.5) WITHIN GROUP (
+               ORDER BY EXTRACT(EPOCH FROM verified_at - COALESCE(assigned_at, reported_at)) / 3600.0
+           ) FILTER (WHERE verified_at IS NOT NULL) AS median_response_hours
+    FROM r
+    GROUP BY unit_id
+),
+types AS (
+    SELECT unit_id, jsonb_object_agg(incident_type_id, c) AS distribution
+    FROM (SELECT unit_id, incident_type_id, count(*) AS c FROM r GROUP BY 1, 2) t
+    GROUP BY unit_id
+),
+trust AS (
+    SELECT x.unit_id, avg(d.device_trust_score) AS avg_device_trust
+    FROM (SELECT DISTINCT unit_id, device_id FROM r) x
+    JOIN devices d ON d.device_id = x.device_id
+    WHERE d.device_trust_score IS NOT NULL
+    GROUP BY x.unit_id
+)
+SELECT stats.*, types.distribution, trust.avg_device_trust
+FROM stats
+LEFT JOIN types ON types.unit_id = stats.unit_id
+LEFT JOIN trust ON trust.unit_id = stats.unit_id
+""")
+
+
+def unit_location_map(db: Session, unit_ids: Iterable[int]) -> Tuple[List[int], List[int]]:
+    """
+    Parallel (location_id, unit_id) lists covering each unit and everything beneath it.
+
+    A location under several units is attributed to the first unit listed.
+    """
+    location_ids: List[int] = []
+    owners: List[int] = []
+    seen = set()
+    for unit_id in unit_ids:
+        for location_id in location_hierarchy.descendants(db, unit_id):
+            if location_id in seen:
+                continue
+            seen.add(location_id)
+            location_ids.append(location_id)
+            owners.append(unit_id)
+    return location_ids, owners
+
+
+def area_kpis(db: Session, unit_ids: Iterable[int], since: datetime) -> Dict[int, AreaKpis]:
+    """KPIs for every unit in one query; units without reports get an empty AreaKpis."""
+    unit_ids = list(unit_ids)
+    out = {unit_id: AreaKpis() for unit_id in unit_ids}
+    location_ids, owners = unit_location_map(db, unit_ids)
+    if not location_ids:
+        return out
+    rows = db.execute(
+        _AREA_KPIS_SQL,
+        {"location_ids": location_ids, "unit_ids": owners, "since": since},
+    ).mappings()
+    for row in rows:
+        out[row["unit_id"]] = AreaKpis(
+            report_count=int(row["report_count"]),
+            device_count=int(row["device_count"]),
+            min_lat=row["min_lat"],
+            max_lat=row["max_lat"],
+            min_lon=row["min_lon"],
+            max_lon=row["max_lon"],
+            confirmed_reports=int(row["confirmed_reports"] or 0),
+            flagged_reports=int(row["flagged_reports"] or 0),
+            avg_response_hours=float(row["avg_response_hours"] or 0),
+            median_response_hours=(
+                float(row["median_response_hours"]) if row["median_response_hours"] is not None else None
+            ),
+            avg_device_trust=float(row["avg_device_trust"] or 0),
+            incident_type_distribution={
+                int(k): int(v) for k, v in (row["distribution"] or {}).items()
+            },
+        )
+    return out
+
+
+@dataclass
+class OfficerDay:
+    day: date
+    reports_processed: int
+    avg_response_hours: float
+    median_response_hours: Optional[float]
+    verified_count: int
+    flagged_count: int
+
+
+_OFFICER_DAYS_SQL = text("""
+SELECT (rep.reported_at AT TIME ZONE 'UTC')::date AS day,
+       count(*) AS reports_processed,
+       avg(EXTRACT(EPOCH FROM rep.verified_at - COALESCE(a.assigned_at, rep.reported_at)) / 3600.0)
+           AS avg_response_hours,
+       percentile_cont(0.5) WITHIN GROUP (
+           ORDER BY EXTRACT(EPOCH FROM rep.verified_at - COALESCE(a.assigned_at, rep.reported_at)) / 3600.0
+       ) AS median_response_hours,
+       count(*) FILTER (WHERE rep.verification_status::text = 'confirmed') AS verified_count,
+       count(*) FILTER (WHERE rep.verification_status::text IN ('flagged', 'rejected')) AS flagged_count
+FROM reports rep
+LEFT JOIN LATERAL (
+    SELECT min(ra.assigned_at) AS assigned_at
+    FROM report_assignments ra
+    WHERE ra.report_id = rep.report_id AND ra.police_user_id = :officer_id
+) a ON true
+WHERE rep.verified_by = :officer_id AND rep.verified_at >= :since
+GROUP BY 1
+ORDER BY 1
+""")
+
+
+def officer_daily_kpis(db: Session, officer_id: int, since: datetime) -> List[OfficerDay]:
+    """Per-day counts and assignment -> verification response times for one officer."""
+    return [
+        OfficerDay(
+            day=row["day"],
+            reports_processed=int(row["reports_processed"]),
+            avg_response_hours=float(row["avg_response_hours"] or 0),
+            median_response_hours=(
+                float(row["median_response_hours"]) if row["median_response_hours"] is not None else None
+            ),
+            verified_count=int(row["verified_count"] or 0),
+            flagged_count=int(row["flagged_count"] or 0),
+        )
+        for row in db.execute(
+            _OFFICER_DAYS_SQL, {"officer_id": officer_id, "since": since}
+        ).mappings()
+    ]
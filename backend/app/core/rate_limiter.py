@@ -0,0 +1,147 @@
+"""
+Token-bucket rate limiting shared by RouteRateLimitMiddleware.
+
+- A bucket holds up to `burst` tokens and refills at `per_minute / 60` tokens
+  per second; each request takes one token. State is O(1) per key.
+- consume() takes several keys at once (e.g. client IP and device hash): the
+  request passes only if every bucket has a token, and then takes one from each.
+- InMemoryRateLimiter keeps buckets per process and evicts idle keys (a bucket
+  that has refilled completely is the same as no bucket).
+- RedisRateLimiter runs the same algorithm in one Lua script, so all workers
+  share the limits. If Redis is unreachable it falls back to the in-memory
+  limiter for a few seconds at a time rather than rejecting traffic.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_KEYS = 100_000
+SWEEP_INTERVAL_SECONDS = 60.0
+REDIS_RETRY_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    remaining: int
+    retry_after_seconds: int
+
+
+class InMemoryRateLimiter:
+    def __init__(self, max_keys: int = DEFAULT_MAX_KEYS) -> None:
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}  # key -> (tokens, updated_at, full_after)
+        self._max_keys = max_keys
+        self._lock = Lock()
+        self._last_sweep = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _sweep(self, now: float) -> None:
+        idle = [key for key, (_, _, full_after) in self._buckets.items() if full_after <= now]
+        for key in idle:
+            del self._buckets[key]
+        self._last_sweep = now
+
+    async def consume(self, keys: Sequence[str], per_minute: int, burst: int) -> RateLimitDecision:
+        return self.take(keys, per_minute, burst)
+
+    def take(self, keys: Sequence[str], per_minute: int, burst: int) -> RateLimitDecision:
+        rate = per_minute / 60.0
+        capacity = float(max(1, burst))
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sweep > SWEEP_INTERVAL_SECONDS or len(self._buckets) > self._max_keys:
+                self._sweep(now)
+            levels: List[float] = []
+            for key in keys:
+                state = self._buckets.get(key)
+                if state is None:
+                    levels.append(capacity)
+                else:
+                    tokens, updated_at, _ = state
+                    levels.append(min(capacity, tokens + (now - updated_at) * rate))
+            lowest = min(levels)
+            if lowest < 1.0:
+                return RateLimitDecision(False, 0, max(1, math.ceil((1.0 - lowest) / rate)))
+            for key, tokens in zip(keys, levels):
+                tokens -= 1.0
+                self._buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+            return RateLimitDecision(True, int(lowest - 1.0), 0)
+
+
+# KEYS: bucket keys. ARGV: refill rate (tokens/s), capacity.
+# Returns {allowed, remaining, retry_after_seconds}. Uses the Redis clock so
+# workers with skewed clocks agree, and expires each key once it would be full.
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local levels = {}
+local lowest = capacity
+for i, key in ipairs(KEYS) do
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1])
+    local ts = tonumber(state[2])
+    if tokens == nil or ts == nil then
+        tokens = capacity
+    else
+        tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    end
+    levels[i] = tokens
+    if tokens < lowest then lowest = tokens end
+end
+if lowest < 1 then
+    return {0, 0, math.max(1, math.ceil((1 - lowest) / rate))}
+end
+for i, key in ipairs(KEYS) do
+    local tokens = levels[i] - 1
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('EXPIRE', key, math.ceil((capacity - tokens) / rate) + 1)
+end
+return {1, math.floor(lowest - 1), 0}
+"""
+
+
+class RedisRateLimiter:
+    def __init__(self, redis_url: str, prefix: str = "rl:", fallback: Optional[InMemoryRateLimiter] = None) -> None:
+        import redis.asyncio as aioredis  # optional dependency
+
+        self._client = aioredis.Redis.from_url(redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._script = self._client.register_script(_TOKEN_BUCKET_LUA)
+        self._prefix = prefix
+        self._fallback = fallback or InMemoryRateLimiter()
+        self._down_until = 0.0
+
+    async def consume(self, keys: Sequence[str], per_minute: int, burst: int) -> RateLimitDecision:
+        if time.monotonic() < self._down_until:
+            return self._fallback.take(keys, per_minute, burst)
+        try:
+            allowed, remaining, retry_after = await self._script(
+                keys=[self._prefix + key for key in keys],
+                args=[per_minute / 60.0, max(1, burst)],
+            )
+            return RateLimitDecision(bool(int(allowed)), int(remaining), int(retry_after))
+        except Exception as e:
+            # Don't pay a connect timeout on every request while Redis is down.
+            logger.warning(f"Redis rate limiter unavailable, using in-process buckets: {e}")
+            self._down_until = time.monotonic() + REDIS_RETRY_SECONDS
+            return self._fallback.take(keys, per_minute, burst)
+
+
+def build_rate_limiter(redis_url: Optional[str]):
+    """Redis-backed limiter when redis_url is set (and redis is installed), else in-memory."""
+    if redis_url:
+        try:
+            return RedisRateLimiter(redis_url)
+        except Exception as e:
+            logger.warning(f"Redis rate limiter disabled: {e}")
+    return InMemoryRateLimiter()
@@ -0,0 +1,209 @@
+"""
+Per-day report count rollups backing the dashboard and station statistics.
+
+report_daily_rollups holds one row per (day, handling station, village, incident
+type, status, verification status, is_flagged, is_reviewed) with a report count,
+so dashboard counters become small indexed SUMs instead of repeated scans of
+reports.
+
+The table is kept current two ways:
+
+- ORM hooks on Report (insert/update/delete) move one count from the old key to
+  the new key on the same connection as the flush, so the rollup commits or
+  rolls back together with the report change.
+- reconcile_report_rollups() rebuilds the table from reports. main.py runs it
+  periodically to pick up writes that bypass the ORM (bulk query.update(),
+  scripts, manual SQL) and any change whose previous value was not loaded.
+
+Day buckets are UTC dates of reported_at, so "last 7 days" style windows are
+day-aligned rather than rolling to the second.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event, inspect as sa_inspect, text
+from sqlalchemy.orm import Session, attributes
+
+from app.models.report import Report
+
+logger = logging.getLogger(__name__)
+
+# Report attributes that make up a rollup key, in key order after the day.
+_DIMENSION_ATTRS = (
+    "handling_station_id",
+    "village_location_id",
+    "incident_type_id",
+    "status",
+    "verification_status",
+    "is_flagged",
+    "verified_by",
+)
+_KEY_ATTRS = ("reported_at",) + _DIMENSION_ATTRS
+
+RollupKey = Tuple[date, int, int, int, str, str, bool, bool]
+
+_UPSERT_SQL = text("""
+    INSERT INTO report_daily_rollups (
+        day, station_id, village_location_id, incident_type_id,
+        status, verification_status, is_flagged, is_reviewed, report_count
+    )
+    VALUES (
+        :day, :station_id, :village_location_id, :incident_type_id,
+        :status, :verification_status, :is_flagged, :is_reviewed, :delta
+    )
+    ON CONFLICT (
+        day, station_id, village_location_id, incident_type_id,
+        status, verification_status, is_flagged, is_reviewed
+    )
+    DO UPDATE SET report_count = report_daily_rollups.report_count + EXCLUDED.report_count
+""")
+
+_REBUILD_SQL = text("""
+    INSERT INTO report_daily_rollups (
+        day, station_id, village_location_id, incident_type_id,
+        status, verification_status, is_flagged, is_reviewed, report_count
+    )
+    SELECT (COALESCE(reported_at, now()) AT TIME ZONE 'UTC')::date,
+           COALESCE(handling_station_id, 0),
+           COALESCE(village_location_id, 0),
+           incident_type_id,
+           COALESCE(status, ''),
+           COALESCE(verification_status::text, ''),
+           COALESCE(is_flagged, false),
+           verified_by IS NOT NULL,
+           COUNT(*)
+    FROM reports
+    GROUP BY 1, 2, 3, 4, 5, 6, 7, 8
+""")
+
+# None until the first flush checks whether the table exists (migration 015).
+_table_available: Optional[bool] = None
+
+
+def rollup_key(values: Dict[str, Any]) -> Optional[RollupKey]:
+    """Normalise report attribute values into a rollup key (None if incident type is unknown)."""
+    if values.get("incident_type_id") is None:
+        return None
+    reported_at = values.get("reported_at")
+    if isinstance(reported_at, datetime):
+        if reported_at.tzinfo is not None:
+            reported_at = reported_at.astimezone(timezone.utc)
+        day = reported_at.date()
+    else:
+        day = datetime.now(timezone.utc).date()
+    return (
+        day,
+        int(values.get("handling_station_id") or 0),
+        int(values.get("village_location_id") or 0),
+        int(values["incident_type_id"]),
+        str(values.get("status") or ""),
+        str(values.get("verification_status") or ""),
+        bool(values.get("is_flagged")),
+        values.get("verified_by") is not None,
+    )
+
+
+def _apply(connection, key: Optional[RollupKey], delta: int) -> None:
+    if key is None:
+        return
+    day, station_id, village_id, incident_type_id, status, verification, flagged, reviewed = key
+    connection.execute(
+        _UPSERT_SQL,
+        {
+            "day": day,
+            "station_id": station_id,
+            "village_location_id": village_id,
+            "incident_type_id": incident_type_id,
+            "status": status,
+            "verification_status": verification,
+            "is_flagged": flagged,
+            "is_reviewed": reviewed,
+            "delta": delta,
+        },
+    )
+
+
+def _enabled(connection) -> bool:
+    global _table_available
+    if _table_available is None:
+        try:
+            _table_available = sa_inspect(connection).has_table("report_daily_rollups")
+        except Exception:
+            return False
+    return _table_available
+
+
+def _current_values(connection, target: Report) -> Dict[str, Any]:
+    """Loaded attribute values, with anything unloaded/server-generated read back from the row."""
+    state = sa_inspect(target)
+    values = {attr: state.dict[attr] for attr in _KEY_ATTRS if attr in state.dict}
+    missing = [attr for attr in _KEY_ATTRS if attr not in values]
+    if missing and target.report_id is not None:
+        row = connection.execute(
+            text(f"SELECT {', '.join(missing)} FROM reports WHERE report_id = :rid"),
+            {"rid": target.report_id},
+        ).mappings().first()
+        if row is not None:
+            values.update(row)
+    return values
+
+
+def _previous_values(target: Report, current: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Pre-flush values, or None when a changed attribute's old value was never loaded."""
+    previous = dict(current)
+    committed = sa_inspect(target).committed_state
+    for attr in _KEY_ATTRS:
+        if attr not in committed:
+            continue
+        original = committed[attr]
+        if original is attributes.NO_VALUE:
+            if attr == "reported_at":
+                continue
+            # Expired attribute overwritten without loading: leave it to reconcile.
+            return None
+        previous[attr] = original
+    return previous
+
+
+@event.listens_for(Report, "after_insert")
+def _report_inserted(mapper, connection, target: Report) -> None:
+    if not _enabled(connection):
+        return
+    _apply(connection, rollup_key(_current_values(connection, target)), 1)
+
+
+@event.listens_for(Report, "after_update")
+def _report_updated(mapper, connection, target: Report) -> None:
+    if not _enabled(connection):
+        return
+    current = _current_values(connection, target)
+    previous = _previous_values(target, current)
+    if previous is None:
+        logger.debug("Report %s rollup key change deferred to reconcile", target.report_id)
+        return
+    old_key, new_key = rollup_key(previous), rollup_key(current)
+    if old_key == new_key:
+        return
+    _apply(connection, old_key, -1)
+    _apply(connection, new_key, 1)
+
+
+@event.listens_for(Report, "before_delete")
+def _report_deleting(mapper, connection, target: Report) -> None:
+    # before_delete so unloaded attributes can still be read back from the row.
+    if not _enabled(connection):
+        return
+    _apply(connection, rollup_key(_current_values(connection, target)), -1)
+
+
+def reconcile_report_rollups(db: Session) -> None:
+    """Rebuild report_daily_rollups from reports in one transaction."""
+    # EXCLUSIVE blocks concurrent hook upserts until the rebuild commits, so a report
+    # committed meanwhile is counted exactly once (by its hook, after the rebuild).
+    db.execute(text("LOCK TABLE report_daily_rollups IN EXCLUSIVE MODE"))
+    db.execute(text("DELETE FROM report_daily_rollups"))
+    db.execute(_REBUILD_SQL)
+    db.commit()
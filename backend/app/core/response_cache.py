@@ -0,0 +1,403 @@
+"""
+Short-TTL cache for read-heavy dashboard endpoints.
+
+Dashboard widgets poll, and the frontend re-fetches all of them on every
+`refresh_data` websocket message, so the same aggregates are recomputed many
+times per minute. cached_response() wraps an endpoint so identical calls (same
+route, query params and user scope) share one computed response:
+
+- Local LRU of JSON-encoded responses, optionally backed by Redis
+  (settings.redis_url) so several workers share entries.
+- Entries are tagged with entity names ("report", "hotspot", "case", ...).
+  Each tag has a generation counter; ConnectionManager.broadcast() bumps the
+  generation for the event's entity, which orphans every entry computed under
+  the old generation. No key scanning is needed.
+- Concurrent identical requests are coalesced: one computes, the rest wait for
+  its result.
+- Hit/miss/coalesced counters per route are available from stats().
+- Async endpoints and invalidations raised on the event loop (websocket
+  publishes) talk to Redis through redis.asyncio, so a slow Redis never
+  stalls the loop; the blocking client is only used from worker threads.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 512
+
+# Broadcast entities that also change data tagged with another entity.
+_EVENT_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "station": ("location",),
+    "geographic_intelligence": ("report",),
+}
+
+_MISSING = object()
+
+# Request parameters that never belong in a cache key.
+_UNKEYED_PARAMS = frozenset({"db", "current_user", "background_tasks", "request", "response"})
+
+
+def user_scope(user: Any) -> str:
+    """Cache scope for a police user: admins share, supervisors per station, officers per user."""
+    if user is None:
+        return "public"
+    role = getattr(user, "role", None)
+    if role == "admin":
+        return "admin"
+    if role == "supervisor":
+        return f"supervisor:{getattr(user, 'station_id', None)}"
+    return f"{role}:{getattr(user, 'police_user_id', None)}"
+
+
+class _InFlight:
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.value: Any = _MISSING
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, redis_url: Optional[str] = None) -> None:
+        self._max_entries = max_entries
+        # key -> (expires_at, tag generations at compute time, value)
+        self._entries: "OrderedDict[str, Tuple[float, Tuple[int, ...], Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = defaultdict(int)
+        self._inflight: Dict[str, _InFlight] = {}
+        self._async_inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0, "coalesced": 0})
+        self._invalidations: Dict[str, int] = defaultdict(int)
+        self._redis_url = redis_url
+        self._redis = None
+        # redis.asyncio client for the loop it was created on (clients are loop-bound).
+        self._async_redis_client = None
+        self._async_redis_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Redis generation bumps started on the loop and not finished yet.
+        self._pending_invalidations: "set[asyncio.Task]" = set()
+        if redis_url:
+            try:
+                import redis  # optional dependency
+
+                self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.5)
+            except Exception as e:
+                logger.warning(f"Response cache Redis backend disabled: {e}")
+
+    # ----- keys and generations -----
+
+    @staticmethod
+    def make_key(route: str, params: Dict[str, Any], scope: str) -> str:
+        encoded = json.dumps(jsonable_encoder(params), sort_keys=True, separators=(",", ":"))
+        digest = hashlib.sha1(encoded.encode("utf-8")).hexdigest()[:16]
+        return f"{route}|{scope}|{digest}"
+
+    def _async_redis(self):
+        loop = asyncio.get_running_loop()
+        if self._async_redis_client is None or self._async_redis_loop is not loop:
+            import redis.asyncio as aioredis
+
+            self._async_redis_client = aioredis.Redis.from_url(self._redis_url, socket_timeout=0.5)
+            self._async_redis_loop = loop
+        return self._async_redis_client
+
+    def _tag_generations(self, tags: Tuple[str, ...]) -> Tuple[int, ...]:
+        if self._redis is not None and tags:
+            try:
+                raw = self._redis.mget([f"rc:tag:{tag}" for tag in tags])
+                return tuple(int(v or 0) for v in raw)
+            except Exception as e:
+                logger.debug(f"Response cache Redis generation read failed: {e}")
+        return tuple(self._generations[tag] for tag in tags)
+
+    async def _tag_generations_async(self, tags: Tuple[str, ...]) -> Tuple[int, ...]:
+        if self._redis is not None and tags:
+            if self._pending_invalidations:
+                # Read after this worker's own bumps have landed.
+                await asyncio.gather(*self._pending_invalidations, return_exceptions=True)
+            try:
+                raw = await self._async_redis().mget([f"rc:tag:{tag}" for tag in tags])
+                return tuple(int(v or 0) for v in raw)
+            except Exception as e:
+                logger.debug(f"Response cache Redis generation read failed: {e}")
+        return tuple(self._generations[tag] for tag in tags)
+
+    def invalidate(self, *tags: str) -> None:
+        """Bump tag generations so entries computed before now are ignored."""
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] += 1
+                self._invalidations[tag] += 1
+        if self._redis is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None:
+            # On the event loop (e.g. a websocket publish): bump in a task instead of blocking.
+            task = loop.create_task(self._invalidate_remote_async(tags))
+            self._pending_invalidations.add(task)
+            task.add_done_callback(self._pending_invalidations.discard)
+            return
+        try:
+            pipe = self._redis.pipeline()
+            for tag in tags:
+                pipe.incr(f"rc:tag:{tag}")
+            pipe.execute()
+        except Exception as e:
+            logger.debug(f"Response cache Redis invalidation failed: {e}")
+
+    async def _invalidate_remote_async(self, tags: Tuple[str, ...]) -> None:
+        try:
+            client = self._async_redis()
+            for tag in tags:
+                await client.incr(f"rc:tag:{tag}")
+        except Exception as e:
+            logger.debug(f"Response cache Redis invalidation failed: {e}")
+
+    def invalidate_for_event(self, message: Dict[str, Any]) -> None:
+        """Invalidate the tags touched by a websocket `refresh_data` event."""
+        entity = message.get("entity") if isinstance(message, dict) else None
+        if not entity:
+            return
+        self.invalidate(entity, *_EVENT_ALIASES.get(entity, ()))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # ----- storage -----
+
+    def _get_local(self, key: str, generations: Tuple[int, ...]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, entry_generations, value = entry
+                if expires_at > now and entry_generations == generations:
+                    self._entries.move_to_end(key)
+                    return value
+                del self._entries[key]
+        return _MISSING
+
+    @staticmethod
+    def _decode_remote(raw: Any, generations: Tuple[int, ...]) -> Any:
+        if raw is None:
+            return _MISSING
+        stored = json.loads(raw)
+        return stored["v"] if tuple(stored["g"]) == generations else _MISSING
+
+    def _get(self, key: str, generations: Tuple[int, ...]) -> Any:
+        value = self._get_local(key, generations)
+        if value is _MISSING and self._redis is not None:
+            try:
+                value = self._decode_remote(self._redis.get(f"rc:{key}"), generations)
+            except Exception as e:
+                logger.debug(f"Response cache Redis read failed: {e}")
+        return value
+
+    async def _get_async(self, key: str, generations: Tuple[int, ...]) -> Any:
+        value = self._get_local(key, generations)
+        if value is _MISSING and self._redis is not None:
+            try:
+                value = self._decode_remote(await self._async_redis().get(f"rc:{key}"), generations)
+            except Exception as e:
+                logger.debug(f"Response cache Redis read failed: {e}")
+        return value
+
+    def _set_local(self, key: str, generations: Tuple[int, ...], value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, generations, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _encode_remote(generations: Tuple[int, ...], value: Any) -> str:
+        return json.dumps({"g": list(generations), "v": value}, separators=(",", ":"))
+
+    def _set(self, key: str, generations: Tuple[int, ...], value: Any, ttl: float) -> None:
+        self._set_local(key, generations, value, ttl)
+        if self._redis is not None:
+            try:
+                self._redis.set(f"rc:{key}", self._encode_remote(generations, value), ex=max(1, int(ttl)))
+            except Exception as e:
+                logger.debug(f"Response cache Redis write failed: {e}")
+
+    async def _set_async(self, key: str, generations: Tuple[int, ...], value: Any, ttl: float) -> None:
+        self._set_local(key, generations, value, ttl)
+        if self._redis is not None:
+            try:
+                await self._async_redis().set(
+                    f"rc:{key}", self._encode_remote(generations, value), ex=max(1, int(ttl))
+                )
+            except Exception as e:
+                logger.debug(f"Response cache Redis write failed: {e}")
+
+    def _count(self, route: str, outcome: str) -> None:
+        with self._lock:
+            self._stats[route][outcome] += 1
+
+    # ----- compute -----
+
+    def get_or_compute(
+        self,
+        route: str,
+        key: str,
+        tags: Tuple[str, ...],
+        ttl: float,
+        compute: Callable[[], Any],
+        encode: Callable[[Any], Any] = jsonable_encoder,
+    ) -> Any:
+        """Return the cached value for key, or compute it once even under concurrent callers."""
+        generations = self._tag_generations(tags)
+        value = self._get(key, generations)
+        if value is not _MISSING:
+            self._count(route, "hits")
+            return value
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _InFlight()
+        if not leader:
+            flight.event.wait()
+            if flight.value is not _MISSING:
+                self._count(route, "coalesced")
+                return flight.value
+            # Leader failed; compute independently so the error surfaces here too.
+            return encode(compute())
+
+        self._count(route, "misses")
+        try:
+            value = encode(compute())
+            flight.value = value
+            self._set(key, generations, value, ttl)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    async def get_or_compute_async(
+        self,
+        route: str,
+        key: str,
+        tags: Tuple[str, ...],
+        ttl: float,
+        compute: Callable[[], Any],
+        encode: Callable[[Any], Any] = jsonable_encoder,
+    ) -> Any:
+        generations = await self._tag_generations_async(tags)
+        value = await self._get_async(key, generations)
+        if value is not _MISSING:
+            self._count(route, "hits")
+            return value
+
+        pending = self._async_inflight.get(key)
+        if pending is not None:
+            self._count(route, "coalesced")
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._async_inflight[key] = future
+        self._count(route, "misses")
+        try:
+            value = encode(await compute())
+            await self._set_async(key, generations, value, ttl)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            # Nobody may be awaiting; mark retrieved to avoid "exception never retrieved".
+            future.exception()
+            raise
+        finally:
+            self._async_inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            routes = {route: dict(counts) for route, counts in self._stats.items()}
+            return {
+                "backend": "redis" if self._redis is not None else "local",
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "routes": routes,
+                "hits": sum(c["hits"] for c in routes.values()),
+                "misses": sum(c["misses"] for c in routes.values()),
+                "coalesced": sum(c["coalesced"] for c in routes.values()),
+                "invalidations": dict(self._invalidations),
+            }
+
+
+def cached_response(
+    route: str,
+    ttl: float,
+    tags: Iterable[str],
+    scope: Callable[[Any], str] = user_scope,
+    response_model: Any = None,
+):
+    """
+    Cache an endpoint's response by route + query params + scope(current_user).
+
+    The wrapped function keeps its signature for FastAPI. Responses are stored
+    JSON-encoded, so cached and fresh responses serialise identically; pass the
+    route's response_model when the endpoint returns ORM objects.
+    """
+    tags = tuple(tags)
+    if response_model is not None:
+        adapter = TypeAdapter(response_model)
+
+        def encode(value: Any) -> Any:
+            return adapter.dump_python(adapter.validate_python(value, from_attributes=True), mode="json")
+    else:
+        encode = jsonable_encoder
+
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        def _key(args, kwargs) -> str:
+            bound = signature.bind_partial(*args, **kwargs)
+            params = {k: v for k, v in bound.arguments.items() if k not in _UNKEYED_PARAMS}
+            return response_cache.make_key(route, params, scope(bound.arguments.get("current_user")))
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                return await response_cache.get_or_compute_async(
+                    route, _key(args, kwargs), tags, ttl, lambda: fn(*args, **kwargs), encode
+                )
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return response_cache.get_or_compute(
+                route, _key(args, kwargs), tags, ttl, lambda: fn(*args, **kwargs), encode
+            )
+
+        return wrapper
+
+    return decorator
+
+
+# Global singleton shared by all API modules.
+response_cache = ResponseCache(
+    max_entries=settings.response_cache_max_entries,
+    redis_url=settings.redis_url,
+)
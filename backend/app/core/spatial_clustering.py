@@ -0,0 +1,126 @@
+"""
+Indexed radius neighbourhoods and clustering over report coordinates.
+
+Shared by hotspot detection (trust-weighted DBSCAN in app.core.hotspot_auto) and
+the geographic intelligence clustering endpoint. Points are indexed once in a
+haversine BallTree, so each neighbourhood lookup touches only nearby points
+instead of scanning every report.
+"""
+from __future__ import annotations
+
+from typing import List, Optional, Sequence
+
+import numpy as np
+from sklearn.neighbors import BallTree
+
+EARTH_RADIUS_METERS = 6371000.0
+
+
+class RadiusIndex:
+    """Great-circle radius lookups over a fixed set of lat/lon points."""
+
+    def __init__(self, lats: Sequence[float], lons: Sequence[float]) -> None:
+        coords = np.radians(np.column_stack([
+            np.asarray(lats, dtype=np.float64),
+            np.asarray(lons, dtype=np.float64),
+        ])) if len(lats) else np.empty((0, 2))
+        self._coords = coords
+        self._tree = BallTree(coords, metric="haversine") if len(coords) else None
+
+    def __len__(self) -> int:
+        return int(self._coords.shape[0])
+
+    def neighbors(self, i: int, radius_meters: float) -> np.ndarray:
+        """Indices (ascending, including i) of points within radius_meters of point i."""
+        if self._tree is None:
+            return np.empty(0, dtype=np.intp)
+        found = self._tree.query_radius(
+            self._coords[i:i + 1], r=radius_meters / EARTH_RADIUS_METERS
+        )[0]
+        found.sort()
+        return found
+
+
+def dbscan_labels(
+    index: RadiusIndex,
+    eps_meters: float,
+    min_pts: int,
+    weights: Optional[Sequence[float]] = None,
+    min_weight: float = 0.0,
+) -> List[int]:
+    """
+    DBSCAN labels (-1 noise, >=0 cluster id) using the index for neighbourhoods.
+
+    A point is a core point when it has at least min_pts neighbours and, when
+    weights are given, the neighbours' summed weight reaches min_weight.
+    """
+    n = len(index)
+    w = np.asarray(weights, dtype=np.float64) if weights is not None else None
+    labels = [-2] * n  # -2 unvisited, -1 noise, >=0 cluster id
+    cluster_id = 0
+
+    def core_neighbors(i: int) -> Optional[np.ndarray]:
+        nbs = index.neighbors(i, eps_meters)
+        if nbs.size < min_pts:
+            return None
+        if w is not None and float(w[nbs].sum()) < min_weight:
+            return None
+        return nbs
+
+    for i in range(n):
+        if labels[i] != -2:
+            continue
+        nbs = core_neighbors(i)
+        if nbs is None:
+            labels[i] = -1
+            continue
+
+        labels[i] = cluster_id
+        queue = [int(j) for j in nbs]
+        queued = set(queue)
+        qi = 0
+        while qi < len(queue):
+            j = queue[qi]
+            qi += 1
+            if labels[j] == -1:
+                labels[j] = cluster_id
+            if labels[j] != -2:
+                continue
+            labels[j] = cluster_id
+            jn = core_neighbors(j)
+            if jn is not None:
+                for cand in jn:
+                    cand = int(cand)
+                    if cand not in queued:
+                        queued.add(cand)
+                        queue.append(cand)
+
+        cluster_id += 1
+
+    return labels
+
+
+def radius_clusters(
+    index: RadiusIndex,
+    radius_meters: float,
+    device_ids: Sequence[object],
+    min_devices: int,
+) -> List[List[int]]:
+    """
+    Greedy radius grouping: each unclaimed point, in order, gathers the unclaimed
+    points after it within radius_meters. Groups with at least min_devices
+    distinct devices are kept and claim their points; smaller groups release
+    them for later seeds.
+    """
+    claimed = np.zeros(len(index), dtype=bool)
+    clusters: List[List[int]] = []
+    for i in range(len(index)):
+        if claimed[i]:
+            continue
+        nbs = index.neighbors(i, radius_meters)
+        members = [i] + [int(j) for j in nbs if j > i and not claimed[j]]
+        if len({device_ids[j] for j in members}) < min_devices:
+            continue
+        claimed[members] = True
+        clusters.append(members)
+    return clusters
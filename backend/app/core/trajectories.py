@@ -0,0 +1,242 @@
+"""
+Columnar device trajectories for movement and speed analytics.
+
+Devices keep a `location_history` list in metadata_json. Instead of walking each
+list point by point, the histories for a query window are flattened once into
+a TrajectoryTable (parallel NumPy arrays: device index, epoch seconds, lat, lon)
+and turned into a SegmentSet of consecutive-point segments with distances and
+speeds computed over whole arrays.
+
+Both /movement-flows and /speed-analysis read the same SegmentSet, which is
+cached briefly per (time window, sector) so the two dashboard panels share one
+load.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Integer
+from sqlalchemy.orm import Session
+
+from app.models.device import Device
+
+EARTH_RADIUS_KM = 6371.0
+SEGMENT_CACHE_TTL_SECONDS = 60.0
+
+
+@dataclass
+class TrajectoryTable:
+    """Flattened location histories; rows of one device are contiguous and in history order."""
+
+    device_ids: List[Any]
+    device_hashes: List[str]
+    device_idx: np.ndarray  # int32, index into device_ids
+    ts: np.ndarray  # float64 epoch seconds, NaN when unparseable
+    lat: np.ndarray  # float64, NaN when missing
+    lon: np.ndarray
+    timestamps: np.ndarray  # object, original timestamp strings for responses
+    devices_with_history: int
+
+    @classmethod
+    def from_histories(cls, rows: Sequence[Tuple[Any, str, Optional[list]]]) -> "TrajectoryTable":
+        """Build from (device_id, device_hash, location_history) rows."""
+        device_ids: List[Any] = []
+        device_hashes: List[str] = []
+        idx: List[int] = []
+        lat: List[float] = []
+        lon: List[float] = []
+        stamps: List[Any] = []
+        with_history = 0
+        for device_id, device_hash, history in rows:
+            if not isinstance(history, list) or len(history) < 2:
+                continue
+            with_history += 1
+            n = len(device_ids)
+            device_ids.append(device_id)
+            device_hashes.append(device_hash or "")
+            for point in history:
+                point = point if isinstance(point, dict) else {}
+                idx.append(n)
+                lat.append(_as_float(point.get("latitude")))
+                lon.append(_as_float(point.get("longitude")))
+                stamps.append(point.get("timestamp"))
+
+        timestamps = np.array(stamps, dtype=object)
+        parsed = pd.to_datetime(
+            pd.Series(timestamps, dtype=object), utc=True, errors="coerce", format="ISO8601"
+        )
+        ts = parsed.to_numpy(dtype="datetime64[ns]").astype("int64").astype(np.float64) / 1e9
+        ts[parsed.isna().to_numpy()] = np.nan
+        return cls(
+            device_ids=device_ids,
+            device_hashes=device_hashes,
+            device_idx=np.asarray(idx, dtype=np.int32),
+            ts=ts,
+            lat=np.asarray(lat, dtype=np.float64),
+            lon=np.asarray(lon, dtype=np.float64),
+            timestamps=timestamps,
+            devices_with_history=with_history,
+        )
+
+
+@dataclass
+class SegmentSet:
+    """Consecutive-point segments with positive duration and known coordinates."""
+
+    table: TrajectoryTable
+    device_idx: np.ndarray
+    start: np.ndarray  # row index of the segment's first point in table
+    end: np.ndarray  # row index of the segment's second point
+    distance_km: np.ndarray
+    hours: np.ndarray
+    speed_kmh: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.device_idx.size)
+
+
+def _as_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def haversine_km(lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """Element-wise great-circle distance in kilometres."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def build_segments(table: TrajectoryTable) -> SegmentSet:
+    start = np.arange(table.device_idx.size - 1)
+    end = start + 1
+    same_device = table.device_idx[start] == table.device_idx[end]
+    start, end = start[same_device], end[same_device]
+
+    hours = (table.ts[end] - table.ts[start]) / 3600.0
+    distance = haversine_km(table.lat[start], table.lon[start], table.lat[end], table.lon[end])
+    valid = np.isfinite(distance) & np.isfinite(hours) & (hours > 0)
+    start, end, hours, distance = start[valid], end[valid], hours[valid], distance[valid]
+    return SegmentSet(
+        table=table,
+        device_idx=table.device_idx[start],
+        start=start,
+        end=end,
+        distance_km=distance,
+        hours=hours,
+        speed_kmh=distance / hours,
+    )
+
+
+def aggregate_flows(segments: SegmentSet, min_devices: int) -> List[Dict[str, Any]]:
+    """
+    Group segments that cross a 0.01 degree cell boundary by (from cell, to cell).
+
+    Returns flows with at least min_devices distinct devices, strongest first.
+    """
+    if not len(segments):
+        return []
+    table = segments.table
+    frame = pd.DataFrame({
+        "from_lat": np.round(table.lat[segments.start] * 100).astype(np.int64),
+        "from_lon": np.round(table.lon[segments.start] * 100).astype(np.int64),
+        "to_lat": np.round(table.lat[segments.end] * 100).astype(np.int64),
+        "to_lon": np.round(table.lon[segments.end] * 100).astype(np.int64),
+        "device": segments.device_idx,
+        "speed": segments.speed_kmh,
+        "distance": segments.distance_km,
+    })
+    moved = (frame["from_lat"] != frame["to_lat"]) | (frame["from_lon"] != frame["to_lon"])
+    grouped = (
+        frame[moved]
+        .groupby(["from_lat", "from_lon", "to_lat", "to_lon"], sort=False)
+        .agg(
+            device_count=("device", "nunique"),
+            movement_count=("device", "size"),
+            avg_speed=("speed", "mean"),
+            avg_distance=("distance", "mean"),
+        )
+        .reset_index()
+    )
+    grouped = grouped[grouped["device_count"] >= min_devices].sort_values(
+        "device_count", ascending=False, kind="stable"
+    )
+    return [
+        {
+            "from_sector": f"sector_{row.from_lat / 100:.2f}_{row.from_lon / 100:.2f}",
+            "to_sector": f"sector_{row.to_lat / 100:.2f}_{row.to_lon / 100:.2f}",
+            "device_count": int(row.device_count),
+            "movement_count": int(row.movement_count),
+            "avg_speed_kmh": round(float(row.avg_speed), 2),
+            "avg_distance_km": round(float(row.avg_distance), 2),
+            "flow_strength": int(row.device_count),
+        }
+        for row in grouped.itertuples(index=False)
+    ]
+
+
+def segment_rows(segments: SegmentSet, positions: np.ndarray) -> List[Dict[str, Any]]:
+    """Response dicts for the selected segment positions."""
+    table = segments.table
+    rows = []
+    for pos in positions:
+        s, e = segments.start[pos], segments.end[pos]
+        device = segments.device_idx[pos]
+        rows.append({
+            "device_id": table.device_ids[device],
+            "device_hash": table.device_hashes[device][:8] + "...",
+            "from_lat": float(table.lat[s]),
+            "from_lng": float(table.lon[s]),
+            "to_lat": float(table.lat[e]),
+            "to_lng": float(table.lon[e]),
+            "distance_km": round(float(segments.distance_km[pos]), 2),
+            "time_hours": round(float(segments.hours[pos]), 2),
+            "speed_kmh": round(float(segments.speed_kmh[pos]), 2),
+            "timestamp": table.timestamps[e],
+        })
+    return rows
+
+
+_segment_cache: Dict[Tuple[int, Optional[int]], Tuple[float, SegmentSet, int]] = {}
+_segment_cache_lock = Lock()
+
+
+def load_segments(db: Session, time_window_hours: int, sector_id: Optional[int]) -> Tuple[SegmentSet, int]:
+    """
+    Segments for devices seen in the window (optionally in one sector), plus the
+    number of devices considered. Cached for SEGMENT_CACHE_TTL_SECONDS.
+    """
+    key = (time_window_hours, sector_id)
+    cached = _segment_cache.get(key)
+    if cached is not None and time.monotonic() - cached[0] < SEGMENT_CACHE_TTL_SECONDS:
+        return cached[1], cached[2]
+
+    since = datetime.now(timezone.utc) - timedelta(hours=time_window_hours)
+    query = db.query(
+        Device.device_id,
+        Device.device_hash,
+        Device.metadata_json["location_history"],
+    ).filter(
+        Device.metadata_json.isnot(None),
+        Device.last_seen_at >= since,
+    )
+    if sector_id:
+        query = query.filter(
+            Device.metadata_json["current_sector_location_id"].astext.cast(Integer) == sector_id
+        )
+    rows = query.all()
+    segments = build_segments(TrajectoryTable.from_histories(rows))
+
+    with _segment_cache_lock:
+        if len(_segment_cache) >= 64:
+            _segment_cache.clear()
+        _segment_cache[key] = (time.monotonic(), segments, len(rows))
+    return segments, len(rows)
@@ -0,0 +1,196 @@
+"""
+Mapbox vector tiles (MVT) for the Safety Map and dashboard maps.
+
+Tiles are rendered by PostGIS (ST_TileEnvelope / ST_AsMVTGeom / ST_AsMVT) so a
+map only fetches geometry inside the viewport, already clipped, simplified to
+about one tile pixel and quantized to the tile extent:
+
+- "locations": active sector/cell/village polygons; finer levels appear only
+  from LOCATION_MIN_ZOOM upwards so low zooms stay small.
+- "hotspots": hotspot centres detected in the last CURRENT_HOTSPOT_HOURS (the
+  same "current" window as /public/hotspots), as points.
+
+Rendered tiles are gzip-compressed and cached on disk under
+settings.tile_cache_dir/<layer>/<version>/<z>/<x>/<y>.mvt.gz. The layer version
+comes from dataset_versions (bumped by triggers on locations / hotspots, see
+migrations 016 and 017); when it changes, tiles of older versions are removed.
+The hotspots version also includes the hour of its 24h cutoff so expired
+hotspots drop out without a write.
+"""
+from __future__ import annotations
+
+import gzip
+import logging
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import inspect as sa_inspect, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.geojson_artifacts import dataset_version
+from app.core.hotspot_auto import CURRENT_HOTSPOT_HOURS
+
+logger = logging.getLogger(__name__)
+
+MAX_ZOOM = 22
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+# Half the Web Mercator world width in metres.
+WEB_MERCATOR_HALF_WORLD = 20037508.342789244
+LOCATION_MIN_ZOOM = {"sector": 0, "cell": 10, "village": 12}
+# Version bucket used before migration 016 is applied.
+FALLBACK_VERSION_SECONDS = 300
+
+_LOCATIONS_SQL = text(f"""
+WITH bounds AS (SELECT ST_TileEnvelope(:z, :x, :y) AS env),
+features AS (
+    SELECT l.location_id,
+           l.location_type,
+           l.location_name AS name,
+           l.parent_location_id,
+           ST_AsMVTGeom(
+               ST_SimplifyPreserveTopology(ST_Transform(l.geometry, 3857), :tolerance),
+               bounds.env, {TILE_EXTENT}, {TILE_BUFFER}, true
+           ) AS geom
+    FROM locations l, bounds
+    WHERE l.is_active = true
+      AND l.geometry IS NOT NULL
+      AND l.location_type = ANY(CAST(:location_types AS text[]))
+      AND l.geometry && ST_Transform(bounds.env, 4326)
+)
+SELECT ST_AsMVT(features, 'locations', {TILE_EXTENT}, 'geom')
+FROM features
+WHERE geom IS NOT NULL
+""")
+
+_HOTSPOTS_SQL = text(f"""
+WITH bounds AS (SELECT ST_TileEnvelope(:z, :x, :y) AS env),
+features AS (
+    SELECT h.hotspot_id,
+           h.risk_level,
+           h.incident_count,
+           h.radius_meters::float8 AS radius_meters,
+           h.incident_type_id,
+           h.time_window_hours,
+           ST_AsMVTGeom(
+               ST_Transform(ST_SetSRID(ST_MakePoint(h.center_long::float8, h.center_lat::float8), 4326), 3857),
+               bounds.env, {TILE_EXTENT}, {TILE_BUFFER}, true
+           ) AS geom
+    FROM hotspots h, bounds
+    WHERE h.detected_at >= :since
+)
+SELECT ST_AsMVT(features, 'hotspots', {TILE_EXTENT}, 'geom')
+FROM features
+WHERE geom IS NOT NULL
+""")
+
+LAYERS = ("locations", "hotspots")
+
+
+def tile_in_range(z: int, x: int, y: int) -> bool:
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def pixel_size_meters(z: int) -> float:
+    """Web Mercator width of one tile-extent unit at zoom z (the simplify tolerance)."""
+    return 2 * WEB_MERCATOR_HALF_WORLD / (2 ** z) / TILE_EXTENT
+
+
+def location_types_for_zoom(z: int) -> list:
+    return [t for t, min_zoom in LOCATION_MIN_ZOOM.items() if z >= min_zoom]
+
+
+def _hotspot_cutoff(now: Optional[datetime] = None) -> datetime:
+    """Start of the current-hotspot window, truncated to the hour so tiles stay cacheable."""
+    now = now or datetime.now(timezone.utc)
+    return now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=CURRENT_HOTSPOT_HOURS)
+
+
+def render_tile(db: Session, layer: str, z: int, x: int, y: int) -> bytes:
+    """Uncompressed MVT bytes for one tile (empty for tiles without features)."""
+    if layer == "locations":
+        result = db.execute(_LOCATIONS_SQL, {
+            "z": z, "x": x, "y": y,
+            "tolerance": pixel_size_meters(z),
+            "location_types": location_types_for_zoom(z),
+        }).scalar()
+    elif layer == "hotspots":
+        result = db.execute(_HOTSPOTS_SQL, {"z": z, "x": x, "y": y, "since": _hotspot_cutoff()}).scalar()
+    else:
+        raise ValueError(f"Unknown tile layer: {layer}")
+    return bytes(result or b"")
+
+
+class VectorTileCache:
+    def __init__(self, root: str) -> None:
+        self._root = Path(root)
+        self._versioned: Optional[bool] = None
+        self._current: Dict[str, str] = {}
+        self._lock = Lock()
+
+    def layer_version(self, db: Session, layer: str) -> str:
+        if self._versioned is None:
+            self._versioned = sa_inspect(db.get_bind()).has_table("dataset_versions")
+        if not self._versioned:
+            version = f"t{int(time.time() // FALLBACK_VERSION_SECONDS)}"
+        else:
+            version = f"v{dataset_version(db, layer)}"
+        if layer == "hotspots":
+            version += _hotspot_cutoff().strftime("-%Y%m%d%H")
+        return version
+
+    def _path(self, layer: str, version: str, z: int, x: int, y: int) -> Path:
+        return self._root / layer / version / str(z) / str(x) / f"{y}.mvt.gz"
+
+    def _prune(self, layer: str, version: str) -> None:
+        """Remove cached tiles of every other version of layer (once per version change)."""
+        with self._lock:
+            if self._current.get(layer) == version:
+                return
+            self._current[layer] = version
+        layer_dir = self._root / layer
+        if not layer_dir.is_dir():
+            return
+        for child in layer_dir.iterdir():
+            if child.name != version:
+                shutil.rmtree(child, ignore_errors=True)
+
+    def get(
+        self, db: Session, layer: str, z: int, x: int, y: int, version: Optional[str] = None
+    ) -> Tuple[str, bytes]:
+        """(layer version, gzip-compressed tile), rendering and storing it on a miss."""
+        version = version or self.layer_version(db, layer)
+        self._prune(layer, version)
+        path = self._path(layer, version, z, x, y)
+        try:
+            return version, path.read_bytes()
+        except FileNotFoundError:
+            pass
+
+        data = gzip.compress(render_tile(db, layer, z, x, y), mtime=0)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            # Serving still works without the disk cache (e.g. read-only filesystem).
+            logger.warning(f"Could not cache tile {layer}/{z}/{x}/{y}: {e}")
+        return version, data
+
+    def clear(self) -> None:
+        with self._lock:
+            self._current.clear()
+        shutil.rmtree(self._root, ignore_errors=True)
+
+
+# Global singleton used by the tiles router.
+vector_tiles = VectorTileCache(settings.tile_cache_dir)
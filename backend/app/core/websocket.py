@@ -1,38 +1,491 @@
-from typing import List, Dict, Any
+"""
+Websocket broadcast hub for dashboard `refresh_data` events.
+
+Every connection gets a bounded send queue drained by its own writer task, so
+a broadcast only enqueues and one slow client never delays the others:
+
+- Connections are split over settings.ws_shards shards; each shard is fanned
+  out in its own event-loop callback so large broadcasts yield between shards.
+- `refresh_data` events still queued for a client are coalesced with an
+  identical one (same entity/action and delta). When a queue is full the
+  oldest message is dropped; a client that keeps dropping
+  (settings.ws_max_dropped_messages in a row) or whose send exceeds
+  settings.ws_send_timeout_seconds is disconnected.
+- publish() is synchronous and thread-safe: from worker threads and sync
+  background tasks it hands the message to the hub's loop with
+  call_soon_threadsafe. `await broadcast()` is kept for async callers.
+- With settings.redis_url, messages are also published on a Redis channel and
+  start() relays other workers' messages to local clients, so a broadcast
+  reaches clients connected to any worker. The Redis PUBLISH itself runs in a
+  publisher task on the hub's loop (redis.asyncio, bounded queue), so a slow
+  or unreachable Redis never blocks the caller of publish().
+
+Clients declare interest with subscribe(): a set of topics (refresh_data
+entities) and a location scope (the station's sectors, see /ws). Events built
+with refresh_event() carry the changed ids and fields so dashboards can patch
+their state, and publish(..., location_ids=...) limits scoped clients to events
+touching their area. Clients that never subscribe receive everything.
+
+A hub built with expand= can also carry batched messages: publish() sends the
+batch once (one Redis PUBLISH for any number of recipients) and each worker
+splits it into per-topic messages for its own clients, e.g. one
+notification_count message per user from a single map of counts.
+"""
+from __future__ import annotations
+
+import asyncio
 import json
+import logging
+import uuid
+from collections import defaultdict
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
 from fastapi import WebSocket
 
+from app.config import settings
+from app.core.request_context import get_request_id
+from app.core.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+RELAY_MAX_BACKOFF_SECONDS = 30.0
+REDIS_PUBLISH_QUEUE_SIZE = 1000
+
+# Splits a batched message into (topic, message) pairs; None = not a batch.
+Expander = Callable[[Dict[str, Any]], Optional[Iterable[Tuple[str, Dict[str, Any]]]]]
+
+
+def refresh_event(
+    entity: str,
+    action: Optional[str] = None,
+    ids: Optional[Iterable[Any]] = None,
+    changes: Optional[Dict[str, Any]] = None,
+    **extra: Any,
+) -> Dict[str, Any]:
+    """
+    A `refresh_data` message with an optional delta.
+
+    ids are the changed records (stringified); changes holds the new values of
+    changed fields when they are the same for all of them.
+    """
+    message: Dict[str, Any] = {"type": "refresh_data", "entity": entity}
+    if action is not None:
+        message["action"] = action
+    if ids is not None:
+        message["ids"] = [str(i) for i in ids]
+    if changes:
+        message["changes"] = changes
+    message.update(extra)
+    return message
+
+
+def coalesce_key(message: Dict[str, Any]) -> Optional[str]:
+    """Queued messages sharing a key are interchangeable for the client (None = never coalesce)."""
+    if message.get("type") != "refresh_data":
+        return None
+    key = f"refresh:{message.get('entity')}:{message.get('action')}"
+    if "ids" in message or "changes" in message:
+        # Deltas only coalesce with an identical delta.
+        key += ":" + json.dumps([message.get("ids"), message.get("changes")], sort_keys=True, default=str)
+    return key
+
+
+def _normalize_scope(location_ids: Optional[Iterable[Any]]) -> Optional[FrozenSet[int]]:
+    if location_ids is None:
+        return None
+    return frozenset(int(i) for i in location_ids if i is not None) or None
+
+
+class _Client:
+    def __init__(self, websocket: WebSocket, queue_size: int) -> None:
+        self.websocket = websocket
+        self.queue: "asyncio.Queue[Tuple[Optional[str], str]]" = asyncio.Queue(maxsize=queue_size)
+        # Coalesce keys of messages currently waiting in the queue.
+        self.pending: set = set()
+        # Messages dropped since the last successful send.
+        self.dropped = 0
+        self.task: Optional[asyncio.Task] = None
+        # None = every topic / no location restriction.
+        self.topics: Optional[FrozenSet[str]] = None
+        self.scope: Optional[FrozenSet[int]] = None
+
+    def wants(self, entity: Optional[str], location_ids: Optional[FrozenSet[int]]) -> bool:
+        if entity is None:
+            return True
+        if self.topics is not None and entity not in self.topics:
+            return False
+        if self.scope is None or location_ids is None:
+            return True
+        return not self.scope.isdisjoint(location_ids)
+
+
 class ConnectionManager:
-    def __init__(self):
-        # Store active connections
-        self.active_connections: List[WebSocket] = []
+    def __init__(
+        self,
+        shards: int = 8,
+        queue_size: int = 64,
+        send_timeout: float = 5.0,
+        max_dropped: int = 32,
+        redis_url: Optional[str] = None,
+        channel: str = "trustbond:ws",
+        expand: Optional[Expander] = None,
+    ) -> None:
+        self._shards: List[Dict[WebSocket, _Client]] = [{} for _ in range(max(1, shards))]
+        self._queue_size = max(1, queue_size)
+        self._send_timeout = send_timeout
+        self._max_dropped = max_dropped
+        self._expand = expand
+        # Loop that owns the websockets; set by start() or the first connect().
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats: Dict[str, int] = defaultdict(int)
+        self._origin = uuid.uuid4().hex
+        self._channel = channel
+        self._redis_url = redis_url
+        self._redis = None
+        self._relay_task: Optional[asyncio.Task] = None
+        self._publisher_task: Optional[asyncio.Task] = None
+        self._publish_queue: Optional["asyncio.Queue[str]"] = None
+        if redis_url:
+            try:
+                import redis  # optional dependency
+
+                self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.5)
+            except Exception as e:
+                logger.warning(f"Websocket Redis backend disabled: {e}")
+
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return [websocket for shard in self._shards for websocket in shard]
+
+    def _shard(self, websocket: WebSocket) -> Dict[WebSocket, _Client]:
+        return self._shards[id(websocket) % len(self._shards)]
+
+    # ----- lifecycle -----
+
+    async def start(self) -> None:
+        """Bind the hub to the running loop and start the Redis relay when configured."""
+        self._loop = asyncio.get_running_loop()
+        if self._redis is not None and self._relay_task is None:
+            self._relay_task = asyncio.create_task(self._relay())
+        if self._redis is not None and self._publisher_task is None:
+            self._publish_queue = asyncio.Queue(maxsize=REDIS_PUBLISH_QUEUE_SIZE)
+            self._publisher_task = asyncio.create_task(self._redis_publisher(self._publish_queue))
+
+    async def stop(self) -> None:
+        if self._relay_task is not None:
+            self._relay_task.cancel()
+            self._relay_task = None
+        if self._publisher_task is not None:
+            self._publisher_task.cancel()
+            self._publisher_task = None
+            self._publish_queue = None
+        for websocket in self.active_connections:
+            self.disconnect(websocket)
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+    async def connect(self, websocket: WebSocket, accept: bool = True):
+        """Register a connection; accept=False for sockets the endpoint already accepted (e.g. to authenticate)."""
+        if accept:
+            await websocket.accept()
+        self._loop = asyncio.get_running_loop()
+        client = _Client(websocket, self._queue_size)
+        client.task = asyncio.create_task(self._writer(client))
+        self._shard(websocket)[websocket] = client
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        client = self._shard(websocket).pop(websocket, None)
+        if client is None or client.task is None:
+            return
+        if client.task is not asyncio.current_task() and not client.task.done():
+            client.task.cancel()
 
-    async def broadcast(self, message: Dict[str, Any]):
+    def subscribe(
+        self,
+        websocket: WebSocket,
+        topics: Optional[Iterable[str]] = None,
+        scope: Optional[Iterable[int]] = None,
+    ) -> None:
+        """Limit a connection to some entities and/or to events touching the given locations."""
+        client = self._shard(websocket).get(websocket)
+        if client is None:
+            return
+        client.topics = frozenset(topics) if topics else None
+        client.scope = frozenset(scope) if scope is not None else None
+
+    # ----- sending -----
+
+    async def _writer(self, client: _Client) -> None:
+        while True:
+            key, payload = await client.queue.get()
+            client.pending.discard(key)
+            try:
+                await asyncio.wait_for(client.websocket.send_text(payload), self._send_timeout)
+                client.dropped = 0
+                self._stats["sent"] += 1
+            except Exception:
+                # Closed, broken or too slow to take a message.
+                self._stats["send_failures"] += 1
+                self.disconnect(client.websocket)
+                return
+            finally:
+                client.queue.task_done()
+
+    def _offer(self, client: _Client, key: Optional[str], payload: str) -> None:
+        if key is not None and key in client.pending:
+            self._stats["coalesced"] += 1
+            return
+        if client.queue.full():
+            old_key, _ = client.queue.get_nowait()
+            client.queue.task_done()
+            client.pending.discard(old_key)
+            client.dropped += 1
+            self._stats["dropped"] += 1
+            if client.dropped > self._max_dropped:
+                logger.info(f"Disconnecting slow websocket client after {client.dropped} dropped messages")
+                self._stats["slow_disconnects"] += 1
+                self.disconnect(client.websocket)
+                asyncio.ensure_future(self._close_quietly(client.websocket))
+                return
+        client.queue.put_nowait((key, payload))
+        if key is not None:
+            client.pending.add(key)
+
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket) -> None:
+        try:
+            await websocket.close(code=1013)
+        except Exception:
+            pass
+
+    def _fan_out_shard(
+        self,
+        shard: Dict[WebSocket, _Client],
+        key: Optional[str],
+        payload: str,
+        entity: Optional[str],
+        location_ids: Optional[FrozenSet[int]],
+    ) -> None:
+        for client in list(shard.values()):
+            if client.wants(entity, location_ids):
+                self._offer(client, key, payload)
+            else:
+                self._stats["filtered"] += 1
+
+    def _fan_out(
+        self,
+        key: Optional[str],
+        payload: str,
+        entity: Optional[str] = None,
+        location_ids: Optional[FrozenSet[int]] = None,
+    ) -> None:
+        """Enqueue payload for every interested local client. Must run on the hub's loop."""
+        for shard in self._shards:
+            if shard:
+                self._loop.call_soon(self._fan_out_shard, shard, key, payload, entity, location_ids)
+
+    def _fan_out_parts_shard(self, shard: Dict[WebSocket, _Client], parts: Dict[str, str]) -> None:
+        for client in list(shard.values()):
+            # Per-topic messages only go to clients subscribed to that topic.
+            for topic in client.topics or ():
+                payload = parts.get(topic)
+                if payload is not None:
+                    self._offer(client, None, payload)
+
+    def _fan_out_parts(self, parts: Dict[str, str]) -> None:
+        """Enqueue each topic's own payload for its subscribers. Must run on the hub's loop."""
+        for shard in self._shards:
+            if shard:
+                self._loop.call_soon(self._fan_out_parts_shard, shard, parts)
+
+    def _expand_parts(self, message: Dict[str, Any]) -> Optional[Dict[str, str]]:
+        if self._expand is None:
+            return None
+        parts = self._expand(message)
+        if parts is None:
+            return None
+        return {topic: json.dumps(part, default=str) for topic, part in parts}
+
+    def _dispatch(self, fan_out: Callable[..., None], *args: Any) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            # Nobody has connected to this process yet.
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            fan_out(*args)
+        else:
+            loop.call_soon_threadsafe(fan_out, *args)
+
+    def send(self, websocket: WebSocket, message: Dict[str, Any]) -> None:
+        """Queue a message for one connection (e.g. a pong), behind its pending broadcasts."""
+        client = self._shard(websocket).get(websocket)
+        if client is not None:
+            self._offer(client, coalesce_key(message) or message.get("type"), json.dumps(message))
+
+    def publish(
+        self,
+        message: Dict[str, Any],
+        location_ids: Optional[Iterable[Any]] = None,
+        topic: Optional[str] = None,
+    ) -> None:
         """
-        Send a JSON message to all active connected clients.
-        Example: {"type": "refresh_data", "entity": "case", "action": "created", "id": "123"}
+        Send a JSON message to all interested clients, from any thread or loop.
+        Example: refresh_event("case", "created", ids=[case.case_id])
+
+        location_ids are the locations the change touches; clients scoped to
+        other areas skip the event. None means the event concerns everyone.
+        topic overrides the subscription topic (default: the message's entity).
         """
-        payload = json.dumps(message)
-        dead_connections = []
-        for connection in self.active_connections:
+        # Cached dashboard responses depending on this entity are stale from now on.
+        response_cache.invalidate_for_event(message)
+        request_id = get_request_id()
+        if request_id and "request_id" not in message:
+            message = {**message, "request_id": request_id}
+        parts = self._expand_parts(message)
+        if parts is not None:
+            self._stats["published"] += 1
+            if self._redis is not None:
+                self._publish_remote(json.dumps({
+                    "origin": self._origin,
+                    "batch": json.dumps(message, default=str),
+                }))
+            self._dispatch(self._fan_out_parts, parts)
+            return
+        key = coalesce_key(message)
+        payload = json.dumps(message, default=str)
+        entity = topic or message.get("entity")
+        scope = _normalize_scope(location_ids)
+        self._stats["published"] += 1
+        if self._redis is not None:
+            self._publish_remote(json.dumps({
+                "origin": self._origin,
+                "key": key,
+                "payload": payload,
+                "entity": entity,
+                "location_ids": sorted(scope) if scope is not None else None,
+            }))
+        self._dispatch(self._fan_out, key, payload, entity, scope)
+
+    async def broadcast(self, message: Dict[str, Any], location_ids: Optional[Iterable[Any]] = None):
+        """Async form of publish(); returns once the message is queued, not sent."""
+        self.publish(message, location_ids)
+
+    async def flush(self) -> None:
+        """Wait until every queued message has been sent (or its client dropped)."""
+        # Let fan-out callbacks scheduled by publish() run first.
+        await asyncio.sleep(0)
+        clients = [client for shard in self._shards for client in shard.values()]
+        await asyncio.gather(*(client.queue.join() for client in clients))
+
+    # ----- Redis relay -----
+
+    def _publish_remote(self, envelope: str) -> None:
+        loop = self._loop
+        if self._publish_queue is None or loop is None or loop.is_closed():
+            # No hub loop in this process (scripts, CLI): a blocking PUBLISH stalls nobody else.
             try:
-                await connection.send_text(payload)
+                self._redis.publish(self._channel, envelope)
+            except Exception as e:
+                logger.warning(f"Websocket Redis publish failed: {e}")
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._queue_remote(envelope)
+        else:
+            loop.call_soon_threadsafe(self._queue_remote, envelope)
+
+    def _queue_remote(self, envelope: str) -> None:
+        queue = self._publish_queue
+        if queue is None:
+            return
+        if queue.full():
+            queue.get_nowait()
+            self._stats["redis_publish_dropped"] += 1
+        queue.put_nowait(envelope)
+
+    async def _redis_publisher(self, queue: "asyncio.Queue[str]") -> None:
+        """Send queued envelopes to the Redis channel, off the request path."""
+        import redis.asyncio as aioredis
+
+        client = aioredis.Redis.from_url(self._redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        try:
+            while True:
+                envelope = await queue.get()
+                try:
+                    await client.publish(self._channel, envelope)
+                except Exception as e:
+                    self._stats["redis_publish_failures"] += 1
+                    logger.warning(f"Websocket Redis publish failed: {e}")
+                finally:
+                    queue.task_done()
+        finally:
+            try:
+                await client.aclose()
             except Exception:
-                # Connection might be dead/closed unexpectedly
-                dead_connections.append(connection)
-                
-        # Clean up dead connections
-        for dead in dead_connections:
-            self.disconnect(dead)
+                pass
+
+    async def _relay(self) -> None:
+        """Deliver messages published by other workers to this worker's clients."""
+        import redis.asyncio as aioredis
+
+        backoff = 1.0
+        while True:
+            client = aioredis.Redis.from_url(self._redis_url)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(self._channel)
+                backoff = 1.0
+                async for item in pubsub.listen():
+                    if item.get("type") != "message":
+                        continue
+                    envelope = json.loads(item["data"])
+                    if envelope.get("origin") == self._origin:
+                        continue
+                    self._stats["relayed"] += 1
+                    if "batch" in envelope:
+                        parts = self._expand_parts(json.loads(envelope["batch"]))
+                        if parts:
+                            self._fan_out_parts(parts)
+                        continue
+                    self._fan_out(
+                        envelope.get("key"),
+                        envelope["payload"],
+                        envelope.get("entity"),
+                        _normalize_scope(envelope.get("location_ids")),
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Websocket Redis relay failed, retrying in {backoff:.0f}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, RELAY_MAX_BACKOFF_SECONDS)
+            finally:
+                try:
+                    await pubsub.aclose()
+                    await client.aclose()
+                except Exception:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis" if self._redis is not None else "local",
+            "connections": sum(len(shard) for shard in self._shards),
+            "shards": len(self._shards),
+            **self._stats,
+        }
 
 
 # Global singleton instance to be imported across API endpoints
-manager = ConnectionManager()
+manager = ConnectionManager(
+    shards=settings.ws_shards,
+    queue_size=settings.ws_send_queue_size,
+    send_timeout=settings.ws_send_timeout_seconds,
+    max_dropped=settings.ws_max_dropped_messages,
+    redis_url=settings.redis_url,
+    channel=settings.ws_redis_channel,
+)
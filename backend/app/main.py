@@ -37,9 +37,19 @@ from app.api.v1 import (
     public_locations,
     public_hotspots,
     public_alerts,
+    tiles,
     ws,
     geographic_intelligence,
 )
+from app.core.websocket import manager as ws_manager
+from app.core.notification_delivery import notification_hub
+from app.core.email import is_smtp_configured
+from app.core.email_delivery import email_delivery
+from app.core.rate_limiter import build_rate_limiter
+from app.middleware.proxy_headers import ForwardedClientMiddleware
+from app.middleware.rate_limit import RouteRateLimitMiddleware, load_rate_limit_overrides
+from app.middleware.request_id import RequestIdMiddleware
+import app.core.report_rollups  # noqa: F401  (registers Report rollup hooks)
 
 
 @asynccontextmanager
@@ -126,17 +136,64 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error(f"Error processing existing reports: {e}")
     
+    async def reconcile_rollups_periodically():
+        """Rebuild dashboard rollups to catch writes that bypass the ORM hooks."""
+        from app.core.report_rollups import reconcile_report_rollups
+
+        def _run():
+            db = SessionLocal()
+            try:
+                reconcile_report_rollups(db)
+            finally:
+                db.close()
+
+        interval = settings.report_rollup_reconcile_minutes * 60
+        while True:
+            try:
+                await asyncio.to_thread(_run)
+            except Exception as e:
+                logger.warning(f"Report rollup reconcile failed: {e}")
+            await asyncio.sleep(interval)
+
     # Process existing reports in background
     asyncio.create_task(process_existing_reports())
+    if settings.report_rollup_reconcile_minutes > 0:
+        asyncio.create_task(reconcile_rollups_periodically())
     
+    await ws_manager.start()
+    await notification_hub.start()
+    if settings.email_outbox_enabled and is_smtp_configured():
+        email_delivery.start()
+
     yield
-    # shutdown if needed
+    await ws_manager.stop()
+    await notification_hub.stop()
+    await asyncio.to_thread(email_delivery.stop)
 
 
 app = FastAPI(
     title=settings.app_name,
     lifespan=lifespan,
 )
+# Added before CORS so CORS stays outermost and 429 responses carry its headers.
+if settings.rate_limit_enabled:
+    app.add_middleware(
+        RouteRateLimitMiddleware,
+        report_create_per_minute=settings.rate_limit_report_create_per_minute,
+        evidence_upload_per_minute=settings.rate_limit_evidence_upload_per_minute,
+        report_confirm_per_minute=settings.rate_limit_report_confirm_per_minute,
+        limiter=build_rate_limiter(settings.redis_url),
+        config_loader=load_rate_limit_overrides,
+        config_ttl_seconds=settings.rate_limit_config_ttl_seconds,
+    )
+# Outside the rate limiter: takes the client address from X-Forwarded-For when the peer is a
+# trusted proxy, so limits are per client rather than per proxy.
+app.add_middleware(
+    ForwardedClientMiddleware,
+    trusted_hosts=settings.trusted_proxy_ips,
+    proxy_hops=settings.trusted_proxy_hops,
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.get_cors_origins_list(),
@@ -145,6 +202,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Outermost, so rate-limit logs and websocket events published by a request carry its id.
+app.add_middleware(RequestIdMiddleware)
 
 # Mount static files for evidence uploads
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
@@ -166,6 +225,7 @@ app.include_router(system_config.router, prefix="/api/v1")
 app.include_router(public_locations.router, prefix="/api/v1")
 app.include_router(public_hotspots.router, prefix="/api/v1")
 app.include_router(public_alerts.router, prefix="/api/v1")
+app.include_router(tiles.router, prefix="/api/v1")
 app.include_router(ws.router, prefix="/api/v1")
 app.include_router(geographic_intelligence.router, prefix="/api/v1/geographic-intelligence")
 
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import ipaddress
+from typing import List, Optional, Union
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def _parse_networks(trusted: str) -> Optional[List[IPNetwork]]:
+    """Comma-separated IPs/CIDRs -> networks; None means every peer ("*")."""
+    entries = [entry.strip() for entry in trusted.split(",") if entry.strip()]
+    if "*" in entries:
+        return None
+    return [ipaddress.ip_network(entry, strict=False) for entry in entries]
+
+
+class ForwardedClientMiddleware:
+    """
+    Take the client address (and scheme) from X-Forwarded-For/-Proto set by our own proxies.
+
+    Proxies append the address they received the request from, so only the
+    rightmost entries are trustworthy; anything to their left was sent by the
+    client and can be anything. With `proxy_hops` proxies in front of the app
+    (Render: 1), the client is the proxy_hops-th entry from the right. Leftmost
+    entries are ignored, so a client can't pick a fresh rate-limit bucket by
+    sending its own X-Forwarded-For.
+
+    The headers are only honoured when the direct peer is in `trusted_hosts`
+    (comma-separated IPs/CIDRs, "*" = any peer, e.g. when the proxy's
+    addresses aren't fixed).
+    """
+
+    def __init__(self, app: ASGIApp, trusted_hosts: str = "127.0.0.1", proxy_hops: int = 1) -> None:
+        self.app = app
+        self._networks = _parse_networks(trusted_hosts)
+        self._proxy_hops = max(1, proxy_hops)
+
+    def _is_trusted(self, host: Optional[str]) -> bool:
+        if self._networks is None:
+            return True
+        if not host:
+            return False
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            return False
+        return any(address in network for network in self._networks)
+
+    def _from_right(self, value: str) -> Optional[str]:
+        entries = [entry.strip() for entry in value.split(",") if entry.strip()]
+        if not entries:
+            return None
+        # Fewer entries than proxies: every entry was added by a proxy, the first is the client.
+        return entries[max(0, len(entries) - self._proxy_hops)]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        if self._is_trusted(client[0] if client else None):
+            headers = Headers(scope=scope)
+            forwarded_for = self._from_right(headers.get("x-forwarded-for", ""))
+            if forwarded_for:
+                scope = {**scope, "client": (forwarded_for, 0)}
+            proto = self._from_right(headers.get("x-forwarded-proto", ""))
+            if proto in ("http", "https"):
+                if scope["type"] == "websocket":
+                    proto = "wss" if proto == "https" else "ws"
+                scope = {**scope, "scheme": proto}
+
+        await self.app(scope, receive, send)
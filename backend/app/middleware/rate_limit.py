@@ -1,117 +1,205 @@
 from __future__ import annotations
 
-from collections import deque
-from dataclasses import dataclass
-from threading import Lock
+import asyncio
+from dataclasses import dataclass, replace
 from time import monotonic
+from typing import Any, Callable, Dict, Optional, Tuple
+import logging
 import re
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.audit import structured_log
+from app.core.rate_limiter import InMemoryRateLimiter
 
+logger = logging.getLogger(__name__)
 
-WINDOW_SECONDS = 60.0
+# system_config key holding per-rule overrides, e.g.
+# {"report_create": {"per_minute": 10, "burst": 5, "keys": ["ip", "device"], "enabled": true}}
+RATE_LIMIT_CONFIG_KEY = "rate_limit.rules"
+DEVICE_HASH_HEADER = "x-device-hash"
+KEY_KINDS = ("ip", "device")
 
+_config_generation = 0
 
-@dataclass
+
+def invalidate_rate_limit_config() -> None:
+    """Make every middleware instance in this process reload its overrides on the next request."""
+    global _config_generation
+    _config_generation += 1
+
+
+def load_rate_limit_overrides() -> Dict[str, Any]:
+    """Read the rate_limit.rules system_config value ({} when unset)."""
+    from app.database import SessionLocal
+    from app.models.system_config import SystemConfig
+
+    db = SessionLocal()
+    try:
+        row = db.query(SystemConfig).filter(SystemConfig.config_key == RATE_LIMIT_CONFIG_KEY).first()
+        return dict(row.config_value) if row and isinstance(row.config_value, dict) else {}
+    finally:
+        db.close()
+
+
+@dataclass(frozen=True)
 class _Rule:
     name: str
     path_pattern: re.Pattern[str]
     method: str
     limit_per_window: int
-
-
-class RouteRateLimitMiddleware(BaseHTTPMiddleware):
-    """Simple in-memory fixed-window throttling for high-risk write routes."""
+    burst: int
+    keys: Tuple[str, ...] = KEY_KINDS
+    enabled: bool = True
+
+
+def _apply_override(rule: _Rule, override: Any) -> _Rule:
+    if not isinstance(override, dict):
+        return rule
+    try:
+        per_minute = max(1, int(override.get("per_minute", rule.limit_per_window)))
+        burst = max(1, int(override.get("burst", override.get("per_minute", rule.burst))))
+        keys = tuple(k for k in override.get("keys", rule.keys) if k in KEY_KINDS) or rule.keys
+        enabled = bool(override.get("enabled", rule.enabled))
+    except (TypeError, ValueError):
+        logger.warning(f"Ignoring invalid rate limit override for {rule.name}: {override!r}")
+        return rule
+    return replace(rule, limit_per_window=per_minute, burst=burst, keys=keys, enabled=enabled)
+
+
+class RouteRateLimitMiddleware:
+    """
+    Token-bucket throttling for high-risk write routes (plain ASGI middleware).
+
+    Each rule is checked against the client IP and, when the mobile app sends
+    X-Device-Hash, the device as well; a request must fit both buckets.
+    Buckets live in `limiter` (in-memory by default, Redis when shared across
+    workers). Constructor limits are defaults; `config_loader` (e.g.
+    load_rate_limit_overrides) supplies per-rule overrides, refreshed in the
+    background every `config_ttl_seconds` or after invalidate_rate_limit_config().
+    """
 
     def __init__(
         self,
-        app,
+        app: ASGIApp,
         *,
         report_create_per_minute: int = 20,
         evidence_upload_per_minute: int = 30,
         report_confirm_per_minute: int = 40,
+        limiter: Any = None,
+        config_loader: Optional[Callable[[], Dict[str, Any]]] = None,
+        config_ttl_seconds: float = 60.0,
     ) -> None:
-        super().__init__(app)
-        self._rules = [
+        self.app = app
+        self._default_rules = [
             _Rule(
                 name="report_create",
                 method="POST",
                 path_pattern=re.compile(r"^/api/v1/reports/?$"),
                 limit_per_window=max(1, int(report_create_per_minute)),
+                burst=max(1, int(report_create_per_minute)),
             ),
             _Rule(
                 name="evidence_upload",
                 method="POST",
                 path_pattern=re.compile(r"^/api/v1/reports/[^/]+/evidence/?$"),
                 limit_per_window=max(1, int(evidence_upload_per_minute)),
+                burst=max(1, int(evidence_upload_per_minute)),
             ),
             _Rule(
                 name="report_confirm",
                 method="POST",
                 path_pattern=re.compile(r"^/api/v1/reports/[^/]+/confirm/?$"),
                 limit_per_window=max(1, int(report_confirm_per_minute)),
+                burst=max(1, int(report_confirm_per_minute)),
             ),
         ]
-        self._hits: dict[str, deque[float]] = {}
-        self._lock = Lock()
-
-    def _match_rule(self, request: Request) -> _Rule | None:
-        path = request.url.path
-        method = request.method.upper()
+        self._rules = list(self._default_rules)
+        self._limiter = limiter or InMemoryRateLimiter()
+        self._config_loader = config_loader
+        self._config_ttl_seconds = config_ttl_seconds
+        self._config_loaded_at: Optional[float] = None
+        self._config_generation = _config_generation
+        self._config_task: Optional[asyncio.Task] = None
+
+    # ----- configuration -----
+
+    async def _reload_rules(self) -> None:
+        try:
+            overrides = await asyncio.to_thread(self._config_loader)
+            self._rules = [_apply_override(rule, overrides.get(rule.name)) for rule in self._default_rules]
+        except Exception as e:
+            logger.warning(f"Rate limit config reload failed, keeping current rules: {e}")
+        finally:
+            self._config_task = None
+
+    def _maybe_refresh_rules(self) -> None:
+        if self._config_loader is None or self._config_task is not None:
+            return
+        stale = (
+            self._config_loaded_at is None
+            or monotonic() - self._config_loaded_at > self._config_ttl_seconds
+            or self._config_generation != _config_generation
+        )
+        if stale:
+            self._config_loaded_at = monotonic()
+            self._config_generation = _config_generation
+            # Requests keep using the current rules while the DB is read off the loop.
+            self._config_task = asyncio.create_task(self._reload_rules())
+
+    # ----- matching -----
+
+    def _match_rule(self, method: str, path: str) -> _Rule | None:
         for rule in self._rules:
-            if method == rule.method and rule.path_pattern.match(path):
+            if rule.enabled and method == rule.method and rule.path_pattern.match(path):
                 return rule
         return None
 
-    def _client_key(self, request: Request, rule: _Rule) -> str:
-        client_ip = request.client.host if request.client else "unknown"
-        return f"{rule.name}:{client_ip}"
-
-    def _consume(self, key: str, limit: int) -> tuple[bool, int, int]:
-        now = monotonic()
-        cutoff = now - WINDOW_SECONDS
-
-        with self._lock:
-            bucket = self._hits.get(key)
-            if bucket is None:
-                bucket = deque()
-                self._hits[key] = bucket
-
-            while bucket and bucket[0] <= cutoff:
-                bucket.popleft()
-
-            if len(bucket) >= limit:
-                retry_after_seconds = int(max(1, WINDOW_SECONDS - (now - bucket[0])))
-                remaining = 0
-                return False, remaining, retry_after_seconds
-
-            bucket.append(now)
-            remaining = max(0, limit - len(bucket))
-            return True, remaining, 0
-
-    async def dispatch(self, request: Request, call_next) -> Response:
-        rule = self._match_rule(request)
+    @staticmethod
+    def _client_keys(rule: _Rule, client_ip: str | None, device_hash: str | None) -> list[str]:
+        keys = []
+        if "ip" in rule.keys:
+            keys.append(f"{rule.name}:ip:{client_ip or 'unknown'}")
+        if "device" in rule.keys:
+            device_hash = (device_hash or "").strip()[:128]
+            if device_hash:
+                keys.append(f"{rule.name}:device:{device_hash}")
+        return keys or [f"{rule.name}:ip:unknown"]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        self._maybe_refresh_rules()
+        method = scope["method"].upper()
+        path = scope["path"]
+        rule = self._match_rule(method, path)
         if rule is None:
-            return await call_next(request)
-
-        key = self._client_key(request, rule)
-        allowed, remaining, retry_after = self._consume(key, rule.limit_per_window)
-        if not allowed:
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        client_ip = client[0] if client else None
+        device_hash = Headers(scope=scope).get(DEVICE_HASH_HEADER)
+        keys = self._client_keys(rule, client_ip, device_hash)
+        decision = await self._limiter.consume(keys, rule.limit_per_window, rule.burst)
+        if not decision.allowed:
+            retry_after = decision.retry_after_seconds
             structured_log(
                 "rate_limit.blocked",
                 "api",
                 "blocked",
                 rule=rule.name,
-                method=request.method,
-                path=request.url.path,
-                client_ip=request.client.host if request.client else None,
+                method=method,
+                path=path,
+                client_ip=client_ip,
+                device_hash=device_hash,
                 retry_after_seconds=retry_after,
             )
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=429,
                 content={
                     "detail": "Rate limit exceeded. Please retry shortly.",
@@ -124,8 +212,14 @@ class RouteRateLimitMiddleware(BaseHTTPMiddleware):
                     "X-RateLimit-Remaining": "0",
                 },
             )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_limit_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-RateLimit-Limit"] = str(rule.limit_per_window)
+                headers["X-RateLimit-Remaining"] = str(decision.remaining)
+            await send(message)
 
-        response = await call_next(request)
-        response.headers["X-RateLimit-Limit"] = str(rule.limit_per_window)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
-        return response
+        await self.app(scope, receive, send_with_limit_headers)
@@ -17,6 +17,11 @@ from app.models.case import Case, CaseReport, CaseHistory
 from app.models.user_session import UserSession
 from app.models.system_config import SystemConfig
 from app.models.station import Station
+from app.models.number_counter import NumberCounter
+from app.models.report_rollup import ReportDailyRollup
+from app.models.dataset_version import DatasetVersion
+from app.models.notification_counter import NotificationCounter
+from app.models.email_outbox import OutboxEmail
 
 __all__ = [
     "Base",
@@ -40,4 +45,9 @@ __all__ = [
     "UserSession",
     "SystemConfig",
     "Station",
+    "NumberCounter",
+    "ReportDailyRollup",
+    "DatasetVersion",
+    "NotificationCounter",
+    "OutboxEmail",
 ]
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, BigInteger, DateTime
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class DatasetVersion(Base):
+    """
+    Change counter per source table (e.g. "locations").
+
+    Bumped by database triggers on every write to the table, so artifacts built
+    from it (pre-rendered GeoJSON) can tell when they are stale.
+    """
+
+    __tablename__ = "dataset_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=1)
+    changed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -0,0 +1,33 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class OutboxEmail(Base):
+    """
+    One queued email for one recipient (migration 020).
+
+    Either the rendered subject/bodies are stored, or `template` + `context`
+    and the delivery worker renders them. status: pending -> sending -> sent,
+    or back to pending with a later next_attempt_at, or dead after the last
+    attempt fails.
+    """
+
+    __tablename__ = "email_outbox"
+
+    email_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    to_address = Column(String(255), nullable=False)
+    subject = Column(String(255))
+    body_plain = Column(Text)
+    body_html = Column(Text)
+    template = Column(String(50))
+    context = Column(JSONB)
+    status = Column(String(10), nullable=False, default="pending", server_default="pending")
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_at = Column(DateTime(timezone=True))
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    sent_at = Column(DateTime(timezone=True))
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, Numeric, SmallInteger, String, DateTime, ForeignKey, Table
+from sqlalchemy import Column, Computed, Float, Integer, Numeric, SmallInteger, String, DateTime, ForeignKey, Table
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
+from geoalchemy2 import Geography
 from app.database import Base
 
 hotspot_reports_table = Table(
@@ -24,6 +25,20 @@ class Hotspot(Base):
     time_window_hours = Column(Integer, nullable=False)
     detected_at = Column(DateTime(timezone=True), server_default=func.now())
     incident_type_id = Column(SmallInteger, ForeignKey("incident_types.incident_type_id"), nullable=True)  # same place + same type
+    # Indexed (GiST) point for KNN / radius lookups; maintained by Postgres.
+    geog = Column(
+        Geography("POINT", srid=4326),
+        Computed(
+            "ST_SetSRID(ST_MakePoint(center_long::float8, center_lat::float8), 4326)::geography",
+            persisted=True,
+        ),
+    )
+    # Cluster classification stored at detection time (app.core.cluster_classifier).
+    classification = Column(String(20), nullable=True)  # low_activity, emerging, active, critical
+    classification_confidence = Column(Float, nullable=True)
+    hotspot_score = Column(Float, nullable=True)
+    classification_source = Column(String(20), nullable=True)  # model, dbscan_fallback
+    avg_trust_score = Column(Float, nullable=True)
 
     reports = relationship(
         "Report",
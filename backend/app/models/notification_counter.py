@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class NotificationCounter(Base):
+    """
+    Unread notification count per police user.
+
+    Maintained by triggers on notifications (migration 019) in the same
+    transaction as each insert, read-state change or delete.
+    """
+
+    __tablename__ = "notification_counters"
+
+    police_user_id = Column(
+        Integer, ForeignKey("police_users.police_user_id", ondelete="CASCADE"), primary_key=True
+    )
+    unread_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class NumberCounter(Base):
+    """Last issued human-readable number per (scope, year), e.g. ('report', 2026) -> 412."""
+
+    __tablename__ = "number_counters"
+
+    scope = Column(String(30), primary_key=True)  # report, case
+    year = Column(Integer, primary_key=True)
+    last_value = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
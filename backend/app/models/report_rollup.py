@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, SmallInteger, String, Boolean, Date
+
+from app.database import Base
+
+
+class ReportDailyRollup(Base):
+    """
+    Report counts per (day, station, village, incident type, status, verification, flags).
+
+    Maintained incrementally by app.core.report_rollups on report insert/update/delete
+    and rebuilt periodically by its reconcile job. NULL dimensions are stored as
+    0 / '' so they can take part in the primary key.
+    """
+
+    __tablename__ = "report_daily_rollups"
+
+    day = Column(Date, primary_key=True)
+    station_id = Column(Integer, primary_key=True, default=0)  # reports.handling_station_id, 0 = none
+    village_location_id = Column(Integer, primary_key=True, default=0)  # 0 = unmapped
+    incident_type_id = Column(SmallInteger, primary_key=True)
+    status = Column(String(20), primary_key=True, default="")
+    verification_status = Column(String(20), primary_key=True, default="")
+    is_flagged = Column(Boolean, primary_key=True, default=False)
+    is_reviewed = Column(Boolean, primary_key=True, default=False)  # reports.verified_by IS NOT NULL
+    report_count = Column(Integer, nullable=False, default=0)
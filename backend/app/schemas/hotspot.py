@@ -25,6 +25,8 @@ class HotspotResponse(BaseModel):
     incident_type_id: Optional[int] = None
     incident_type_name: Optional[str] = None
     evidence_files: Optional[List[Dict[str, Any]]] = []
+    evidence_count: Optional[int] = None
+    village_names: Optional[List[str]] = None
     lifecycle_state: Optional[str] = None
     hotspot_score: Optional[float] = None
     classification: Optional[str] = None
@@ -193,6 +193,10 @@ class ReportDetailResponse(ReportResponse):
 class ReportListResponse(BaseModel):
     """Paginated list of reports (police dashboard)."""
     items: list[ReportResponse]
-    total: int
+    total: Optional[int] = None
     limit: int
     offset: int
+    # Opaque keyset cursor for the next page (None when this is the last page).
+    next_cursor: Optional[str] = None
+    # True when total comes from the planner estimate (total_mode=estimate).
+    total_is_estimate: bool = False
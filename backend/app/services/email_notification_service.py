@@ -1,98 +1,119 @@
 """
 Email notification service for sending email alerts to police users.
 Integrates with existing notification system to send both web and email notifications.
+
+Emails are queued in the email_outbox with a template name (app.services.email_templates)
+and one context per event, so every recipient of the event shares one render. Location
+text for an entity is resolved once (stored village -> in-memory location tree, otherwise
+one PostGIS lookup) and cached briefly for the other emails about the same entity.
 """
 
 import os
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import List, Optional
-from datetime import datetime
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, List, Optional
 import logging
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 from app.models.police_user import PoliceUser
-from app.models.location import Location
 from app.database import SessionLocal
+from app.core.email import is_smtp_configured
+from app.core.email_delivery import enqueue_email
+from app.core.location_hierarchy import location_hierarchy
+from app.services import email_templates  # noqa: F401  (registers the notification templates)
 
+logger = logging.getLogger(__name__)
 
-def get_location_hierarchy_from_coordinates(db: Session, latitude: float, longitude: float) -> str:
+LOCATION_TEXT_TTL_SECONDS = 600.0
+LOCATION_TEXT_MAX_ENTRIES = 1024
+
+_location_text_cache: "OrderedDict[Hashable, tuple[float, str]]" = OrderedDict()
+_location_text_lock = Lock()
+
+
+def _coordinates_text(latitude: float, longitude: float) -> str:
+    return f"{float(latitude):.4f}, {float(longitude):.4f}"
+
+
+def resolve_location_text(
+    db: Session,
+    latitude: Any,
+    longitude: Any,
+    village_location_id: Optional[int] = None,
+    entity: Optional[Hashable] = None,
+) -> str:
     """
-    Convert coordinates to location hierarchy (sector, cell, village).
-    
-    Args:
-        db: Database session
-        latitude: Latitude coordinate
-        longitude: Longitude coordinate
-        
-    Returns:
-        Location hierarchy string (e.g., "Sector, Cell, Village") or coordinates if no location found
+    "Sector, Cell, Village" for an event location, or the coordinates if no village matches.
+
+    Uses the stored village when the entity has one (no spatial query), otherwise
+    one PostGIS point-in-village lookup. Results are cached per `entity`
+    (e.g. ("report", report_id)), or per rounded coordinates when no entity is given.
     """
+    has_point = latitude is not None and longitude is not None
+    if not has_point and village_location_id is None:
+        return "Location not specified"
+    if entity is not None:
+        key = entity
+    elif has_point:
+        key = ("point", round(float(latitude), 5), round(float(longitude), 5))
+    else:
+        key = ("village", village_location_id)
+    now = time.monotonic()
+    with _location_text_lock:
+        hit = _location_text_cache.get(key)
+        if hit is not None and now - hit[0] < LOCATION_TEXT_TTL_SECONDS:
+            _location_text_cache.move_to_end(key)
+            return hit[1]
+
+    text = _coordinates_text(latitude, longitude) if has_point else "Location not specified"
     try:
-        from app.core.village_lookup import get_village_location_info
-        
-        # Get village location info using the proper lookup service
-        location_info = get_village_location_info(db, latitude, longitude)
-        
-        if location_info:
-            # Build location hierarchy in order: Sector, Cell, Village
-            location_parts = []
-            
-            # Add sector if available
-            if location_info.get("sector_name"):
-                location_parts.append(location_info["sector_name"])
-            
-            # Add cell if available
-            if location_info.get("cell_name"):
-                location_parts.append(location_info["cell_name"])
-            
-            # Add village if available
-            if location_info.get("village_name"):
-                location_parts.append(location_info["village_name"])
-            
-            if location_parts:
-                return ", ".join(location_parts)
-        
-        # Fallback to coordinates if no location found
-        return f"{float(latitude):.4f}, {float(longitude):.4f}"
-        
+        if village_location_id is not None and location_hierarchy.type_of(db, village_location_id) != "village":
+            village_location_id = None
+        if village_location_id is None and has_point:
+            from app.core.village_lookup import get_village_location_id
+
+            village_location_id = get_village_location_id(db, float(latitude), float(longitude))
+        lineage = location_hierarchy.lineage(db, village_location_id)
+        if lineage:
+            parts = [lineage.get(k) for k in ("sector_name", "cell_name", "village_name") if lineage.get(k)]
+            if parts:
+                text = ", ".join(parts)
     except Exception as e:
         logger.error(f"Error getting location hierarchy: {e}")
-        return f"{float(latitude):.4f}, {float(longitude):.4f}"
+
+    with _location_text_lock:
+        _location_text_cache[key] = (now, text)
+        _location_text_cache.move_to_end(key)
+        while len(_location_text_cache) > LOCATION_TEXT_MAX_ENTRIES:
+            _location_text_cache.popitem(last=False)
+    return text
 
 
-def generate_google_maps_link(latitude: float, longitude: float, address: str = None) -> dict:
+def get_location_hierarchy_from_coordinates(db: Session, latitude: float, longitude: float) -> str:
     """
-    Generate Google Maps links for navigation and viewing.
+    Convert coordinates to location hierarchy (sector, cell, village).
     
     Args:
+        db: Database session
         latitude: Latitude coordinate
-        longitude: Longitude coordinate  
-        address: Optional address description
+        longitude: Longitude coordinate
         
     Returns:
-        Dictionary with different Google Maps URLs
+        Location hierarchy string (e.g., "Sector, Cell, Village") or coordinates if no location found
     """
-    lat, lon = float(latitude), float(longitude)
-    
-    # Google Maps navigation link (for driving directions)
-    navigation_url = f"https://www.google.com/maps/dir/?api=1&destination={lat},{lon}"
-    
-    # Google Maps view link (to see the location on map)
-    view_url = f"https://www.google.com/maps?q={lat},{lon}"
-    
-    # Google Maps search link (if address is available)
-    search_url = f"https://www.google.com/maps/search/?api=1&query={address}" if address else view_url
-    
-    return {
-        "navigation": navigation_url,
-        "view": view_url, 
-        "search": search_url,
-        "coordinates": f"{lat},{lon}"
-    }
+    return resolve_location_text(db, latitude, longitude)
 
-logger = logging.getLogger(__name__)
+
+def _parse_coordinates(location: Optional[str]) -> Optional[tuple[float, float]]:
+    """(lat, lon) when `location` is a "lat, lon" string rather than a place description."""
+    if not location or "," not in location:
+        return None
+    try:
+        lat, lon = (float(part) for part in location.split(",")[:2])
+    except ValueError:
+        return None
+    return lat, lon
 
 
 class EmailNotificationService:
@@ -110,8 +131,8 @@ class EmailNotificationService:
         self.from_email = os.getenv("SMTP_FROM", "noreply@trustbond.system")
         self.frontend_url = os.getenv("VITE_API_BASE_URL", "https://trustbondmobileapp.onrender.com")
         
-        # Check if email is configured
-        self.email_enabled = bool(self.smtp_username and self.smtp_password)
+        # Delivery goes through the email_outbox worker, which uses the SMTP settings from config.
+        self.email_enabled = is_smtp_configured()
         
         if not self.email_enabled:
             logger.warning("Email notifications disabled - SMTP credentials not configured")
@@ -124,54 +145,62 @@ class EmailNotificationService:
         text_body: Optional[str] = None
     ) -> bool:
         """
-        Send email to specified recipients.
+        Queue an already rendered email for each recipient in the email_outbox.
         
-        Args:
-            to_emails: List of recipient email addresses
-            subject: Email subject
-            html_body: HTML email body
-            text_body: Plain text email body (optional)
-            
         Returns:
-            True if email sent successfully, False otherwise
+            True if the email was queued, False otherwise
         """
+        if not self.email_enabled or not to_emails:
+            return False
+        try:
+            return enqueue_email(to_emails, subject=subject, body_plain=text_body or "", body_html=html_body) > 0
+        except Exception as e:
+            logger.error(f"Failed to queue email: {str(e)}")
+            return False
+
+    def _queue(
+        self, emails: List[str], template: str, context: Dict[str, Any], db: Optional[Session] = None
+    ) -> bool:
+        """Queue a template email; with `db` the outbox rows commit with the caller's transaction."""
         if not self.email_enabled:
             logger.warning("Email not configured - skipping email send")
             return False
-        
-        if not to_emails:
+        if not emails:
             logger.warning("No recipients specified - skipping email send")
             return False
-        
         try:
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = self.from_email
-            msg['To'] = ', '.join(to_emails)
-            
-            # Add plain text body
-            if text_body:
-                text_part = MIMEText(text_body, 'plain')
-                msg.attach(text_part)
-            
-            # Add HTML body
-            html_part = MIMEText(html_body, 'html')
-            msg.attach(html_part)
-            
-            # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_username, self.smtp_password)
-                server.send_message(msg)
-            
-            logger.info(f"Email sent successfully to {len(to_emails)} recipients")
-            return True
-            
+            queued = enqueue_email(emails, template=template, context={**context, "base_url": self.frontend_url}, db=db)
+            logger.info(f"{template} email queued for {queued} recipients")
+            return queued > 0
         except Exception as e:
-            logger.error(f"Failed to send email: {str(e)}")
+            logger.error(f"Failed to queue email: {str(e)}")
             return False
-    
+
+    def _location(
+        self,
+        location: Optional[str],
+        latitude: Optional[float],
+        longitude: Optional[float],
+        db: Optional[Session] = None,
+    ) -> tuple[Optional[str], Optional[float], Optional[float]]:
+        """Display text and map coordinates; a bare "lat, lon" string is resolved (cached)."""
+        coordinates = _parse_coordinates(location)
+        if coordinates is None:
+            return location, latitude, longitude
+        session = db or SessionLocal()
+        try:
+            text = resolve_location_text(session, *coordinates)
+        finally:
+            if db is None:
+                session.close()
+        if latitude is None or longitude is None:
+            latitude, longitude = coordinates
+        return text, latitude, longitude
+
+    @staticmethod
+    def _recipient_name(police_user: PoliceUser) -> str:
+        return f"{police_user.first_name or ''} {police_user.last_name or ''}".strip() or police_user.email
+
     def send_case_assignment_notification(
         self,
         police_user: PoliceUser,
@@ -182,6 +211,7 @@ class EmailNotificationService:
         report_count: int,
         latitude: Optional[float] = None,
         longitude: Optional[float] = None,
+        db: Optional[Session] = None,
     ) -> bool:
         """
         Send email notification when a case is assigned to an officer.
@@ -195,101 +225,22 @@ class EmailNotificationService:
             report_count: Number of reports in the case
             
         Returns:
-            True if email sent successfully, False otherwise
+            True if email was queued, False otherwise
         """
         if not police_user.email:
             logger.warning(f"Police user {police_user.police_user_id} has no email address")
             return False
-        
-        subject = f"New Case Assigned: {case_number}"
-        
-        case_url = f"{self.frontend_url}/cases/{case_number}"
-        
-        # Build display + one unified case-level maps link.
-        # Handle both coordinate strings (lat, lon) and location descriptions
-        location_display = location
-        maps_links = None
-
-        if latitude is not None and longitude is not None:
-            try:
-                lat_f = float(latitude)
-                lon_f = float(longitude)
-                maps_links = generate_google_maps_link(lat_f, lon_f)
-            except (TypeError, ValueError):
-                maps_links = None
-        
-        if ',' in location and location.replace(',', '').replace('.', '').replace(' ', '').replace('-', '').isdigit():
-            # This looks like coordinates, convert to location hierarchy
-            try:
-                lat, lon = float(location.split(',')[0]), float(location.split(',')[1])
-                db = SessionLocal()
-                try:
-                    location_display = get_location_hierarchy_from_coordinates(db, lat, lon)
-                    if maps_links is None:
-                        maps_links = generate_google_maps_link(lat, lon)
-                finally:
-                    db.close()
-            except (ValueError, IndexError):
-                pass
-        
-        html_body = f"""
-        <html>
-        <body>
-            <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-                <div style="background-color: #2563eb; color: white; padding: 20px; text-align: center;">
-                    <h1>TrustBond System</h1>
-                    <h2>New Case Assignment</h2>
-                </div>
-                
-                <div style="padding: 20px; background-color: #f8f9fa;">
-                    <p>Dear {f"{police_user.first_name} {police_user.last_name}".strip() or police_user.email},</p>
-                    
-                    <p>A new case has been assigned to you:</p>
-                    
-                    <div style="background-color: white; padding: 15px; border-left: 4px solid #2563eb; margin: 15px 0;">
-                        <h3>{case_number}</h3>
-                        <p><strong>Title:</strong> {case_title}</p>
-                        <p><strong>Incident Type:</strong> {incident_type}</p>
-                        <p><strong>Location:</strong> {location_display}</p>
-                        <p><strong>Reports:</strong> {report_count}</p>
-                    </div>
-                    
-                    <p>Please review the case details and take appropriate action.</p>
-                    
-                    <div style="text-align: center; margin: 20px 0;">
-                        <a href="{case_url}" style="background-color: #2563eb; color: white; padding: 12px 24px; text-decoration: none; border-radius: 4px; display: inline-block; margin: 5px;">
-                            View Case Details
-                        </a>
-                        {f'<a href="{maps_links["navigation"]}" style="background-color: #10b981; color: white; padding: 12px 24px; text-decoration: none; border-radius: 4px; display: inline-block; margin: 5px;">🚗 Navigate to Case Area</a>' if maps_links else ''}
-                    </div>
-                    
-                    {f'<div style="background-color: #e3f2fd; padding: 10px; border-radius: 4px; margin: 15px 0;"><p style="margin: 0; font-size: 14px;"><strong>📍 Quick Navigation:</strong> <a href="{maps_links["view"]}" style="color: #1976d2; text-decoration: none;">View on Map</a> | <a href="{maps_links["navigation"]}" style="color: #1976d2; text-decoration: none;">Get Directions</a></p></div>' if maps_links else ''}
-                    
-                    <p style="font-size: 12px; color: #666; margin-top: 20px;">
-                        This is an automated notification from the TrustBond system. 
-                        If you have questions, please contact your supervisor.
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        text_body = f"""
-        New Case Assigned: {case_number}
-        
-        Title: {case_title}
-        Incident Type: {incident_type}
-        Location: {location_display}
-        Reports: {report_count}
-        
-        Please review the case details at: {case_url}
-        {f'Navigate to case area: {maps_links["navigation"]}' if maps_links else ''}
-        
-        This is an automated notification from the TrustBond system.
-        """
-        
-        return self.send_email([police_user.email], subject, html_body, text_body)
+        location_display, latitude, longitude = self._location(location, latitude, longitude, db)
+        return self._queue([police_user.email], "case_assignment", {
+            "recipient_name": self._recipient_name(police_user),
+            "case_number": case_number,
+            "case_title": case_title,
+            "incident_type": incident_type,
+            "location": location_display,
+            "report_count": report_count,
+            "latitude": latitude,
+            "longitude": longitude,
+        }, db=db)
     
     def send_auto_case_notification(
         self,
@@ -301,6 +252,7 @@ class EmailNotificationService:
         report_count: int,
         latitude: Optional[float] = None,
         longitude: Optional[float] = None,
+        db: Optional[Session] = None,
     ) -> int:
         """
         Send email notification to multiple users when a case is auto-created.
@@ -314,114 +266,23 @@ class EmailNotificationService:
             report_count: Number of reports in the case
             
         Returns:
-            Number of successful email sends
+            Number of queued emails
         """
-        successful_sends = 0
-        
-        # Filter users with email addresses
-        users_with_email = [user for user in police_users if user.email]
-        
-        if not users_with_email:
+        emails = [user.email for user in police_users if user.email]
+        if not emails:
             logger.warning("No police users with email addresses found")
             return 0
-        
-        subject = f"Auto-Generated Case: {case_number}"
-        
-        case_url = f"{self.frontend_url}/cases/{case_number}"
-        
-        # Build display + one unified case-level maps link.
-        location_display = location
-        maps_links = None
-
-        if latitude is not None and longitude is not None:
-            try:
-                lat_f = float(latitude)
-                lon_f = float(longitude)
-                maps_links = generate_google_maps_link(lat_f, lon_f)
-            except (TypeError, ValueError):
-                maps_links = None
-        
-        if ',' in location and location.replace(',', '').replace('.', '').replace(' ', '').replace('-', '').isdigit():
-            # This looks like coordinates, convert to location hierarchy
-            try:
-                lat, lon = float(location.split(',')[0]), float(location.split(',')[1])
-                db = SessionLocal()
-                try:
-                    location_display = get_location_hierarchy_from_coordinates(db, lat, lon)
-                    if maps_links is None:
-                        maps_links = generate_google_maps_link(lat, lon)
-                finally:
-                    db.close()
-            except (ValueError, IndexError):
-                pass
-        
-        html_body = f"""
-        <html>
-        <body>
-            <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-                <div style="background-color: #dc2626; color: white; padding: 20px; text-align: center;">
-                    <h1>TrustBond System</h1>
-                    <h2>Auto-Generated Case Alert</h2>
-                </div>
-                
-                <div style="padding: 20px; background-color: #f8f9fa;">
-                    <p>Dear Team,</p>
-                    
-                    <p>A new case has been automatically generated from verified reports:</p>
-                    
-                    <div style="background-color: white; padding: 15px; border-left: 4px solid #dc2626; margin: 15px 0;">
-                        <h3>{case_number}</h3>
-                        <p><strong>Title:</strong> {case_title}</p>
-                        <p><strong>Incident Type:</strong> {incident_type}</p>
-                        <p><strong>Location:</strong> {location_display}</p>
-                        <p><strong>Reports:</strong> {report_count}</p>
-                        <p><strong>Status:</strong> Auto-generated from AI-verified reports</p>
-                    </div>
-                    
-                    <p>This case was automatically created when multiple verified reports were clustered together.</p>
-                    
-                    <div style="text-align: center; margin: 20px 0;">
-                        <a href="{case_url}" style="background-color: #dc2626; color: white; padding: 12px 24px; text-decoration: none; border-radius: 4px; display: inline-block; margin: 5px;">
-                            Review Case Details
-                        </a>
-                        {f'<a href="{maps_links["navigation"]}" style="background-color: #10b981; color: white; padding: 12px 24px; text-decoration: none; border-radius: 4px; display: inline-block; margin: 5px;">🚗 Navigate to Case Area</a>' if maps_links else ''}
-                    </div>
-                    
-                    {f'<div style="background-color: #fef2f2; padding: 10px; border-radius: 4px; margin: 15px 0;"><p style="margin: 0; font-size: 14px;"><strong>📍 Quick Navigation:</strong> <a href="{maps_links["view"]}" style="color: #dc2626; text-decoration: none;">View on Map</a> | <a href="{maps_links["navigation"]}" style="color: #dc2626; text-decoration: none;">Get Directions</a></p></div>' if maps_links else ''}
-                    
-                    <p style="font-size: 12px; color: #666; margin-top: 20px;">
-                        This is an automated notification from the TrustBond system. 
-                        The case was created using AI-powered verification and clustering.
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        text_body = f"""
-        Auto-Generated Case Alert: {case_number}
-        
-        Title: {case_title}
-        Incident Type: {incident_type}
-        Location: {location_display}
-        Reports: {report_count}
-        Status: Auto-generated from AI-verified reports
-        
-        This case was automatically created when multiple verified reports were clustered together.
-        
-        Review the case details at: {case_url}
-        {f'Navigate to case area: {maps_links["navigation"]}' if maps_links else ''}
-        
-        This is an automated notification from the TrustBond system.
-        """
-        
-        # Send to all users with email
-        emails = [user.email for user in users_with_email]
-        if self.send_email(emails, subject, html_body, text_body):
-            successful_sends = len(emails)
-        
-        return successful_sends
+        location_display, latitude, longitude = self._location(location, latitude, longitude, db)
+        queued = self._queue(emails, "auto_case", {
+            "case_number": case_number,
+            "case_title": case_title,
+            "incident_type": incident_type,
+            "location": location_display,
+            "report_count": report_count,
+            "latitude": latitude,
+            "longitude": longitude,
+        }, db=db)
+        return len(emails) if queued else 0
     
     def send_report_verification_notification(
         self,
@@ -430,7 +291,10 @@ class EmailNotificationService:
         incident_type: str,
         location: str,
         verification_status: str,
-        flag_reason: str = None
+        flag_reason: str = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        db: Optional[Session] = None,
     ) -> int:
         """
         Send email notification when a report is verified, flagged, or rejected (for supervisors/admins).
@@ -444,122 +308,22 @@ class EmailNotificationService:
             flag_reason: Reason for flagging (if applicable)
             
         Returns:
-            Number of successful email sends
+            Number of queued emails
         """
-        successful_sends = 0
-        
-        # Filter users with email addresses
-        users_with_email = [user for user in police_users if user.email]
-        
-        if not users_with_email:
+        emails = [user.email for user in police_users if user.email]
+        if not emails:
             return 0
-        
-        # Determine color and title based on status
-        if verification_status == "verified":
-            status_color = "#10b981"
-            status_text = "VERIFIED"
-            title = "Report Verified"
-        elif verification_status == "under_review" or verification_status == "flagged":
-            status_color = "#f59e0b"
-            status_text = "FLAGGED FOR REVIEW"
-            title = "Report Flagged for Review"
-        else:  # rejected
-            status_color = "#ef4444"
-            status_text = "REJECTED"
-            title = "Report Rejected"
-        
-        subject = f"{title}: {report_id[:8]}..."
-        
-        report_url = f"{self.frontend_url}/reports/{report_id}"
-        
-        # Convert coordinates to location hierarchy and generate Google Maps links
-        location_display = location
-        maps_links = generate_google_maps_link(0, 0)  # Default location
-        
-        if ',' in location and location.replace(',', '').replace('.', '').replace(' ', '').replace('-', '').isdigit():
-            # This looks like coordinates, convert to location hierarchy
-            try:
-                lat, lon = float(location.split(',')[0]), float(location.split(',')[1])
-                db = SessionLocal()
-                try:
-                    location_display = get_location_hierarchy_from_coordinates(db, lat, lon)
-                    maps_links = generate_google_maps_link(lat, lon)
-                finally:
-                    db.close()
-            except (ValueError, IndexError):
-                pass
-        
-        html_body = f"""
-        <html>
-        <body>
-            <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-                <div style="background-color: {status_color}; color: white; padding: 20px; text-align: center;">
-                    <h1>TrustBond System</h1>
-                    <h2>{title}</h2>
-                </div>
-                
-                <div style="padding: 20px; background-color: #f8f9fa;">
-                    <p>Dear Team,</p>
-                    
-                    <p>A report has been {status_text.lower()}:</p>
-                    
-                    <div style="background-color: white; padding: 15px; border-left: 4px solid {status_color}; margin: 15px 0;">
-                        <p><strong>Report ID:</strong> {report_id}</p>
-                        <p><strong>Incident Type:</strong> {incident_type}</p>
-                        <p><strong>Location:</strong> {location_display}</p>
-                        <p><strong>Status:</strong> {status_text}</p>
-                        {f'<p><strong>Reason:</strong> {flag_reason}</p>' if flag_reason else ''}
-                    </div>
-                    
-                    {'<p><strong>Action Required:</strong> Please review this report and take appropriate action.</p>' if verification_status in ['under_review', 'flagged'] else ''}
-                    
-                    <div style="text-align: center; margin: 20px 0;">
-                        <a href="{report_url}" style="background-color: {status_color}; color: white; padding: 12px 24px; text-decoration: none; border-radius: 4px; display: inline-block; margin: 5px;">
-                            View Report Details
-                        </a>
-                        <a href="{maps_links['navigation']}" style="background-color: #10b981; color: white; padding: 12px 24px; text-decoration: none; border-radius: 4px; display: inline-block; margin: 5px;">
-                            🚗 Navigate to Location
-                        </a>
-                    </div>
-                    
-                    <div style="background-color: #f0f9ff; padding: 10px; border-radius: 4px; margin: 15px 0;">
-                        <p style="margin: 0; font-size: 14px;">
-                            <strong>📍 Quick Navigation:</strong> 
-                            <a href="{maps_links['view']}" style="color: {status_color}; text-decoration: none;">View on Map</a> | 
-                            <a href="{maps_links['navigation']}" style="color: {status_color}; text-decoration: none;">Get Directions</a>
-                        </p>
-                    </div>
-                    
-                    <p style="font-size: 12px; color: #666; margin-top: 20px;">
-                        This is an automated notification from the TrustBond system.
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        text_body = f"""
-        {title}: {report_id}
-        
-        Incident Type: {incident_type}
-        Location: {location_display}
-        Status: {status_text}
-        {f'Reason: {flag_reason}' if flag_reason else ''}
-        
-        {'Action Required: Please review this report and take appropriate action.' if verification_status in ['under_review', 'flagged'] else ''}
-        
-        View the report details at: {report_url}
-        
-        This is an automated notification from the TrustBond system.
-        """
-        
-        # Send to all users with email
-        emails = [user.email for user in users_with_email]
-        if self.send_email(emails, subject, html_body, text_body):
-            successful_sends = len(emails)
-        
-        return successful_sends
+        location_display, latitude, longitude = self._location(location, latitude, longitude, db)
+        queued = self._queue(emails, "report_verification", {
+            "report_id": report_id,
+            "incident_type": incident_type,
+            "location": location_display,
+            "verification_status": verification_status,
+            "flag_reason": flag_reason,
+            "latitude": latitude,
+            "longitude": longitude,
+        }, db=db)
+        return len(emails) if queued else 0
     
     def send_report_assignment_notification(
         self,
@@ -568,7 +332,10 @@ class EmailNotificationService:
         incident_type: str,
         location: str,
         flag_reason: str,
-        assignment_type: str = "flagged"
+        assignment_type: str = "flagged",
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        db: Optional[Session] = None,
     ) -> bool:
         """
         Send email notification when a report is assigned to an officer.
@@ -582,121 +349,30 @@ class EmailNotificationService:
             assignment_type: Type of assignment (flagged, boundary, etc.)
             
         Returns:
-            True if email sent successfully, False otherwise
+            True if email was queued, False otherwise
         """
         if not police_user.email:
             logger.warning(f"Police user {police_user.police_user_id} has no email address")
             return False
-        
-        subject = f"Report Assigned for Review: {report_id[:8]}..."
-        
-        report_url = f"{self.frontend_url}/reports/{report_id}"
-        
-        # Convert coordinates to location hierarchy if needed
-        db = SessionLocal()
-        try:
-            if ',' in location and location.replace(',', '').replace('.', '').replace(' ', '').replace('-', '').isdigit():
-                # This looks like coordinates, convert to location hierarchy
-                try:
-                    lat, lon = float(location.split(',')[0]), float(location.split(',')[1])
-                    location_display = get_location_hierarchy_from_coordinates(db, lat, lon)
-                    maps_links = generate_google_maps_link(lat, lon)
-                except (ValueError, IndexError):
-                    location_display = location
-                    maps_links = generate_google_maps_link(0, 0)
-            else:
-                # This is already a location description
-                location_display = location
-                maps_links = generate_google_maps_link(0, 0)
-        finally:
-            db.close()
-        
-        # Customize title and color based on assignment type
-        if assignment_type == "boundary":
-            title = "Boundary Report Assigned"
-            color = "#ef4444"  # Red
-            description = "Out-of-boundary report"
-            bg_color = "#fef2f2"
-            link_color = "#ef4444"
-        else:
-            title = "Flagged Report Assigned"
-            color = "#f59e0b"  # Orange
-            description = "Flagged report"
-            bg_color = "#fffbeb"
-            link_color = "#f59e0b"
-        
-        html_body = f"""
-        <html>
-        <body>
-            <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-                <div style="background-color: {color}; color: white; padding: 20px; text-align: center;">
-                    <h1>TrustBond System</h1>
-                    <h2>{title}</h2>
-                </div>
-                
-                <div style="padding: 20px; background-color: #f8f9fa;">
-                    <p>Dear {f"{police_user.first_name} {police_user.last_name}".strip() or police_user.email},</p>
-                    
-                    <p>A {description} has been assigned to you for review:</p>
-                    
-                    <div style="background-color: white; padding: 15px; border-left: 4px solid {color}; margin: 15px 0;">
-                        <h3>{report_id[:8]}...</h3>
-                        <p><strong>Incident Type:</strong> {incident_type}</p>
-                        <p><strong>Location:</strong> {location_display}</p>
-                        <p><strong>Reason:</strong> {flag_reason}</p>
-                    </div>
-                    
-                    <p><strong>Action Required:</strong> Please review this report and take appropriate action.</p>
-                    
-                    <div style="text-align: center; margin: 20px 0;">
-                        <a href="{report_url}" style="background-color: {color}; color: white; padding: 12px 24px; text-decoration: none; border-radius: 4px; display: inline-block; margin: 5px;">
-                            Review Report
-                        </a>
-                        <a href="{maps_links['navigation']}" style="background-color: #10b981; color: white; padding: 12px 24px; text-decoration: none; border-radius: 4px; display: inline-block; margin: 5px;">
-                            🚗 Navigate to Location
-                        </a>
-                    </div>
-                    
-                    <div style="background-color: {bg_color}; padding: 10px; border-radius: 4px; margin: 15px 0;">
-                        <p style="margin: 0; font-size: 14px;">
-                            <strong>📍 Quick Navigation:</strong> 
-                            <a href="{maps_links['view']}" style="color: {link_color}; text-decoration: none;">View on Map</a> | 
-                            <a href="{maps_links['navigation']}" style="color: {link_color}; text-decoration: none;">Get Directions</a>
-                        </p>
-                    </div>
-                    
-                    <p style="font-size: 12px; color: #666; margin-top: 20px;">
-                        This is an automated notification from the TrustBond system. 
-                        If you have questions, please contact your supervisor.
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        text_body = f"""
-        {title}: {report_id[:8]}...
-        
-        Incident Type: {incident_type}
-        Location: {location}
-        Reason: {flag_reason}
-        
-        Action Required: Please review this report and take appropriate action.
-        
-        Review the report at: {report_url}
-        
-        This is an automated notification from the TrustBond system.
-        """
-        
-        return self.send_email([police_user.email], subject, html_body, text_body)
+        location_display, latitude, longitude = self._location(location, latitude, longitude, db)
+        return self._queue([police_user.email], "report_assignment", {
+            "recipient_name": self._recipient_name(police_user),
+            "report_id": report_id,
+            "incident_type": incident_type,
+            "location": location_display,
+            "flag_reason": flag_reason,
+            "assignment_type": assignment_type,
+            "latitude": latitude,
+            "longitude": longitude,
+        }, db=db)
     
     def send_hotspot_notification(
         self,
         police_users: List[PoliceUser],
         hotspot_count: int,
         hotspot_location: str = None,
-        hotspot_coordinates: str = None
+        hotspot_coordinates: str = None,
+        db: Optional[Session] = None,
     ) -> int:
         """
         Send email notification when new hotspots are detected (for supervisors/admins).
@@ -708,104 +384,32 @@ class EmailNotificationService:
             hotspot_coordinates: Coordinates of primary hotspot
             
         Returns:
-            Number of successful email sends
+            Number of queued emails
         """
-        successful_sends = 0
-        
-        # Filter users with email addresses
-        users_with_email = [user for user in police_users if user.email]
-        
-        if not users_with_email:
+        emails = [user.email for user in police_users if user.email]
+        if not emails:
             return 0
-        
-        subject = f"New Hotspots Detected: {hotspot_count} Safety Hotspots"
-        
-        # Convert coordinates to location hierarchy and generate Google Maps links
-        location_display = hotspot_location
-        maps_links = None
-        
-        if hotspot_coordinates:
+        location_display, latitude, longitude = hotspot_location, None, None
+        coordinates = _parse_coordinates(hotspot_coordinates)
+        if coordinates is not None:
+            latitude, longitude = coordinates
+            session = db or SessionLocal()
             try:
-                lat, lon = hotspot_coordinates.split(',')
-                lat_float, lon_float = float(lat), float(lon)
-                maps_links = generate_google_maps_link(lat_float, lon_float)
-                
-                # Convert coordinates to location hierarchy
-                db = SessionLocal()
-                try:
-                    location_hierarchy = get_location_hierarchy_from_coordinates(db, lat_float, lon_float)
-                    if location_hierarchy and location_hierarchy != f"{lat_float:.4f}, {lon_float:.4f}":
-                        # Use location hierarchy if found, otherwise keep original location description
-                        location_display = location_hierarchy
-                finally:
-                    db.close()
-            except:
-                pass
-        
-        html_body = f"""
-        <html>
-        <body>
-            <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-                <div style="background-color: #dc2626; color: white; padding: 20px; text-align: center;">
-                    <h1>TrustBond System</h1>
-                    <h2>🔥 New Safety Hotspots Detected</h2>
-                </div>
-                
-                <div style="padding: 20px; background-color: #f8f9fa;">
-                    <p>Dear Team,</p>
-                    
-                    <p><strong>{hotspot_count}</strong> new safety hotspots have been automatically detected based on recent report clusters.</p>
-                    
-                    <div style="background-color: white; padding: 15px; border-left: 4px solid #dc2626; margin: 15px 0;">
-                        <h3>📍 Hotspot Analysis</h3>
-                        <p><strong>Hotspots Detected:</strong> {hotspot_count}</p>
-                        <p><strong>Analysis:</strong> AI-powered clustering of verified reports</p>
-                        <p><strong>Priority:</strong> Requires immediate attention</p>
-                        {f'<p><strong>Primary Location:</strong> {location_display}</p>' if location_display else ''}
-                        {f'<p><strong>Coordinates:</strong> {hotspot_coordinates}</p>' if hotspot_coordinates else ''}
-                    </div>
-                    
-                    <p><strong>Action Required:</strong> Please review the Safety Map to assess these hotspots and deploy appropriate resources.</p>
-                    
-                    <div style="text-align: center; margin: 20px 0;">
-                        <a href="{self.frontend_url}/hotspots" style="background-color: #dc2626; color: white; padding: 12px 24px; text-decoration: none; border-radius: 4px; display: inline-block; margin: 5px;">
-                            🔥 View Safety Map
-                        </a>
-                        {f'<a href="{maps_links["navigation"]}" style="background-color: #10b981; color: white; padding: 12px 24px; text-decoration: none; border-radius: 4px; display: inline-block; margin: 5px;">🚗 Navigate to Hotspot</a>' if maps_links else ''}
-                    </div>
-                    
-                    {f'<div style="background-color: #fef2f2; padding: 10px; border-radius: 4px; margin: 15px 0;"><p style="margin: 0; font-size: 14px;"><strong>📍 Quick Navigation:</strong> <a href="{maps_links["view"]}" style="color: #dc2626; text-decoration: none;">View on Map</a> | <a href="{maps_links["navigation"]}" style="color: #dc2626; text-decoration: none;">Get Directions</a></p></div>' if maps_links else ''}
-                    
-                    <p style="font-size: 12px; color: #666; margin-top: 20px;">
-                        This is an automated notification from the TrustBond system. 
-                        Hotspots are generated using AI-powered analysis of report patterns.
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        text_body = f"""
-        New Safety Hotspots Detected: {hotspot_count} Hotspots
-        
-        {hotspot_count} new safety hotspots have been automatically detected.
-        
-        Analysis: AI-powered clustering of verified reports
-        Priority: Requires immediate attention
-        {f'Primary Location: {location_display}' if location_display else ''}
-        {f'Coordinates: {hotspot_coordinates}' if hotspot_coordinates else ''}
-        
-        Action Required: Please review the Safety Map to assess these hotspots.
-        
-        View the Safety Map at: {self.frontend_url}/hotspots
-        {f'Navigate to hotspot: {maps_links["navigation"]}' if maps_links else ''}
-        
-        This is an automated notification from the TrustBond system.
-        Hotspots are generated using AI-powered analysis of report patterns.
-        """
-        
-        return successful_sends
+                # Keep the original description when no village matches the point.
+                resolved = resolve_location_text(session, latitude, longitude)
+                if resolved != _coordinates_text(latitude, longitude):
+                    location_display = resolved
+            finally:
+                if db is None:
+                    session.close()
+        queued = self._queue(emails, "hotspot_detected", {
+            "hotspot_count": hotspot_count,
+            "location": location_display,
+            "coordinates": hotspot_coordinates,
+            "latitude": latitude,
+            "longitude": longitude,
+        }, db=db)
+        return len(emails) if queued else 0
 
 
 # Global email service instance
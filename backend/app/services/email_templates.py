@@ -0,0 +1,294 @@
+"""
+Notification email templates, compiled once at import.
+
+Each notification type is a render function over a JSON-serializable context
+(stored with the email_outbox row) that fills one shared, precompiled layout.
+Everything a recipient sees except the greeting comes from the event, so the
+delivery worker renders a hotspot alert to 50 supervisors once per batch.
+Values are HTML-escaped; Google Maps links come from latitude/longitude in the
+context and are left out when the event has no coordinates.
+"""
+from __future__ import annotations
+
+from html import escape
+from string import Template
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.email_delivery import RenderedEmail, register_email_template
+
+_HTML_LAYOUT = Template("""
+        <html>
+        <body>
+            <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+                <div style="background-color: $color; color: white; padding: 20px; text-align: center;">
+                    <h1>TrustBond System</h1>
+                    <h2>$heading</h2>
+                </div>
+
+                <div style="padding: 20px; background-color: #f8f9fa;">
+                    <p>Dear $greeting,</p>
+
+                    <p>$intro</p>
+
+                    <div style="background-color: white; padding: 15px; border-left: 4px solid $color; margin: 15px 0;">
+$details
+                    </div>
+                    $after_details
+                    <div style="text-align: center; margin: 20px 0;">
+                        <a href="$action_url" style="background-color: $color; color: white; padding: 12px 24px; text-decoration: none; border-radius: 4px; display: inline-block; margin: 5px;">
+                            $action_label
+                        </a>
+                        $navigate_button
+                    </div>
+
+                    $quick_nav
+
+                    <p style="font-size: 12px; color: #666; margin-top: 20px;">
+                        $footer
+                    </p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """)
+
+_HTML_TITLE = Template("""                        <h3>$value</h3>""")
+_HTML_ROW = Template("""                        <p><strong>$label:</strong> $value</p>""")
+_HTML_NOTE = Template("""<p>$text</p>""")
+_HTML_NAVIGATE = Template(
+    """<a href="$navigation" style="background-color: #10b981; color: white; padding: 12px 24px; """
+    """text-decoration: none; border-radius: 4px; display: inline-block; margin: 5px;">🚗 $label</a>"""
+)
+_HTML_QUICK_NAV = Template(
+    """<div style="background-color: $background; padding: 10px; border-radius: 4px; margin: 15px 0;">"""
+    """<p style="margin: 0; font-size: 14px;"><strong>📍 Quick Navigation:</strong> """
+    """<a href="$view" style="color: $link_color; text-decoration: none;">View on Map</a> | """
+    """<a href="$navigation" style="color: $link_color; text-decoration: none;">Get Directions</a></p></div>"""
+)
+
+_TEXT_LAYOUT = Template("""
+        $heading
+
+$details
+
+        $note$action_label: $action_url
+        $navigate
+        This is an automated notification from the TrustBond system.
+        """)
+
+_AUTOMATED = "This is an automated notification from the TrustBond system."
+
+
+def maps_links(latitude: Any, longitude: Any) -> Optional[Dict[str, str]]:
+    """Google Maps view/navigation links, or None without usable coordinates."""
+    try:
+        lat, lon = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        return None
+    return {
+        "navigation": f"https://www.google.com/maps/dir/?api=1&destination={lat},{lon}",
+        "view": f"https://www.google.com/maps?q={lat},{lon}",
+    }
+
+
+def _render(
+    *,
+    subject: str,
+    color: str,
+    heading: str,
+    greeting: str,
+    intro: str,
+    title: Optional[str],
+    rows: List[Tuple[str, Any]],
+    action_url: str,
+    action_label: str,
+    text_action_label: str,
+    navigate_label: str,
+    nav_background: str,
+    context: Dict[str, Any],
+    note: Optional[str] = None,
+    footer: Optional[str] = None,
+) -> RenderedEmail:
+    links = maps_links(context.get("latitude"), context.get("longitude"))
+    visible_rows = [(label, value) for label, value in rows if value not in (None, "")]
+
+    html_details = [_HTML_TITLE.substitute(value=escape(title))] if title else []
+    html_details += [_HTML_ROW.substitute(label=label, value=escape(str(value))) for label, value in visible_rows]
+    html_body = _HTML_LAYOUT.substitute(
+        color=color,
+        heading=escape(heading),
+        greeting=escape(greeting),
+        intro=escape(intro),
+        details="\n".join(html_details),
+        after_details=f"\n                    {_HTML_NOTE.substitute(text=escape(note))}\n" if note else "",
+        action_url=escape(action_url),
+        action_label=action_label,
+        navigate_button=_HTML_NAVIGATE.substitute(navigation=escape(links["navigation"]), label=navigate_label)
+        if links else "",
+        quick_nav=_HTML_QUICK_NAV.substitute(
+            background=nav_background, link_color=color, view=escape(links["view"]), navigation=escape(links["navigation"])
+        )
+        if links else "",
+        footer=escape(footer or _AUTOMATED),
+    )
+    text_body = _TEXT_LAYOUT.substitute(
+        heading=subject,
+        details="\n".join(f"        {label}: {value}" for label, value in visible_rows),
+        note=f"{note}\n        \n        " if note else "",
+        action_label=text_action_label,
+        action_url=action_url,
+        navigate=f"{navigate_label}: {links['navigation']}\n" if links else "",
+    )
+    return RenderedEmail(subject, text_body, html_body)
+
+
+def render_case_assignment(context: Dict[str, Any]) -> RenderedEmail:
+    case_number = context["case_number"]
+    return _render(
+        subject=f"New Case Assigned: {case_number}",
+        color="#2563eb",
+        heading="New Case Assignment",
+        greeting=context.get("recipient_name") or "Officer",
+        intro="A new case has been assigned to you:",
+        title=case_number,
+        rows=[
+            ("Title", context.get("case_title")),
+            ("Incident Type", context.get("incident_type")),
+            ("Location", context.get("location")),
+            ("Reports", context.get("report_count")),
+        ],
+        note="Please review the case details and take appropriate action.",
+        action_url=f"{context['base_url']}/cases/{case_number}",
+        action_label="View Case Details",
+        text_action_label="Please review the case details at",
+        navigate_label="Navigate to Case Area",
+        nav_background="#e3f2fd",
+        context=context,
+        footer=f"{_AUTOMATED} If you have questions, please contact your supervisor.",
+    )
+
+
+def render_auto_case(context: Dict[str, Any]) -> RenderedEmail:
+    case_number = context["case_number"]
+    return _render(
+        subject=f"Auto-Generated Case: {case_number}",
+        color="#dc2626",
+        heading="Auto-Generated Case Alert",
+        greeting="Team",
+        intro="A new case has been automatically generated from verified reports:",
+        title=case_number,
+        rows=[
+            ("Title", context.get("case_title")),
+            ("Incident Type", context.get("incident_type")),
+            ("Location", context.get("location")),
+            ("Reports", context.get("report_count")),
+            ("Status", "Auto-generated from AI-verified reports"),
+        ],
+        note="This case was automatically created when multiple verified reports were clustered together.",
+        action_url=f"{context['base_url']}/cases/{case_number}",
+        action_label="Review Case Details",
+        text_action_label="Review the case details at",
+        navigate_label="Navigate to Case Area",
+        nav_background="#fef2f2",
+        context=context,
+        footer=f"{_AUTOMATED} The case was created using AI-powered verification and clustering.",
+    )
+
+
+_VERIFICATION_STYLES = {
+    "verified": ("#10b981", "VERIFIED", "Report Verified"),
+    "under_review": ("#f59e0b", "FLAGGED FOR REVIEW", "Report Flagged for Review"),
+    "flagged": ("#f59e0b", "FLAGGED FOR REVIEW", "Report Flagged for Review"),
+}
+
+
+def render_report_verification(context: Dict[str, Any]) -> RenderedEmail:
+    status = context.get("verification_status") or "rejected"
+    color, status_text, title = _VERIFICATION_STYLES.get(status, ("#ef4444", "REJECTED", "Report Rejected"))
+    report_id = context["report_id"]
+    return _render(
+        subject=f"{title}: {report_id[:8]}...",
+        color=color,
+        heading=title,
+        greeting="Team",
+        intro=f"A report has been {status_text.lower()}:",
+        title=None,
+        rows=[
+            ("Report ID", report_id),
+            ("Incident Type", context.get("incident_type")),
+            ("Location", context.get("location")),
+            ("Status", status_text),
+            ("Reason", context.get("flag_reason")),
+        ],
+        note="Action Required: Please review this report and take appropriate action."
+        if status in ("under_review", "flagged") else None,
+        action_url=f"{context['base_url']}/reports/{report_id}",
+        action_label="View Report Details",
+        text_action_label="View the report details at",
+        navigate_label="Navigate to Location",
+        nav_background="#f0f9ff",
+        context=context,
+    )
+
+
+def render_report_assignment(context: Dict[str, Any]) -> RenderedEmail:
+    report_id = context["report_id"]
+    if context.get("assignment_type") == "boundary":
+        color, title, description, background = "#ef4444", "Boundary Report Assigned", "Out-of-boundary report", "#fef2f2"
+    else:
+        color, title, description, background = "#f59e0b", "Flagged Report Assigned", "Flagged report", "#fffbeb"
+    return _render(
+        subject=f"Report Assigned for Review: {report_id[:8]}...",
+        color=color,
+        heading=title,
+        greeting=context.get("recipient_name") or "Officer",
+        intro=f"A {description} has been assigned to you for review:",
+        title=f"{report_id[:8]}...",
+        rows=[
+            ("Incident Type", context.get("incident_type")),
+            ("Location", context.get("location")),
+            ("Reason", context.get("flag_reason")),
+        ],
+        note="Action Required: Please review this report and take appropriate action.",
+        action_url=f"{context['base_url']}/reports/{report_id}",
+        action_label="Review Report",
+        text_action_label="Review the report at",
+        navigate_label="Navigate to Location",
+        nav_background=background,
+        context=context,
+        footer=f"{_AUTOMATED} If you have questions, please contact your supervisor.",
+    )
+
+
+def render_hotspot_detected(context: Dict[str, Any]) -> RenderedEmail:
+    count = context.get("hotspot_count") or 1
+    return _render(
+        subject=f"New Hotspots Detected: {count} Safety Hotspots",
+        color="#dc2626",
+        heading="🔥 New Safety Hotspots Detected",
+        greeting="Team",
+        intro=f"{count} new safety hotspots have been automatically detected based on recent report clusters.",
+        title=None,
+        rows=[
+            ("Hotspots Detected", count),
+            ("Analysis", "AI-powered clustering of verified reports"),
+            ("Priority", "Requires immediate attention"),
+            ("Primary Location", context.get("location")),
+            ("Coordinates", context.get("coordinates")),
+        ],
+        note="Action Required: Please review the Safety Map to assess these hotspots and deploy appropriate resources.",
+        action_url=f"{context['base_url']}/hotspots",
+        action_label="🔥 View Safety Map",
+        text_action_label="View the Safety Map at",
+        navigate_label="Navigate to Hotspot",
+        nav_background="#fef2f2",
+        context=context,
+        footer=f"{_AUTOMATED} Hotspots are generated using AI-powered analysis of report patterns.",
+    )
+
+
+register_email_template("case_assignment", render_case_assignment)
+register_email_template("auto_case", render_auto_case)
+register_email_template("report_verification", render_report_verification)
+register_email_template("report_assignment", render_report_assignment)
+register_email_template("hotspot_detected", render_hotspot_detected)
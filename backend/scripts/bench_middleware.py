@@ -0,0 +1,170 @@
+"""
+Benchmark the request-id and rate-limit middleware: BaseHTTPMiddleware vs plain ASGI.
+
+Builds two copies of a small FastAPI app with stand-ins for the public
+endpoints (report create/confirm, device register, incident types) and drives
+them in-process through httpx's ASGI transport, so the numbers are the
+framework + middleware overhead without network or database. The "before"
+stack is the previous BaseHTTPMiddleware implementation, kept here for the
+comparison; the "after" stack is what app.main installs.
+
+  cd backend
+  python scripts/bench_middleware.py --requests 5000 --concurrency 20
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.rate_limiter import InMemoryRateLimiter
+from app.core.request_context import reset_request_id, set_request_id
+from app.middleware.rate_limit import DEVICE_HASH_HEADER, RouteRateLimitMiddleware
+from app.middleware.request_id import REQUEST_ID_HEADER, RequestIdMiddleware
+
+# Limits high enough that the benchmark measures the allowed path, not 429s.
+HIGH_LIMIT = 10_000_000
+
+ENDPOINTS = [
+    ("GET", "/api/v1/incident-types/"),
+    ("POST", "/api/v1/devices/register"),
+    ("POST", "/api/v1/reports/"),
+    ("POST", "/api/v1/reports/0f8e2c1a-0000-0000-0000-000000000000/confirm"),
+]
+
+
+class LegacyRequestIdMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        request_id = request.headers.get(REQUEST_ID_HEADER) or uuid4().hex
+        token = set_request_id(request_id)
+        try:
+            response = await call_next(request)
+            response.headers[REQUEST_ID_HEADER] = request_id
+            return response
+        finally:
+            reset_request_id(token)
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    """The previous dispatch(): same rules and limiter, wrapped in BaseHTTPMiddleware."""
+
+    def __init__(self, app, **kwargs) -> None:
+        super().__init__(app)
+        self._rules = RouteRateLimitMiddleware(app, **kwargs)
+
+    async def dispatch(self, request, call_next):
+        rule = self._rules._match_rule(request.method.upper(), request.url.path)
+        if rule is None:
+            return await call_next(request)
+        client_ip = request.client.host if request.client else None
+        keys = self._rules._client_keys(rule, client_ip, request.headers.get(DEVICE_HASH_HEADER))
+        decision = await self._rules._limiter.consume(keys, rule.limit_per_window, rule.burst)
+        response = await call_next(request)
+        response.headers["X-RateLimit-Limit"] = str(rule.limit_per_window)
+        response.headers["X-RateLimit-Remaining"] = str(decision.remaining)
+        return response
+
+
+def build_app(request_id_cls, rate_limit_cls) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(
+        rate_limit_cls,
+        report_create_per_minute=HIGH_LIMIT,
+        evidence_upload_per_minute=HIGH_LIMIT,
+        report_confirm_per_minute=HIGH_LIMIT,
+        limiter=InMemoryRateLimiter(),
+    )
+    app.add_middleware(request_id_cls)
+
+    @app.get("/api/v1/incident-types/")
+    async def incident_types() -> list[dict]:
+        return [{"incident_type_id": i, "type_name": f"type {i}"} for i in range(10)]
+
+    @app.post("/api/v1/devices/register")
+    async def register_device() -> dict:
+        return {"device_id": "d", "device_trust_score": 50}
+
+    @app.post("/api/v1/reports/")
+    async def create_report() -> dict:
+        return {"report_id": "r", "status": "pending"}
+
+    @app.post("/api/v1/reports/{report_id}/confirm")
+    async def confirm_report(report_id: str) -> dict:
+        return {"report_id": report_id, "confirmed": True}
+
+    return app
+
+
+async def run(app: FastAPI, total: int, concurrency: int) -> tuple[list[float], float]:
+    transport = httpx.ASGITransport(app=app)
+    latencies: list[float] = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up routing, pydantic and the limiter before timing.
+        for method, path in ENDPOINTS:
+            await client.request(method, path, headers={DEVICE_HASH_HEADER: "warmup"})
+
+        async def worker(worker_id: int) -> None:
+            headers = {DEVICE_HASH_HEADER: f"device-{worker_id}"}
+            for i in range(worker_id, total, concurrency):
+                method, path = ENDPOINTS[i % len(ENDPOINTS)]
+                started = time.perf_counter()
+                response = await client.request(method, path, headers=headers)
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.text
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(w) for w in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return latencies, elapsed
+
+
+def summarize(label: str, latencies: list[float], elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    row = {
+        "label": label,
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p95_ms": ordered[int(len(ordered) * 0.95) - 1] * 1000,
+        "rps": len(ordered) / elapsed,
+    }
+    print(f"{label:<22} p50 {row['p50_ms']:7.3f} ms   p95 {row['p95_ms']:7.3f} ms   {row['rps']:8.0f} req/s")
+    return row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3, help="best round per stack is reported")
+    args = parser.parse_args()
+
+    stacks = [
+        ("BaseHTTPMiddleware", build_app(LegacyRequestIdMiddleware, LegacyRateLimitMiddleware)),
+        ("pure ASGI", build_app(RequestIdMiddleware, RouteRateLimitMiddleware)),
+    ]
+    print(f"{args.requests} requests, concurrency {args.concurrency}, best of {args.rounds} rounds")
+    results = []
+    for label, app in stacks:
+        rounds = [asyncio.run(run(app, args.requests, args.concurrency)) for _ in range(args.rounds)]
+        latencies, elapsed = min(rounds, key=lambda r: r[1])
+        results.append(summarize(label, latencies, elapsed))
+
+    before, after = results
+    print(
+        f"throughput {after['rps'] / before['rps'] - 1:+.0%}, "
+        f"p50 {after['p50_ms'] / before['p50_ms'] - 1:+.0%}, "
+        f"p95 {after['p95_ms'] / before['p95_ms'] - 1:+.0%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.v1.auth import _get_user_from_token
+from app.core.auth_cache import principal_cache
+from app.core.security import create_access_token
+from app.models.police_user import PoliceUser
+from app.models.user_session import UserSession
+
+
+@pytest.fixture()
+def db_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    PoliceUser.__table__.create(engine)
+    UserSession.__table__.create(engine)
+    statements: list[str] = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, sql, *args: statements.append(sql))
+    principal_cache.clear()
+    yield sessionmaker(bind=engine), statements
+    principal_cache.clear()
+    engine.dispose()
+
+
+def _login(db, role: str = "supervisor") -> tuple[PoliceUser, str]:
+    user = PoliceUser(
+        first_name="Aline",
+        last_name="Uwase",
+        email=f"{role}@example.org",
+        password_hash="x",
+        role=role,
+        station_id=3,
+        assigned_location_id=11,
+        is_active=True,
+    )
+    db.add(user)
+    db.flush()
+    token = create_access_token(subject=str(user.police_user_id), role=role)
+    db.add(UserSession(
+        police_user_id=user.police_user_id,
+        refresh_token=token,
+        expires_at=datetime.now(timezone.utc) + timedelta(hours=1),
+    ))
+    db.commit()
+    return user, token
+
+
+def test_repeat_requests_authenticate_without_queries(db_factory) -> None:
+    Session, statements = db_factory
+    with Session() as db:
+        user, token = _login(db)
+        user_id = user.police_user_id
+
+    with Session() as db:
+        _get_user_from_token(db, token)
+
+    statements.clear()
+    with Session() as db:
+        current = _get_user_from_token(db, token)
+        assert (current.police_user_id, current.role, current.station_id, current.assigned_location_id) == (
+            user_id, "supervisor", 3, 11,
+        )
+        assert current in db
+    assert statements == []
+
+    # The attached instance behaves like a loaded one: changes flush as an UPDATE.
+    with Session() as db:
+        current = _get_user_from_token(db, token)
+        current.last_name = "Mukamana"
+        db.commit()
+        assert db.get(PoliceUser, user_id).last_name == "Mukamana"
+    assert principal_cache.stats()["hits"] >= 2
+
+
+def test_revoked_session_is_rejected_after_invalidation(db_factory) -> None:
+    Session, _ = db_factory
+    with Session() as db:
+        user, token = _login(db)
+        user_id = user.police_user_id
+        _get_user_from_token(db, token)
+
+        db.query(UserSession).update({UserSession.revoked_at: datetime.now(timezone.utc)})
+        db.commit()
+        principal_cache.invalidate_user(user_id)
+
+        with pytest.raises(HTTPException) as exc:
+            _get_user_from_token(db, token)
+        assert exc.value.status_code == 401
+    assert len(principal_cache) == 0
+
+
+def test_deactivated_user_is_rejected_after_invalidation(db_factory) -> None:
+    Session, _ = db_factory
+    with Session() as db:
+        user, token = _login(db, role="officer")
+        _get_user_from_token(db, token)
+
+        user.is_active = False
+        db.commit()
+        principal_cache.invalidate_user(user.police_user_id)
+
+        with pytest.raises(HTTPException):
+            _get_user_from_token(db, token)
+
+
+def test_token_without_session_row_is_still_accepted(db_factory) -> None:
+    Session, _ = db_factory
+    with Session() as db:
+        user, _ = _login(db)
+        legacy_token = create_access_token(subject=str(user.police_user_id), role="supervisor", expires_delta=timedelta(minutes=5))
+        assert _get_user_from_token(db, legacy_token).police_user_id == user.police_user_id
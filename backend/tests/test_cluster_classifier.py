@@ -0,0 +1,79 @@
+import numpy as np
+
+from app.core import cluster_classifier as cc
+from app.core.cluster_classifier import (
+    ClusterFeatures,
+    classification_to_risk_level,
+    predict_cluster_classification,
+    predict_cluster_classification_many,
+    risk_level_to_classification,
+)
+from app.core.hotspot_auto import _store_classification
+from app.models.hotspot import Hotspot
+
+
+def test_risk_level_round_trips_to_classification() -> None:
+    for classification in ("critical", "active", "emerging", "low_activity"):
+        assert risk_level_to_classification(classification_to_risk_level(classification)) == classification
+    assert risk_level_to_classification(None) == "low_activity"
+
+
+def test_classification_is_stored_on_hotspot() -> None:
+    result = predict_cluster_classification(
+        incident_count=6, avg_trust=80.0, cluster_density=8.0, time_window_hours=24
+    )
+    hotspot = Hotspot()
+    _store_classification(hotspot, result, 80.123)
+
+    assert hotspot.classification == result["classification"]
+    assert hotspot.hotspot_score == result["hotspot_score"]
+    assert hotspot.classification_source == result["source"]
+    assert hotspot.avg_trust_score == 80.12
+
+
+class _FakeModel:
+    classes_ = np.array(["active", "critical", "emerging", "low_activity"])
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def predict(self, frame):
+        self.calls += 1
+        return np.where(frame["incident_count"].to_numpy() >= 10, "critical", "emerging")
+
+    def predict_proba(self, frame):
+        self.calls += 1
+        big = frame["incident_count"].to_numpy() >= 10
+        return np.array([[0.1, 0.7, 0.1, 0.1] if b else [0.2, 0.1, 0.6, 0.1] for b in big])
+
+
+def test_batch_prediction_uses_one_model_call_and_matches_single(monkeypatch) -> None:
+    model = _FakeModel()
+    monkeypatch.setattr(cc, "_load_cluster_model", lambda: model)
+    clusters = [
+        ClusterFeatures(incident_count=3, avg_trust=60.0, cluster_density=4.0, time_window_hours=24),
+        ClusterFeatures(incident_count=12, avg_trust=90.0, cluster_density=30.0, time_window_hours=24),
+    ]
+
+    results = predict_cluster_classification_many(clusters)
+
+    assert model.calls == 2  # one predict + one predict_proba for the whole run
+    assert [r["classification"] for r in results] == ["emerging", "critical"]
+    assert [r["confidence"] for r in results] == [0.6, 0.7]
+    assert all(r["source"] == "model" for r in results)
+    assert results[1] == predict_cluster_classification(12, 90.0, 30.0, 24)
+
+
+def test_batch_prediction_falls_back_when_model_fails(monkeypatch) -> None:
+    class _Broken:
+        def predict(self, frame):
+            raise RuntimeError("bad model")
+
+    monkeypatch.setattr(cc, "_load_cluster_model", lambda: _Broken())
+    results = predict_cluster_classification_many([
+        ClusterFeatures(incident_count=2, avg_trust=50.0, cluster_density=1.0, time_window_hours=168),
+    ])
+
+    assert results[0]["source"] == "dbscan_fallback"
+    assert results[0]["classification"] == "low_activity"
+    assert predict_cluster_classification_many([]) == []
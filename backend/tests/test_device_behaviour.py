@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta, timezone
+
+import app.core.device_behaviour as device_behaviour
+from app.core.device_behaviour import DeviceBehaviour, DeviceBehaviourSummaries
+
+
+def _summary(device_id: str, count: int) -> DeviceBehaviour:
+    now = datetime.now(timezone.utc)
+    return DeviceBehaviour(
+        device_id=device_id,
+        device_hash="hash-" + device_id,
+        trust_score=50,
+        report_count=count,
+        first_reported_at=now - timedelta(hours=2),
+        last_reported_at=now,
+        interval_mean=100.0,
+        interval_std=10.0,
+    )
+
+
+class _FakeResult(list):
+    pass
+
+
+class _FakeSession:
+    def __init__(self, changed) -> None:
+        self.changed = changed
+
+    def execute(self, statement, params=None):
+        return _FakeResult((d,) for d in self.changed)
+
+
+def test_interval_cv_and_time_span() -> None:
+    summary = _summary("a", 3)
+
+    assert summary.interval_cv == 0.1
+    assert round(summary.time_span_hours, 2) == 2.0
+
+
+def test_incremental_refresh_only_requeries_changed_devices(monkeypatch) -> None:
+    calls = []
+
+    def fake_query(db, since, sector_id=None, device_id=None, only_devices=None):
+        calls.append(only_devices)
+        if only_devices is None:
+            return [_summary("a", 3), _summary("b", 4)]
+        return [_summary(d, 9) for d in only_devices]
+
+    monkeypatch.setattr(device_behaviour, "query_device_behaviour", fake_query)
+    monkeypatch.setattr(device_behaviour, "INCREMENTAL_REFRESH_SECONDS", 0.0)
+    summaries = DeviceBehaviourSummaries()
+
+    first = summaries.get(_FakeSession([]), 720)
+    second = summaries.get(_FakeSession(["b"]), 720)
+
+    assert {s.device_id: s.report_count for s in first} == {"a": 3, "b": 4}
+    assert {s.device_id: s.report_count for s in second} == {"a": 3, "b": 9}
+    assert calls == [None, ["b"]]
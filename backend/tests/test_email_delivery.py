@@ -0,0 +1,286 @@
+import smtplib
+import socket
+import threading
+from datetime import datetime
+
+import pytest
+
+from app.core.email import SmtpPool
+from app.core.email_delivery import (
+    EmailDeliveryWorker,
+    OutboxMessage,
+    RenderedEmail,
+    register_email_template,
+)
+
+
+class _MemoryStore:
+    def __init__(self, messages: list[OutboxMessage]) -> None:
+        self.pending = list(messages)
+        self.sent: list[int] = []
+        self.retry: dict[int, datetime] = {}
+        self.dead: dict[int, str] = {}
+
+    def claim(self, limit: int) -> list[OutboxMessage]:
+        batch, self.pending = self.pending[:limit], self.pending[limit:]
+        return [m._replace(attempts=m.attempts + 1) for m in batch]
+
+    def mark_sent(self, email_ids: list[int]) -> None:
+        self.sent.extend(email_ids)
+
+    def mark_failed(self, email_id: int, error: str, retry_at: datetime | None) -> None:
+        if retry_at is None:
+            self.dead[email_id] = error
+        else:
+            self.retry[email_id] = retry_at
+
+    def purge_sent(self, older_than_days: int) -> int:
+        return 0
+
+
+class _FakeSmtp:
+    def __init__(self, log: list, fail_for: dict | None = None) -> None:
+        self.log = log
+        self.fail_for = fail_for or {}
+
+    def sendmail(self, from_addr: str, to_addrs: list[str], message: str) -> None:
+        error = self.fail_for.pop(to_addrs[0], None)
+        if error is not None:
+            raise error
+        self.log.append((to_addrs[0], message))
+
+    def noop(self) -> tuple[int, bytes]:
+        return 250, b"OK"
+
+    def quit(self) -> None:
+        pass
+
+
+def _message(email_id: int, to: str, attempts: int = 0, **fields) -> OutboxMessage:
+    base = dict(subject="Hello", body_plain="plain", body_html=None, template=None, context=None)
+    base.update(fields)
+    return OutboxMessage(email_id=email_id, to_address=to, attempts=attempts, **base)
+
+
+def test_batch_shares_one_connection_and_one_render() -> None:
+    renders = []
+
+    def render(context: dict) -> RenderedEmail:
+        renders.append(context)
+        return RenderedEmail(f"{context['count']} hotspots", "plain", "<p>html</p>")
+
+    register_email_template("test_hotspots", render)
+    sent_log: list = []
+    connects = []
+
+    def connect() -> _FakeSmtp:
+        connects.append(1)
+        return _FakeSmtp(sent_log)
+
+    store = _MemoryStore(
+        [_message(i, f"user{i}@example.org", template="test_hotspots", context={"count": 3}) for i in range(5)]
+    )
+    worker = EmailDeliveryWorker(store=store, pool=SmtpPool(connect=connect), batch_size=10)
+
+    assert worker.run_once() == 5
+    assert store.sent == [0, 1, 2, 3, 4]
+    assert len(connects) == 1
+    assert len(renders) == 1
+    assert [to for to, _ in sent_log] == [f"user{i}@example.org" for i in range(5)]
+    assert all(f"To: user{i}@example.org" in msg for i, (_, msg) in enumerate(sent_log))
+    assert worker.stats()["render_reuse"] == 4
+
+
+def test_transient_failure_is_retried_with_backoff_and_permanent_is_dead_lettered() -> None:
+    sent_log: list = []
+    fail_for = {
+        "busy@example.org": smtplib.SMTPResponseException(451, b"try later"),
+        "gone@example.org": smtplib.SMTPRecipientsRefused({"gone@example.org": (550, b"no such user")}),
+    }
+    store = _MemoryStore([
+        _message(1, "busy@example.org"),
+        _message(2, "gone@example.org"),
+        _message(3, "ok@example.org"),
+        _message(4, "last@example.org", attempts=2, body_plain="other"),
+    ])
+    fail_for["last@example.org"] = smtplib.SMTPResponseException(421, b"closing")
+    worker = EmailDeliveryWorker(
+        store=store,
+        pool=SmtpPool(connect=lambda: _FakeSmtp(sent_log, fail_for)),
+        max_attempts=3,
+        retry_base_seconds=30,
+    )
+
+    worker.run_once()
+
+    assert store.sent == [3]
+    assert set(store.retry) == {1}
+    assert set(store.dead) == {2, 4}
+    assert worker.retry_delay(1) == 30 and worker.retry_delay(3) == 120
+
+
+def test_dropped_connection_is_reopened_within_the_batch() -> None:
+    sent_log: list = []
+    servers: list[_FakeSmtp] = []
+
+    def connect() -> _FakeSmtp:
+        server = _FakeSmtp(sent_log)
+        if not servers:
+            server.fail_for = {"b@example.org": smtplib.SMTPServerDisconnected("gone")}
+        servers.append(server)
+        return server
+
+    pool = SmtpPool(connect=connect)
+    store = _MemoryStore([_message(1, "a@example.org"), _message(2, "b@example.org"), _message(3, "c@example.org")])
+    EmailDeliveryWorker(store=store, pool=pool).run_once()
+
+    assert store.sent == [1, 2, 3]
+    assert len(servers) == 2
+    assert pool.stats["reconnects"] == 1
+
+
+def test_unreachable_server_retries_whole_batch() -> None:
+    def connect() -> _FakeSmtp:
+        raise socket.timeout("timed out")
+
+    store = _MemoryStore([_message(1, "a@example.org"), _message(2, "b@example.org")])
+    EmailDeliveryWorker(store=store, pool=SmtpPool(connect=connect)).run_once()
+
+    assert store.sent == []
+    assert set(store.retry) == {1, 2}
+
+
+def test_delivers_to_local_debugging_server() -> None:
+    pytest.importorskip("aiosmtpd")
+    from aiosmtpd.controller import Controller
+
+    received: list = []
+
+    class Handler:
+        async def handle_DATA(self, server, session, envelope):
+            received.append((envelope.rcpt_tos, envelope.content))
+            return "250 OK"
+
+    controller = Controller(Handler(), hostname="127.0.0.1", port=0)
+    controller.start()
+    try:
+        port = controller.server.sockets[0].getsockname()[1]
+        pool = SmtpPool(connect=lambda: smtplib.SMTP("127.0.0.1", port, timeout=5))
+        store = _MemoryStore([_message(i, f"user{i}@example.org") for i in range(3)])
+        EmailDeliveryWorker(store=store, pool=pool).run_once()
+        pool.close()
+    finally:
+        controller.stop()
+
+    assert store.sent == [0, 1, 2]
+    assert [rcpt for rcpt, _ in received] == [[f"user{i}@example.org"] for i in range(3)]
+    assert pool.stats["connects"] == 1
+
+
+class _RecordingSession:
+    def __init__(self, user_ids: list[int]) -> None:
+        self.calls: list[str] = []
+        self.user_ids = user_ids
+
+    def add(self, obj) -> None:
+        self.calls.append("add")
+
+    def execute(self, statement) -> None:
+        self.calls.append("insert")
+
+    def commit(self) -> None:
+        self.calls.append("commit")
+
+    def refresh(self, obj) -> None:
+        pass
+
+    def query(self, *entities):
+        session = self
+
+        class _Query:
+            def filter(self, *args):
+                return self
+
+            def all(self):
+                return [(user_id,) for user_id in session.user_ids]
+
+        return _Query()
+
+
+def test_notification_emails_are_queued_in_the_notifications_transaction(monkeypatch) -> None:
+    from app.api.v1 import notifications as notifications_module
+
+    db = _RecordingSession(user_ids=[4, 5])
+    monkeypatch.setattr(notifications_module.notification_manager, "push_counts", lambda db, ids: {})
+    monkeypatch.setattr(
+        notifications_module, "_send_email_notification", lambda session, *args: session.calls.append("email")
+    )
+    monkeypatch.setattr(
+        notifications_module, "_send_role_email_notifications", lambda session, *args: session.calls.append("emails")
+    )
+
+    notifications_module.create_notification(db, 4, "Case assigned", related_entity_type="case", send_email=True)
+    assert db.calls == ["add", "email", "commit"]
+
+    db.calls.clear()
+    notifications_module.create_role_notifications(db, "New case", related_entity_type="case", send_email=True)
+    assert db.calls == ["insert", "emails", "commit"]
+
+
+@pytest.fixture()
+def outbox_session(monkeypatch):
+    from sqlalchemy import create_engine, text as sql_text
+    from sqlalchemy.orm import Session
+
+    from app.core import email_delivery as delivery_module
+
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(sql_text(
+            "CREATE TABLE email_outbox (email_id INTEGER PRIMARY KEY, to_address TEXT, subject TEXT, "
+            "body_plain TEXT, body_html TEXT, template TEXT, context TEXT, status TEXT, attempts INTEGER)"
+        ))
+    monkeypatch.setattr(delivery_module, "_has_outbox_table", True)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def test_worker_is_woken_only_after_the_callers_commit(monkeypatch, outbox_session) -> None:
+    from app.core import email_delivery as delivery_module
+
+    wakes: list[int] = []
+    monkeypatch.setattr(delivery_module.settings, "email_outbox_enabled", True)
+    monkeypatch.setattr(delivery_module.email_delivery, "wake", lambda: wakes.append(1))
+
+    assert delivery_module.enqueue_email(["a@example.org"], subject="Hi", body_plain="x", db=outbox_session) == 1
+    with outbox_session.begin_nested():
+        pass
+    assert wakes == []
+    outbox_session.commit()
+    assert wakes == [1]
+
+    delivery_module.enqueue_email(["b@example.org"], subject="Hi", body_plain="x", db=outbox_session)
+    outbox_session.rollback()
+    outbox_session.commit()
+    assert wakes == [1]
+
+
+def test_disabled_outbox_sends_inline_after_commit(monkeypatch, outbox_session) -> None:
+    from sqlalchemy import text as sql_text
+
+    from app.core import email_delivery as delivery_module
+
+    sent: list[list[str]] = []
+    monkeypatch.setattr(delivery_module.settings, "email_outbox_enabled", False)
+    monkeypatch.setattr(delivery_module, "_send_inline", lambda recipients, *args: sent.append(recipients) or len(recipients))
+
+    assert delivery_module.enqueue_email(["a@example.org"], subject="Hi", body_plain="x", db=outbox_session) == 1
+    assert sent == []
+    outbox_session.commit()
+    assert sent == [["a@example.org"]]
+
+    delivery_module.enqueue_email(["b@example.org"], subject="Hi", body_plain="x", db=outbox_session)
+    outbox_session.rollback()
+    assert sent == [["a@example.org"]]
+    assert outbox_session.execute(sql_text("SELECT count(*) FROM email_outbox")).scalar() == 0
@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+
+from app.core.email import SmtpPool
+from app.core.email_delivery import EmailDeliveryWorker, OutboxMessage
+from app.core.location_hierarchy import location_hierarchy
+from app.services import email_notification_service as service_module
+from app.services.email_templates import render_hotspot_detected, render_report_verification
+
+
+class _FakeSession:
+    def close(self) -> None:
+        pass
+
+
+class _MemoryStore:
+    def __init__(self, messages: list[OutboxMessage]) -> None:
+        self.pending = messages
+        self.sent: list[int] = []
+
+    def claim(self, limit: int) -> list[OutboxMessage]:
+        batch, self.pending = self.pending[:limit], self.pending[limit:]
+        return batch
+
+    def mark_sent(self, email_ids: list[int]) -> None:
+        self.sent.extend(email_ids)
+
+    def mark_failed(self, email_id, error, retry_at) -> None:
+        raise AssertionError(error)
+
+
+class _FakeSmtp:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def sendmail(self, from_addr, to_addrs, message) -> None:
+        self.count += 1
+
+
+def test_hotspot_alert_to_many_recipients_does_one_lookup_and_one_render(monkeypatch) -> None:
+    lookups: list[tuple] = []
+    queued: list[dict] = []
+
+    def fake_village_lookup(db, lat, lon):
+        lookups.append((lat, lon))
+        return 7
+
+    def fake_enqueue(to_addresses, template=None, context=None, **_):
+        queued.append({"to": list(to_addresses), "template": template, "context": context})
+        return len(queued[-1]["to"])
+
+    monkeypatch.setattr("app.core.village_lookup.get_village_location_id", fake_village_lookup)
+    monkeypatch.setattr(location_hierarchy, "type_of", lambda db, location_id: "village")
+    monkeypatch.setattr(
+        location_hierarchy,
+        "lineage",
+        lambda db, location_id: {"sector_name": "Muhoza", "cell_name": "Cyabararika", "village_name": "Kabeza"},
+    )
+    monkeypatch.setattr(service_module, "SessionLocal", _FakeSession)
+    monkeypatch.setattr(service_module, "enqueue_email", fake_enqueue)
+    service_module._location_text_cache.clear()
+
+    service = service_module.EmailNotificationService()
+    service.email_enabled = True
+    users = [SimpleNamespace(email=f"sup{i}@example.org") for i in range(50)]
+    assert service.send_hotspot_notification(users, 1, "Radius 250m", "-1.4990,29.6340") == 50
+    assert service.send_hotspot_notification(users, 1, "Radius 250m", "-1.4990,29.6340") == 50
+    assert len(lookups) == 1
+    assert queued[0]["context"]["location"] == "Muhoza, Cyabararika, Kabeza"
+
+    messages = [
+        OutboxMessage(i, address, None, None, None, queued[0]["template"], queued[0]["context"], 1)
+        for i, address in enumerate(queued[0]["to"])
+    ]
+    smtp = _FakeSmtp()
+    worker = EmailDeliveryWorker(store=_MemoryStore(messages), pool=SmtpPool(connect=lambda: smtp), batch_size=50)
+    worker.run_once()
+    assert smtp.count == 50
+    assert worker.stats()["renders"] == 1
+
+
+def test_templates_escape_values_and_skip_map_links_without_coordinates() -> None:
+    rendered = render_report_verification({
+        "base_url": "https://dash.example",
+        "report_id": "0f8e2c1a-aaaa-bbbb-cccc-123456789abc",
+        "incident_type": "Theft",
+        "location": "<script>x</script>",
+        "verification_status": "flagged",
+        "flag_reason": None,
+    })
+    assert rendered.subject == "Report Flagged for Review: 0f8e2c1a..."
+    assert "&lt;script&gt;" in rendered.body_html and "<script>" not in rendered.body_html
+    assert "google.com/maps" not in rendered.body_html
+    assert "Reason" not in rendered.body_html
+    assert "Action Required" in rendered.body_plain
+
+    hotspot = render_hotspot_detected({"base_url": "https://dash.example", "hotspot_count": 3, "latitude": -1.5, "longitude": 29.6})
+    assert "3 new safety hotspots" in hotspot.body_html
+    assert "https://www.google.com/maps/dir/?api=1&amp;destination=-1.5,29.6" in hotspot.body_html
+    assert "https://dash.example/hotspots" in hotspot.body_plain
@@ -0,0 +1,60 @@
+import gzip
+import json
+
+from app.core import geojson_artifacts as ga
+from app.core.geojson_artifacts import LocationGeoJsonArtifacts, build_artifact, render_feature_collection
+
+
+def _rows():
+    return [
+        ({"location_id": 1, "location_type": "sector", "sector": "Muhoza"}, '{"type":"MultiPolygon","coordinates":[]}'),
+        ({"location_id": 2, "location_type": "sector", "sector": "Broken"}, "{not json"),
+    ]
+
+
+def test_render_embeds_geometry_and_skips_invalid() -> None:
+    body, count = render_feature_collection(_rows())
+    data = json.loads(body)
+
+    assert count == 1
+    assert data["type"] == "FeatureCollection"
+    assert data["features"] == [{
+        "type": "Feature",
+        "geometry": {"type": "MultiPolygon", "coordinates": []},
+        "properties": {"location_id": 1, "location_type": "sector", "sector": "Muhoza"},
+    }]
+
+
+def test_artifact_etag_encodings_and_if_none_match() -> None:
+    body, count = render_feature_collection(_rows())
+    artifact = build_artifact("3", body, count)
+
+    assert artifact.etag == build_artifact("4", body, count).etag
+    assert gzip.decompress(artifact.gzip_body) == body
+    assert artifact.encoded("gzip, deflate") == (artifact.gzip_body, "gzip")
+    assert artifact.encoded("") == (body, None)
+    assert artifact.matches(artifact.etag)
+    assert artifact.matches(f'"other", W/{artifact.etag}')
+    assert not artifact.matches('"other"')
+    assert not artifact.matches(None)
+
+
+def test_artifacts_regenerate_only_when_version_changes(monkeypatch) -> None:
+    store = LocationGeoJsonArtifacts()
+    versions = iter(["1", "1", "2"])
+    renders = []
+    monkeypatch.setattr(store, "_version", lambda db: next(versions))
+
+    def fake_rows(db, location_type, parent_id, detail, limit):
+        renders.append((location_type, detail))
+        return _rows()
+
+    monkeypatch.setattr(ga, "_feature_rows", fake_rows)
+
+    first = store.get(None, "sector", None, "low", 100)
+    assert store.get(None, "sector", None, "low", 100) is first
+    third = store.get(None, "sector", None, "low", 100)
+
+    assert renders == [("sector", "low"), ("sector", "low")]
+    assert third.version == "2"
+    assert third.etag == first.etag
@@ -0,0 +1,69 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.api.v1.hotspots import _summary_hotspot_response
+
+
+def _hotspot(**overrides) -> SimpleNamespace:
+    fields = dict(
+        hotspot_id=7,
+        center_lat=Decimal("-1.5"),
+        center_long=Decimal("29.6"),
+        radius_meters=Decimal("500"),
+        incident_count=3,
+        risk_level="high",
+        time_window_hours=24,
+        detected_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        incident_type_id=2,
+        incident_type=SimpleNamespace(type_name="Theft"),
+        classification="active",
+        classification_confidence=0.8,
+        hotspot_score=65.0,
+        classification_source="ml_model",
+    )
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+def _summary(**overrides) -> dict:
+    row = dict(
+        hotspot_id=7,
+        incident_count=3,
+        avg_pre_trust=62.5,
+        avg_final_trust=None,
+        evidence_count=4,
+        lats=[-1.5, -1.501, -1.499],
+        lons=[29.6, 29.601, 29.602],
+        incident_mix={"Theft": 2, "Assault": 1},
+        village_counts={"Kabeza": 1, "Rugali": 2},
+    )
+    row.update(overrides)
+    return row
+
+
+def test_summary_response_uses_stored_classification_and_aggregates() -> None:
+    response = _summary_hotspot_response(_hotspot(), _summary())
+
+    assert response.classification == "active"
+    assert response.classification_source == "ml_model"
+    assert response.incident_count == 3
+    assert response.avg_trust_score == 62.5
+    assert response.evidence_count == 4
+    assert response.area_label == "Rugali"
+    assert response.village_names == ["Kabeza", "Rugali"]
+    assert response.cluster_kind == "mixed_hotspot"
+    assert response.incident_points == [] and response.evidence_files == []
+    assert len(response.boundary_points) >= 3
+
+
+def test_summary_response_prefers_final_trust_and_falls_back_to_score() -> None:
+    response = _summary_hotspot_response(
+        _hotspot(classification=None, hotspot_score=None, classification_source=None),
+        _summary(avg_final_trust=80.123, incident_mix={"Theft": 3}),
+    )
+
+    assert response.avg_trust_score == 80.12
+    assert response.classification_source == "dbscan_fallback"
+    assert response.classification_confidence is None
+    assert response.cluster_kind == "trend_cluster"
@@ -0,0 +1,101 @@
+from app.core.location_hierarchy import LocationHierarchy
+
+
+class _FakeResult:
+    def __init__(self, rows) -> None:
+        self._rows = rows
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+class _FakeSession:
+    def __init__(self, locations, stations) -> None:
+        self.locations = locations
+        self.stations = stations
+        self.queries = 0
+
+    def execute(self, statement, params=None):
+        self.queries += 1
+        sql = str(statement)
+        if "FROM stations" in sql:
+            return _FakeResult(self.stations)
+        return _FakeResult(self.locations)
+
+
+def _session() -> _FakeSession:
+    locations = [
+        (1, None, "sector", "Sector 1"),
+        (2, None, "sector", "Sector 2"),
+        (10, 1, "cell", "Cell 10"),
+        (11, 1, "cell", "Cell 11"),
+        (20, 2, "cell", "Cell 20"),
+        (100, 10, "village", "Village 100"),
+        (101, 10, "village", "Village 101"),
+        (110, 11, "village", "Village 110"),
+        (120, 1, "village", "Village 120"),
+        (200, 20, "village", "Village 200"),
+    ]
+    stations = [(7, 1, None), (8, 1, 2)]
+    return _FakeSession(locations, stations)
+
+
+def test_descendants_include_cells_and_villages() -> None:
+    db = _session()
+    hierarchy = LocationHierarchy()
+
+    assert hierarchy.descendants(db, 1) == {1, 10, 11, 100, 101, 110, 120}
+    assert hierarchy.villages_under(db, 1) == {100, 101, 110, 120}
+    assert hierarchy.descendants(db, None) == frozenset()
+
+
+def test_station_scope_covers_primary_and_secondary_sector() -> None:
+    db = _session()
+    hierarchy = LocationHierarchy()
+
+    assert hierarchy.station_scope(db, 7) == {1, 10, 11, 100, 101, 110, 120}
+    assert hierarchy.station_scope(db, 8) == {1, 10, 11, 100, 101, 110, 120, 2, 20, 200}
+    assert hierarchy.station_scope(db, 999) is None
+    assert hierarchy.sector_of(db, 110) == 1
+
+
+def test_lineage_handles_villages_with_and_without_cells() -> None:
+    db = _session()
+    hierarchy = LocationHierarchy()
+
+    assert hierarchy.lineage(db, 110) == {
+        "village_location_id": 110,
+        "village_name": "Village 110",
+        "cell_location_id": 11,
+        "cell_name": "Cell 11",
+        "sector_location_id": 1,
+        "sector_name": "Sector 1",
+    }
+    direct = hierarchy.lineage(db, 120)
+    assert direct["cell_location_id"] is None
+    assert direct["sector_location_id"] == 1
+    assert hierarchy.lineage(db, 999) is None
+
+
+def test_tree_is_loaded_once_until_invalidated() -> None:
+    db = _session()
+    hierarchy = LocationHierarchy()
+
+    hierarchy.station_scope(db, 7)
+    hierarchy.descendants(db, 2)
+    assert db.queries == 2
+
+    db.stations = [(7, 2, None)]
+    hierarchy.invalidate()
+    assert hierarchy.station_scope(db, 7) == {2, 20, 200}
+    assert db.queries == 4
+
+
+def test_type_of_and_children() -> None:
+    db = _session()
+    hierarchy = LocationHierarchy()
+
+    assert hierarchy.type_of(db, 10) == "cell"
+    assert hierarchy.type_of(db, 999) is None
+    assert sorted(hierarchy.children(db, 1)) == [10, 11, 120]
+    assert hierarchy.children(db, 100) == []
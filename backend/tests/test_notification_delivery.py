@@ -0,0 +1,119 @@
+import asyncio
+import json
+
+from app.core.notification_delivery import NotificationManager, expand_counts
+from app.core.websocket import ConnectionManager
+
+
+class _FakeWebSocket:
+    def __init__(self) -> None:
+        self.messages: list[dict] = []
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, payload: str) -> None:
+        self.messages.append(json.loads(payload))
+
+
+def test_every_tab_of_a_user_receives_its_counts(monkeypatch) -> None:
+    notifications = NotificationManager(ConnectionManager(expand=expand_counts))
+    monkeypatch.setattr(notifications, "unread_counts", lambda db, ids: {i: 10 + i for i in ids})
+    tab1, tab2, other = _FakeWebSocket(), _FakeWebSocket(), _FakeWebSocket()
+
+    async def run() -> None:
+        await notifications.connect_user(tab1, 1, unread=3)
+        await notifications.connect_user(tab2, 1, unread=3)
+        await notifications.connect_user(other, 2, unread=0)
+        notifications.push_counts(db=None, police_user_ids=[1])
+        await notifications.hub.flush()
+
+    asyncio.run(run())
+    assert [m["count"] for m in tab1.messages] == [3, 11]
+    assert [m["count"] for m in tab2.messages] == [3, 11]
+    assert [m["count"] for m in other.messages] == [0]
+
+
+def test_disconnecting_one_tab_keeps_the_others() -> None:
+    notifications = NotificationManager(ConnectionManager(expand=expand_counts))
+    tab1, tab2 = _FakeWebSocket(), _FakeWebSocket()
+
+    async def run() -> None:
+        await notifications.connect_user(tab1, 7, unread=1)
+        await notifications.connect_user(tab2, 7, unread=1)
+        await notifications.hub.flush()
+        notifications.disconnect(tab1)
+        notifications.send_to_user(7, {"type": "notification_count", "count": 2})
+        await notifications.hub.flush()
+
+    asyncio.run(run())
+    assert [m["count"] for m in tab1.messages] == [1]
+    assert [m["count"] for m in tab2.messages] == [1, 2]
+
+
+def test_counts_for_many_users_are_published_once(monkeypatch) -> None:
+    notifications = NotificationManager(ConnectionManager(expand=expand_counts))
+    monkeypatch.setattr(notifications, "unread_counts", lambda db, ids: {i: i * 2 for i in ids})
+    published: list[dict] = []
+    monkeypatch.setattr(notifications.hub, "_publish_remote", lambda envelope: published.append(json.loads(envelope)))
+    monkeypatch.setattr(notifications.hub, "_redis", object())
+    sockets = {user_id: _FakeWebSocket() for user_id in (1, 2, 3)}
+
+    async def run() -> None:
+        for user_id, ws in sockets.items():
+            await notifications.connect_user(ws, user_id, unread=0)
+        notifications.push_counts(db=None, police_user_ids=[1, 2, 3])
+        await notifications.hub.flush()
+
+    asyncio.run(run())
+    assert len(published) == 1
+    assert json.loads(published[0]["batch"]) == {"type": "notification_count", "counts": {"1": 2, "2": 4, "3": 6}}
+    assert {user_id: [m["count"] for m in ws.messages] for user_id, ws in sockets.items()} == {
+        1: [0, 2], 2: [0, 4], 3: [0, 6],
+    }
+
+
+def test_relayed_batch_reaches_each_user_on_this_worker() -> None:
+    hub = ConnectionManager(expand=expand_counts)
+    notifications = NotificationManager(hub)
+    tab, other = _FakeWebSocket(), _FakeWebSocket()
+
+    async def run() -> None:
+        await notifications.connect_user(tab, 5, unread=0)
+        await notifications.connect_user(other, 6, unread=0)
+        # Counts arrive from another worker with JSON (string) keys.
+        hub._fan_out_parts(hub._expand_parts({"type": "notification_count", "counts": {"5": 9}}))
+        await hub.flush()
+
+    asyncio.run(run())
+    assert [m["count"] for m in tab.messages] == [0, 9]
+    assert [m["count"] for m in other.messages] == [0]
+
+
+def test_notification_socket_authenticates_and_receives_counts(monkeypatch) -> None:
+    import pytest
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from starlette.websockets import WebSocketDisconnect
+
+    from app.api.v1 import ws as ws_module
+    from app.core.security import create_access_token
+
+    notifications = NotificationManager(ConnectionManager(expand=expand_counts))
+    monkeypatch.setattr(ws_module, "notification_manager", notifications)
+    monkeypatch.setattr(ws_module, "_unread_count", lambda police_user_id: 4)
+    app = FastAPI()
+    app.include_router(ws_module.router, prefix="/api/v1")
+    client = TestClient(app)
+
+    with client.websocket_connect("/api/v1/ws/notifications") as socket:
+        socket.send_json({"type": "auth", "token": create_access_token(subject="12", role="officer")})
+        assert socket.receive_json() == {"type": "notification_count", "count": 4}
+        socket.send_json({"type": "get_notification_count"})
+        assert socket.receive_json() == {"type": "notification_count", "count": 4}
+
+    with client.websocket_connect("/api/v1/ws/notifications") as socket:
+        socket.send_json({"type": "auth", "token": "not-a-jwt"})
+        with pytest.raises(WebSocketDisconnect) as exc:
+            socket.receive_json()
+        assert exc.value.code == 4001
@@ -0,0 +1,106 @@
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.number_allocator import (
+    CASE_SCOPE,
+    REPORT_SCOPE,
+    allocate_case_number,
+    allocate_number,
+    allocate_report_number,
+)
+
+MIGRATION = Path(__file__).resolve().parent.parent / "alembic" / "versions" / "013_number_counters.py"
+
+
+def _load_migration():
+    spec = importlib.util.spec_from_file_location("migration_013", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _run_upgrade(engine) -> None:
+    migration = _load_migration()
+    with engine.begin() as conn:
+        with Operations.context(MigrationContext.configure(conn)):
+            migration.upgrade()
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    # File-backed SQLite so worker threads use separate connections; it has the same
+    # INSERT ... ON CONFLICT DO UPDATE ... RETURNING the allocator uses on Postgres.
+    engine = create_engine(f"sqlite:///{tmp_path / 'numbers.db'}", connect_args={"timeout": 30})
+
+    @event.listens_for(engine, "connect")
+    def _register_now(dbapi_conn, _):
+        dbapi_conn.create_function("now", 0, lambda: datetime.now(timezone.utc).isoformat())
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE reports (report_number VARCHAR(50))"))
+        conn.execute(text("CREATE TABLE cases (case_number VARCHAR(50))"))
+    yield engine
+    engine.dispose()
+
+
+def test_numbers_are_sequential_per_scope_and_year(engine) -> None:
+    _run_upgrade(engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        year = datetime.now(timezone.utc).year
+        assert [allocate_report_number(db) for _ in range(3)] == [f"RPT-{year}-{n:04d}" for n in (1, 2, 3)]
+        assert allocate_case_number(db) == f"CASE-{year}-0001"
+        assert allocate_number(db, REPORT_SCOPE, now=datetime(2030, 1, 1)) == "RPT-2030-0001"
+        with pytest.raises(ValueError):
+            allocate_number(db, "invoice")
+    finally:
+        db.close()
+
+
+def test_concurrent_allocations_never_repeat(engine) -> None:
+    _run_upgrade(engine)
+    Session = sessionmaker(bind=engine)
+
+    def allocate_many(_: int) -> list[str]:
+        db = Session()
+        try:
+            return [allocate_number(db, CASE_SCOPE) for _ in range(25)]
+        finally:
+            db.close()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        numbers = [n for batch in pool.map(allocate_many, range(8)) for n in batch]
+
+    assert len(numbers) == 200
+    assert len(set(numbers)) == 200
+    assert max(int(n.rsplit("-", 1)[1]) for n in numbers) == 200
+
+
+def test_migration_seeds_counters_from_existing_numbers(engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO reports (report_number) VALUES (:n)"),
+            [{"n": n} for n in ("RPT-2025-0007", "RPT-2025-0012", "RPT-2026-0003", "RPT-legacy", None)],
+        )
+        conn.execute(text("INSERT INTO cases (case_number) VALUES ('CASE-2026-0040')"))
+
+    _run_upgrade(engine)
+
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT scope, year, last_value FROM number_counters ORDER BY scope, year")).all()
+    assert [tuple(r) for r in rows] == [("case", 2026, 40), ("report", 2025, 12), ("report", 2026, 3)]
+
+    db = sessionmaker(bind=engine)()
+    try:
+        assert allocate_number(db, REPORT_SCOPE, now=datetime(2025, 6, 1)) == "RPT-2025-0013"
+        assert allocate_number(db, CASE_SCOPE, now=datetime(2026, 6, 1)) == "CASE-2026-0041"
+    finally:
+        db.close()
@@ -0,0 +1,38 @@
+from app.core import performance_analytics
+from app.core.location_hierarchy import LocationHierarchy
+from app.core.performance_analytics import AreaKpis, unit_location_map
+
+
+class _FakeResult:
+    def __init__(self, rows) -> None:
+        self._rows = rows
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+class _FakeSession:
+    def execute(self, statement, params=None):
+        if "FROM stations" in str(statement):
+            return _FakeResult([])
+        return _FakeResult([
+            (1, None, "sector", "Sector 1"),
+            (2, None, "sector", "Sector 2"),
+            (10, 1, "cell", "Cell 10"),
+            (100, 10, "village", "Village 100"),
+            (200, 2, "village", "Village 200"),
+        ])
+
+
+def test_unit_location_map_covers_descendants_once(monkeypatch) -> None:
+    monkeypatch.setattr(performance_analytics, "location_hierarchy", LocationHierarchy())
+
+    location_ids, owners = unit_location_map(_FakeSession(), [1, 2, 10])
+
+    assert dict(zip(location_ids, owners)) == {1: 1, 10: 1, 100: 1, 2: 2, 200: 2}
+
+
+def test_area_kpis_bounding_box_area() -> None:
+    assert AreaKpis().geographic_area_km2 == 0.0
+    kpis = AreaKpis(min_lat=-1.5, max_lat=-1.4, min_lon=29.5, max_lon=29.6)
+    assert round(kpis.geographic_area_km2, 1) == 123.2
@@ -1,16 +1,18 @@
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
-from app.middleware.rate_limit import RouteRateLimitMiddleware
+from app.middleware.proxy_headers import ForwardedClientMiddleware
+from app.middleware.rate_limit import RouteRateLimitMiddleware, invalidate_rate_limit_config
 
 
-def _build_app() -> FastAPI:
+def _build_app(**middleware_kwargs) -> FastAPI:
     app = FastAPI()
     app.add_middleware(
         RouteRateLimitMiddleware,
         report_create_per_minute=2,
         evidence_upload_per_minute=2,
         report_confirm_per_minute=2,
+        **middleware_kwargs,
     )
 
     @app.post("/api/v1/reports")
@@ -63,3 +65,78 @@ def test_non_targeted_routes_not_rate_limited() -> None:
     for _ in range(5):
         response = client.get("/health")
         assert response.status_code == 200
+
+
+def test_device_hash_is_limited_across_ip_changes() -> None:
+    app = _build_app()
+    wifi = TestClient(app, client=("10.0.0.1", 50000))
+    cellular = TestClient(app, client=("10.0.0.2", 50000))
+    device = {"X-Device-Hash": "dev-a"}
+
+    assert wifi.post("/api/v1/reports", headers=device).status_code == 200
+    assert wifi.post("/api/v1/reports", headers=device).status_code == 200
+
+    # Same device on a new IP: its own bucket is empty even though the IP's is not.
+    blocked = cellular.post("/api/v1/reports", headers=device)
+    assert blocked.status_code == 429
+    assert int(blocked.headers["Retry-After"]) >= 1
+    assert cellular.post("/api/v1/reports", headers={"X-Device-Hash": "dev-b"}).status_code == 200
+
+
+def test_system_config_overrides_are_applied_and_reloaded() -> None:
+    overrides = {"report_create": {"per_minute": 1}}
+    app = _build_app(config_loader=lambda: dict(overrides))
+    client = TestClient(app)
+
+    client.get("/health")  # first request schedules the config load
+    client.get("/health")
+    ok = client.post("/api/v1/reports")
+    assert ok.status_code == 200
+    assert ok.headers["X-RateLimit-Limit"] == "1"
+    assert client.post("/api/v1/reports").status_code == 429
+
+    overrides["report_create"] = {"enabled": False}
+    invalidate_rate_limit_config()
+    client.get("/health")
+    client.get("/health")
+    for _ in range(3):
+        assert client.post("/api/v1/reports").status_code == 200
+
+
+
+def _proxied_client(trusted_hosts: str) -> TestClient:
+    app = _build_app()
+    app.add_middleware(ForwardedClientMiddleware, trusted_hosts=trusted_hosts, proxy_hops=1)
+    return TestClient(app)
+
+
+def test_clients_behind_a_trusted_proxy_get_their_own_buckets() -> None:
+    client = _proxied_client("*")
+
+    def create(client_ip: str) -> int:
+        # The proxy appends the address it received the request from.
+        return client.post("/api/v1/reports", headers={"X-Forwarded-For": client_ip}).status_code
+
+    assert [create("203.0.113.7") for _ in range(3)] == [200, 200, 429]
+    assert create("198.51.100.4") == 200
+
+
+def test_spoofed_leftmost_forwarded_for_keeps_the_same_bucket() -> None:
+    client = _proxied_client("*")
+
+    statuses = [
+        client.post(
+            "/api/v1/reports", headers={"X-Forwarded-For": f"10.9.9.{i}, 203.0.113.7"}
+        ).status_code
+        for i in range(3)
+    ]
+    assert statuses == [200, 200, 429]
+
+
+def test_forwarded_for_is_ignored_from_untrusted_peers() -> None:
+    client = _proxied_client("127.0.0.1, 10.0.0.0/8")
+
+    statuses = [
+        client.post("/api/v1/reports", headers={"X-Forwarded-For": f"203.0.113.{i}"}).status_code for i in range(3)
+    ]
+    assert statuses == [200, 200, 429]
@@ -0,0 +1,48 @@
+import asyncio
+
+from app.core import rate_limiter
+from app.core.rate_limiter import InMemoryRateLimiter, RedisRateLimiter
+
+
+def test_token_bucket_allows_burst_then_refills(monkeypatch) -> None:
+    clock = [1000.0]
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: clock[0])
+    limiter = InMemoryRateLimiter()
+
+    assert [limiter.take(["k"], 60, 3).allowed for _ in range(4)] == [True, True, True, False]
+    assert limiter.take(["k"], 60, 3).retry_after_seconds == 1
+
+    clock[0] += 1.0  # 60/min refills one token per second
+    decision = limiter.take(["k"], 60, 3)
+    assert decision.allowed and decision.remaining == 0
+
+
+def test_request_must_fit_every_key_and_is_charged_to_all() -> None:
+    limiter = InMemoryRateLimiter()
+    assert limiter.take(["ip", "dev-a"], 60, 2).allowed
+    assert limiter.take(["ip", "dev-b"], 60, 2).allowed
+    # IP bucket is empty: a fresh device does not get past it, and dev-b is not charged.
+    assert not limiter.take(["ip", "dev-c"], 60, 2).allowed
+    assert limiter.take(["dev-b"], 60, 2).remaining == 0
+
+
+def test_idle_keys_are_evicted(monkeypatch) -> None:
+    clock = [0.0]
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: clock[0])
+    limiter = InMemoryRateLimiter()
+    for i in range(100):
+        limiter.take([f"client-{i}"], 60, 5)
+    assert len(limiter) == 100
+
+    clock[0] += rate_limiter.SWEEP_INTERVAL_SECONDS + 1
+    limiter.take(["fresh"], 60, 5)
+    assert len(limiter) == 1
+
+
+def test_redis_backend_falls_back_to_memory_when_unreachable() -> None:
+    limiter = RedisRateLimiter("redis://127.0.0.1:1/0")
+
+    async def run() -> list[bool]:
+        return [(await limiter.consume(["k"], 60, 2)).allowed for _ in range(3)]
+
+    assert asyncio.run(run()) == [True, True, False]
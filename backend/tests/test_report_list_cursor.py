@@ -0,0 +1,24 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.reports import _decode_report_cursor, _encode_report_cursor
+
+
+def test_report_cursor_round_trip() -> None:
+    report_id = uuid4()
+    reported_at = datetime(2026, 10, 19, 8, 30, 15, 123456, tzinfo=timezone.utc)
+    cursor = _encode_report_cursor(SimpleNamespace(reported_at=reported_at, report_id=report_id))
+
+    assert "=" not in cursor
+    assert _decode_report_cursor(cursor) == (reported_at, report_id)
+
+
+def test_report_cursor_rejects_garbage() -> None:
+    with pytest.raises(HTTPException) as exc_info:
+        _decode_report_cursor("not-a-cursor")
+
+    assert exc_info.value.status_code == 400
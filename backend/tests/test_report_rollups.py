@@ -0,0 +1,36 @@
+from datetime import date, datetime, timedelta, timezone
+
+from app.core.report_rollups import rollup_key
+
+
+def test_rollup_key_normalises_nulls_and_utc_day() -> None:
+    kigali = timezone(timedelta(hours=2))
+    key = rollup_key(
+        {
+            "reported_at": datetime(2026, 3, 2, 1, 30, tzinfo=kigali),
+            "handling_station_id": None,
+            "village_location_id": 42,
+            "incident_type_id": 3,
+            "status": None,
+            "verification_status": "pending",
+            "is_flagged": None,
+            "verified_by": None,
+        }
+    )
+
+    assert key == (date(2026, 3, 1), 0, 42, 3, "", "pending", False, False)
+
+
+def test_rollup_key_marks_reviewed_and_skips_unknown_type() -> None:
+    values = {
+        "reported_at": datetime(2026, 3, 2, 12, tzinfo=timezone.utc),
+        "incident_type_id": 1,
+        "status": "verified",
+        "verification_status": "verified",
+        "is_flagged": True,
+        "verified_by": 7,
+        "handling_station_id": 5,
+    }
+
+    assert rollup_key(values) == (date(2026, 3, 2), 5, 0, 1, "verified", "verified", True, True)
+    assert rollup_key({**values, "incident_type_id": None}) is None
@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
 from fastapi.testclient import TestClient
 
 from app.core.request_context import get_request_id
@@ -36,3 +37,22 @@ def test_request_id_header_is_preserved_when_provided() -> None:
     assert response.status_code == 200
     assert response.headers.get(REQUEST_ID_HEADER) == "manual-request-id-123"
     assert response.json()["request_id"] == "manual-request-id-123"
+
+
+def test_streaming_response_keeps_request_id_header_and_context() -> None:
+    app = FastAPI()
+    app.add_middleware(RequestIdMiddleware)
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:
+        async def body():
+            yield "first,"
+            yield get_request_id() or "missing"
+
+        return StreamingResponse(body(), media_type="text/plain")
+
+    client = TestClient(app)
+    response = client.get("/stream", headers={REQUEST_ID_HEADER: "stream-id"})
+
+    assert response.headers.get(REQUEST_ID_HEADER) == "stream-id"
+    assert response.text == "first,stream-id"
@@ -0,0 +1,182 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+from typing import List
+
+from pydantic import BaseModel, ConfigDict
+
+from app.core import response_cache as rc
+from app.core.response_cache import ResponseCache, cached_response, user_scope
+
+
+def _fresh_cache(monkeypatch) -> ResponseCache:
+    cache = ResponseCache(max_entries=8)
+    monkeypatch.setattr(rc, "response_cache", cache)
+    return cache
+
+
+def test_hits_until_tag_is_invalidated_by_event(monkeypatch) -> None:
+    cache = _fresh_cache(monkeypatch)
+    calls = []
+
+    @cached_response("test.counts", 60.0, ("report",))
+    def endpoint(days: int = 7, db=None, current_user=None):
+        calls.append(days)
+        return {"days": days, "n": len(calls)}
+
+    admin = SimpleNamespace(role="admin", police_user_id=1)
+    assert endpoint(days=7, db=object(), current_user=admin) == {"days": 7, "n": 1}
+    assert endpoint(days=7, db=object(), current_user=admin) == {"days": 7, "n": 1}
+    assert endpoint(days=30, db=object(), current_user=admin)["n"] == 2
+
+    cache.invalidate_for_event({"type": "refresh_data", "entity": "hotspot"})
+    assert endpoint(days=7, db=object(), current_user=admin)["n"] == 1
+
+    cache.invalidate_for_event({"type": "refresh_data", "entity": "geographic_intelligence"})
+    assert endpoint(days=7, db=object(), current_user=admin)["n"] == 3
+
+    stats = cache.stats()["routes"]["test.counts"]
+    assert stats == {"hits": 2, "misses": 3, "coalesced": 0}
+
+
+def test_scope_separates_officers_and_shares_admins(monkeypatch) -> None:
+    _fresh_cache(monkeypatch)
+    calls = []
+
+    @cached_response("test.scope", 60.0, ("case",))
+    def endpoint(current_user=None):
+        calls.append(current_user)
+        return len(calls)
+
+    assert user_scope(SimpleNamespace(role="supervisor", station_id=4)) == "supervisor:4"
+    endpoint(current_user=SimpleNamespace(role="admin", police_user_id=1))
+    endpoint(current_user=SimpleNamespace(role="admin", police_user_id=2))
+    endpoint(current_user=SimpleNamespace(role="officer", police_user_id=3))
+    endpoint(current_user=SimpleNamespace(role="officer", police_user_id=4))
+    assert len(calls) == 3
+
+
+def test_concurrent_sync_calls_are_coalesced(monkeypatch) -> None:
+    cache = _fresh_cache(monkeypatch)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    @cached_response("test.slow", 60.0, ("report",))
+    def endpoint():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"ok": True}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(endpoint()))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(endpoint())) for _ in range(3)]
+    for t in followers:
+        t.start()
+    release.set()
+    for t in [leader, *followers]:
+        t.join(5)
+
+    assert calls == [1]
+    assert results == [{"ok": True}] * 4
+    counts = cache.stats()["routes"]["test.slow"]
+    assert counts["misses"] == 1
+    assert counts["hits"] + counts["coalesced"] == 3
+
+
+def test_concurrent_async_calls_are_coalesced(monkeypatch) -> None:
+    _fresh_cache(monkeypatch)
+    calls = []
+
+    @cached_response("test.async", 60.0, ("hotspot",))
+    async def endpoint(hours_back: int = 24):
+        calls.append(hours_back)
+        await asyncio.sleep(0.01)
+        return {"hours_back": hours_back}
+
+    async def run():
+        return await asyncio.gather(*(endpoint(hours_back=24) for _ in range(5)))
+
+    assert asyncio.run(run()) == [{"hours_back": 24}] * 5
+    assert calls == [24]
+
+
+class _TypeOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    type_name: str
+
+
+def test_response_model_encodes_orm_like_objects(monkeypatch) -> None:
+    _fresh_cache(monkeypatch)
+
+    @cached_response("test.orm", 60.0, ("incident_type",), response_model=List[_TypeOut])
+    def endpoint():
+        return [SimpleNamespace(type_name="Theft", internal="hidden")]
+
+    assert endpoint() == [{"type_name": "Theft"}]
+
+
+def test_lru_evicts_oldest_entry() -> None:
+    cache = ResponseCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.get_or_compute("test.lru", key, (), 60.0, lambda key=key: key)
+    assert cache.stats()["entries"] == 2
+    assert cache.get_or_compute("test.lru", "a", (), 60.0, lambda: "recomputed") == "recomputed"
+
+
+class _FakeAsyncRedis:
+    def __init__(self) -> None:
+        self.data: dict = {}
+
+    async def mget(self, keys):
+        await asyncio.sleep(0.01)
+        return [self.data.get(k) for k in keys]
+
+    async def get(self, key):
+        await asyncio.sleep(0.01)
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        await asyncio.sleep(0.01)
+        self.data[key] = value
+
+    async def incr(self, key):
+        await asyncio.sleep(0.01)
+        self.data[key] = int(self.data.get(key) or 0) + 1
+        return self.data[key]
+
+
+def test_async_paths_never_use_the_blocking_redis_client(monkeypatch) -> None:
+    import redis.asyncio
+
+    fake = _FakeAsyncRedis()
+    monkeypatch.setattr(redis.asyncio.Redis, "from_url", lambda *args, **kwargs: fake)
+    cache = ResponseCache(max_entries=8, redis_url="redis://127.0.0.1:6379/0")
+    monkeypatch.setattr(rc, "response_cache", cache)
+
+    def blocked(*args, **kwargs):
+        raise AssertionError("blocking Redis call on the event loop")
+
+    for name in ("get", "set", "mget", "pipeline"):
+        monkeypatch.setattr(cache._redis, name, blocked)
+    calls = []
+
+    @cached_response("test.async", 60.0, ("report",))
+    async def endpoint(current_user=None):
+        calls.append(1)
+        return {"n": len(calls)}
+
+    async def run() -> list:
+        first = await endpoint()
+        second = await endpoint()
+        # A websocket publish on the loop invalidates without blocking it.
+        cache.invalidate_for_event({"type": "refresh_data", "entity": "report"})
+        third = await endpoint()
+        return [first, second, third]
+
+    assert asyncio.run(run()) == [{"n": 1}, {"n": 1}, {"n": 2}]
+    assert fake.data["rc:tag:report"] == 1
@@ -0,0 +1,43 @@
+from app.core.spatial_clustering import RadiusIndex, dbscan_labels, radius_clusters
+
+# Two tight groups ~10 km apart plus one isolated point.
+LATS = [-1.5000, -1.5001, -1.5002, -1.4100, -1.4101, -1.4102, -1.3000]
+LONS = [29.6000, 29.6001, 29.6002, 29.6000, 29.6001, 29.6002, 29.9000]
+
+
+def test_neighbors_are_limited_to_radius() -> None:
+    index = RadiusIndex(LATS, LONS)
+
+    assert list(index.neighbors(0, 100.0)) == [0, 1, 2]
+    assert list(index.neighbors(6, 100.0)) == [6]
+
+
+def test_dbscan_labels_groups_and_marks_noise() -> None:
+    labels = dbscan_labels(RadiusIndex(LATS, LONS), 100.0, 3)
+
+    assert labels[:3] == [0, 0, 0]
+    assert labels[3:6] == [1, 1, 1]
+    assert labels[6] == -1
+
+
+def test_dbscan_weight_threshold_blocks_low_trust_cores() -> None:
+    labels = dbscan_labels(
+        RadiusIndex(LATS, LONS), 100.0, 3, weights=[0.1] * len(LATS), min_weight=1.5
+    )
+
+    assert set(labels) == {-1}
+
+
+def test_radius_clusters_enforce_min_devices() -> None:
+    devices = ["a", "b", "c", "d", "d", "d", "e"]
+
+    clusters = radius_clusters(RadiusIndex(LATS, LONS), 100.0, devices, min_devices=3)
+
+    assert clusters == [[0, 1, 2]]
+
+
+def test_empty_index() -> None:
+    index = RadiusIndex([], [])
+
+    assert dbscan_labels(index, 100.0, 2) == []
+    assert radius_clusters(index, 100.0, [], 1) == []
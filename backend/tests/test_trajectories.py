@@ -0,0 +1,57 @@
+import numpy as np
+
+from app.core.trajectories import TrajectoryTable, aggregate_flows, build_segments, segment_rows
+
+
+def _history(*points):
+    return [
+        {"latitude": lat, "longitude": lon, "timestamp": ts}
+        for lat, lon, ts in points
+    ]
+
+
+def test_segments_stay_within_device_and_skip_bad_points() -> None:
+    table = TrajectoryTable.from_histories([
+        ("dev-a", "aaaaaaaaaaaa", _history(
+            (-1.50, 29.60, "2026-01-01T10:00:00Z"),
+            (-1.50, 29.70, "2026-01-01T11:00:00Z"),
+            (-1.50, 29.80, "not-a-time"),
+        )),
+        ("dev-b", "bbbbbbbbbbbb", _history((-1.40, 29.60, "2026-01-01T10:00:00+00:00"))),
+        ("dev-c", "cccccccccccc", _history(
+            (-1.40, 29.60, "2026-01-01T10:00:00+00:00"),
+            (-1.40, 29.60, "2026-01-01T10:00:00+00:00"),
+        )),
+    ])
+    segments = build_segments(table)
+
+    assert table.devices_with_history == 2
+    assert len(segments) == 1
+    assert np.isclose(segments.distance_km[0], 11.12, atol=0.05)
+    assert np.isclose(segments.speed_kmh[0], segments.distance_km[0])
+    row = segment_rows(segments, np.array([0]))[0]
+    assert row["device_id"] == "dev-a"
+    assert row["timestamp"] == "2026-01-01T11:00:00Z"
+
+
+def test_aggregate_flows_groups_by_cell_pair_and_device_count() -> None:
+    hop = _history(
+        (-1.50, 29.60, "2026-01-01T10:00:00Z"),
+        (-1.50, 29.70, "2026-01-01T12:00:00Z"),
+    )
+    table = TrajectoryTable.from_histories([
+        ("dev-a", "a", hop),
+        ("dev-b", "b", hop),
+        ("dev-c", "c", _history(
+            (-1.50, 29.60, "2026-01-01T10:00:00Z"),
+            (-1.50, 29.601, "2026-01-01T12:00:00Z"),
+        )),
+    ])
+
+    flows = aggregate_flows(build_segments(table), min_devices=2)
+
+    assert len(flows) == 1
+    assert flows[0]["from_sector"] == "sector_-1.50_29.60"
+    assert flows[0]["to_sector"] == "sector_-1.50_29.70"
+    assert flows[0]["device_count"] == 2
+    assert flows[0]["movement_count"] == 2
@@ -0,0 +1,67 @@
+import gzip
+
+from app.core import vector_tiles as vt
+from app.core.vector_tiles import VectorTileCache, location_types_for_zoom, pixel_size_meters, tile_in_range
+
+
+def test_tile_ranges_and_zoom_levels() -> None:
+    assert tile_in_range(0, 0, 0)
+    assert not tile_in_range(2, 4, 0)
+    assert not tile_in_range(23, 0, 0)
+    assert location_types_for_zoom(8) == ["sector"]
+    assert location_types_for_zoom(14) == ["sector", "cell", "village"]
+    assert round(pixel_size_meters(0)) == 9784
+
+
+def test_tiles_are_cached_per_version_and_old_versions_pruned(tmp_path, monkeypatch) -> None:
+    cache = VectorTileCache(str(tmp_path))
+    versions = iter(["v1", "v1", "v2"])
+    renders = []
+    monkeypatch.setattr(cache, "layer_version", lambda db, layer: next(versions))
+
+    def fake_render(db, layer, z, x, y):
+        renders.append((layer, z, x, y))
+        return b"mvt-%d" % len(renders)
+
+    monkeypatch.setattr(vt, "render_tile", fake_render)
+
+    version, data = cache.get(None, "locations", 12, 2440, 2065)
+    assert version == "v1"
+    assert gzip.decompress(data) == b"mvt-1"
+    assert (tmp_path / "locations" / "v1" / "12" / "2440" / "2065.mvt.gz").is_file()
+
+    assert cache.get(None, "locations", 12, 2440, 2065) == ("v1", data)
+    assert len(renders) == 1
+
+    version, data = cache.get(None, "locations", 12, 2440, 2065)
+    assert version == "v2"
+    assert gzip.decompress(data) == b"mvt-2"
+    assert not (tmp_path / "locations" / "v1").exists()
+
+
+def test_revalidation_returns_304_without_rendering(tmp_path, monkeypatch) -> None:
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api.v1 import tiles
+    from app.database import get_db
+
+    cache = VectorTileCache(str(tmp_path))
+    renders = []
+    monkeypatch.setattr(cache, "layer_version", lambda db, layer: "v7")
+    monkeypatch.setattr(vt, "render_tile", lambda db, layer, z, x, y: renders.append(z) or b"mvt")
+    monkeypatch.setattr(tiles, "vector_tiles", cache)
+    app = FastAPI()
+    app.include_router(tiles.router, prefix="/api/v1")
+    app.dependency_overrides[get_db] = lambda: None
+    client = TestClient(app)
+
+    url = "/api/v1/tiles/locations/12/2440/2065.mvt"
+    response = client.get(url, headers={"If-None-Match": '"locations-v7-12-2440-2065"'})
+    assert response.status_code == 304
+    assert renders == []
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"locations-v7-12-2440-2065"'
+    assert renders == [12]
@@ -0,0 +1,181 @@
+import asyncio
+import json
+import threading
+
+from app.core.websocket import ConnectionManager, coalesce_key, refresh_event
+
+
+class _FakeWebSocket:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.messages: list[dict] = []
+        self.closed = False
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, payload: str) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.messages.append(json.loads(payload))
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed = True
+
+
+def test_slow_client_does_not_delay_fast_client() -> None:
+    manager = ConnectionManager(shards=2, send_timeout=5.0)
+    fast, slow = _FakeWebSocket(), _FakeWebSocket(delay=0.2)
+
+    async def run() -> None:
+        await manager.connect(fast)
+        await manager.connect(slow)
+        await manager.broadcast({"type": "refresh_data", "entity": "case"})
+        await asyncio.sleep(0.05)
+        assert len(fast.messages) == 1
+        assert slow.messages == []
+        await manager.flush()
+
+    asyncio.run(run())
+    assert len(slow.messages) == 1
+
+
+def test_pending_refresh_events_are_coalesced() -> None:
+    manager = ConnectionManager(queue_size=8)
+    ws = _FakeWebSocket(delay=0.01)
+
+    async def run() -> None:
+        await manager.connect(ws)
+        for _ in range(5):
+            await manager.broadcast({"type": "refresh_data", "entity": "report", "action": "created"})
+        await manager.broadcast({"type": "refresh_data", "entity": "case", "action": "created"})
+        await manager.flush()
+
+    asyncio.run(run())
+    assert [m["entity"] for m in ws.messages] == ["report", "case"]
+    assert manager.stats()["coalesced"] == 4
+
+
+def test_full_queue_drops_oldest_then_disconnects_slow_consumer() -> None:
+    manager = ConnectionManager(queue_size=2, max_dropped=3, send_timeout=5.0)
+    ws = _FakeWebSocket(delay=1.0)
+
+    async def run() -> None:
+        await manager.connect(ws)
+        for i in range(8):
+            await manager.broadcast({"type": "alert", "n": i})
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    stats = manager.stats()
+    assert stats["dropped"] == 4
+    assert stats["slow_disconnects"] == 1
+    assert stats["connections"] == 0
+    assert ws.closed
+
+
+def test_publish_from_worker_thread_is_delivered_on_hub_loop() -> None:
+    manager = ConnectionManager()
+    ws = _FakeWebSocket()
+
+    async def run() -> None:
+        await manager.start()
+        await manager.connect(ws)
+        worker = threading.Thread(
+            target=manager.publish, args=({"type": "refresh_data", "entity": "hotspot"},)
+        )
+        worker.start()
+        await asyncio.to_thread(worker.join)
+        await asyncio.sleep(0.01)
+        await manager.flush()
+        await manager.stop()
+
+    asyncio.run(run())
+    assert [m["entity"] for m in ws.messages] == ["hotspot"]
+
+
+def test_publish_without_connections_is_a_no_op() -> None:
+    manager = ConnectionManager()
+    manager.publish({"type": "refresh_data", "entity": "report"})
+    assert manager.stats()["published"] == 1
+
+
+def test_subscriptions_filter_by_topic_and_location_scope() -> None:
+    manager = ConnectionManager()
+    admin, station, cases_only = _FakeWebSocket(), _FakeWebSocket(), _FakeWebSocket()
+
+    async def run() -> None:
+        for ws in (admin, station, cases_only):
+            await manager.connect(ws)
+        manager.subscribe(station, topics=["report", "hotspot"], scope=[10, 11])
+        manager.subscribe(cases_only, topics=["case"])
+        await manager.broadcast(refresh_event("report", "reviewed", ids=["r1"]), location_ids=[10])
+        await manager.broadcast(refresh_event("report", "reviewed", ids=["r2"]), location_ids=[99])
+        await manager.broadcast(refresh_event("hotspot", "recomputed"))
+        await manager.broadcast(refresh_event("case", "created", ids=["c1"]), location_ids=[99])
+        await manager.flush()
+
+    asyncio.run(run())
+    assert [(m["entity"], m.get("ids")) for m in admin.messages] == [
+        ("report", ["r1"]), ("report", ["r2"]), ("hotspot", None), ("case", ["c1"]),
+    ]
+    assert [(m["entity"], m.get("ids")) for m in station.messages] == [("report", ["r1"]), ("hotspot", None)]
+    assert [m["entity"] for m in cases_only.messages] == ["case"]
+    assert manager.stats()["filtered"] == 5
+
+
+def test_refresh_event_carries_delta() -> None:
+    event = refresh_event("case", "updated", ids=[1], changes={"report_count": 3}, case_id="1")
+    assert event == {
+        "type": "refresh_data",
+        "entity": "case",
+        "action": "updated",
+        "ids": ["1"],
+        "changes": {"report_count": 3},
+        "case_id": "1",
+    }
+    assert coalesce_key(event) != coalesce_key(refresh_event("case", "updated", ids=[2]))
+
+
+class _SlowAsyncRedis:
+    def __init__(self) -> None:
+        self.published: list[dict] = []
+
+    async def publish(self, channel: str, envelope: str) -> None:
+        await asyncio.sleep(0.2)
+        self.published.append(json.loads(envelope))
+
+    def pubsub(self) -> "_SlowAsyncRedis":
+        return self
+
+    async def subscribe(self, channel: str) -> None:
+        await asyncio.Event().wait()
+
+    async def aclose(self) -> None:
+        pass
+
+
+def test_slow_redis_publish_does_not_block_the_caller(monkeypatch) -> None:
+    import redis.asyncio
+
+    fake = _SlowAsyncRedis()
+    monkeypatch.setattr(redis.asyncio.Redis, "from_url", lambda *args, **kwargs: fake)
+    manager = ConnectionManager(redis_url="redis://127.0.0.1:6379/0")
+    monkeypatch.setattr(manager._redis, "publish", lambda *args: (_ for _ in ()).throw(AssertionError("sync publish")))
+    ws = _FakeWebSocket()
+
+    async def run() -> float:
+        await manager.start()
+        await manager.connect(ws)
+        started = asyncio.get_running_loop().time()
+        for entity in ("report", "case", "hotspot"):
+            await manager.broadcast({"type": "refresh_data", "entity": entity})
+        elapsed = asyncio.get_running_loop().time() - started
+        await manager.flush()
+        await manager._publish_queue.join()
+        await manager.stop()
+        return elapsed
+
+    assert asyncio.run(run()) < 0.1
+    assert [m["entity"] for m in ws.messages] == ["report", "case", "hotspot"]
+    assert [e["entity"] for e in fake.published] == ["report", "case", "hotspot"]
@@ -9,18 +9,29 @@ class _FakeWebSocket:
     def __init__(self) -> None:
         self.messages: list[str] = []
 
+    async def accept(self) -> None:
+        pass
+
     async def send_text(self, payload: str) -> None:
         self.messages.append(payload)
 
 
+def _broadcast(manager: ConnectionManager, ws: _FakeWebSocket, message: dict) -> None:
+    async def run() -> None:
+        await manager.connect(ws)
+        await manager.broadcast(message)
+        await manager.flush()
+
+    asyncio.run(run())
+
+
 def test_broadcast_includes_request_id_from_context() -> None:
     manager = ConnectionManager()
     ws = _FakeWebSocket()
-    manager.active_connections.append(ws)
 
     token = set_request_id("rid-123")
     try:
-        asyncio.run(manager.broadcast({"type": "refresh_data", "entity": "report"}))
+        _broadcast(manager, ws, {"type": "refresh_data", "entity": "report"})
     finally:
         reset_request_id(token)
 
@@ -33,14 +44,11 @@ def test_broadcast_includes_request_id_from_context() -> None:
 def test_broadcast_preserves_existing_request_id() -> None:
     manager = ConnectionManager()
     ws = _FakeWebSocket()
-    manager.active_connections.append(ws)
 
     token = set_request_id("rid-context")
     try:
-        asyncio.run(
-            manager.broadcast(
-                {"type": "refresh_data", "entity": "hotspot", "request_id": "rid-payload"}
-            )
+        _broadcast(
+            manager, ws, {"type": "refresh_data", "entity": "hotspot", "request_id": "rid-payload"}
         )
     finally:
         reset_request_id(token)
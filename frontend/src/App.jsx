@@ -21,7 +21,8 @@ import Login from "./components/screens/Login";
 import ForgotPassword from "./components/screens/ForgotPassword";
 import ResetPassword from "./components/screens/ResetPassword";
 import { useAuth } from "./context/AuthContext";
-import { useRealtime } from "./context/WebSocketContext";
+import { topicRefreshKey, useRealtime } from "./context/WebSocketContext";
+import { isInPlaceUpdate } from "./utils/realtimePatch";
 import AddUserModal from "./components/Modals/AddUserModal";
 import EditUserModal from "./components/Modals/EditUserModal";
 import AssignModal from "./components/Modals/AssignModal";
@@ -32,9 +33,25 @@ import StationModal from "./components/Modals/StationModal";
 import StationDetailModal from "./components/Modals/StationDetailModal";
 import api from "./api/client";
 
+// Websocket topics each screen needs; screens not listed receive every entity.
+const SCREEN_TOPICS = {
+  reports: ["report"],
+  "case-management": ["case"],
+  "safety-map": ["hotspot"],
+  "hotspot-details": ["hotspot"],
+};
+// The sidebar badges count reports and cases.
+const SIDEBAR_TOPICS = ["report", "case"];
+
 function App() {
   const { user, loading, logout } = useAuth();
-  const { refreshKey: wsRefreshKey } = useRealtime();
+  const {
+    refreshKey: allRefreshKey,
+    lastMessage: wsMessage,
+    entityKeys,
+    setTopics,
+  } = useRealtime();
+  const [countsKey, setCountsKey] = useState(0);
   const initialReportId = (() => {
     if (typeof window === "undefined") return null;
     const path = window.location.pathname || "/";
@@ -291,6 +308,24 @@ function App() {
     localStorage.setItem("tb-mode", newMode ? "light" : "dark");
   };
 
+  const currentScreenId =
+    typeof currentScreen === "string" ? currentScreen : currentScreen.id;
+  const screenTopics = SCREEN_TOPICS[currentScreenId] || null;
+  // Bumped only by events for the current screen's topics.
+  const wsRefreshKey = topicRefreshKey(entityKeys, screenTopics, allRefreshKey);
+
+  useEffect(() => {
+    setTopics(screenTopics ? [...screenTopics, ...SIDEBAR_TOPICS] : null);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [currentScreenId, setTopics]);
+
+  // Sidebar totals only change when reports or cases are added or removed.
+  useEffect(() => {
+    if (!wsMessage || !SIDEBAR_TOPICS.includes(wsMessage.entity)) return;
+    if (isInPlaceUpdate(wsMessage)) return;
+    setCountsKey((key) => key + 1);
+  }, [wsMessage]);
+
   // Load sidebar badge counts (reports, cases, notifications)
   useEffect(() => {
     if (!user) return;
@@ -334,7 +369,7 @@ function App() {
       cancelled = true;
       clearInterval(id);
     };
-  }, [user, wsRefreshKey]);
+  }, [user, countsKey]);
 
   const goToScreen = (id, idx, props = {}) => {
     // Handle both string and object formats for consistency
@@ -383,7 +418,7 @@ function App() {
             goToScreen={goToScreen}
             openModal={openModal}
             onOpenReport={handleOpenReport}
-            wsRefreshKey={wsRefreshKey}
+            wsMessage={wsMessage}
             initialStatusFilter={
               currentScreen.props?.initialStatusFilter || "all"
             }
@@ -403,7 +438,7 @@ function App() {
           <CaseManagement
             goToScreen={goToScreen}
             openModal={openModal}
-            wsRefreshKey={wsRefreshKey}
+            wsMessage={wsMessage}
           />
         );
       case "hotspot-details":
@@ -1,10 +1,11 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import api from '../../api/client';
+import { patchListFromEvent } from '../../utils/realtimePatch';
 import { useAuth } from '../../context/AuthContext';
 import EditCaseModal from '../Modals/EditCaseModal';
 import ViewCaseModal from '../Modals/ViewCaseModal';
 
-const CaseManagement = ({ goToScreen, openModal, wsRefreshKey }) => {
+const CaseManagement = ({ goToScreen, openModal, wsMessage }) => {
   const { user: me } = useAuth();
   const role = me?.role || 'officer';
   const isAdminOrSupervisor = role === 'admin' || role === 'supervisor';
@@ -20,10 +21,32 @@ const CaseManagement = ({ goToScreen, openModal, wsRefreshKey }) => {
   const [priorityFilter, setPriorityFilter] = useState('all');
   const [stationsById, setStationsById] = useState({});
   const [stationFilter, setStationFilter] = useState('all');
+  const [reloadKey, setReloadKey] = useState(0);
+  // Events that arrived before this screen mounted are already in its first load.
+  const lastSeenSeq = useRef(wsMessage?.seq ?? 0);
 
   useEffect(() => {
     reload();
-  }, [wsRefreshKey]);
+  }, [reloadKey]);
+
+  // Patch loaded cases from case deltas; refetch only when that isn't possible.
+  useEffect(() => {
+    if (!wsMessage || wsMessage.seq <= lastSeenSeq.current) return;
+    lastSeenSeq.current = wsMessage.seq;
+    if (wsMessage.entity !== 'case') return;
+    const patched = patchListFromEvent(cases, wsMessage, 'case_id', statusFilter !== 'all' ? ['status'] : []);
+    if (patched === null) {
+      setReloadKey((key) => key + 1);
+      return;
+    }
+    if (patched !== cases) {
+      setCases(patched);
+    }
+    if ('status' in (wsMessage.changes || {})) {
+      api.get('/api/v1/cases/stats').then((s) => setStats(s || null)).catch(() => {});
+    }
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [wsMessage]);
 
   const reload = async () => {
     let mounted = true;
@@ -65,7 +88,7 @@ const CaseManagement = ({ goToScreen, openModal, wsRefreshKey }) => {
     return () => {
       cancelled = true;
     };
-  }, [wsRefreshKey]);
+  }, []);
 
   const openCount = stats?.open ?? 0;
   const inProgress = stats?.in_progress ?? 0;
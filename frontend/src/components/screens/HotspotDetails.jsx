@@ -193,38 +193,15 @@ const HotspotDetails = ({ hotspotId, wsRefreshKey }) => {
         
         console.log('Loading hotspot details for ID:', hotspotId);
         
-        // Use the admin endpoint for location data (which works perfectly)
-        const allHotspotsResponse = await api.get('/api/v1/hotspots');
-        console.log('🔍 HOTSPOT RESPONSE ANALYSIS:');
-        console.log('Full response:', allHotspotsResponse);
-        console.log('Response type:', typeof allHotspotsResponse);
-        console.log('Response keys:', Object.keys(allHotspotsResponse || {}));
-        
-        // Find the specific hotspot by ID
-        const hotspots = Array.isArray(allHotspotsResponse) ? allHotspotsResponse : [];
-        const foundHotspot = hotspots.find(h => h.hotspot_id == hotspotId);
-        
-        console.log('Found hotspot:', foundHotspot);
-        console.log('Incident points:', foundHotspot?.incident_points);
-        console.log('Evidence files from admin API:', foundHotspot?.evidence_files);
-        
-        // If admin API doesn't have evidence files in incident_points, try public API
-        if (foundHotspot && (!foundHotspot.evidence_files || foundHotspot.evidence_files.length === 0)) {
-          console.log('🔄 Admin API has no evidence files, trying public API...');
-          try {
-            const publicResponse = await api.get(`/api/v1/public/hotspots/${hotspotId}`);
-            console.log('📋 Public API response:', publicResponse);
-            if (publicResponse?.evidence_files && publicResponse.evidence_files.length > 0) {
-              console.log('✅ Found evidence files in public API:', publicResponse.evidence_files.length);
-              foundHotspot.evidence_files = publicResponse.evidence_files;
-            } else {
-              console.log('❌ No evidence files in public API either');
-            }
-          } catch (error) {
-            console.log('❌ Error calling public API:', error);
-          }
+        // Detail endpoint: the list endpoint no longer carries incident_points / evidence_files.
+        let foundHotspot = null;
+        try {
+          foundHotspot = await api.get(`/api/v1/hotspots/${hotspotId}`);
+        } catch (detailError) {
+          if (detailError?.status !== 404) throw detailError;
         }
-        
+        console.log('Found hotspot:', foundHotspot);
+
         if (foundHotspot) {
           console.log('Incident count from hotspot:', foundHotspot?.incident_count);
           
@@ -278,37 +255,10 @@ const HotspotDetails = ({ hotspotId, wsRefreshKey }) => {
           }
           
           setHotspot(foundHotspot);
-          
-          // If incident_points is not available, try to get reports by location
-          if (!foundHotspot?.incident_points || foundHotspot.incident_points.length === 0) {
-            console.log('No incident_points found, trying to get reports by location...');
-            try {
-              // Try to get reports near the hotspot location
-              const lat = foundHotspot?.center_lat || foundHotspot?.lat;
-              const lng = foundHotspot?.center_long || foundHotspot?.lng;
-              const radius = foundHotspot?.radius_meters || 500;
-              
-              console.log(`Querying reports near lat: ${lat}, lng: ${lng}, radius: ${radius}m`);
-              
-              // Query reports in the area
-              const reportsResponse = await api.get(`/api/v1/reports?limit=50&lat=${lat}&lng=${lng}&radius=${radius}`);
-              console.log('Reports by location:', reportsResponse);
-              
-              // Handle different response formats
-              const reports = Array.isArray(reportsResponse) ? reportsResponse : reportsResponse?.items || [];
-              setRelatedReports(reports);
-            } catch (locationError) {
-              console.error('Failed to get reports by location:', locationError);
-              setRelatedReports([]);
-            }
-          } else {
-            // Use incident_points if available
-            setRelatedReports(foundHotspot.incident_points);
-          }
-          
+          setRelatedReports(foundHotspot.incident_points || []);
           setError(null);
         } else {
-          console.error('Hotspot not found in list');
+          console.error('Hotspot not found');
           setError(`Hotspot #${hotspotId} not found`);
           setRelatedReports([]);
         }
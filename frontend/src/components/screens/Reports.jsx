@@ -1,6 +1,7 @@
-import React, { useEffect, useState, useCallback } from "react";
+import React, { useEffect, useState, useCallback, useRef } from "react";
 import api from "../../api/client";
 import { formatLocalDate } from "../../utils/dateTime";
+import { patchListFromEvent } from "../../utils/realtimePatch";
 import { useAuth } from "../../context/AuthContext";
 
 const friendlyFlagReason = (reason) => {
@@ -24,9 +25,12 @@ const friendlyFlagReason = (reason) => {
   return m[reason] || reason.replaceAll("_", " ");
 };
 
+// Report fields the header counters are derived from.
+const STATUS_FIELDS = ["status", "verification_status", "rule_status"];
+
 const Reports = ({
   onOpenReport,
-  wsRefreshKey,
+  wsMessage,
   initialStatusFilter = "all",
 }) => {
   const { user } = useAuth();
@@ -52,6 +56,9 @@ const Reports = ({
   const [toDate, setToDate] = useState("");
   const [incidentTypes, setIncidentTypes] = useState([]);
   const [locations, setLocations] = useState([]);
+  const [reloadKey, setReloadKey] = useState(0);
+  // Events that arrived before this screen mounted are already in its first load.
+  const lastSeenSeq = useRef(wsMessage?.seq ?? 0);
 
   const loadFilters = () => {
     // Load incident types for Types dropdown
@@ -152,11 +159,37 @@ const Reports = ({
 
   useEffect(() => {
     loadFilters();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [isAdmin]);
+
+  // Patch the loaded page from report deltas; refetch only when that isn't possible.
+  useEffect(() => {
+    if (!wsMessage || wsMessage.seq <= lastSeenSeq.current) return;
+    lastSeenSeq.current = wsMessage.seq;
+    if (wsMessage.entity !== "report") return;
+    const viewFields = [];
+    if (statusFilter !== "all") viewFields.push(...STATUS_FIELDS);
+    if (priorityFilter !== "all") viewFields.push("priority");
+    const patched = patchListFromEvent(data.items || [], wsMessage, "report_id", viewFields);
+    if (patched === null) {
+      setReloadKey((key) => key + 1);
+      return;
+    }
+    if (patched !== data.items) {
+      setData((prev) => ({ ...prev, items: patched }));
+    }
+    if (STATUS_FIELDS.some((field) => field in (wsMessage.changes || {}))) {
+      loadDashboardStats();
+    }
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [wsMessage]);
+
+  useEffect(() => {
     loadReports();
     loadDashboardStats();
   }, [
     offset,
-    wsRefreshKey,
+    reloadKey,
     initialStatusFilter,
     pageSize,
     statusFilter,
@@ -315,7 +315,7 @@ const SafetyMap = ({ goToScreen, openModal, wsRefreshKey }) => {
     return () => {
       mounted = false;
     };
-  }, [wsRefreshKey]);
+  }, []);
 
   // Load village polygons from public GeoJSON for district boundaries
   useEffect(() => {
@@ -4,19 +4,53 @@ import React, {
   useEffect,
   useState,
   useRef,
+  useCallback,
 } from "react";
 import { useAuth } from "./AuthContext";
 import { API_BASE_URL } from "../utils/apiBaseUrl";
-
-const WebSocketContext = createContext({ lastMessage: null, refreshKey: 0 });
+import { getToken } from "../api/client";
+
+const WebSocketContext = createContext({
+  lastMessage: null,
+  refreshKey: 0,
+  entityKeys: {},
+  setTopics: () => {},
+});
+
+const sendSubscribe = (socket, topics) => {
+  if (!socket || socket.readyState !== WebSocket.OPEN) return;
+  // Scoped to the user's station by token; no topics means every entity.
+  socket.send(
+    JSON.stringify({ type: "subscribe", topics: topics || [], token: getToken() }),
+  );
+};
 
 export const WebSocketProvider = ({ children }) => {
   const { user } = useAuth();
+  // Latest refresh_data event; seq makes repeated identical events distinct.
   const [lastMessage, setLastMessage] = useState(null);
   const [refreshKey, setRefreshKey] = useState(0);
+  // entity -> number of events received, so screens can key on their own topics.
+  const [entityKeys, setEntityKeys] = useState({});
+  // Topics the server should send (null = everything).
+  const [topics, setTopicsState] = useState(null);
+  const topicsRef = useRef(null);
+  const seq = useRef(0);
   const ws = useRef(null);
   const reconnectTimeout = useRef(null);
 
+  const setTopics = useCallback((next) => {
+    const normalized = next && next.length ? [...new Set(next)].sort() : null;
+    setTopicsState((prev) =>
+      JSON.stringify(prev) === JSON.stringify(normalized) ? prev : normalized,
+    );
+  }, []);
+
+  useEffect(() => {
+    topicsRef.current = topics;
+    sendSubscribe(ws.current, topics);
+  }, [topics]);
+
   useEffect(() => {
     // Only establish a connection if the user is authenticated
     if (!user) return;
@@ -37,6 +71,7 @@ export const WebSocketProvider = ({ children }) => {
 
       ws.current.onopen = () => {
         console.log("Real-time WebSocket connected.");
+        sendSubscribe(ws.current, topicsRef.current);
         if (reconnectTimeout.current) {
           clearTimeout(reconnectTimeout.current);
           reconnectTimeout.current = null;
@@ -47,8 +82,15 @@ export const WebSocketProvider = ({ children }) => {
         try {
           const data = JSON.parse(event.data);
           if (data.type === "refresh_data") {
-            setLastMessage(data);
+            seq.current += 1;
+            setLastMessage({ ...data, seq: seq.current });
             setRefreshKey((prev) => prev + 1);
+            if (data.entity) {
+              setEntityKeys((prev) => ({
+                ...prev,
+                [data.entity]: (prev[data.entity] || 0) + 1,
+              }));
+            }
           }
         } catch (e) {
           console.error("Failed to parse WS message", e);
@@ -85,11 +127,19 @@ export const WebSocketProvider = ({ children }) => {
   }, [user]);
 
   return (
-    <WebSocketContext.Provider value={{ lastMessage, refreshKey }}>
+    <WebSocketContext.Provider
+      value={{ lastMessage, refreshKey, entityKeys, setTopics }}
+    >
       {children}
     </WebSocketContext.Provider>
   );
 };
 
 export const useRealtime = () =>
-  useContext(WebSocketContext) || { refreshKey: 0 };
+  useContext(WebSocketContext) || { refreshKey: 0, entityKeys: {}, setTopics: () => {} };
+
+/** Number of events received for any of the given entities (all events when topics is null). */
+export const topicRefreshKey = (entityKeys, topics, refreshKey) =>
+  topics
+    ? topics.reduce((sum, topic) => sum + (entityKeys[topic] || 0), 0)
+    : refreshKey;
@@ -26,7 +26,9 @@ class WebSocketService {
     // Use the same API base URL as the REST API
     const apiBaseUrl = API_BASE_URL;
     const wsProtocol = apiBaseUrl.startsWith("https") ? "wss:" : "ws:";
-    const wsUrl = apiBaseUrl.replace(/^https?:/, wsProtocol) + "/api/v1/ws";
+    // Per-user unread counts; /api/v1/ws carries the dashboard refresh events.
+    const wsUrl =
+      apiBaseUrl.replace(/^https?:/, wsProtocol) + "/api/v1/ws/notifications";
 
     console.log("Connecting to WebSocket:", wsUrl);
 
@@ -0,0 +1,37 @@
+// Apply websocket refresh_data deltas (ids + changes) to already loaded lists,
+// so a screen only refetches when an event can't be applied locally.
+
+// Actions that change existing records without adding or removing any.
+const IN_PLACE_ACTIONS = new Set([
+  "updated",
+  "reviewed",
+  "assigned",
+  "evidence_added",
+]);
+
+export function isInPlaceUpdate(message) {
+  return Boolean(
+    message && IN_PLACE_ACTIONS.has(message.action) && message.ids?.length,
+  );
+}
+
+/**
+ * Patch `items` with a refresh_data event.
+ *
+ * Returns the (possibly unchanged) list when the event was handled locally, or
+ * null when the caller should refetch: records were created/deleted, a shown
+ * record changed in an unknown way, or a field the current view filters on
+ * (viewFields) changed and rows may move in or out of the view.
+ */
+export function patchListFromEvent(items, message, idField, viewFields = []) {
+  if (!isInPlaceUpdate(message)) return null;
+  const changes = message.changes || {};
+  if (viewFields.some((field) => field in changes)) return null;
+  const ids = new Set(message.ids.map(String));
+  const shown = items.some((item) => ids.has(String(item[idField])));
+  if (!shown) return items;
+  if (!Object.keys(changes).length) return null;
+  return items.map((item) =>
+    ids.has(String(item[idField])) ? { ...item, ...changes } : item,
+  );
+}